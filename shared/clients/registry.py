@@ -0,0 +1,289 @@
+"""
+Process-wide pooled provider clients.
+
+Constructing AsyncOpenAI()/AsyncAnthropic() per call builds a fresh httpx
+connection pool each time — a new DNS lookup, TCP connect and TLS handshake
+for every moderation check, classification and specialist answer. The
+registry hands out one long-lived client per provider with keep-alive tuned
+pool limits, so connections are reused across jobs and sessions.
+
+Usage:
+    from clients.registry import get_openai_client, get_anthropic_client
+    _client = client or get_openai_client()
+
+warm_up() pre-opens connections (backend-b lifespan, agent worker boot) so the
+first student request does not pay for the handshakes.
+
+CRITICAL: httpx connections are bound to the event loop that opened them.
+Clients are cached per provider *and* event loop — a new loop (pytest, a new
+LiveKit job process) gets a new client instead of a pool full of dead sockets.
+The client it replaces is closed with aclose() — on its own loop when that
+loop still runs elsewhere, otherwise on the current one (best-effort).
+
+in_flight counts a request from the moment it is sent until its response
+body is closed — streamed answers stay in flight until the last chunk, and
+requests that fail before any response are released too.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POOL_MAX_CONNECTIONS = int(os.environ.get("PROVIDER_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("PROVIDER_POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_SECONDS = float(os.environ.get("PROVIDER_POOL_KEEPALIVE_SECONDS", "90"))
+POOL_WARMUP_CONNECTIONS = int(os.environ.get("PROVIDER_POOL_WARMUP_CONNECTIONS", "2"))
+
+OPENAI = "openai"
+ANTHROPIC = "anthropic"
+
+
+@dataclass
+class PoolStats:
+    """Request counters for one provider's connection pool."""
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    clients_created: int = 0
+    clients_closed: int = 0
+    warmup_connections: int = 0
+    warmup_failures: int = 0
+
+    def snapshot(self, max_connections: int) -> dict:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": round(self.in_flight / max_connections, 4) if max_connections else 0.0,
+            "clients_created": self.clients_created,
+            "clients_closed": self.clients_closed,
+            "warmup_connections": self.warmup_connections,
+            "warmup_failures": self.warmup_failures,
+        }
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_SECONDS,
+    )
+
+
+class _CountedStream(httpx.AsyncByteStream):
+    """Response body that releases its in-flight slot when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport to count requests for the lifetime of their response."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: PoolStats):
+        self.transport = transport
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                stats.in_flight = max(0, stats.in_flight - 1)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CountedStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ClientRegistry:
+    """
+    One pooled client per provider (per event loop).
+
+    Factories are injectable for tests; by default they build SDK clients on
+    an httpx.AsyncClient with POOL_* limits and a request counting transport.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[httpx.AsyncClient], Any]]] = None):
+        self._factories = factories or {
+            OPENAI: _openai_factory,
+            ANTHROPIC: _anthropic_factory,
+        }
+        self._clients: Dict[str, Tuple[Optional[asyncio.AbstractEventLoop], Any, httpx.AsyncClient]] = {}
+        self.stats: Dict[str, PoolStats] = {name: PoolStats() for name in self._factories}
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self, provider: str) -> Any:
+        """Return the pooled client for provider, creating it on first use."""
+        loop = _current_loop()
+        entry = self._clients.get(provider)
+        if entry is not None:
+            owner, client, old_http_client = entry
+            if owner is None or loop is None or owner is loop:
+                return client
+            logger.info(f"Event loop changed, replacing pooled {provider} client")
+            self._retire(owner, old_http_client)
+            self.stats[provider].clients_closed += 1
+
+        http_client = self._http_client(provider)
+        client = self._factories[provider](http_client)
+        self._clients[provider] = (loop, client, http_client)
+        self.stats[provider].clients_created += 1
+        return client
+
+    def _http_client(self, provider: str) -> httpx.AsyncClient:
+        transport = httpx.AsyncHTTPTransport(limits=_pool_limits())
+        return httpx.AsyncClient(
+            transport=_CountingTransport(transport, self.stats[provider]),
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            follow_redirects=True,
+        )
+
+    def _retire(self, owner: asyncio.AbstractEventLoop, http_client: httpx.AsyncClient) -> None:
+        """
+        aclose() a client replaced after an event loop change (best-effort).
+
+        A loop still running elsewhere (another thread) closes it itself.
+        Otherwise it is closed in the background on the current loop; if the
+        old loop is already closed its connections cannot be shut down
+        cleanly and are only dropped — the failure is logged, not raised.
+        """
+        if owner.is_running() and not owner.is_closed():
+            asyncio.run_coroutine_threadsafe(_aclose(http_client), owner)
+            return
+        task = asyncio.get_running_loop().create_task(_aclose(http_client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def warm_up(self, connections: int = POOL_WARMUP_CONNECTIONS) -> None:
+        """
+        Pre-open `connections` keep-alive connections per provider.
+
+        Sends concurrent unauthenticated HEAD requests to each API host — the
+        status code does not matter, only that TCP + TLS are done. Failures are
+        logged, never raised.
+        """
+        if connections <= 0:
+            return
+
+        async def _open(provider: str) -> None:
+            try:
+                client = self.get(provider)
+                http_client = self._clients[provider][2]
+                url = str(client.base_url)
+            except Exception as e:
+                logger.warning(f"Pool warm-up skipped for {provider}: {e}")
+                self.stats[provider].warmup_failures += 1
+                return
+            results = await asyncio.gather(
+                *(http_client.head(url) for _ in range(connections)),
+                return_exceptions=True,
+            )
+            failures = sum(isinstance(r, Exception) for r in results)
+            self.stats[provider].warmup_connections += connections - failures
+            self.stats[provider].warmup_failures += failures
+            if failures:
+                logger.warning(f"Pool warm-up for {provider}: {failures}/{connections} connections failed")
+            else:
+                logger.info(f"Pool warm-up for {provider}: {connections} connections open")
+
+        await asyncio.gather(*(_open(provider) for provider in self._factories))
+
+    def snapshot(self) -> dict:
+        """Per-provider request counters and pool utilization."""
+        out = {}
+        for provider, stats in self.stats.items():
+            section = stats.snapshot(POOL_MAX_CONNECTIONS)
+            section["max_connections"] = POOL_MAX_CONNECTIONS
+            section["max_keepalive"] = POOL_MAX_KEEPALIVE
+            out[provider] = section
+        return out
+
+    async def aclose(self) -> None:
+        """Close every pooled client (shutdown)."""
+        entries, self._clients = list(self._clients.values()), {}
+        for _, _, http_client in entries:
+            await _aclose(http_client)
+
+
+async def _aclose(http_client: httpx.AsyncClient) -> None:
+    try:
+        await http_client.aclose()
+    except Exception as e:
+        logger.warning(f"Closing pooled client failed: {e}")
+
+
+def _openai_factory(http_client: httpx.AsyncClient) -> Any:
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(http_client=http_client)
+
+
+def _anthropic_factory(http_client: httpx.AsyncClient) -> Any:
+    from anthropic import AsyncAnthropic
+    return AsyncAnthropic(http_client=http_client)
+
+
+_registry: Optional[ClientRegistry] = None
+
+
+def get_registry() -> ClientRegistry:
+    """Process-wide client registry (lazily created)."""
+    global _registry
+    if _registry is None:
+        _registry = ClientRegistry()
+    return _registry
+
+
+def get_openai_client():
+    """Pooled AsyncOpenAI client shared by guardrail and specialists."""
+    return get_registry().get(OPENAI)
+
+
+def get_anthropic_client():
+    """Pooled AsyncAnthropic client shared by the classifier and math specialist."""
+    return get_registry().get(ANTHROPIC)
+
+
+async def warm_up(connections: int = POOL_WARMUP_CONNECTIONS) -> None:
+    """Pre-open provider connections on the process-wide registry."""
+    await get_registry().warm_up(connections)
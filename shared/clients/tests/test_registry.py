@@ -0,0 +1,198 @@
+"""Unit tests for the pooled provider client registry - no network calls."""
+import asyncio
+import pytest
+import httpx
+from unittest.mock import MagicMock
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from clients.registry import ANTHROPIC, OPENAI, ClientRegistry
+
+
+def _fake_factory(calls: list):
+    """Factory returning a stand-in SDK client bound to the pooled http client."""
+    def factory(http_client):
+        client = MagicMock()
+        client.base_url = "https://api.example.test/v1/"
+        client.http_client = http_client
+        calls.append(client)
+        return client
+    return factory
+
+
+def _registry(calls: list) -> ClientRegistry:
+    return ClientRegistry(factories={OPENAI: _fake_factory(calls), ANTHROPIC: _fake_factory(calls)})
+
+
+@pytest.mark.asyncio
+async def test_get_reuses_client_within_loop():
+    """Repeated lookups on one event loop share a single pooled client."""
+    calls = []
+    registry = _registry(calls)
+
+    first = registry.get(OPENAI)
+    second = registry.get(OPENAI)
+
+    assert first is second
+    assert len(calls) == 1
+    assert registry.stats[OPENAI].clients_created == 1
+    await registry.aclose()
+
+
+def test_get_recreates_client_for_new_event_loop():
+    """A client opened on one loop is not handed to a different loop."""
+    calls = []
+    registry = _registry(calls)
+
+    async def lookup():
+        return registry.get(OPENAI)
+
+    async def replace():
+        client = registry.get(OPENAI)
+        await asyncio.sleep(0.01)   # background aclose of the replaced client
+        return client
+
+    first = asyncio.run(lookup())
+    second = asyncio.run(replace())
+
+    assert first is not second
+    assert first.http_client.is_closed
+    assert registry.stats[OPENAI].clients_created == 2
+    assert registry.stats[OPENAI].clients_closed == 1
+
+
+def test_loop_change_closes_old_client_on_its_running_loop():
+    """A client replaced while its loop still runs (other thread) is closed there."""
+    calls = []
+    registry = _registry(calls)
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def lookup():
+            return registry.get(OPENAI)
+
+        asyncio.run_coroutine_threadsafe(lookup(), other).result(timeout=5)
+        old_http_client = calls[0].http_client
+
+        async def replace():
+            registry.get(OPENAI)
+            for _ in range(50):
+                if old_http_client.is_closed:
+                    break
+                await asyncio.sleep(0.02)
+
+        asyncio.run(replace())
+        assert old_http_client.is_closed
+        assert registry.stats[OPENAI].clients_closed == 1
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(timeout=5)
+        other.close()
+
+
+@pytest.mark.asyncio
+async def test_pooled_http_client_uses_keepalive_limits():
+    """The underlying httpx pool is built with the configured keep-alive limits."""
+    from clients.registry import POOL_MAX_CONNECTIONS, POOL_MAX_KEEPALIVE
+
+    calls = []
+    registry = _registry(calls)
+    registry.get(ANTHROPIC)
+
+    pool = calls[0].http_client._transport.transport._pool
+    assert pool._max_connections == POOL_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == POOL_MAX_KEEPALIVE
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_request_hooks_count_in_flight_requests():
+    """Requests through the pooled client update in-flight and peak counters."""
+    calls = []
+    registry = _registry(calls)
+    registry.get(OPENAI)
+    http_client = calls[0].http_client
+    http_client._transport.transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    await asyncio.gather(*(http_client.get("https://api.example.test/") for _ in range(3)))
+
+    snapshot = registry.snapshot()[OPENAI]
+    assert snapshot["requests"] == 3
+    assert snapshot["in_flight"] == 0
+    assert snapshot["peak_in_flight"] >= 1
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_stays_in_flight_until_body_closed():
+    """A streamed answer counts as in flight after its headers, until the body is closed."""
+    calls = []
+    registry = _registry(calls)
+    registry.get(OPENAI)
+    http_client = calls[0].http_client
+    http_client._transport.transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"data: chunk\n\n")
+    )
+
+    async with http_client.stream("POST", "https://api.example.test/") as response:
+        assert registry.stats[OPENAI].in_flight == 1
+        async for _ in response.aiter_bytes():
+            pass
+
+    assert registry.stats[OPENAI].in_flight == 0
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_in_flight():
+    """A request that fails before any response does not leak an in-flight slot."""
+    calls = []
+    registry = _registry(calls)
+    registry.get(OPENAI)
+    http_client = calls[0].http_client
+
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    http_client._transport.transport = httpx.MockTransport(refuse)
+
+    with pytest.raises(httpx.ConnectError):
+        await http_client.get("https://api.example.test/")
+
+    assert registry.stats[OPENAI].requests == 1
+    assert registry.stats[OPENAI].in_flight == 0
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections_per_provider():
+    """warm_up sends N concurrent requests per provider and counts them."""
+    calls = []
+    registry = _registry(calls)
+    for provider in (OPENAI, ANTHROPIC):
+        registry.get(provider)
+    for client in calls:
+        client.http_client._transport.transport = httpx.MockTransport(lambda request: httpx.Response(404))
+
+    await registry.warm_up(connections=3)
+
+    assert registry.stats[OPENAI].warmup_connections == 3
+    assert registry.stats[ANTHROPIC].warmup_connections == 3
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_is_logged_not_raised():
+    """A provider that cannot be constructed (no API key) only counts a failure."""
+    def broken(http_client):
+        raise RuntimeError("missing credentials")
+
+    registry = ClientRegistry(factories={OPENAI: broken})
+
+    await registry.warm_up(connections=2)
+
+    assert registry.stats[OPENAI].warmup_failures == 1
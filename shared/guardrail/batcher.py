@@ -0,0 +1,162 @@
+"""
+Cross-session micro-batching for moderation calls.
+
+Every guardrailed stream moderates one sentence at a time. At classroom peak
+that is hundreds of tiny moderation requests per second. The batcher collects
+pending sentences from all in-flight streams for a short window (or until
+max_batch_size items are queued) and sends them as ONE list-input
+moderations.create request, then fans each result back out to its caller.
+
+CRITICAL: Result order from the API matches input order — results[i] belongs
+to the i-th queued sentence. Never reorder the pending list between snapshot
+and fan-out.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from clients.registry import get_openai_client
+
+from .models import ModerationResult
+
+logger = logging.getLogger(__name__)
+
+# Off by default: check() without an explicit client/batcher only uses the
+# shared batcher when GUARDRAIL_BATCHING=true (set for backend-b and agent-a).
+BATCHING_ENABLED = os.environ.get("GUARDRAIL_BATCHING", "false").lower() in ("1", "true", "yes")
+BATCH_WINDOW_MS = float(os.environ.get("GUARDRAIL_BATCH_WINDOW_MS", "10"))
+BATCH_MAX_SIZE = int(os.environ.get("GUARDRAIL_BATCH_MAX_SIZE", "32"))
+
+
+@dataclass
+class BatcherStats:
+    """Counters for batch size and latency (exposed via snapshot())."""
+    batches_sent: int = 0
+    items_sent: int = 0
+    max_batch_size: int = 0
+    failed_batches: int = 0
+    total_request_ms: float = 0.0   # moderation API round-trip time, summed
+    total_wait_ms: float = 0.0      # time items spent queued before dispatch, summed
+
+    def snapshot(self) -> dict:
+        batches = self.batches_sent or 1
+        items = self.items_sent or 1
+        return {
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "failed_batches": self.failed_batches,
+            "avg_batch_size": round(self.items_sent / batches, 2),
+            "max_batch_size": self.max_batch_size,
+            "avg_request_ms": round(self.total_request_ms / batches, 2),
+            "avg_queue_wait_ms": round(self.total_wait_ms / items, 2),
+        }
+
+
+class ModerationBatcher:
+    """
+    Collects moderation requests across sessions and dispatches them in batches.
+
+    Usage:
+        batcher = ModerationBatcher(window_ms=10, max_batch_size=32)
+        result = await batcher.submit("Some sentence.")
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+    ):
+        self._client = client
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+        self.stats = BatcherStats()
+
+    def _get_client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = get_openai_client()
+        return self._client
+
+    async def submit(self, text: str) -> ModerationResult:
+        """Queue text for the next batch and wait for its ModerationResult."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future, time.monotonic()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000, self._dispatch)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Dispatch anything pending now and wait for in-flight batches to finish."""
+        self._dispatch()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _dispatch(self) -> None:
+        """Snapshot the pending queue and send it as one request in the background."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        from .service import MODERATION_MODEL, _to_moderation_result
+
+        sent_at = time.monotonic()
+        texts = [text for text, _, _ in batch]
+        self.stats.batches_sent += 1
+        self.stats.items_sent += len(batch)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+        self.stats.total_wait_ms += sum((sent_at - queued) * 1000 for _, _, queued in batch)
+
+        try:
+            response = await self._get_client().moderations.create(input=texts, model=MODERATION_MODEL)
+            results = [
+                _to_moderation_result(text, result)
+                for text, result in zip(texts, response.results)
+            ]
+            if len(results) != len(texts):
+                raise ValueError(f"expected {len(texts)} results, got {len(results)}")
+        except Exception as e:
+            logger.error(f"Batched moderation check failed ({len(texts)} items): {e}")
+            self.stats.failed_batches += 1
+            # Fail safe, same as check(): treat as not flagged on error
+            results = [
+                ModerationResult(flagged=False, original_text=text, error=str(e))
+                for text in texts
+            ]
+        finally:
+            self.stats.total_request_ms += (time.monotonic() - sent_at) * 1000
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+_batcher: Optional[ModerationBatcher] = None
+
+
+def get_batcher() -> ModerationBatcher:
+    """Process-wide batcher shared by all sessions (lazily created)."""
+    global _batcher
+    if _batcher is None:
+        _batcher = ModerationBatcher()
+    return _batcher
@@ -0,0 +1,215 @@
+"""
+Shared moderation result cache.
+
+The same sentences recur constantly across students ("Great question!",
+step headers in math answers, the fixed escalation line). The cache stores
+the ModerationResult — including any rewritten text — keyed on a hash of the
+normalized sentence plus the moderation model, so a repeat costs no API call.
+
+Backends are pluggable:
+- InMemoryCacheBackend: per-process LRU with TTL (default)
+- RedisCacheBackend: shared across backend-b workers (needs `redis` extra)
+
+CRITICAL: Results that failed open (result.error set) are never cached —
+an outage must not pin "not flagged" for a sentence after it recovers.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Optional
+
+from .models import ModerationResult
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.environ.get("GUARDRAIL_CACHE", "false").lower() in ("1", "true", "yes")
+CACHE_MAX_SIZE = int(os.environ.get("GUARDRAIL_CACHE_SIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.environ.get("GUARDRAIL_CACHE_TTL_SECONDS", "3600"))
+CACHE_REDIS_URL = os.environ.get("GUARDRAIL_CACHE_REDIS_URL", "")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different sentences share a key."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def cache_key(text: str, model: str) -> str:
+    """Cache key: moderation model + SHA-256 of the normalized text."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+class CacheBackend:
+    """Async key/value interface for moderation cache storage."""
+
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict) -> None:
+        raise NotImplementedError
+
+    def snapshot(self) -> dict:
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU cache with TTL expiry."""
+
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis-backed cache shared by every worker. Expiry uses key TTL; size is
+    bounded by Redis maxmemory policy (allkeys-lru) rather than by this class.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        prefix: str = "guardrail:mod:",
+    ):
+        import redis.asyncio as aioredis  # optional dependency: guardrail[redis]
+
+        self._redis = aioredis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict) -> None:
+        await self._redis.set(
+            self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl_seconds))
+        )
+
+    def snapshot(self) -> dict:
+        return {"backend": "redis", "ttl_seconds": self.ttl_seconds}
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    backend_errors: int = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "backend_errors": self.backend_errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ModerationCache:
+    """
+    Moderation result cache over a pluggable backend.
+
+    Backend failures are logged and counted but never raised — the cache is an
+    optimization and must not break the guardrail.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, model: Optional[str] = None):
+        if model is None:
+            from .service import MODERATION_MODEL
+            model = MODERATION_MODEL
+        self.backend = backend or InMemoryCacheBackend()
+        self.model = model
+        self.stats = CacheStats()
+
+    async def get(self, text: str) -> Optional[ModerationResult]:
+        """Return a cached result for text (original_text set to text), or None."""
+        try:
+            value = await self.backend.get(cache_key(text, self.model))
+        except Exception as e:
+            logger.warning(f"Moderation cache lookup failed: {e}")
+            self.stats.backend_errors += 1
+            value = None
+
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return replace(ModerationResult(**value), original_text=text, cached=True)
+
+    async def put(self, result: ModerationResult) -> None:
+        """Store a result. Failed-open results are skipped."""
+        if result.error is not None:
+            return
+        try:
+            await self.backend.set(
+                cache_key(result.original_text, self.model),
+                asdict(replace(result, cached=False)),
+            )
+            self.stats.stores += 1
+        except Exception as e:
+            logger.warning(f"Moderation cache store failed: {e}")
+            self.stats.backend_errors += 1
+
+    def snapshot(self) -> dict:
+        return {**self.stats.snapshot(), **self.backend.snapshot()}
+
+
+_cache: Optional[ModerationCache] = None
+
+
+def get_cache() -> ModerationCache:
+    """
+    Process-wide moderation cache (lazily created). Uses Redis when
+    GUARDRAIL_CACHE_REDIS_URL is set so all workers share entries.
+    """
+    global _cache
+    if _cache is None:
+        backend: CacheBackend
+        if CACHE_REDIS_URL:
+            backend = RedisCacheBackend(CACHE_REDIS_URL)
+        else:
+            backend = InMemoryCacheBackend()
+        _cache = ModerationCache(backend=backend)
+    return _cache
@@ -0,0 +1,259 @@
+"""
+Latency budgets, timeout policies and a circuit breaker for moderation calls.
+
+Without a budget a slow moderation call waits on the client's default timeout
+(minutes) and then silently fails open — the student hears nothing meanwhile.
+With a budget every call is bounded:
+
+- GUARDRAIL_CALL_BUDGET_MS:   max time for one moderation call
+- GUARDRAIL_STREAM_BUDGET_MS: max total moderation time across one response;
+  once spent, remaining sentences get the policy immediately
+
+When a call exceeds its budget or errors, GUARDRAIL_TIMEOUT_POLICY decides:
+- open:   pass the sentence through unmoderated (previous behaviour)
+- closed: replace it with FAIL_CLOSED_TEXT
+- retry:  hold the sentence and retry once within the budget, then fail closed
+
+The circuit breaker opens after GUARDRAIL_BREAKER_FAILURES consecutive
+failures and skips the API (straight to the policy) for
+GUARDRAIL_BREAKER_COOLDOWN_SECONDS, then lets one probe call through. A probe
+that ends without a result (cancelled, or no budget left to make the call)
+counts as a failure, so the breaker never stays half-open.
+
+In fail-closed streams FAIL_CLOSED_TEXT is spoken once per run of blocked
+sentences; a sentence that passes moderation ends the run.
+
+CRITICAL: Budgets and the breaker are off by default (0) so callers that do
+not opt in keep the old behaviour. docker-compose turns them on.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from .models import ModerationResult
+from .rewriter import TIER_FALLBACK
+
+logger = logging.getLogger(__name__)
+
+CALL_BUDGET_MS = float(os.environ.get("GUARDRAIL_CALL_BUDGET_MS", "0"))
+STREAM_BUDGET_MS = float(os.environ.get("GUARDRAIL_STREAM_BUDGET_MS", "0"))
+TIMEOUT_POLICY = os.environ.get("GUARDRAIL_TIMEOUT_POLICY", "open").lower()
+BREAKER_FAILURES = int(os.environ.get("GUARDRAIL_BREAKER_FAILURES", "0"))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("GUARDRAIL_BREAKER_COOLDOWN_SECONDS", "30"))
+
+POLICY_OPEN = "open"
+POLICY_CLOSED = "closed"
+POLICY_RETRY = "retry"
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Spoken in place of a sentence that could not be moderated in time (fail closed)
+FAIL_CLOSED_TEXT = "Sorry, I need a moment to check my answer. Could you ask me that again?"
+
+
+class Deadline:
+    """Absolute deadline shared by every sentence of one guardrailed stream."""
+
+    def __init__(self, budget_ms: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + budget_ms / 1000 if budget_ms > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None for no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed → open → half_open → closed)."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURES,
+        cooldown_seconds: float = BREAKER_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """True if a call may go to the API now."""
+        if self.failure_threshold <= 0 or self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and self._clock() - self.opened_at >= self.cooldown_seconds:
+            self.state = BREAKER_HALF_OPEN
+            return True  # one probe call
+        return False
+
+    def record_success(self) -> None:
+        if self.state != BREAKER_CLOSED:
+            logger.info("Moderation circuit breaker closed")
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"Moderation circuit breaker open after {self.consecutive_failures} failures"
+                )
+            self.state = BREAKER_OPEN
+            self.opened_at = self._clock()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "enabled": self.failure_threshold > 0,
+        }
+
+
+@dataclass
+class DeadlineStats:
+    calls: int = 0
+    budget_exceeded: int = 0
+    errors: int = 0
+    retries: int = 0
+    breaker_skips: int = 0
+    failed_open: int = 0
+    failed_closed: int = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "budget_exceeded": self.budget_exceeded,
+            "errors": self.errors,
+            "retries": self.retries,
+            "breaker_skips": self.breaker_skips,
+            "failed_open": self.failed_open,
+            "failed_closed": self.failed_closed,
+        }
+
+
+class GuardrailPolicy:
+    """
+    Runs a moderation call under the call/stream budget and the breaker, and
+    applies the timeout policy when it does not produce a result.
+    """
+
+    def __init__(
+        self,
+        policy: str = TIMEOUT_POLICY,
+        call_budget_ms: float = CALL_BUDGET_MS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if policy not in (POLICY_OPEN, POLICY_CLOSED, POLICY_RETRY):
+            logger.warning(f"Unknown guardrail timeout policy {policy!r}, using 'open'")
+            policy = POLICY_OPEN
+        self.policy = policy
+        self.call_budget_ms = call_budget_ms
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = DeadlineStats()
+
+    def _timeout(self, deadline: Optional[Deadline]) -> Optional[float]:
+        """Seconds allowed for the next attempt (None = unbounded)."""
+        limits = []
+        if self.call_budget_ms > 0:
+            limits.append(self.call_budget_ms / 1000)
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None:
+            limits.append(remaining)
+        return min(limits) if limits else None
+
+    async def run(
+        self,
+        text: str,
+        call: Callable[[], Awaitable[ModerationResult]],
+        deadline: Optional[Deadline] = None,
+    ) -> ModerationResult:
+        """
+        Await call() within budget. call() must return a ModerationResult with
+        error set (not raise) on API failure.
+        """
+        self.stats.calls += 1
+        if not self.breaker.allow():
+            self.stats.breaker_skips += 1
+            return self._fallback(text, "moderation circuit breaker open")
+
+        probing = self.breaker.state == BREAKER_HALF_OPEN
+        attempts = 2 if self.policy == POLICY_RETRY else 1
+        reason = ""
+        try:
+            for attempt in range(attempts):
+                if attempt:
+                    self.stats.retries += 1
+                timeout = self._timeout(deadline)
+                if timeout is not None and timeout <= 0:
+                    self.stats.budget_exceeded += 1
+                    reason = "moderation stream budget exhausted"
+                    break
+                try:
+                    result = await asyncio.wait_for(call(), timeout) if timeout is not None else await call()
+                except asyncio.TimeoutError:
+                    self.stats.budget_exceeded += 1
+                    self.breaker.record_failure()
+                    reason = f"moderation exceeded {timeout * 1000:.0f}ms budget"
+                    continue
+                if result.error is None:
+                    self.breaker.record_success()
+                    return result
+                self.stats.errors += 1
+                self.breaker.record_failure()
+                reason = result.error
+        finally:
+            if probing and self.breaker.state == BREAKER_HALF_OPEN:
+                # The probe was cancelled or never made: reopen so a later call probes again
+                self.breaker.record_failure()
+
+        return self._fallback(text, reason)
+
+    def _fallback(self, text: str, reason: str) -> ModerationResult:
+        if self.policy == POLICY_OPEN:
+            self.stats.failed_open += 1
+            logger.warning(f"Guardrail failing open ({reason}): {text[:50]}...")
+            return ModerationResult(flagged=False, original_text=text, error=reason)
+
+        self.stats.failed_closed += 1
+        logger.warning(f"Guardrail failing closed ({reason}): {text[:50]}...")
+        return ModerationResult(
+            flagged=True,
+            original_text=text,
+            rewritten_text=FAIL_CLOSED_TEXT,
+            rewrite_tier=TIER_FALLBACK,
+            error=reason,
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "policy": self.policy,
+            "call_budget_ms": self.call_budget_ms,
+            **self.stats.snapshot(),
+            "breaker": self.breaker.snapshot(),
+        }
+
+
+_policy: Optional[GuardrailPolicy] = None
+
+
+def get_policy() -> GuardrailPolicy:
+    """Process-wide policy + breaker (lazily created) so outages are seen across sessions."""
+    global _policy
+    if _policy is None:
+        _policy = GuardrailPolicy()
+    return _policy
@@ -11,6 +11,12 @@ class ModerationResult:
     original_text: str = ""
     rewritten_text: Optional[str] = None
     confidence: float = 0.0
+    error: Optional[str] = None       # Set when moderation failed open (never cached)
+    cached: bool = False              # Served from the moderation result cache
+    prefilter: Optional[str] = None   # Lexical pre-filter decision: pass|block|ambiguous
+    prefilter_score: float = 0.0
+    rewrite_tier: Optional[str] = None   # template | llm | fallback (None if not rewritten)
+    rewrite_ms: float = 0.0
 
     @property
     def safe_text(self) -> str:
@@ -18,3 +24,33 @@ class ModerationResult:
         if self.flagged and self.rewritten_text:
             return self.rewritten_text
         return self.original_text
+
+
+@dataclass
+class GuardrailEvent:
+    """Per-sentence guardrail outcome, emitted alongside the safe text stream."""
+    index: int                        # Sentence position in the stream (0-based)
+    original_text: str
+    safe_text: str
+    flagged: bool
+    categories_flagged: List[str] = field(default_factory=list)
+    confidence: float = 0.0
+    rewrite_tier: Optional[str] = None
+    cached: bool = False
+    prefilter: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, index: int, result: ModerationResult) -> "GuardrailEvent":
+        return cls(
+            index=index,
+            original_text=result.original_text,
+            safe_text=result.safe_text,
+            flagged=result.flagged,
+            categories_flagged=list(result.categories_flagged),
+            confidence=result.confidence,
+            rewrite_tier=result.rewrite_tier,
+            cached=result.cached,
+            prefilter=result.prefilter,
+            error=result.error,
+        )
@@ -0,0 +1,226 @@
+"""
+Local lexical pre-filter in front of the moderation API.
+
+Most tutoring sentences are obviously benign. The pre-filter runs a compiled
+Aho-Corasick automaton over curated term lists and scores each sentence:
+
+- pass:      no sensitive term at all → not flagged, no network call
+- block:     block-term score >= block_threshold → flagged, straight to rewrite
+- ambiguous: anything in between → moderations.create decides
+
+CRITICAL: Term lists are deliberately conservative. History answers talk about
+wars and deaths all the time — those words are "sensitive" (ambiguous), never
+"block". Only unmistakable phrases belong in BLOCK_TERMS.
+
+A sample of "pass" decisions (GUARDRAIL_PREFILTER_AUDIT_RATE) is still sent to
+the API so the false-negative rate can be measured on real traffic.
+"""
+import logging
+import os
+import random
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .models import ModerationResult
+
+logger = logging.getLogger(__name__)
+
+PREFILTER_ENABLED = os.environ.get("GUARDRAIL_PREFILTER", "false").lower() in ("1", "true", "yes")
+PREFILTER_AUDIT_RATE = float(os.environ.get("GUARDRAIL_PREFILTER_AUDIT_RATE", "0.05"))
+
+PASS = "pass"
+BLOCK = "block"
+AMBIGUOUS = "ambiguous"
+
+# Unmistakable phrases: category -> terms. Each match scores BLOCK_WEIGHT.
+BLOCK_TERMS: Dict[str, List[str]] = {
+    "self-harm": [
+        "kill yourself", "kys", "cut yourself", "end your life", "hurt yourself",
+        "how to commit suicide",
+    ],
+    "violence": [
+        "how to make a bomb", "build a bomb", "make a pipe bomb", "shoot up a school",
+        "how to poison someone",
+    ],
+    "sexual": ["porn", "pornography", "nudes", "send nudes"],
+    "harassment": ["you are worthless", "nobody likes you", "you should die"],
+}
+BLOCK_WEIGHT = 1.0
+
+# Words that are fine in context ("the war killed millions") but need a real
+# moderation check. Each match scores SENSITIVE_WEIGHT.
+SENSITIVE_TERMS: Dict[str, List[str]] = {
+    "violence": [
+        "kill", "killed", "killing", "murder", "murdered", "bomb", "bombs", "bombing",
+        "gun", "guns", "shoot", "shot", "weapon", "weapons", "knife", "attack",
+        "blood", "war", "massacre", "genocide", "torture", "execute", "executed",
+    ],
+    "self-harm": ["suicide", "self harm", "die", "dead", "death", "overdose"],
+    "hate": ["nazi", "nazis", "slave", "slavery", "racist", "racism", "hate"],
+    "sexual": ["sex", "sexual", "naked", "nude"],
+    "illicit": ["drug", "drugs", "cocaine", "heroin", "steal", "hack"],
+    "harassment": ["stupid", "idiot", "dumb", "loser", "shut up"],
+}
+SENSITIVE_WEIGHT = 0.25
+
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, collapse punctuation/whitespace, pad with spaces for whole-word matching."""
+    return f" {_NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+class _TermAutomaton:
+    """Aho-Corasick automaton: finds every listed term in one pass over the text."""
+
+    def __init__(self, terms: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for term in terms:
+            node = 0
+            for ch in term:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(term)
+
+        # Breadth-first failure links; outputs inherit from their fallback node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def find(self, text: str) -> List[str]:
+        """Return the distinct terms present in text, in first-seen order."""
+        found: Dict[str, None] = {}
+        node = 0
+        for ch in text:
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for term in self._out[node]:
+                found[term] = None
+        return list(found)
+
+
+@dataclass
+class PrefilterDecision:
+    """Outcome of the lexical pre-filter for one sentence."""
+    decision: str                                   # pass | block | ambiguous
+    score: float = 0.0
+    categories: List[str] = field(default_factory=list)
+    matched_terms: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PrefilterStats:
+    passed: int = 0
+    blocked: int = 0
+    ambiguous: int = 0
+    audited: int = 0
+    audit_false_negatives: int = 0   # audited "pass" that the API flagged
+
+    def snapshot(self) -> dict:
+        total = self.passed + self.blocked + self.ambiguous
+        skipped_api = self.passed - self.audited + self.blocked
+        return {
+            "passed": self.passed,
+            "blocked": self.blocked,
+            "ambiguous": self.ambiguous,
+            "audited": self.audited,
+            "audit_false_negatives": self.audit_false_negatives,
+            "api_call_reduction": round(skipped_api / total, 4) if total else 0.0,
+            "false_negative_rate": (
+                round(self.audit_false_negatives / self.audited, 4) if self.audited else 0.0
+            ),
+        }
+
+
+class LexicalPrefilter:
+    """Scores sentences against curated term lists with a compiled automaton."""
+
+    def __init__(
+        self,
+        block_terms: Optional[Dict[str, List[str]]] = None,
+        sensitive_terms: Optional[Dict[str, List[str]]] = None,
+        block_threshold: float = 1.0,
+        audit_rate: float = PREFILTER_AUDIT_RATE,
+    ):
+        self.block_threshold = block_threshold
+        self.audit_rate = audit_rate
+        self.stats = PrefilterStats()
+
+        # Padded term -> (category, weight); block entries win on duplicates
+        self._terms: Dict[str, Tuple[str, float]] = {}
+        for weight, table in (
+            (SENSITIVE_WEIGHT, SENSITIVE_TERMS if sensitive_terms is None else sensitive_terms),
+            (BLOCK_WEIGHT, BLOCK_TERMS if block_terms is None else block_terms),
+        ):
+            for category, terms in table.items():
+                for term in terms:
+                    self._terms[_normalize(term)] = (category, weight)
+        self._automaton = _TermAutomaton(list(self._terms))
+
+    def classify(self, text: str) -> PrefilterDecision:
+        """Score text and decide pass / block / ambiguous."""
+        matched = self._automaton.find(_normalize(text))
+        if not matched:
+            self.stats.passed += 1
+            return PrefilterDecision(decision=PASS)
+
+        score = sum(self._terms[term][1] for term in matched)
+        categories = list(dict.fromkeys(self._terms[term][0] for term in matched))
+        terms = [term.strip() for term in matched]
+
+        # Only unmistakable phrases can block — any number of sensitive words
+        # ("war", "killed", "blood") still goes to the API
+        blocking = [term for term in matched if self._terms[term][1] >= BLOCK_WEIGHT]
+        block_score = sum(self._terms[term][1] for term in blocking)
+        if block_score >= self.block_threshold:
+            self.stats.blocked += 1
+            block_categories = list(dict.fromkeys(self._terms[term][0] for term in blocking))
+            return PrefilterDecision(BLOCK, score, block_categories, terms)
+
+        self.stats.ambiguous += 1
+        return PrefilterDecision(AMBIGUOUS, score, categories, terms)
+
+    def should_audit(self) -> bool:
+        """Sample a 'pass' decision for an API cross-check."""
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def record_audit(self, result: ModerationResult) -> None:
+        """Record the API verdict for an audited 'pass' decision."""
+        self.stats.audited += 1
+        if result.flagged:
+            self.stats.audit_false_negatives += 1
+            logger.warning(
+                f"Prefilter false negative ({result.categories_flagged}): "
+                f"{result.original_text[:50]}..."
+            )
+
+
+_prefilter: Optional[LexicalPrefilter] = None
+
+
+def get_prefilter() -> LexicalPrefilter:
+    """Process-wide pre-filter (automaton compiled once, lazily)."""
+    global _prefilter
+    if _prefilter is None:
+        _prefilter = LexicalPrefilter()
+    return _prefilter
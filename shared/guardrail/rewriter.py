@@ -0,0 +1,132 @@
+"""
+Rewrite tiers for flagged content.
+
+Tier 1 — template: high-confidence flags in categories where the right answer
+is always the same redirect (self-harm → point to a trusted adult, sexual →
+back to the lesson) get a fixed safe sentence. No LLM call, ~0ms.
+
+Tier 2 — llm: gpt-4o-mini rewrites the sentence. rewrite_stream() streams the
+rewrite clause by clause so TTS can start on the first clause instead of
+waiting for the whole completion.
+
+Tier 3 — fallback: REWRITE_FALLBACK when the LLM rewrite fails.
+
+CRITICAL: Violence is deliberately NOT templated — history answers about wars
+are flagged for violence and need an LLM rewrite that keeps the lesson.
+"""
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from clients.registry import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+REWRITE_MODEL = os.environ.get("GUARDRAIL_REWRITE_MODEL", "gpt-4o-mini")
+TEMPLATE_MIN_CONFIDENCE = float(os.environ.get("GUARDRAIL_TEMPLATE_MIN_CONFIDENCE", "0.9"))
+
+TIER_TEMPLATE = "template"
+TIER_LLM = "llm"
+TIER_FALLBACK = "fallback"
+
+# Spoken when a flagged sentence cannot be rewritten
+REWRITE_FALLBACK = (
+    "I apologize, but I cannot answer that question in the way you've asked. Please try rephrasing."
+)
+
+# Category prefix (after normalizing "_" and "/" to "-") -> safe sentence.
+# Checked in order: self-harm wins when several categories are flagged.
+SAFE_TEMPLATES: Dict[str, str] = {
+    "self-harm": (
+        "If you're going through something difficult, please talk to a teacher "
+        "or a trusted adult right away. You don't have to handle it alone."
+    ),
+    "sexual": "That's not something I can talk about here. Let's get back to your lesson.",
+    "hate": "Let's keep our language kind and respectful to everyone. Back to the lesson!",
+    "harassment": "Let's keep things kind and respectful. Back to the lesson!",
+    "illicit": "I can't help with that, but I'm happy to keep going with your studies.",
+}
+
+_CLAUSE_END = ",;:.!?\n"
+
+SYSTEM_PROMPT = (
+    "You are a content safety editor for an educational AI tutor. "
+    "Rewrite content to be safe while preserving educational value."
+)
+
+
+def rewrite_messages(text: str, categories: List[str]) -> list[dict]:
+    """Chat messages for an LLM rewrite of flagged text."""
+    categories_str = ", ".join(categories)
+    prompt = (
+        f"The following educational AI response was flagged for: {categories_str}.\n"
+        f"Rewrite it to be completely safe and appropriate for students, "
+        f"while keeping the educational value:\n\n{text}"
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _normalize_category(category: str) -> str:
+    return category.lower().replace("_", "-").replace("/", "-")
+
+
+def template_for(categories: List[str], confidence: float) -> Optional[str]:
+    """Return the safe template for a high-confidence flag, or None to use the LLM."""
+    if confidence < TEMPLATE_MIN_CONFIDENCE:
+        return None
+    normalized = [_normalize_category(c) for c in categories]
+    for prefix, template in SAFE_TEMPLATES.items():
+        if any(c.startswith(prefix) for c in normalized):
+            return template
+    return None
+
+
+async def rewrite_stream(
+    text: str,
+    categories: List[str],
+    client: Optional[AsyncOpenAI] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream an LLM rewrite of flagged text, one clause at a time.
+
+    Yields clauses as soon as a clause boundary (, ; : . ! ?) arrives. If the
+    rewrite fails before anything was yielded, yields REWRITE_FALLBACK.
+    """
+    _client = client or get_openai_client()
+    buffer = ""
+    emitted = False
+
+    try:
+        stream = await _client.chat.completions.create(
+            model=REWRITE_MODEL,
+            messages=rewrite_messages(text, categories),
+            temperature=0.1,
+            max_tokens=500,
+            stream=True,
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            buffer += delta
+            cut = max(buffer.rfind(ch) for ch in _CLAUSE_END)
+            if cut >= 0:
+                clause, buffer = buffer[:cut + 1], buffer[cut + 1:]
+                if clause.strip():
+                    yield clause if emitted else clause.lstrip()
+                    emitted = True
+    except Exception as e:
+        logger.error(f"Streaming content rewrite failed: {e}")
+        if not emitted:
+            yield REWRITE_FALLBACK
+            return
+
+    if buffer.strip():
+        yield buffer if emitted else buffer.lstrip()
+    elif not emitted:
+        yield REWRITE_FALLBACK
@@ -0,0 +1,261 @@
+"""
+Incremental streaming sentence segmenter.
+
+Shared by the guardrail stream (backend-b) and GuardedAgent.tts_node (agent-a).
+
+Unlike `buffer += chunk; _SENTENCE_END.search(buffer)`, the segmenter:
+- tracks a scan offset, so each character is examined once (linear, not
+  quadratic, on long chunks)
+- only ends a sentence at [.!?] followed by whitespace, so "3.14" stays whole
+- skips abbreviations ("e.g.", "Mr.", "Dr."), initials ("J. K. Rowling",
+  "George W. Bush") and list markers ("1. First step") that look like
+  sentence ends; a lone capital is only an initial before another initial or
+  after a name and before a capitalized word, so "The answer is B. Next..."
+  still splits
+- optionally coalesces sentences shorter than min_chars with the next one,
+  bounded by a max_hold_ms latency deadline: feed() releases expired holds,
+  and segment_stream() awaits the next chunk with a hold_remaining() timeout
+  and calls poll(), so a stalled stream cannot hold a sentence past it
+
+CRITICAL: Punctuation at the very end of the buffer is undecided until the
+next character (or flush()) arrives — "3." may still become "3.14". After a
+name ("George W.") it waits for the first letter of the next word.
+"""
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+MIN_SENTENCE_CHARS = int(os.environ.get("GUARDRAIL_MIN_SENTENCE_CHARS", "0"))
+MAX_HOLD_MS = float(os.environ.get("GUARDRAIL_MAX_HOLD_MS", "250"))
+
+_TERMINALS = ".!?"
+# Closing characters allowed between the punctuation and the whitespace: 'He said "hi."'
+_CLOSERS = "\"')]}’”"
+
+# Only tokens that are never ordinary words: "no", "fig", "mar" and month
+# names end real sentences ("The answer is no.") far more often than not
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "mt", "ft",
+    "e.g", "i.e", "cf", "approx", "eq", "vol", "pp",
+})
+
+
+class SentenceSegmenter:
+    """
+    Feed text chunks, get back complete sentences.
+
+    Usage:
+        segmenter = SentenceSegmenter()
+        for chunk in stream:
+            for sentence in segmenter.feed(chunk):
+                ...
+        residual = segmenter.flush()
+    """
+
+    def __init__(
+        self,
+        min_chars: int = MIN_SENTENCE_CHARS,
+        max_hold_ms: float = MAX_HOLD_MS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_chars = min_chars
+        self.max_hold_ms = max_hold_ms
+        self._clock = clock
+        self._buffer = ""
+        self._scan_from = 0            # buffer[:_scan_from] holds no sentence boundary
+        self._held = ""                # short sentence(s) waiting to be coalesced
+        self._held_since: Optional[float] = None
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk; return the sentences it completed (stripped, in order)."""
+        self._buffer += chunk
+        sentences: List[str] = []
+        start = 0
+        i = self._scan_from
+        n = len(self._buffer)
+
+        while i < n:
+            if self._buffer[i] not in _TERMINALS:
+                i += 1
+                continue
+
+            # Consume the whole punctuation run ("...", "?!") plus closers
+            run_start = i
+            while i < n and self._buffer[i] in _TERMINALS:
+                i += 1
+            while i < n and self._buffer[i] in _CLOSERS:
+                i += 1
+            if i == n:
+                # Undecided until the next character arrives
+                i = run_start
+                break
+            if not self._buffer[i].isspace():
+                continue  # "3.14", "e.g" mid-token, "U.S.A"
+            next_pos = i
+            while next_pos < n and self._buffer[next_pos].isspace():
+                next_pos += 1
+            boundary = self._is_boundary(start, run_start, next_pos)
+            if boundary is None:
+                # "George W. " — undecided until the next word starts
+                i = run_start
+                break
+            if not boundary:
+                continue
+
+            i = next_pos
+            sentences.extend(self._emit(self._buffer[start:i].strip()))
+            start = i
+
+        self._buffer = self._buffer[start:]
+        self._scan_from = i - start
+        sentences.extend(self._release_expired())
+        return sentences
+
+    def poll(self) -> List[str]:
+        """Release held short sentences whose latency deadline has passed."""
+        return self._release_expired()
+
+    def hold_remaining(self) -> Optional[float]:
+        """Seconds until the held sentence's deadline (0 if passed), None if nothing is held."""
+        if not self._held or self._held_since is None:
+            return None
+        return max(0.0, self.max_hold_ms / 1000 - (self._clock() - self._held_since))
+
+    def flush(self) -> Optional[str]:
+        """End of stream: return held + residual text (or None if empty)."""
+        residual = " ".join(part for part in (self._held, self._buffer.strip()) if part)
+        self._buffer = ""
+        self._scan_from = 0
+        self._held = ""
+        self._held_since = None
+        return residual or None
+
+    def _is_boundary(self, start: int, punct_pos: int, next_pos: int) -> Optional[bool]:
+        """
+        Decide whether punctuation at punct_pos really ends a sentence.
+
+        next_pos is the start of the following word (len(buffer) if it has not
+        arrived yet). Returns None when that word is needed but missing.
+        """
+        if self._buffer[punct_pos] != "." or self._buffer[punct_pos + 1:punct_pos + 2] == ".":
+            return True  # "!", "?" and ellipses always end sentences
+
+        token_start = punct_pos
+        while token_start > start and not self._buffer[token_start - 1].isspace():
+            token_start -= 1
+        token = self._buffer[token_start:punct_pos].lstrip("\"'([{“‘")
+
+        if token.lower() in ABBREVIATIONS:
+            return False
+        if len(token) == 1 and token.isupper():
+            initial = self._is_initial(start, token_start, next_pos)
+            if initial is None:
+                return None
+            if initial:
+                return False  # initials: "J. K. Rowling", "George W. Bush"
+        if "." in token and all(len(part) <= 1 for part in token.split(".")):
+            return False  # dotted acronyms: "U.S.", "a.m."
+
+        # List markers: "1." / "a." as the first token of a line or sentence
+        if (token.isdigit() and len(token) <= 2) or (len(token) == 1 and token.isalpha()):
+            before = self._buffer[start:token_start]
+            if not before.strip() or "\n" in before.rstrip(" \t")[-1:]:
+                return False
+        return True
+
+    def _is_initial(self, start: int, token_start: int, next_pos: int) -> Optional[bool]:
+        """A lone capital is an initial before another initial, or after a name before a capitalized word."""
+        following = self._buffer[next_pos:next_pos + 2]
+        if len(following) == 2 and following[0].isupper() and following[1] == ".":
+            return True  # "J. K."
+        if len(following) == 1 and following.isupper():
+            return None  # "J. K" — another initial, or a capitalized word?
+
+        prev_end = token_start
+        while prev_end > start and self._buffer[prev_end - 1].isspace():
+            prev_end -= 1
+        prev_start = prev_end
+        while prev_start > start and not self._buffer[prev_start - 1].isspace():
+            prev_start -= 1
+        previous = self._buffer[prev_start:prev_end]
+        after_name = previous[:1].isupper() and (
+            previous.isalpha() or (len(previous) == 2 and previous[1] == ".")
+        )
+        if not after_name:
+            return False  # "The answer is B."
+        if not following:
+            return None  # "George W. " — is a surname next?
+        return following[0].isupper()
+
+    def _emit(self, sentence: str) -> List[str]:
+        """Apply the min-length coalescing policy to one complete sentence."""
+        if not sentence:
+            return []
+        if self._held:
+            sentence = f"{self._held} {sentence}"
+        if len(sentence) < self.min_chars:
+            if not self._held:
+                self._held_since = self._clock()
+            self._held = sentence
+            return []
+        self._held = ""
+        self._held_since = None
+        return [sentence]
+
+    def _release_expired(self) -> List[str]:
+        if not self._held or self._held_since is None:
+            return []
+        if (self._clock() - self._held_since) * 1000 < self.max_hold_ms:
+            return []
+        held, self._held, self._held_since = self._held, "", None
+        return [held]
+
+
+async def segment_stream(
+    text_stream: AsyncIterator[str],
+    segmenter: Optional[SentenceSegmenter] = None,
+) -> AsyncIterator[Tuple[str, bool]]:
+    """
+    Split a text stream into sentences, enforcing the max_hold_ms deadline.
+
+    Yields (sentence, complete) — complete is False only for the residual
+    fragment flushed at stream end. While a short sentence is held, the next
+    chunk is awaited with a timeout so the sentence is released on time even
+    if the stream stalls.
+    """
+    segmenter = segmenter or SentenceSegmenter()
+    chunks = text_stream.__aiter__()
+    pending: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            hold = segmenter.hold_remaining()
+            if hold is None and pending is None:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+            else:
+                if pending is None:
+                    pending = asyncio.ensure_future(chunks.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=hold)
+                if not done:
+                    for sentence in segmenter.poll():
+                        yield sentence, True
+                    continue
+                next_chunk, pending = pending, None
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+            for sentence in segmenter.feed(chunk):
+                yield sentence, True
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+    # Flush residual (critical: don't drop the last fragment)
+    residual = segmenter.flush()
+    if residual:
+        yield residual, False
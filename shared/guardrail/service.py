@@ -6,52 +6,110 @@ and flush residual at stream end. Never cut words mid-stream.
 """
 import asyncio
 import logging
-import re
-from typing import AsyncIterator, List, Optional
+import os
+import time
+from typing import AsyncIterator, List, Optional, Tuple
 from openai import AsyncOpenAI
 
-from .models import ModerationResult
+from clients.registry import get_openai_client
+
+from . import batcher as _batching
+from .batcher import ModerationBatcher
+from .cache import ModerationCache
+from . import cache as _caching
+from . import deadline as _deadlines
+from .deadline import Deadline, GuardrailPolicy
+from .models import GuardrailEvent, ModerationResult
+from . import prefilter as _prefiltering
+from .prefilter import BLOCK, PASS, LexicalPrefilter
+from .rewriter import (
+    REWRITE_FALLBACK,
+    REWRITE_MODEL,
+    TIER_FALLBACK,
+    TIER_LLM,
+    TIER_TEMPLATE,
+    rewrite_messages,
+    rewrite_stream,
+    template_for,
+)
+from .segmenter import segment_stream
 
 logger = logging.getLogger(__name__)
 
-# Sentence-ending punctuation pattern
-_SENTENCE_END = re.compile(r'[.!?]+\s*')
+MODERATION_MODEL = os.environ.get("OPENAI_MODERATION_MODEL", "omni-moderation-latest")
 
+# Sentences moderated concurrently by the streaming guardrail (1 = serial)
+PIPELINE_LOOKAHEAD = int(os.environ.get("GUARDRAIL_LOOKAHEAD", "1"))
 
-async def check(text: str, client: Optional[AsyncOpenAI] = None) -> ModerationResult:
+
+def _to_moderation_result(text: str, result) -> ModerationResult:
+    """Convert one entry of a moderations.create response into a ModerationResult."""
+    flagged_categories = [
+        cat for cat, flagged in result.categories.model_dump().items()
+        if flagged
+    ]
+
+    return ModerationResult(
+        flagged=result.flagged,
+        categories_flagged=flagged_categories,
+        original_text=text,
+        confidence=max(result.category_scores.model_dump().values()) if result.flagged else 0.0,
+    )
+
+
+async def check(
+    text: str,
+    client: Optional[AsyncOpenAI] = None,
+    batcher: Optional[ModerationBatcher] = None,
+    deadline: Optional[Deadline] = None,
+    policy: Optional[GuardrailPolicy] = None,
+) -> ModerationResult:
     """
     Check text for harmful content using OpenAI moderation API.
 
     Args:
         text: Text to check
-        client: Optional AsyncOpenAI client (creates new one if not provided)
+        client: Optional AsyncOpenAI client (pooled shared client if not provided)
+        batcher: Optional ModerationBatcher — when given, the text is queued and
+            sent together with other sessions' sentences in one batched request.
+            Defaults to the process-wide batcher when GUARDRAIL_BATCHING=true
+            and no client is passed.
+        deadline: Optional stream Deadline; the call gets at most its remaining time
+        policy: Optional GuardrailPolicy (budget, timeout policy, breaker).
+            Defaults to the process-wide policy configured by GUARDRAIL_* env.
 
     Returns:
-        ModerationResult with flagged status and categories
+        ModerationResult with flagged status and categories. When the call
+        fails or runs out of budget the timeout policy decides: not flagged
+        (fail open) or flagged with FAIL_CLOSED_TEXT; error is set either way.
     """
-    _client = client or AsyncOpenAI()
+    policy = policy or _deadlines.get_policy()
+    return await policy.run(text, lambda: _moderate(text, client, batcher), deadline)
 
-    try:
-        response = await _client.moderations.create(input=text)
-        result = response.results[0]
 
-        flagged_categories = [
-            cat for cat, flagged in result.categories.model_dump().items()
-            if flagged
-        ]
+async def _moderate(
+    text: str,
+    client: Optional[AsyncOpenAI],
+    batcher: Optional[ModerationBatcher],
+) -> ModerationResult:
+    """One moderation API call (direct or batched). Errors are returned, not raised."""
+    if batcher is None and client is None and _batching.BATCHING_ENABLED:
+        batcher = _batching.get_batcher()
+    if batcher is not None:
+        return await batcher.submit(text)
+
+    _client = client or get_openai_client()
 
-        return ModerationResult(
-            flagged=result.flagged,
-            categories_flagged=flagged_categories,
-            original_text=text,
-            confidence=max(result.category_scores.model_dump().values()) if result.flagged else 0.0,
-        )
+    try:
+        response = await _client.moderations.create(input=text, model=MODERATION_MODEL)
+        return _to_moderation_result(text, response.results[0])
     except Exception as e:
         logger.error(f"Moderation check failed: {e}")
-        # Fail safe: treat as not flagged on error (log for monitoring)
+        # Not flagged + error; the policy in check() decides open vs closed
         return ModerationResult(
             flagged=False,
             original_text=text,
+            error=str(e),
         )
 
 
@@ -71,65 +129,222 @@ async def rewrite(
     Returns:
         Safe rewritten version of the text
     """
-    _client = client or AsyncOpenAI()
-
-    categories_str = ", ".join(categories)
-    prompt = (
-        f"The following educational AI response was flagged for: {categories_str}.\n"
-        f"Rewrite it to be completely safe and appropriate for students, "
-        f"while keeping the educational value:\n\n{text}"
-    )
+    _client = client or get_openai_client()
 
     try:
         response = await _client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a content safety editor for an educational AI tutor. "
-                               "Rewrite content to be safe while preserving educational value.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+            model=REWRITE_MODEL,
+            messages=rewrite_messages(text, categories),
             temperature=0.1,
             max_tokens=500,
         )
         return response.choices[0].message.content or text
     except Exception as e:
         logger.error(f"Content rewrite failed: {e}")
-        return "I apologize, but I cannot answer that question in the way you've asked. Please try rephrasing."
+        return REWRITE_FALLBACK
+
+
+async def _check_stage(
+    text: str,
+    client: Optional[AsyncOpenAI],
+    batcher: Optional[ModerationBatcher],
+    cache: Optional[ModerationCache],
+    prefilter: Optional[LexicalPrefilter],
+    deadline: Optional[Deadline] = None,
+) -> Tuple[ModerationResult, bool]:
+    """
+    Moderation half of check_and_rewrite: pre-filter → cache → API.
+
+    Returns (result, done). done=True means the result is final (not flagged,
+    served from the cache with its rewrite, or failed closed with the fallback
+    sentence) and needs no rewrite.
+    """
+    if prefilter is None and _prefiltering.PREFILTER_ENABLED:
+        prefilter = _prefiltering.get_prefilter()
+
+    decision = prefilter.classify(text) if prefilter is not None else None
+    audit = False
+    if decision is not None and decision.decision == PASS:
+        audit = prefilter.should_audit()
+        if not audit:
+            return ModerationResult(flagged=False, original_text=text, prefilter=PASS), True
+
+    cached = None
+    if decision is not None and decision.decision == BLOCK:
+        # Obviously unsafe: skip the API, go straight to rewrite
+        result = ModerationResult(
+            flagged=True,
+            categories_flagged=decision.categories,
+            original_text=text,
+            confidence=min(1.0, decision.score),
+        )
+    else:
+        cached = await cache.get(text) if cache is not None else None
+        result = cached or await check(text, client, batcher=batcher, deadline=deadline)
+
+    if decision is not None:
+        result.prefilter = decision.decision
+        result.prefilter_score = decision.score
+        if audit:
+            prefilter.record_audit(result)
+
+    return result, cached is not None or not result.flagged or result.rewritten_text is not None
+
+
+async def _store(result: ModerationResult, cache: Optional[ModerationCache]) -> None:
+    """
+    Cache a result freshly returned by the moderation API.
+
+    Pre-filter decisions (pass, including audited ones, and block) are skipped:
+    they cost nothing to recompute and are decided before the cache is read.
+    Failed rewrites are skipped too.
+    """
+    if (
+        cache is not None
+        and not result.cached
+        and result.prefilter not in (PASS, BLOCK)
+        and result.rewrite_tier != TIER_FALLBACK
+    ):
+        await cache.put(result)
 
 
 async def check_and_rewrite(
     text: str,
     client: Optional[AsyncOpenAI] = None,
+    batcher: Optional[ModerationBatcher] = None,
+    cache: Optional[ModerationCache] = None,
+    prefilter: Optional[LexicalPrefilter] = None,
+    deadline: Optional[Deadline] = None,
 ) -> ModerationResult:
     """
     Check text and rewrite if flagged. Returns ModerationResult with safe_text.
 
+    Stages (cheapest first): lexical pre-filter → result cache → moderation API.
+    Flagged text is rewritten by the template tier when a safe template covers
+    the category at high confidence, otherwise by the LLM.
+
     Args:
         text: Text to check and potentially rewrite
         client: Optional AsyncOpenAI client
+        batcher: Optional ModerationBatcher for cross-session batching
+        cache: Optional ModerationCache. Defaults to the process-wide cache
+            when GUARDRAIL_CACHE=true.
+        prefilter: Optional LexicalPrefilter. Defaults to the process-wide
+            pre-filter when GUARDRAIL_PREFILTER=true.
+        deadline: Optional stream Deadline bounding the moderation call
 
     Returns:
         ModerationResult. Use result.safe_text for the final safe version.
     """
-    result = await check(text, client)
-
-    if result.flagged:
-        safe = await rewrite(text, result.categories_flagged, client)
-        result.rewritten_text = safe
-        logger.warning(
-            f"Content flagged ({result.categories_flagged}), rewritten. "
-            f"Original: {text[:50]}..."
-        )
+    if cache is None and _caching.CACHE_ENABLED:
+        cache = _caching.get_cache()
+
+    result, done = await _check_stage(text, client, batcher, cache, prefilter, deadline)
+    if done:
+        if not result.cached:
+            await _store(result, cache)
+        return result
+
+    started = time.monotonic()
+    template = template_for(result.categories_flagged, result.confidence)
+    if template is not None:
+        result.rewritten_text = template
+        result.rewrite_tier = TIER_TEMPLATE
+    else:
+        result.rewritten_text = await rewrite(text, result.categories_flagged, client)
+        result.rewrite_tier = TIER_FALLBACK if result.rewritten_text == REWRITE_FALLBACK else TIER_LLM
+    result.rewrite_ms = (time.monotonic() - started) * 1000
+    logger.warning(
+        f"Content flagged ({result.categories_flagged}), rewritten "
+        f"[{result.rewrite_tier}, {result.rewrite_ms:.0f}ms]. Original: {text[:50]}..."
+    )
 
+    await _store(result, cache)
     return result
 
 
+async def check_and_rewrite_stream(
+    text: str,
+    client: Optional[AsyncOpenAI] = None,
+    batcher: Optional[ModerationBatcher] = None,
+    cache: Optional[ModerationCache] = None,
+    prefilter: Optional[LexicalPrefilter] = None,
+    result_out: Optional[List[ModerationResult]] = None,
+    deadline: Optional[Deadline] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of check_and_rewrite.
+
+    Safe text is yielded whole; flagged text is yielded clause by clause as the
+    LLM rewrite streams in (or as one template sentence), so TTS can start on
+    the first clause.
+
+    Args:
+        text: Text to check and potentially rewrite
+        client / batcher / cache / prefilter / deadline: as for check_and_rewrite
+        result_out: Optional list; the final ModerationResult is appended once
+            the text has been fully yielded. With a deadline, the fail-closed
+            sentence is spoken once per stream; later fail-closed sentences
+            yield nothing.
+
+    Yields:
+        Safe text pieces which concatenate to result.safe_text
+    """
+    if cache is None and _caching.CACHE_ENABLED:
+        cache = _caching.get_cache()
+
+    result, done = await _check_stage(text, client, batcher, cache, prefilter, deadline)
+    if done:
+        if not result.cached:
+            await _store(result, cache)
+        if result_out is not None:
+            result_out.append(result)
+        yield result.safe_text
+        return
+
+    started = time.monotonic()
+    template = template_for(result.categories_flagged, result.confidence)
+    if template is not None:
+        result.rewritten_text = template
+        result.rewrite_tier = TIER_TEMPLATE
+        result.rewrite_ms = (time.monotonic() - started) * 1000
+        yield template
+    else:
+        pieces: List[str] = []
+        async for clause in rewrite_stream(text, result.categories_flagged, client):
+            pieces.append(clause)
+            yield clause
+        result.rewritten_text = "".join(pieces).strip() or REWRITE_FALLBACK
+        result.rewrite_tier = TIER_FALLBACK if result.rewritten_text == REWRITE_FALLBACK else TIER_LLM
+        result.rewrite_ms = (time.monotonic() - started) * 1000
+
+    logger.warning(
+        f"Content flagged ({result.categories_flagged}), rewritten "
+        f"[{result.rewrite_tier}, {result.rewrite_ms:.0f}ms]. Original: {text[:50]}..."
+    )
+    await _store(result, cache)
+    if result_out is not None:
+        result_out.append(result)
+
+
+async def _iter_sentences(text_stream: AsyncIterator[str]) -> AsyncIterator[Tuple[str, bool]]:
+    """
+    Split a text stream at sentence boundaries (see SentenceSegmenter).
+
+    Yields (sentence, complete) — complete is False only for the residual
+    fragment flushed at stream end.
+    """
+    async for sentence, complete in segment_stream(text_stream):
+        yield sentence, complete
+
+
 async def check_stream_with_sentence_buffer(
     text_stream: AsyncIterator[str],
     client: Optional[AsyncOpenAI] = None,
+    batcher: Optional[ModerationBatcher] = None,
+    lookahead: int = PIPELINE_LOOKAHEAD,
+    events: Optional[List[GuardrailEvent]] = None,
+    budget_ms: float = _deadlines.STREAM_BUDGET_MS,
 ) -> AsyncIterator[str]:
     """
     Apply guardrail to a streaming text output, buffering at sentence boundaries.
@@ -140,33 +355,182 @@ async def check_stream_with_sentence_buffer(
     Args:
         text_stream: AsyncIterator of text chunks from LLM
         client: Optional AsyncOpenAI client
+        batcher: Optional ModerationBatcher for cross-session batching
+        lookahead: Sentences moderated concurrently. 1 (default, overridable via
+            GUARDRAIL_LOOKAHEAD) is serial; >1 delegates to check_stream_pipelined
+        events: Optional list; one GuardrailEvent per sentence is appended (in
+            sentence order) once that sentence has been fully yielded, so
+            callers can audit flags/categories without re-moderating
+        budget_ms: Total moderation time for this stream (0 = unbounded,
+            overridable via GUARDRAIL_STREAM_BUDGET_MS). Once spent, remaining
+            sentences get the timeout policy without an API call.
 
     Yields:
         Safe text chunks, one sentence at a time
     """
-    buffer = ""
+    if lookahead > 1:
+        async for safe_chunk in check_stream_pipelined(
+            text_stream, client, batcher=batcher, lookahead=lookahead, events=events,
+            budget_ms=budget_ms,
+        ):
+            yield safe_chunk
+        return
+
+    deadline = Deadline(budget_ms)
+    index = 0
+    blocked = False
+    async for sentence, complete in _iter_sentences(text_stream):
+        # Check and potentially rewrite this sentence
+        results: List[ModerationResult] = []
+        async for safe_chunk in _guard_sentence(
+            sentence, complete, client, batcher, results, deadline
+        ):
+            if not (blocked and _failed_closed(results)):
+                yield safe_chunk
+        blocked = _failed_closed(results)
+        _record_event(events, index, results)
+        index += 1
+
+
+def _failed_closed(results: List[ModerationResult]) -> bool:
+    """
+    True if the sentence was replaced by the fail-closed fallback.
+
+    The fallback is spoken once per run of such sentences, not once per
+    sentence: callers skip it while the previous sentence also failed closed.
+    """
+    return bool(results) and results[-1].flagged and results[-1].error is not None
+
+
+def _record_event(
+    events: Optional[List[GuardrailEvent]],
+    index: int,
+    results: List[ModerationResult],
+) -> None:
+    if events is not None and results:
+        events.append(GuardrailEvent.from_result(index, results[-1]))
+
+
+async def _guard_sentence(
+    sentence: str,
+    complete: bool,
+    client: Optional[AsyncOpenAI],
+    batcher: Optional[ModerationBatcher],
+    result_out: Optional[List[ModerationResult]] = None,
+    deadline: Optional[Deadline] = None,
+) -> AsyncIterator[str]:
+    """Yield the safe pieces of one sentence; a complete sentence ends with a space."""
+    previous = None
+    async for piece in check_and_rewrite_stream(
+        sentence, client, batcher=batcher, result_out=result_out, deadline=deadline
+    ):
+        if not piece:
+            continue
+        if previous is not None:
+            yield previous
+        previous = piece
+    if previous is not None:
+        yield previous + " " if complete else previous
+
+
+async def check_stream_pipelined(
+    text_stream: AsyncIterator[str],
+    client: Optional[AsyncOpenAI] = None,
+    batcher: Optional[ModerationBatcher] = None,
+    lookahead: int = 4,
+    events: Optional[List[GuardrailEvent]] = None,
+    budget_ms: float = _deadlines.STREAM_BUDGET_MS,
+) -> AsyncIterator[str]:
+    """
+    Pipelined variant of check_stream_with_sentence_buffer.
 
-    async for chunk in text_stream:
-        buffer += chunk
+    Keeps consuming the LLM stream while up to `lookahead` sentences are being
+    moderated concurrently, so moderation latency overlaps generation instead
+    of adding up per sentence.
 
-        # Look for sentence endings
+    CRITICAL: Output is still yielded strictly in sentence order. When the
+    consumer stops early (or is cancelled), the reader task and every
+    in-flight moderation are cancelled and the upstream stream is closed.
+
+    Args:
+        text_stream: AsyncIterator of text chunks from LLM
+        client: Optional AsyncOpenAI client
+        batcher: Optional ModerationBatcher for cross-session batching
+        lookahead: Max sentences in flight at once (K)
+        events: Optional list of per-sentence GuardrailEvents, appended in
+            sentence order (see check_stream_with_sentence_buffer)
+        budget_ms: Total moderation time for this stream (0 = unbounded)
+
+    Yields:
+        Safe text chunks, one sentence at a time, in input order
+    """
+    deadline = Deadline(budget_ms)
+    slots = asyncio.Semaphore(max(1, lookahead))
+    # Items: (guard task, piece queue, results) | (exception, None, None) | None at end
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _guard_into(
+        sentence: str, complete: bool, pieces: asyncio.Queue, results: List[ModerationResult]
+    ) -> None:
+        try:
+            async for piece in _guard_sentence(
+                sentence, complete, client, batcher, results, deadline
+            ):
+                pieces.put_nowait(piece)
+        finally:
+            pieces.put_nowait(None)
+
+    async def _read_ahead() -> None:
+        try:
+            async for sentence, complete in _iter_sentences(text_stream):
+                await slots.acquire()
+                pieces: asyncio.Queue = asyncio.Queue()
+                results: List[ModerationResult] = []
+                task = asyncio.create_task(_guard_into(sentence, complete, pieces, results))
+                queue.put_nowait((task, pieces, results))
+        except Exception as e:
+            # Surface upstream errors to the consumer, in order
+            queue.put_nowait((e, None, None))
+        finally:
+            queue.put_nowait(None)
+
+    reader = asyncio.create_task(_read_ahead())
+    current: Optional[asyncio.Task] = None
+    index = 0
+    blocked = False
+    try:
         while True:
-            match = _SENTENCE_END.search(buffer)
-            if not match:
+            item = await queue.get()
+            if item is None:
                 break
-
-            # Extract complete sentence
-            end_pos = match.end()
-            sentence = buffer[:end_pos]
-            buffer = buffer[end_pos:]
-
-            # Check and potentially rewrite this sentence
-            result = await check_and_rewrite(sentence.strip(), client)
-            if result.safe_text:
-                yield result.safe_text + " "
-
-    # Flush residual (critical: don't drop the last fragment)
-    if buffer.strip():
-        result = await check_and_rewrite(buffer.strip(), client)
-        if result.safe_text:
-            yield result.safe_text
+            current, pieces, results = item
+            if isinstance(current, Exception):
+                raise current
+            try:
+                # Stream this sentence's pieces (e.g. rewrite clauses) as they land
+                while (piece := await pieces.get()) is not None:
+                    if not (blocked and _failed_closed(results)):
+                        yield piece
+                await current  # re-raise anything the guard task hit
+            finally:
+                slots.release()
+            current = None
+            blocked = _failed_closed(results)
+            _record_event(events, index, results)
+            index += 1
+    finally:
+        reader.cancel()
+        abandoned = [current] if isinstance(current, asyncio.Task) else []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None and isinstance(item[0], asyncio.Task):
+                abandoned.append(item[0])
+        for task in abandoned:
+            task.cancel()
+        await asyncio.gather(reader, *abandoned, return_exceptions=True)
+        aclose = getattr(text_stream, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
@@ -0,0 +1,114 @@
+"""Unit tests for cross-session moderation batching - all API calls mocked."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.batcher import ModerationBatcher
+
+
+def _moderation_entry(flagged: bool) -> MagicMock:
+    """One entry of a moderations.create response."""
+    result = MagicMock()
+    result.flagged = flagged
+    result.categories = MagicMock()
+    result.categories.model_dump.return_value = {"violence": flagged, "hate": False}
+    result.category_scores = MagicMock()
+    result.category_scores.model_dump.return_value = {
+        "violence": 0.95 if flagged else 0.01, "hate": 0.01,
+    }
+    return result
+
+
+def _batch_client() -> AsyncMock:
+    """Client whose moderations.create flags any input containing 'bomb'."""
+    async def create(input, **kwargs):
+        response = MagicMock()
+        response.results = [_moderation_entry("bomb" in text) for text in input]
+        return response
+
+    client = AsyncMock()
+    client.moderations.create = AsyncMock(side_effect=create)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_request():
+    """Sentences submitted within the window go out as one list-input request."""
+    client = _batch_client()
+    batcher = ModerationBatcher(client=client, window_ms=20, max_batch_size=10)
+
+    results = await asyncio.gather(
+        batcher.submit("What is 2+2?"),
+        batcher.submit("How to make a bomb?"),
+        batcher.submit("Photosynthesis uses light."),
+    )
+
+    client.moderations.create.assert_called_once()
+    assert client.moderations.create.call_args.kwargs["input"] == [
+        "What is 2+2?", "How to make a bomb?", "Photosynthesis uses light.",
+    ]
+    # Results fan back out to the right callers
+    assert [r.flagged for r in results] == [False, True, False]
+    assert results[1].original_text == "How to make a bomb?"
+    assert "violence" in results[1].categories_flagged
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_dispatches_immediately():
+    """Reaching max_batch_size sends without waiting for the window."""
+    client = _batch_client()
+    batcher = ModerationBatcher(client=client, window_ms=10_000, max_batch_size=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit("one."), batcher.submit("two.")),
+        timeout=1.0,
+    )
+
+    assert len(results) == 2
+    assert batcher.stats.batches_sent == 1
+    assert batcher.stats.max_batch_size == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_is_safe():
+    """A failed batch fails open for every caller, like check()."""
+    client = AsyncMock()
+    client.moderations.create = AsyncMock(side_effect=Exception("API error"))
+    batcher = ModerationBatcher(client=client, window_ms=1)
+
+    results = await asyncio.gather(batcher.submit("a."), batcher.submit("b."))
+
+    assert not any(r.flagged for r in results)
+    assert batcher.stats.failed_batches == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_snapshot_reports_batch_size_and_latency():
+    """snapshot() exposes batch-size and latency metrics."""
+    batcher = ModerationBatcher(client=_batch_client(), window_ms=1)
+    await asyncio.gather(*(batcher.submit(f"s{i}.") for i in range(4)))
+
+    snapshot = batcher.stats.snapshot()
+    assert snapshot["batches_sent"] == 1
+    assert snapshot["items_sent"] == 4
+    assert snapshot["avg_batch_size"] == 4
+    assert "avg_request_ms" in snapshot
+    assert "avg_queue_wait_ms" in snapshot
+
+
+@pytest.mark.asyncio
+async def test_check_uses_batcher_when_given():
+    """check(batcher=...) routes through the batcher instead of a direct call."""
+    from guardrail.service import check
+
+    client = _batch_client()
+    batcher = ModerationBatcher(client=client, window_ms=1)
+
+    result = await check("What is 25% of 80?", batcher=batcher)
+
+    assert not result.flagged
+    assert batcher.stats.items_sent == 1
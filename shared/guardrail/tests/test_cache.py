@@ -0,0 +1,104 @@
+"""Unit tests for the moderation result cache - no network calls."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.cache import InMemoryCacheBackend, ModerationCache, cache_key
+from guardrail.models import ModerationResult
+
+
+def test_cache_key_normalizes_case_and_whitespace():
+    """Trivially different sentences share a key; the model is part of the key."""
+    assert cache_key("Great  question!", "m1") == cache_key("great question! ", "m1")
+    assert cache_key("Great question!", "m1") != cache_key("Great question!", "m2")
+
+
+@pytest.mark.asyncio
+async def test_hit_returns_stored_result_with_caller_text():
+    """A hit returns the stored result, marked cached, with the caller's original text."""
+    cache = ModerationCache(model="test-model")
+    await cache.put(ModerationResult(
+        flagged=True, categories_flagged=["violence"], original_text="Bad thing.",
+        rewritten_text="Safe thing.", confidence=0.9,
+    ))
+
+    hit = await cache.get("bad   thing.")
+
+    assert hit is not None
+    assert hit.cached
+    assert hit.original_text == "bad   thing."
+    assert hit.safe_text == "Safe thing."
+    assert cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_open_results_are_not_cached():
+    """Results with error set (API failure) must never be stored."""
+    cache = ModerationCache(model="test-model")
+    await cache.put(ModerationResult(flagged=False, original_text="x.", error="timeout"))
+
+    assert await cache.get("x.") is None
+    assert cache.stats.misses == 1
+    assert cache.stats.stores == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_bounds_size():
+    """The least recently used entry is evicted when max_size is exceeded."""
+    backend = InMemoryCacheBackend(max_size=2, ttl_seconds=60)
+    await backend.set("a", {"v": 1})
+    await backend.set("b", {"v": 2})
+    await backend.get("a")            # a is now most recent
+    await backend.set("c", {"v": 3})  # evicts b
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == {"v": 1}
+    assert backend.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry():
+    """Entries past their TTL are dropped on lookup."""
+    backend = InMemoryCacheBackend(max_size=10, ttl_seconds=5)
+    with patch("guardrail.cache.time.monotonic", return_value=100.0):
+        await backend.set("k", {"v": 1})
+    with patch("guardrail.cache.time.monotonic", return_value=106.0):
+        assert await backend.get("k") is None
+    assert backend.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_do_not_raise():
+    """A failing shared backend degrades to misses instead of breaking moderation."""
+    backend = MagicMock()
+    backend.get = AsyncMock(side_effect=ConnectionError("redis down"))
+    backend.set = AsyncMock(side_effect=ConnectionError("redis down"))
+    cache = ModerationCache(backend=backend, model="test-model")
+
+    assert await cache.get("hello.") is None
+    await cache.put(ModerationResult(flagged=False, original_text="hello."))
+    assert cache.stats.backend_errors == 2
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_skips_api_on_cache_hit():
+    """Second check_and_rewrite of the same sentence is served from the cache."""
+    from guardrail.service import check_and_rewrite
+
+    safe_moderation_response = MagicMock()
+    safe_moderation_response.results = [MagicMock(flagged=False)]
+
+    mock_client = AsyncMock()
+    mock_client.moderations.create = AsyncMock(return_value=safe_moderation_response)
+    cache = ModerationCache(model="test-model")
+
+    first = await check_and_rewrite("Great question!", client=mock_client, cache=cache)
+    second = await check_and_rewrite("Great question!", client=mock_client, cache=cache)
+
+    assert mock_client.moderations.create.call_count == 1
+    assert not first.cached
+    assert second.cached
+    assert second.safe_text == "Great question!"
@@ -0,0 +1,255 @@
+"""Unit tests for guardrail latency budgets, timeout policies and circuit breaker."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.deadline import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    FAIL_CLOSED_TEXT,
+    POLICY_CLOSED,
+    POLICY_OPEN,
+    POLICY_RETRY,
+    CircuitBreaker,
+    Deadline,
+    GuardrailPolicy,
+)
+from guardrail.models import ModerationResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _safe_response():
+    result = MagicMock()
+    result.flagged = False
+    result.categories = MagicMock()
+    result.categories.model_dump.return_value = {}
+    result.category_scores = MagicMock()
+    result.category_scores.model_dump.return_value = {}
+    response = MagicMock()
+    response.results = [result]
+    return response
+
+
+def _slow_client(delay: float):
+    async def slow_create(**kwargs):
+        await asyncio.sleep(delay)
+        return _safe_response()
+
+    client = AsyncMock()
+    client.moderations.create = AsyncMock(side_effect=slow_create)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_call_budget_fails_open():
+    """A call over budget returns not-flagged with error set under the open policy."""
+    from guardrail.service import check
+
+    policy = GuardrailPolicy(policy=POLICY_OPEN, call_budget_ms=20)
+
+    result = await check("Slow sentence.", client=_slow_client(1.0), policy=policy)
+
+    assert not result.flagged
+    assert "budget" in result.error
+    assert policy.stats.budget_exceeded == 1
+    assert policy.stats.failed_open == 1
+
+
+@pytest.mark.asyncio
+async def test_call_budget_fails_closed_with_fallback_sentence():
+    """Under the closed policy an over-budget sentence is replaced by the fallback."""
+    from guardrail.service import check_and_rewrite
+
+    policy = GuardrailPolicy(policy=POLICY_CLOSED, call_budget_ms=20)
+    client = _slow_client(1.0)
+    client.chat.completions.create = AsyncMock()
+
+    with patch("guardrail.deadline.get_policy", return_value=policy):
+        result = await check_and_rewrite("Slow sentence.", client=client)
+
+    assert result.flagged
+    assert result.safe_text == FAIL_CLOSED_TEXT
+    client.chat.completions.create.assert_not_called()  # no LLM rewrite of the fallback
+    assert policy.stats.failed_closed == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_retries_once():
+    """The retry policy holds the sentence and succeeds on the second attempt."""
+    policy = GuardrailPolicy(policy=POLICY_RETRY)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            return ModerationResult(flagged=False, original_text="x", error="503")
+        return ModerationResult(flagged=False, original_text="x")
+
+    result = await policy.run("x", flaky)
+
+    assert result.error is None
+    assert len(calls) == 2
+    assert policy.stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_fails_closed_after_second_failure():
+    """When the retry also fails, the sentence fails closed."""
+    policy = GuardrailPolicy(policy=POLICY_RETRY)
+
+    async def down():
+        return ModerationResult(flagged=False, original_text="x", error="503")
+
+    result = await policy.run("x", down)
+
+    assert result.flagged
+    assert result.rewritten_text == FAIL_CLOSED_TEXT
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes():
+    """closed → open after N failures → half_open after cooldown → closed on success."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=10, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()          # one probe
+    assert breaker.state == BREAKER_HALF_OPEN
+    assert not breaker.allow()      # no second probe while the first is out
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+
+
+def test_breaker_reopens_when_probe_fails():
+    """A failed half-open probe re-opens the breaker for another cooldown."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=5, clock=clock)
+    breaker.record_failure()
+    clock.now += 5
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.times_opened == 2
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_skips_api():
+    """While the breaker is open, the API is not called at all."""
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+    breaker.record_failure()
+    policy = GuardrailPolicy(policy=POLICY_OPEN, breaker=breaker)
+    call = AsyncMock()
+
+    result = await policy.run("x", call)
+
+    call.assert_not_called()
+    assert result.error is not None
+    assert policy.stats.breaker_skips == 1
+
+
+@pytest.mark.asyncio
+async def test_spent_stream_deadline_skips_call():
+    """Once the stream budget is spent, the policy applies without calling the API."""
+    clock = FakeClock()
+    deadline = Deadline(budget_ms=50, clock=clock)
+    clock.now += 1
+    policy = GuardrailPolicy(policy=POLICY_OPEN)
+    call = AsyncMock()
+
+    result = await policy.run("x", call, deadline)
+
+    call.assert_not_called()
+    assert policy.stats.budget_exceeded == 1
+    assert result.error == "moderation stream budget exhausted"
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_closed_fallback_spoken_once():
+    """A stream that runs out of budget speaks the fallback once, not per sentence."""
+    from guardrail.service import check_stream_with_sentence_buffer
+
+    policy = GuardrailPolicy(policy=POLICY_CLOSED, call_budget_ms=20)
+
+    async def text_stream():
+        yield "First slow sentence. Second slow sentence. Third one."
+
+    with patch("guardrail.deadline.get_policy", return_value=policy):
+        chunks = [
+            c async for c in check_stream_with_sentence_buffer(
+                text_stream(), client=_slow_client(1.0), lookahead=1
+            )
+        ]
+
+    assert "".join(chunks).strip() == FAIL_CLOSED_TEXT
+    assert policy.stats.failed_closed == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_closed_fallback_spoken_once_per_blocked_span():
+    """A sentence that passes ends the blocked span; the next failure speaks the fallback again."""
+    from guardrail.service import check_stream_with_sentence_buffer
+
+    policy = GuardrailPolicy(policy=POLICY_CLOSED, call_budget_ms=20)
+
+    async def selective_create(**kwargs):
+        if "slow" in str(kwargs.get("input")).lower():
+            await asyncio.sleep(1.0)
+        return _safe_response()
+
+    client = AsyncMock()
+    client.moderations.create = AsyncMock(side_effect=selective_create)
+
+    async def text_stream():
+        yield "A slow one. Another slow one. This is fine. Slow again."
+
+    for lookahead in (1, 4):
+        with patch("guardrail.deadline.get_policy", return_value=policy):
+            chunks = [
+                c async for c in check_stream_with_sentence_buffer(
+                    text_stream(), client=client, lookahead=lookahead
+                )
+            ]
+        assert chunks == [FAIL_CLOSED_TEXT + " ", "This is fine. ", FAIL_CLOSED_TEXT]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_reopens_breaker():
+    """A probe cancelled mid-call counts as a failure instead of leaving the breaker half-open."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=5, clock=clock)
+    breaker.record_failure()
+    clock.now += 5
+    policy = GuardrailPolicy(policy=POLICY_OPEN, breaker=breaker)
+    started = asyncio.Event()
+
+    async def hanging_call():
+        started.set()
+        await asyncio.sleep(10)
+
+    probe = asyncio.create_task(policy.run("x", hanging_call))
+    await started.wait()
+    assert breaker.state == BREAKER_HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == BREAKER_OPEN
+    clock.now += 5
+    assert breaker.allow()          # a new probe after the next cooldown
@@ -0,0 +1,155 @@
+"""Unit tests for the lexical pre-filter - no network calls."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.prefilter import AMBIGUOUS, BLOCK, PASS, LexicalPrefilter, _TermAutomaton
+
+
+def test_automaton_finds_overlapping_terms():
+    """Aho-Corasick finds every term, including ones sharing prefixes/suffixes."""
+    automaton = _TermAutomaton(["he", "she", "his", "hers"])
+    assert set(automaton.find("ushers")) == {"she", "he", "hers"}
+
+
+def test_benign_tutoring_text_passes():
+    """Clearly safe text needs no API call."""
+    prefilter = LexicalPrefilter(audit_rate=0.0)
+    assert prefilter.classify("What is 25% of 80?").decision == PASS
+    # Whole-word matching: 'skilled' does not contain the term 'kill'
+    assert prefilter.classify("He was a skilled warrior.").decision == PASS
+
+
+def test_history_violence_is_ambiguous_not_blocked():
+    """Many sensitive words still defer to the API — only block terms can block."""
+    prefilter = LexicalPrefilter(audit_rate=0.0)
+    decision = prefilter.classify("The war killed millions; the massacre left blood and death.")
+    assert decision.decision == AMBIGUOUS
+    assert "violence" in decision.categories
+
+
+def test_unmistakable_phrase_blocks():
+    """Obviously unsafe text short-circuits to rewrite."""
+    prefilter = LexicalPrefilter(audit_rate=0.0)
+    decision = prefilter.classify("You should just kill yourself.")
+    assert decision.decision == BLOCK
+    assert decision.categories == ["self-harm"]
+
+
+def test_stats_report_api_call_reduction():
+    """api_call_reduction counts pass + block decisions that skipped the API."""
+    prefilter = LexicalPrefilter(audit_rate=0.0)
+    prefilter.classify("Nouns name things.")
+    prefilter.classify("kys")
+    prefilter.classify("The war ended in 1918.")
+    prefilter.classify("Verbs are actions.")
+
+    snapshot = prefilter.stats.snapshot()
+    assert snapshot["passed"] == 2
+    assert snapshot["blocked"] == 1
+    assert snapshot["ambiguous"] == 1
+    assert snapshot["api_call_reduction"] == 0.75
+
+
+def _moderation_client(flagged: bool) -> AsyncMock:
+    entry = MagicMock()
+    entry.flagged = flagged
+    entry.categories.model_dump.return_value = {"violence": flagged}
+    entry.category_scores.model_dump.return_value = {"violence": 0.9 if flagged else 0.01}
+    response = MagicMock()
+    response.results = [entry]
+    rewrite_response = MagicMock()
+    rewrite_response.choices = [MagicMock()]
+    rewrite_response.choices[0].message.content = "Safe rewrite."
+
+    client = AsyncMock()
+    client.moderations.create = AsyncMock(return_value=response)
+    client.chat.completions.create = AsyncMock(return_value=rewrite_response)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_pass_skips_api():
+    """A 'pass' decision returns unflagged without calling moderations.create."""
+    from guardrail.service import check_and_rewrite
+
+    client = _moderation_client(flagged=False)
+    result = await check_and_rewrite(
+        "What is a noun?", client=client, prefilter=LexicalPrefilter(audit_rate=0.0)
+    )
+
+    assert not result.flagged
+    assert result.prefilter == PASS
+    client.moderations.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_block_goes_straight_to_rewrite():
+    """A 'block' decision rewrites without a moderation call."""
+    from guardrail.service import check_and_rewrite
+
+    client = _moderation_client(flagged=False)
+    result = await check_and_rewrite(
+        "Here is how to make a bomb.", client=client, prefilter=LexicalPrefilter(audit_rate=0.0)
+    )
+
+    assert result.flagged
+    assert result.prefilter == BLOCK
+    assert result.safe_text == "Safe rewrite."
+    client.moderations.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_ambiguous_calls_api():
+    """Ambiguous text is decided by the moderation API; the decision is recorded."""
+    from guardrail.service import check_and_rewrite
+
+    client = _moderation_client(flagged=False)
+    result = await check_and_rewrite(
+        "The war began in 1914.", client=client, prefilter=LexicalPrefilter(audit_rate=0.0)
+    )
+
+    assert not result.flagged
+    assert result.prefilter == AMBIGUOUS
+    assert result.prefilter_score > 0
+    client.moderations.create.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_audited_pass_counts_false_negative():
+    """Audited 'pass' decisions the API flags are counted as false negatives."""
+    from guardrail.service import check_and_rewrite
+
+    prefilter = LexicalPrefilter(audit_rate=1.0)
+    client = _moderation_client(flagged=True)
+    result = await check_and_rewrite("Something subtle.", client=client, prefilter=prefilter)
+
+    assert result.flagged  # the API verdict wins
+    assert result.prefilter == PASS
+    assert prefilter.stats.audited == 1
+    assert prefilter.stats.audit_false_negatives == 1
+    assert prefilter.stats.snapshot()["false_negative_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_only_api_results_are_cached():
+    """Pre-filter pass/block results never take a moderation cache slot; API results do."""
+    from guardrail.cache import InMemoryCacheBackend, ModerationCache
+    from guardrail.service import check_and_rewrite
+
+    cache = ModerationCache(backend=InMemoryCacheBackend())
+    prefilter = LexicalPrefilter(audit_rate=1.0)
+
+    await check_and_rewrite(
+        "Two plus two is four.", client=_moderation_client(flagged=False), cache=cache, prefilter=prefilter,
+    )
+    await check_and_rewrite(
+        "The war began in 1914.", client=_moderation_client(flagged=False), cache=cache,
+        prefilter=LexicalPrefilter(audit_rate=0.0),
+    )
+
+    assert prefilter.stats.audited == 1   # the audited pass went to the API, still not cached
+    assert cache.stats.stores == 1
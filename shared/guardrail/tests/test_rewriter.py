@@ -0,0 +1,140 @@
+"""Unit tests for rewrite tiers - all API calls mocked."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.models import ModerationResult
+from guardrail.rewriter import (
+    REWRITE_FALLBACK,
+    SAFE_TEMPLATES,
+    TIER_FALLBACK,
+    TIER_LLM,
+    TIER_TEMPLATE,
+    rewrite_stream,
+    template_for,
+)
+
+
+def _moderation_response(categories: dict, scores: dict):
+    result = MagicMock()
+    result.flagged = True
+    result.categories = MagicMock()
+    result.categories.model_dump.return_value = categories
+    result.category_scores = MagicMock()
+    result.category_scores.model_dump.return_value = scores
+    response = MagicMock()
+    response.results = [result]
+    return response
+
+
+def _chat_stream(deltas):
+    """Mock streaming chat completion yielding the given content deltas."""
+    async def stream():
+        for delta in deltas:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = delta
+            yield chunk
+    return stream()
+
+
+def test_template_for_high_confidence_self_harm():
+    """High-confidence self-harm flags get the fixed safe redirect."""
+    assert template_for(["self_harm"], 0.97) == SAFE_TEMPLATES["self-harm"]
+    assert template_for(["self-harm/intent"], 0.97) == SAFE_TEMPLATES["self-harm"]
+
+
+def test_template_for_low_confidence_or_violence_uses_llm():
+    """Low confidence and violence (history lessons) fall through to the LLM."""
+    assert template_for(["self_harm"], 0.5) is None
+    assert template_for(["violence"], 0.99) is None
+
+
+@pytest.mark.asyncio
+async def test_rewrite_stream_yields_clauses():
+    """The LLM rewrite is yielded at clause boundaries, not only at the end."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(
+        return_value=_chat_stream(["The war", " ended in 1945,", " and then", " peace came."])
+    )
+
+    clauses = [c async for c in rewrite_stream("text", ["violence"], client=mock_client)]
+
+    assert clauses == ["The war ended in 1945,", " and then peace came."]
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_rewrite_stream_failure_yields_fallback():
+    """A failed rewrite yields the fallback sentence."""
+    mock_client = AsyncMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
+
+    clauses = [c async for c in rewrite_stream("text", ["violence"], client=mock_client)]
+
+    assert clauses == [REWRITE_FALLBACK]
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_template_tier_skips_llm():
+    """A templated category is rewritten without a chat completion call."""
+    from guardrail.service import check_and_rewrite
+
+    mock_client = AsyncMock()
+    mock_client.moderations.create = AsyncMock(
+        return_value=_moderation_response({"self_harm": True}, {"self_harm": 0.98})
+    )
+    mock_client.chat.completions.create = AsyncMock()
+
+    result = await check_and_rewrite("harmful content", client=mock_client)
+
+    assert result.rewrite_tier == TIER_TEMPLATE
+    assert result.safe_text == SAFE_TEMPLATES["self-harm"]
+    assert result.rewrite_ms is not None
+    mock_client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_stream_records_llm_tier():
+    """Streamed rewrite pieces concatenate to the recorded rewritten_text."""
+    from guardrail.service import check_and_rewrite_stream
+
+    mock_client = AsyncMock()
+    mock_client.moderations.create = AsyncMock(
+        return_value=_moderation_response({"violence": True}, {"violence": 0.95})
+    )
+    mock_client.chat.completions.create = AsyncMock(
+        return_value=_chat_stream(["Battles were fought,", " and the war ended."])
+    )
+
+    results: list[ModerationResult] = []
+    pieces = [
+        p async for p in check_and_rewrite_stream("harmful content", client=mock_client, result_out=results)
+    ]
+
+    assert pieces == ["Battles were fought,", " and the war ended."]
+    assert results[0].rewrite_tier == TIER_LLM
+    assert results[0].safe_text == "Battles were fought, and the war ended."
+
+
+@pytest.mark.asyncio
+async def test_check_and_rewrite_stream_records_fallback_tier():
+    """A failed streamed rewrite is recorded as the fallback tier."""
+    from guardrail.service import check_and_rewrite_stream
+
+    mock_client = AsyncMock()
+    mock_client.moderations.create = AsyncMock(
+        return_value=_moderation_response({"violence": True}, {"violence": 0.95})
+    )
+    mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API error"))
+
+    results: list[ModerationResult] = []
+    pieces = [
+        p async for p in check_and_rewrite_stream("harmful content", client=mock_client, result_out=results)
+    ]
+
+    assert pieces == [REWRITE_FALLBACK]
+    assert results[0].rewrite_tier == TIER_FALLBACK
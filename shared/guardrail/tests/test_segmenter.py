@@ -0,0 +1,132 @@
+"""Unit tests for the incremental sentence segmenter."""
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from guardrail.segmenter import SentenceSegmenter, segment_stream
+
+
+def segment(chunks, **kwargs) -> list[str]:
+    """Helper: feed chunks, return sentences plus the flushed residual."""
+    segmenter = SentenceSegmenter(**kwargs)
+    sentences = []
+    for chunk in chunks:
+        sentences.extend(segmenter.feed(chunk))
+    residual = segmenter.flush()
+    if residual:
+        sentences.append(residual)
+    return sentences
+
+
+def test_basic_split_and_residual():
+    """Splits at sentence ends and flushes the unterminated residual."""
+    assert segment(["Hello world. How are you? I am fine. Final fragment"]) == [
+        "Hello world.", "How are you?", "I am fine.", "Final fragment",
+    ]
+
+
+def test_decimal_split_across_chunks_stays_whole():
+    """'3.' at a chunk boundary is undecided until the next chunk arrives."""
+    assert segment(["Pi is about 3.", "14 in value. Next."]) == [
+        "Pi is about 3.14 in value.", "Next.",
+    ]
+
+
+def test_abbreviations_and_initials_do_not_split():
+    """e.g., Mr., initials and dotted acronyms are not sentence ends."""
+    text = "Use a noun, e.g. dog. Mr. Smith read J. K. Rowling in the U.S. today. Done."
+    assert segment([text]) == [
+        "Use a noun, e.g. dog.",
+        "Mr. Smith read J. K. Rowling in the U.S. today.",
+        "Done.",
+    ]
+
+
+def test_ordinary_words_are_not_abbreviations():
+    """'no.' ends a sentence: it is a word, not the abbreviation of 'number'."""
+    assert segment(["The answer is no. Try again. "]) == ["The answer is no.", "Try again."]
+    assert segment(["Is 9 a prime number? No. It is divisible by 3. "]) == [
+        "Is 9 a prime number?", "No.", "It is divisible by 3.",
+    ]
+
+
+def test_single_capital_answer_ends_sentence():
+    """'B.' after an ordinary word ends the sentence, without waiting for flush()."""
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("The correct choice is B. Next, look at C. ") == [
+        "The correct choice is B.", "Next, look at C.",
+    ]
+    assert segmenter.flush() is None
+
+
+def test_middle_initial_waits_for_next_word():
+    """After a name, a lone capital is an initial only if a capitalized word follows."""
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("George W. ") == []
+    assert segmenter.feed("Bush was president. Yes. ") == ["George W. Bush was president.", "Yes."]
+
+
+def test_list_markers_do_not_split():
+    """'1.' at the start of a line is a list marker, not a one-character sentence."""
+    text = "Steps:\n1. Add the numbers.\n2. Divide by 2.\n"
+    assert segment([text]) == ["Steps:\n1. Add the numbers.", "2. Divide by 2."]
+
+
+def test_numbers_ending_a_sentence_still_split():
+    """A number mid-line followed by a period ends the sentence."""
+    assert segment(["The answer is 20. Here is why."]) == ["The answer is 20.", "Here is why."]
+
+
+def test_char_by_char_stream_matches_whole_text():
+    """Streaming one character at a time gives the same result as one chunk."""
+    text = "First, 2.5 plus 1.5 is 4. Second! Third? Fourth..."
+    assert segment(list(text)) == segment([text])
+
+
+def test_min_length_coalescing():
+    """Short sentences are held and merged with the next one."""
+    assert segment(["Yes. ", "No. ", "This is a longer sentence. End"], min_chars=12, max_hold_ms=60_000) == [
+        "Yes. No. This is a longer sentence.", "End",
+    ]
+
+
+def test_coalescing_deadline_releases_held_sentence():
+    """A held short sentence is released once max_hold_ms has elapsed."""
+    now = [0.0]
+    segmenter = SentenceSegmenter(min_chars=20, max_hold_ms=100, clock=lambda: now[0])
+
+    assert segmenter.feed("Great question! ") == []
+    now[0] = 0.2
+    assert segmenter.feed("Let") == ["Great question!"]
+    assert segmenter.flush() == "Let"
+
+
+def test_scan_offset_is_linear():
+    """Each feed only scans new text (no rescanning of the whole buffer)."""
+    segmenter = SentenceSegmenter()
+    for _ in range(1000):
+        segmenter.feed("word ")
+    assert segmenter._scan_from == len(segmenter._buffer)
+
+
+@pytest.mark.asyncio
+async def test_segment_stream_releases_held_sentence_while_stream_stalls():
+    """The max_hold_ms deadline is enforced by a timer, not only by the next chunk."""
+    released = asyncio.Event()
+
+    async def stalling_stream():
+        yield "Yes. "
+        await asyncio.wait_for(released.wait(), timeout=5)
+        yield "This is a longer sentence. "
+
+    sentences = []
+    segmenter = SentenceSegmenter(min_chars=12, max_hold_ms=20)
+    async for sentence, complete in segment_stream(stalling_stream(), segmenter):
+        sentences.append((sentence, complete))
+        released.set()
+
+    assert sentences == [("Yes.", True), ("This is a longer sentence.", True)]
@@ -193,3 +193,206 @@ def test_moderation_result_safe_text_flagged_with_rewrite():
         rewritten_text="Safe version",
     )
     assert result.safe_text == "Safe version"
+
+
+def _echo_check_and_rewrite(delays: dict, in_flight: list, peak: list):
+    """Fake check_and_rewrite_stream: sleeps per-sentence, tracks concurrency."""
+    async def fake(text, client=None, batcher=None, result_out=None, deadline=None):
+        import asyncio
+        in_flight.append(text)
+        peak[0] = max(peak[0], len(in_flight))
+        try:
+            await asyncio.sleep(delays.get(text, 0.01))
+        finally:
+            in_flight.remove(text)
+        yield text
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_preserves_order():
+    """Sentences finishing moderation out of order are still yielded in order."""
+    from guardrail.service import check_stream_pipelined
+
+    # First sentence is slowest to moderate
+    delays = {"One.": 0.05, "Two.": 0.01, "Three.": 0.02}
+    in_flight, peak = [], [0]
+
+    async def text_stream():
+        yield "One. Two. "
+        yield "Three. Tail"
+
+    with patch("guardrail.service.check_and_rewrite_stream", new=_echo_check_and_rewrite(delays, in_flight, peak)):
+        results = [c async for c in check_stream_pipelined(text_stream(), lookahead=3)]
+
+    assert results == ["One. ", "Two. ", "Three. ", "Tail"]
+    assert peak[0] > 1  # moderation actually overlapped
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_bounds_lookahead():
+    """No more than `lookahead` sentences are moderated at once."""
+    from guardrail.service import check_stream_pipelined
+
+    in_flight, peak = [], [0]
+
+    async def text_stream():
+        yield " ".join(f"Sentence {i}." for i in range(10))
+
+    with patch("guardrail.service.check_and_rewrite_stream", new=_echo_check_and_rewrite({}, in_flight, peak)):
+        results = [c async for c in check_stream_pipelined(text_stream(), lookahead=2)]
+
+    assert len(results) == 10
+    assert peak[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_cancels_when_consumer_stops():
+    """Stopping early cancels in-flight moderation and closes the upstream stream."""
+    import asyncio
+    from guardrail.service import check_stream_pipelined
+
+    in_flight, peak = [], [0]
+    delays = {f"S{i}.": 0.01 if i == 0 else 5.0 for i in range(5)}
+    upstream_closed = asyncio.Event()
+
+    async def text_stream():
+        try:
+            yield "S0. S1. S2. S3. S4. "
+            await asyncio.sleep(10)
+            yield "never."
+        finally:
+            upstream_closed.set()
+
+    with patch("guardrail.service.check_and_rewrite_stream", new=_echo_check_and_rewrite(delays, in_flight, peak)):
+        gen = check_stream_pipelined(text_stream(), lookahead=3)
+        first = await gen.__anext__()
+        await asyncio.wait_for(gen.aclose(), timeout=1.0)
+
+    assert first == "S0. "
+    assert in_flight == []
+    assert upstream_closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_propagates_upstream_error():
+    """An error in the LLM stream surfaces after already-read sentences are yielded."""
+    from guardrail.service import check_stream_pipelined
+
+    in_flight, peak = [], [0]
+
+    async def text_stream():
+        yield "Fine. "
+        raise RuntimeError("stream broke")
+
+    results = []
+    with patch("guardrail.service.check_and_rewrite_stream", new=_echo_check_and_rewrite({}, in_flight, peak)):
+        with pytest.raises(RuntimeError, match="stream broke"):
+            async for chunk in check_stream_pipelined(text_stream(), lookahead=2):
+                results.append(chunk)
+
+    assert results == ["Fine. "]
+
+
+@pytest.mark.asyncio
+async def test_sentence_buffer_lookahead_option_delegates_to_pipeline():
+    """check_stream_with_sentence_buffer(lookahead>1) runs the pipelined mode."""
+    from guardrail.service import check_stream_with_sentence_buffer
+
+    in_flight, peak = [], [0]
+
+    async def text_stream():
+        yield "Alpha. Beta. Gamma. Delta."
+
+    with patch("guardrail.service.check_and_rewrite_stream", new=_echo_check_and_rewrite({}, in_flight, peak)):
+        results = [
+            c async for c in check_stream_with_sentence_buffer(text_stream(), lookahead=4)
+        ]
+
+    assert "".join(results).strip() == "Alpha. Beta. Gamma. Delta."
+    assert peak[0] > 1
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_yields_rewrite_clauses_in_order():
+    """A streamed rewrite's clauses are yielded as they arrive, ahead of later sentences."""
+    import asyncio
+    from guardrail.service import check_stream_pipelined
+
+    async def fake(text, client=None, batcher=None, result_out=None, deadline=None):
+        if text == "Bad one.":
+            yield "Safe clause one,"
+            await asyncio.sleep(0.02)
+            yield " safe clause two."
+        else:
+            yield text
+
+    async def text_stream():
+        yield "Bad one. Good two."
+
+    with patch("guardrail.service.check_and_rewrite_stream", new=fake):
+        results = [c async for c in check_stream_pipelined(text_stream(), lookahead=2)]
+
+    assert results == ["Safe clause one,", " safe clause two. ", "Good two."]
+
+
+@pytest.mark.asyncio
+async def test_sentence_buffer_emits_events_per_sentence(flagged_moderation_response, safe_moderation_response):
+    """events= receives one GuardrailEvent per sentence with flags and confidence."""
+    from guardrail.service import check_stream_with_sentence_buffer
+
+    mock_rewrite_response = MagicMock()
+    mock_rewrite_response.choices = [MagicMock()]
+    mock_rewrite_response.choices[0].delta.content = "A safe sentence."
+
+    async def rewrite_stream():
+        yield mock_rewrite_response
+
+    mock_client = AsyncMock()
+    mock_client.moderations.create = AsyncMock(
+        side_effect=[safe_moderation_response, flagged_moderation_response]
+    )
+    mock_client.chat.completions.create = AsyncMock(return_value=rewrite_stream())
+
+    async def text_stream():
+        yield "The treaty was signed in 1919. Something harmful here."
+
+    events = []
+    chunks = [
+        c async for c in check_stream_with_sentence_buffer(
+            text_stream(), client=mock_client, lookahead=1, events=events
+        )
+    ]
+
+    assert "".join(chunks) == "The treaty was signed in 1919. A safe sentence."
+    assert [e.index for e in events] == [0, 1]
+    assert not events[0].flagged
+    assert events[1].flagged
+    assert events[1].categories_flagged == ["violence"]
+    assert events[1].confidence == 0.95
+    assert events[1].original_text == "Something harmful here."
+    assert events[1].safe_text == "A safe sentence."
+
+
+@pytest.mark.asyncio
+async def test_pipelined_stream_emits_events_in_sentence_order():
+    """Events are appended in sentence order even when moderation finishes out of order."""
+    import asyncio
+    from guardrail.service import check_stream_pipelined
+
+    delays = {"Alpha.": 0.05, "Beta.": 0.01, "Gamma.": 0.02}
+
+    async def fake(text, client=None, batcher=None, result_out=None, deadline=None):
+        await asyncio.sleep(delays[text])
+        result_out.append(ModerationResult(flagged=text == "Beta.", original_text=text))
+        yield text
+
+    async def text_stream():
+        yield "Alpha. Beta. Gamma."
+
+    events = []
+    with patch("guardrail.service.check_and_rewrite_stream", new=fake):
+        _ = [c async for c in check_stream_pipelined(text_stream(), lookahead=3, events=events)]
+
+    assert [e.original_text for e in events] == ["Alpha.", "Beta.", "Gamma."]
+    assert [e.flagged for e in events] == [False, True, False]
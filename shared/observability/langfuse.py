@@ -14,6 +14,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 _tracer_provider: Optional[TracerProvider] = None
+_meter_provider = None
 
 
 def setup_langfuse_tracing(
@@ -59,14 +60,46 @@ def setup_langfuse_tracing(
     return provider
 
 
+def setup_otel_metrics(service_name: str, endpoint: Optional[str] = None):
+    """
+    Export OTEL metrics (specialist TTFT/throughput, token usage) over OTLP HTTP.
+
+    Langfuse ingests traces only, so metrics go to OTEL_EXPORTER_OTLP_METRICS_ENDPOINT
+    (e.g. an OTEL collector's /v1/metrics). Without an endpoint metrics stay in-process
+    (GET /metrics) and None is returned.
+    """
+    global _meter_provider
+
+    endpoint = endpoint or os.environ.get("OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", "")
+    if not endpoint:
+        logger.info("No OTEL metrics endpoint configured, metrics stay in-process")
+        return None
+
+    from opentelemetry import metrics
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+    export_ms = int(os.environ.get("OTEL_METRIC_EXPORT_INTERVAL", "15000"))
+    reader = PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=endpoint), export_interval_millis=export_ms)
+    provider = MeterProvider(resource=Resource.create({"service.name": service_name}), metric_readers=[reader])
+    metrics.set_meter_provider(provider)
+    _meter_provider = provider
+    logger.info(f"OTEL metrics exporting to {endpoint}")
+    return provider
+
+
 def get_tracer(name: str) -> trace.Tracer:
     """Get a tracer. Call setup_langfuse_tracing() first."""
     return trace.get_tracer(name)
 
 
 def shutdown_tracing() -> None:
-    """Flush and shutdown the tracer provider."""
-    global _tracer_provider
+    """Flush and shutdown the tracer (and metrics) provider."""
+    global _tracer_provider, _meter_provider
     if _tracer_provider:
         _tracer_provider.shutdown()
         _tracer_provider = None
+    if _meter_provider:
+        _meter_provider.shutdown()
+        _meter_provider = None
@@ -85,3 +85,29 @@ def test_otel_endpoint_not_grpc():
         assert "4317" not in endpoint, "Must NOT use gRPC port 4317"
         assert "3001" in endpoint or "localhost" in endpoint
         shutdown_tracing()
+
+
+def test_setup_otel_metrics_without_endpoint_is_noop(monkeypatch):
+    """Without an OTLP metrics endpoint, metrics stay in-process."""
+    from observability.langfuse import setup_otel_metrics
+
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_METRICS_ENDPOINT", raising=False)
+    assert setup_otel_metrics(service_name="test-service") is None
+
+
+def test_setup_otel_metrics_with_endpoint():
+    """An endpoint configures an OTLP HTTP metric exporter."""
+    from observability.langfuse import setup_otel_metrics, shutdown_tracing
+
+    with patch("opentelemetry.exporter.otlp.proto.http.metric_exporter.OTLPMetricExporter") as mock_exporter_cls, \
+         patch("opentelemetry.sdk.metrics.export.PeriodicExportingMetricReader") as mock_reader_cls, \
+         patch("opentelemetry.sdk.metrics.MeterProvider") as mock_provider_cls, \
+         patch("opentelemetry.metrics.set_meter_provider"):
+
+        provider = setup_otel_metrics(service_name="test-service", endpoint="http://collector:4318/v1/metrics")
+
+        assert provider is mock_provider_cls.return_value
+        assert mock_exporter_cls.call_args.kwargs["endpoint"] == "http://collector:4318/v1/metrics"
+        mock_reader_cls.assert_called_once()
+
+        shutdown_tracing()
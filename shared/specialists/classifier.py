@@ -6,9 +6,18 @@ CRITICAL: Returns RoutingResult with subject string constant + confidence score.
 import logging
 import os
 from dataclasses import dataclass
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 from anthropic import AsyncAnthropic
 
+from clients.registry import get_anthropic_client
+
+from . import gateway as _gateway
+from .telemetry import CallMeasurement
+
+if TYPE_CHECKING:
+    from .local_classifier import LocalRouter
+    from .routing_cache import RoutingCache
+
 CLASSIFIER_MODEL = os.environ.get("ANTHROPIC_CLASSIFIER_MODEL", "claude-haiku-4-5-20251001")
 
 logger = logging.getLogger(__name__)
@@ -38,13 +47,22 @@ No explanation, no punctuation, just the single classification word."""
 async def route_intent(
     transcript: str,
     client: AsyncAnthropic | None = None,
+    cache: "RoutingCache | None" = None,
+    local: "LocalRouter | None" = None,
 ) -> RoutingResult:
     """
     Route a student's transcript to the appropriate specialist.
 
     Args:
         transcript: The student's question or message
-        client: Optional AsyncAnthropic client (creates new if not provided)
+        client: Optional AsyncAnthropic client (pooled shared client if not provided)
+        cache: Optional RoutingCache (exact + near-duplicate). Defaults to the
+            process-wide cache when CLASSIFIER_CACHE=true. Hits skip the API
+            and are marked in raw_response ("[cache:exact] ...").
+        local: Optional LocalRouter (on-box n-gram classifier), consulted after
+            the cache. Defaults to the process-wide router when
+            CLASSIFIER_LOCAL=true. Confident predictions skip the API
+            (raw_response "[local 0.97] math").
 
     Returns:
         RoutingResult with subject, confidence, and raw_response.
@@ -55,7 +73,27 @@ async def route_intent(
     CRITICAL: Use result.subject (a string constant) for routing decisions.
     Never string-match LLM output directly. Use counters for state management.
     """
-    _client = client or AsyncAnthropic()
+    if cache is None:
+        from . import routing_cache as _routing
+        if _routing.ROUTING_CACHE_ENABLED:
+            cache = _routing.get_routing_cache()
+    if cache is not None:
+        cached = cache.get(transcript)
+        if cached is not None:
+            logger.info(f"Classified '{transcript[:50]}...' -> {cached.subject} ({cached.raw_response[:20]})")
+            return cached
+
+    if local is None:
+        from . import local_classifier as _local
+        if _local.LOCAL_CLASSIFIER_ENABLED:
+            local = _local.get_local_router()
+    if local is not None:
+        fast = local.classify(transcript)
+        if fast is not None:
+            logger.info(f"Classified '{transcript[:50]}...' -> {fast.subject} ({fast.raw_response[:20]})")
+            return fast
+
+    _client = client or _gateway.without_sdk_retries(get_anthropic_client())
 
     route_map = {
         "math": "math",
@@ -64,16 +102,29 @@ async def route_intent(
         "escalate": "escalate",
     }
 
+    measurement = CallMeasurement(
+        "classifier.route_intent", operation="classifier.route_intent", model=CLASSIFIER_MODEL, provider="anthropic",
+    )
     try:
-        response = await _client.messages.create(
-            model=CLASSIFIER_MODEL,
-            max_tokens=10,
-            temperature=0.1,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": transcript}
-            ],
-        )
+        def _classify():
+            return _client.messages.create(
+                model=CLASSIFIER_MODEL,
+                max_tokens=10,
+                temperature=0.1,
+                system=SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": transcript}
+                ],
+            )
+
+        if _gateway.GATEWAY_ENABLED:
+            # One retry at most: classification is on the critical path and falls back to english
+            response = await _gateway.get_gateway().call("anthropic", CLASSIFIER_MODEL, _classify, max_retries=1)
+        else:
+            response = await _classify()
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            measurement.usage.update(getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None))
 
         raw = response.content[0].text.strip().lower()
 
@@ -86,8 +137,15 @@ async def route_intent(
 
         subject = route_map.get(raw, "english")
         logger.info(f"Classified '{transcript[:50]}...' -> {subject} (conf={confidence})")
-        return RoutingResult(subject=subject, confidence=confidence, raw_response=raw)
+        result = RoutingResult(subject=subject, confidence=confidence, raw_response=raw)
+        measurement.set_attribute("routing.subject", subject)
+        measurement.set_attribute("routing.confidence", confidence)
+        measurement.finish()
+        if cache is not None:
+            cache.put(transcript, result)
+        return result
 
     except Exception as e:
+        measurement.finish(e)
         logger.error(f"Classification failed: {e}, defaulting to english")
         return RoutingResult(subject="english", confidence=0.5, raw_response="")
@@ -7,9 +7,20 @@ In Version B, the Realtime agent handles English natively via WebRTC.
 This module provides a text-only fallback for testing and non-realtime paths.
 """
 import logging
+import os
 from typing import AsyncGenerator, Optional
 from openai import AsyncOpenAI
 
+from .hedging import PROVIDER_OPENAI, Leg, cross_provider_leg, hedge_deadline, hedged_stream, openai_text_stream
+from .telemetry import instrument_stream
+from .tiering import choose_model
+
+ENGLISH_MODEL = os.environ.get("OPENAI_ENGLISH_MODEL", "gpt-4o")
+ENGLISH_FAST_MODEL = os.environ.get("OPENAI_ENGLISH_FAST_MODEL", "gpt-4o-mini")
+
+# Model per complexity tier (SPECIALIST_TIERING, see tiering.py)
+MODEL_TIERS = {"fast": ENGLISH_FAST_MODEL, "standard": ENGLISH_MODEL}
+
 logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = """You are a supportive English tutor helping students with writing, grammar, and literature.
@@ -22,6 +33,7 @@ async def answer_english_question(
     question: str,
     conversation_history: list | None = None,
     client: Optional[AsyncOpenAI] = None,
+    model: Optional[str] = None,
 ) -> AsyncGenerator[str, None]:
     """
     Stream an English tutoring response using GPT-4o.
@@ -30,26 +42,36 @@ async def answer_english_question(
         question: The student's English/writing question
         conversation_history: Optional list of prior messages for context
         client: Optional AsyncOpenAI client
+        model: Model to use; by default ENGLISH_MODEL, or its fast tier for a
+            simple question when SPECIALIST_TIERING is on
 
     Yields:
         Text chunks of the response
     """
-    _client = client or AsyncOpenAI()
-
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    if conversation_history:
-        messages.extend(conversation_history)
+    model = model or choose_model("english", question, ENGLISH_MODEL)
+    messages = list(conversation_history or [])
     messages.append({"role": "user", "content": question})
 
-    stream = await _client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        stream=True,
-        max_tokens=1024,
+    primary = Leg(PROVIDER_OPENAI, lambda: openai_text_stream(model, SYSTEM_PROMPT, messages, client), model)
+    served_by: list = []   # (model, provider) of the hedge leg that answered
+    if client is not None:
+        stream = primary.start()
+    else:
+        # Default client: record TTFT and hedge to the other provider if it is late
+        stream = hedged_stream(
+            "english",
+            primary,
+            cross_provider_leg(PROVIDER_OPENAI, SYSTEM_PROMPT, messages),
+            hedge_deadline("english"),
+            served_by=served_by,
+        )
+    answer = instrument_stream(
+        "specialist.answer", stream,
+        operation="specialist.answer", model=model, provider=PROVIDER_OPENAI, subject="english",
+        served_by=served_by,
     )
-    async for chunk in stream:
-        if chunk.choices[0].delta.content:
-            yield chunk.choices[0].delta.content
+    async for text in answer:
+        yield text
 
 
 # Alias used by orchestrator and integration tests
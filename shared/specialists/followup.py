@@ -0,0 +1,207 @@
+"""
+Session affinity for follow-up turns.
+
+"why?", "and what about the next step?", "can you say that again" — turns
+that continue the previous answer are often misrouted by the classifier,
+which sees them without context (a bare "why?" falls back to english).
+FollowupDetector keeps the session's current subject for such turns — and
+skips the classifier call (route_intent) entirely — when:
+
+- the session has a current subject (not escalate)
+- the previous routed turn was within CLASSIFIER_FOLLOWUP_WINDOW_SECONDS
+- the turn is at most CLASSIFIER_FOLLOWUP_MAX_WORDS words and carries a real
+  continuation cue: it opens with one ("why", "and ...", "what about ...")
+  and the rest is empty or refers back ("it", "that", "the next step"), or
+  it is pronoun-led ("that makes no sense")
+- no escalation cue (teacher, hurt, scared, bullied, ...): the classifier's
+  escalate path is the safety check, so such turns are always classified
+- no topic shift: no explicit cue ("new question", "let's talk about") and
+  no keywords of a different subject
+
+Being short is not a cue: "Who was Napoleon?" and "What is photosynthesis?"
+are reclassified like any other question.
+
+Affinity turns get confidence AFFINITY_CONFIDENCE (-1.0) and raw_response
+"[affinity] <subject>" so routing_decisions rows are distinguishable from
+classifier output (1.0 / 0.8 / 0.5) and local predictions (0..0.99). Only
+turns that really skipped the classifier carry the marker.
+
+CRITICAL: Anything that looks like a topic shift or a cry for help is
+reclassified — a wrong affinity sends the student to the wrong specialist
+(or past the escalate path), a missed one only costs a classifier call.
+"""
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .classifier import RoutingResult
+from .routing_cache import has_escalation_cue, normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+FOLLOWUP_ENABLED = os.environ.get("CLASSIFIER_FOLLOWUP", "false").lower() in ("1", "true", "yes")
+FOLLOWUP_WINDOW_SECONDS = float(os.environ.get("CLASSIFIER_FOLLOWUP_WINDOW_SECONDS", "120"))
+FOLLOWUP_MAX_WORDS = int(os.environ.get("CLASSIFIER_FOLLOWUP_MAX_WORDS", "12"))
+
+# routing_decisions.confidence marker for affinity bypasses (not a probability)
+AFFINITY_CONFIDENCE = -1.0
+
+AFFINITY_SUBJECTS = ("math", "history", "english")
+
+_OPENERS = re.compile(
+    r"^(and|but|so|then|why|how come|what about|how about|what if|what else|"
+    r"ok|okay|wait|really|can you explain|i do not get|i do not understand|"
+    r"say that again|one more)\b"
+)
+_ANAPHORA = {
+    "it", "its", "that", "this", "those", "these", "they", "them", "there",
+    "next", "same", "again", "step", "part", "one", "else", "more",
+}
+# Words that can lead a turn referring back to the previous answer
+_PRONOUN_LEADS = {"it", "its", "that", "this", "those", "these", "they", "them", "there"}
+_TOPIC_SHIFT = re.compile(
+    r"\b(new question|different question|another question|something else|"
+    r"change the subject|switch to|let's talk about|let us talk about|"
+    r"can we talk about|help me with my|my homework on)\b"
+)
+_SUBJECT_KEYWORDS = {
+    "math": {
+        "math", "maths", "equation", "fraction", "fractions", "algebra", "geometry",
+        "percent", "multiply", "divide", "plus", "minus", "times", "sum", "calculate",
+        "triangle", "angle", "number", "numbers", "solve", "square", "root",
+    },
+    "history": {
+        "history", "war", "wars", "empire", "revolution", "century", "king", "queen",
+        "president", "ancient", "battle", "civilization", "dynasty", "treaty", "colonial",
+    },
+    "english": {
+        "english", "grammar", "essay", "poem", "poetry", "novel", "verb", "noun",
+        "adjective", "spelling", "sentence", "paragraph", "punctuation", "shakespeare",
+    },
+}
+
+
+@dataclass
+class FollowupStats:
+    bypassed: int = 0           # affinity kept the session's subject, classifier skipped
+    escalated: int = 0          # escalation cue in the turn, sent to the classifier
+    outside_window: int = 0
+    topic_shift: int = 0
+    not_followup: int = 0
+
+    def snapshot(self) -> dict:
+        consulted = (
+            self.bypassed + self.escalated + self.outside_window + self.topic_shift + self.not_followup
+        )
+        return {
+            "bypassed": self.bypassed,
+            "escalated": self.escalated,
+            "outside_window": self.outside_window,
+            "topic_shift": self.topic_shift,
+            "not_followup": self.not_followup,
+            "bypass_rate": round(self.bypassed / consulted, 4) if consulted else 0.0,
+        }
+
+
+class FollowupDetector:
+    """Decides whether a turn can reuse the session's current subject."""
+
+    def __init__(
+        self,
+        window_seconds: float = FOLLOWUP_WINDOW_SECONDS,
+        max_words: int = FOLLOWUP_MAX_WORDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window_seconds = window_seconds
+        self.max_words = max_words
+        self._clock = clock
+        self.stats = FollowupStats()
+
+    def _is_topic_shift(self, text: str, words: list, current_subject: str) -> bool:
+        if _TOPIC_SHIFT.search(text):
+            return True
+        vocabulary = set(words)
+        return any(
+            vocabulary & keywords
+            for subject, keywords in _SUBJECT_KEYWORDS.items()
+            if subject != current_subject
+        )
+
+    def _is_followup(self, text: str, words: list) -> bool:
+        if len(words) > self.max_words:
+            return False
+        if words[0] in _PRONOUN_LEADS:
+            return True
+        opener = _OPENERS.match(text)
+        if opener is None:
+            return False
+        # "why?" alone continues; "why did Napoleon invade Russia?" must refer back
+        rest = re.findall(r"[a-z0-9]+", text[opener.end():])
+        return not rest or any(word in _ANAPHORA for word in rest)
+
+    def route(
+        self,
+        transcript: str,
+        current_subject: Optional[str],
+        last_routed_at: Optional[float],
+    ) -> Optional[RoutingResult]:
+        """
+        Return an affinity RoutingResult for a follow-up turn, or None.
+
+        A result means the turn is routed without the classifier; None means
+        classify it as usual.
+
+        Args:
+            transcript: The student's turn
+            current_subject: The session's current subject
+            last_routed_at: clock() timestamp of the session's previous routed turn
+        """
+        if current_subject not in AFFINITY_SUBJECTS or last_routed_at is None:
+            return None
+        if self._clock() - last_routed_at > self.window_seconds:
+            self.stats.outside_window += 1
+            return None
+
+        text = normalize_transcript(transcript)
+        words = re.findall(r"[a-z0-9]+", text)
+        if not words:
+            self.stats.not_followup += 1
+            return None
+        if has_escalation_cue(text):
+            self.stats.escalated += 1
+            return None
+        if self._is_topic_shift(text, words, current_subject):
+            self.stats.topic_shift += 1
+            return None
+        if not self._is_followup(text, words):
+            self.stats.not_followup += 1
+            return None
+
+        self.stats.bypassed += 1
+        logger.info(f"Follow-up kept on {current_subject}, classifier skipped")
+        return RoutingResult(
+            subject=current_subject,
+            confidence=AFFINITY_CONFIDENCE,
+            raw_response=f"[affinity] {current_subject}",
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "window_seconds": self.window_seconds,
+            "max_words": self.max_words,
+        }
+
+
+_detector: Optional[FollowupDetector] = None
+
+
+def get_followup_detector() -> FollowupDetector:
+    """Process-wide follow-up detector (lazily created)."""
+    global _detector
+    if _detector is None:
+        _detector = FollowupDetector()
+    return _detector
@@ -0,0 +1,441 @@
+"""
+Provider gateway: adaptive concurrency limits and rate-limit-aware retries.
+
+Under load every turn fired its messages.stream / chat.completions.create
+immediately; once a provider answered 429 the job simply errored. The
+gateway sits in front of specialist (and classifier) calls:
+
+- one AIMD limiter per provider:model — the concurrency limit grows by one
+  per limit's worth of accepted requests and is halved (at most once per
+  PROVIDER_GATEWAY_DECREASE_COOLDOWN_MS) when the provider rate-limits
+  (429 / 529 overloaded)
+- saturated → callers queue (FIFO) for up to PROVIDER_GATEWAY_QUEUE_TIMEOUT_MS,
+  then GatewaySaturatedError
+- retryable failures (rate limits, 5xx, connection errors) are retried up to
+  PROVIDER_GATEWAY_MAX_RETRIES times. The delay honors retry-after-ms /
+  retry-after and the providers' rate-limit reset headers, plus jitter, and
+  falls back to full-jitter exponential backoff. A provider asking for a
+  longer wait than PROVIDER_GATEWAY_MAX_BACKOFF_MS is not retried.
+
+Limits are PROVIDER_GATEWAY_INITIAL_LIMIT .. PROVIDER_GATEWAY_MAX_LIMIT
+(MIN_LIMIT floor); PROVIDER_GATEWAY_LIMITS overrides the maximum per
+"provider" or "provider:model", e.g. "anthropic=32,openai:gpt-4o-mini=128".
+
+Queue depth, current limits and retry counters are in /metrics.
+
+CRITICAL: Streams are only retried before their first chunk — a stream that
+fails mid-answer is never restarted (the student already heard part of it).
+Pooled SDK clients run with max_retries=0 behind the gateway so retries are
+not multiplied.
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_ENABLED = os.environ.get("PROVIDER_GATEWAY", "false").lower() in ("1", "true", "yes")
+GATEWAY_INITIAL_LIMIT = int(os.environ.get("PROVIDER_GATEWAY_INITIAL_LIMIT", "16"))
+GATEWAY_MIN_LIMIT = int(os.environ.get("PROVIDER_GATEWAY_MIN_LIMIT", "2"))
+GATEWAY_MAX_LIMIT = int(os.environ.get("PROVIDER_GATEWAY_MAX_LIMIT", "64"))
+GATEWAY_MAX_RETRIES = int(os.environ.get("PROVIDER_GATEWAY_MAX_RETRIES", "3"))
+GATEWAY_BACKOFF_MS = float(os.environ.get("PROVIDER_GATEWAY_BACKOFF_MS", "250"))
+GATEWAY_MAX_BACKOFF_MS = float(os.environ.get("PROVIDER_GATEWAY_MAX_BACKOFF_MS", "8000"))
+GATEWAY_QUEUE_TIMEOUT_MS = float(os.environ.get("PROVIDER_GATEWAY_QUEUE_TIMEOUT_MS", "10000"))
+GATEWAY_DECREASE_COOLDOWN_MS = float(os.environ.get("PROVIDER_GATEWAY_DECREASE_COOLDOWN_MS", "1000"))
+
+
+def _parse_limits(raw: str) -> Dict[str, int]:
+    limits = {}
+    for part in raw.split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            limits[key.strip()] = int(value)
+    return limits
+
+
+GATEWAY_LIMITS = _parse_limits(os.environ.get("PROVIDER_GATEWAY_LIMITS", ""))
+
+RATE_LIMIT_STATUS = (429, 529)
+RETRYABLE_STATUS = RATE_LIMIT_STATUS + (408, 409, 500, 502, 503, 504)
+# Share of the provider-requested delay added as jitter, so queued retries spread out
+HEADER_JITTER = 0.1
+
+T = TypeVar("T")
+
+
+class GatewaySaturatedError(RuntimeError):
+    """No concurrency slot became free within the queue timeout."""
+
+
+def _status(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return _status(exc) in RATE_LIMIT_STATUS
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if _status(exc) in RETRYABLE_STATUS:
+        return True
+    # openai/anthropic APIConnectionError (APITimeoutError subclasses it)
+    return any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__)
+
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """OpenAI reset headers: "20ms", "6s", "1m30s"."""
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+
+
+def _seconds_until(timestamp: str, now: datetime) -> Optional[float]:
+    """Anthropic reset headers: RFC 3339 timestamps."""
+    try:
+        reset = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset - now).total_seconds())
+
+
+def header_delay(headers: Optional[Mapping[str, str]], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Seconds the provider asked us to wait, or None if the headers do not say.
+
+    retry-after-ms / retry-after win; otherwise the latest reset among the
+    exhausted (remaining == 0) request/token limits.
+    """
+    if not headers:
+        return None
+    now = now or datetime.now(timezone.utc)
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, (parsedate_to_datetime(value) - now).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    delays = []
+    for kind in ("requests", "tokens"):
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0":
+            delay = _parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            if delay is not None:
+                delays.append(delay)
+    for kind in ("requests", "tokens", "input-tokens", "output-tokens"):
+        if headers.get(f"anthropic-ratelimit-{kind}-remaining") == "0":
+            delay = _seconds_until(headers.get(f"anthropic-ratelimit-{kind}-reset", ""), now)
+            if delay is not None:
+                delays.append(delay)
+    return max(delays) if delays else None
+
+
+def _headers(exc: BaseException) -> Optional[Mapping[str, str]]:
+    return getattr(getattr(exc, "response", None), "headers", None)
+
+
+def without_sdk_retries(client: Any) -> Any:
+    """The pooled client with SDK retries off when the gateway does the retrying."""
+    if not GATEWAY_ENABLED:
+        return client
+    return client.with_options(max_retries=0)
+
+
+@dataclass
+class LimiterStats:
+    accepted: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    failures: int = 0
+    queued: int = 0
+    queue_timeouts: int = 0
+    peak_queue_depth: int = 0
+    decreases: int = 0
+
+
+class AimdLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit with a FIFO queue."""
+
+    def __init__(
+        self,
+        initial: int = GATEWAY_INITIAL_LIMIT,
+        min_limit: int = GATEWAY_MIN_LIMIT,
+        max_limit: int = GATEWAY_MAX_LIMIT,
+        decrease_factor: float = 0.5,
+        decrease_cooldown_s: float = GATEWAY_DECREASE_COOLDOWN_MS / 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown_s = decrease_cooldown_s
+        self._clock = clock
+        self._last_decrease: Optional[float] = None
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = LimiterStats()
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """Take a slot, queueing behind earlier callers when saturated."""
+        if not self._waiters and self.in_flight < self.capacity:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats.queued += 1
+        self.stats.peak_queue_depth = max(self.stats.peak_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats.queue_timeouts += 1
+                raise GatewaySaturatedError(
+                    f"no slot within {timeout:.1f}s (limit {self.capacity}, queue {len(self._waiters)})"
+                ) from None
+            raise
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def on_success(self) -> None:
+        """Additive increase: +1 per limit's worth of accepted requests."""
+        self.stats.accepted += 1
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def on_rate_limited(self) -> None:
+        """Multiplicative decrease, once per cooldown (a burst of 429s is one signal)."""
+        self.stats.rate_limited += 1
+        now = self._clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.decrease_cooldown_s:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.stats.decreases += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.capacity,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.stats.peak_queue_depth,
+            "accepted": self.stats.accepted,
+            "rate_limited": self.stats.rate_limited,
+            "decreases": self.stats.decreases,
+            "retries": self.stats.retries,
+            "failures": self.stats.failures,
+            "queued": self.stats.queued,
+            "queue_timeouts": self.stats.queue_timeouts,
+        }
+
+
+class ProviderGateway:
+    """Per provider:model AIMD limiters plus retry policy for provider calls."""
+
+    def __init__(
+        self,
+        initial_limit: int = GATEWAY_INITIAL_LIMIT,
+        min_limit: int = GATEWAY_MIN_LIMIT,
+        max_limit: int = GATEWAY_MAX_LIMIT,
+        limits: Optional[Dict[str, int]] = None,
+        max_retries: int = GATEWAY_MAX_RETRIES,
+        backoff_s: float = GATEWAY_BACKOFF_MS / 1000,
+        max_backoff_s: float = GATEWAY_MAX_BACKOFF_MS / 1000,
+        queue_timeout_s: float = GATEWAY_QUEUE_TIMEOUT_MS / 1000,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rand: Callable[[], float] = random.random,
+    ):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limits = dict(GATEWAY_LIMITS if limits is None else limits)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.queue_timeout_s = queue_timeout_s
+        self._sleep = sleep
+        self._rand = rand
+        self._limiters: Dict[str, AimdLimiter] = {}
+
+    def limiter(self, provider: str, model: str) -> AimdLimiter:
+        key = f"{provider}:{model}"
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            max_limit = self.limits.get(key, self.limits.get(provider, self.max_limit))
+            limiter = AimdLimiter(min(self.initial_limit, max_limit), self.min_limit, max_limit)
+            self._limiters[key] = limiter
+        return limiter
+
+    def retry_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """Seconds before retry `attempt` (0-based), or None if the provider wants us to wait too long."""
+        requested = header_delay(_headers(exc))
+        if requested is not None:
+            if requested > self.max_backoff_s:
+                return None
+            return requested + self._rand() * HEADER_JITTER * max(requested, self.backoff_s)
+        # Full jitter exponential backoff
+        return self._rand() * min(self.max_backoff_s, self.backoff_s * (2 ** attempt))
+
+    async def _should_retry(self, limiter: AimdLimiter, key: str, exc: BaseException, attempt: int, max_retries: int) -> bool:
+        if is_rate_limited(exc):
+            limiter.on_rate_limited()
+        if not is_retryable(exc) or attempt >= max_retries:
+            limiter.stats.failures += 1
+            return False
+        delay = self.retry_delay(exc, attempt)
+        if delay is None:
+            limiter.stats.failures += 1
+            logger.warning(f"{key} asked for a longer wait than {self.max_backoff_s:.1f}s, not retrying: {exc}")
+            return False
+        limiter.stats.retries += 1
+        logger.warning(f"{key} attempt {attempt + 1} failed ({_status(exc) or type(exc).__name__}), retrying in {delay:.2f}s")
+        await self._sleep(delay)
+        return True
+
+    async def call(
+        self,
+        provider: str,
+        model: str,
+        fn: Callable[[], Awaitable[T]],
+        max_retries: Optional[int] = None,
+    ) -> T:
+        """Run a non-streaming provider call under the limiter, retrying retryable failures."""
+        limiter = self.limiter(provider, model)
+        key = f"{provider}:{model}"
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            await limiter.acquire(self.queue_timeout_s)
+            try:
+                result = await fn()
+            except Exception as e:
+                limiter.release()
+                if not await self._should_retry(limiter, key, e, attempt, retries):
+                    raise
+                attempt += 1
+                continue
+            limiter.on_success()
+            limiter.release()
+            return result
+
+    async def stream(
+        self,
+        provider: str,
+        model: str,
+        start: Callable[[], AsyncIterator[str]],
+        max_retries: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream from start() under the limiter. The slot is held until the
+        stream ends; failures before the first chunk are retried.
+        """
+        limiter = self.limiter(provider, model)
+        key = f"{provider}:{model}"
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            await limiter.acquire(self.queue_timeout_s)
+            stream = start()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                limiter.on_success()
+                limiter.release()
+                return
+            except Exception as e:
+                limiter.release()
+                await _aclose(stream)
+                if not await self._should_retry(limiter, key, e, attempt, retries):
+                    raise
+                attempt += 1
+                continue
+            except BaseException:
+                limiter.release()
+                await _aclose(stream)
+                raise
+            break
+
+        limiter.on_success()
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            limiter.release()
+            await _aclose(stream)
+
+    def snapshot(self) -> dict:
+        return {
+            "limiters": {key: limiter.snapshot() for key, limiter in self._limiters.items()},
+            "queue_depth": sum(limiter.queue_depth for limiter in self._limiters.values()),
+            "max_retries": self.max_retries,
+        }
+
+
+async def _aclose(stream) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+_gateway: Optional[ProviderGateway] = None
+
+
+def get_gateway() -> ProviderGateway:
+    """Process-wide provider gateway (lazily created)."""
+    global _gateway
+    if _gateway is None:
+        _gateway = ProviderGateway()
+    return _gateway
@@ -0,0 +1,316 @@
+"""
+Hedged specialist requests with cross-provider fallback.
+
+Math goes to Anthropic, history/English to OpenAI. A slow provider used to
+stall the turn until it errored out. hedged_stream bounds the wait for the
+first token:
+
+1. start the primary leg
+2. no first token within the subject's deadline (SPECIALIST_HEDGE_DEADLINES_MS),
+   or the primary errors before its first token → start the secondary leg
+   (same prompt, other provider: SPECIALIST_HEDGE_OPENAI_MODEL /
+   SPECIALIST_HEDGE_ANTHROPIC_MODEL)
+3. stream from whichever leg produces a first token; cancel the other
+
+Time-to-first-token is recorded per provider for every request, hedged or
+not, together with the hedge rate per subject. Each provider stream is also
+instrumented as an "llm.stream" span (see telemetry.py).
+
+CRITICAL: Hedging only happens before the first token. Once a leg has
+started speaking, a mid-stream failure propagates like it always did —
+switching providers mid-answer would splice two different answers.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from .gateway import GATEWAY_ENABLED, get_gateway, without_sdk_retries
+from .telemetry import Usage, instrument_stream
+
+logger = logging.getLogger(__name__)
+
+HEDGE_ENABLED = os.environ.get("SPECIALIST_HEDGE", "false").lower() in ("1", "true", "yes")
+HEDGE_OPENAI_MODEL = os.environ.get("SPECIALIST_HEDGE_OPENAI_MODEL", "gpt-4o")
+HEDGE_ANTHROPIC_MODEL = os.environ.get("SPECIALIST_HEDGE_ANTHROPIC_MODEL", "claude-sonnet-4-6")
+
+
+def _parse_deadlines(raw: str) -> Dict[str, float]:
+    deadlines = {}
+    for part in raw.split(","):
+        if "=" in part:
+            subject, value = part.split("=", 1)
+            deadlines[subject.strip()] = float(value) / 1000
+    return deadlines
+
+
+# Seconds to wait for the primary's first token, per subject
+HEDGE_DEADLINES = _parse_deadlines(
+    os.environ.get("SPECIALIST_HEDGE_DEADLINES_MS", "math=2500,history=1500,english=1500")
+)
+
+PROVIDER_OPENAI = "openai"
+PROVIDER_ANTHROPIC = "anthropic"
+
+MAX_TOKENS = 1024
+# Recent TTFT samples kept per provider for percentiles
+TTFT_WINDOW = 500
+
+_EMPTY = object()
+
+
+@dataclass
+class Leg:
+    """One way of answering: a provider name, a factory for its text stream and the model behind it."""
+    provider: str
+    start: Callable[[], AsyncIterator[str]]
+    model: Optional[str] = None
+
+
+@dataclass
+class ProviderTtft:
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=TTFT_WINDOW))
+    count: int = 0
+    errors: int = 0
+
+    def record(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {"count": self.count, "errors": self.errors, "p50_ms": pct(0.5), "p95_ms": pct(0.95)}
+
+
+@dataclass
+class SubjectHedgeStats:
+    requests: int = 0
+    hedged: int = 0             # secondary started (deadline or early primary error)
+    secondary_wins: int = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "secondary_wins": self.secondary_wins,
+            "hedge_rate": round(self.hedged / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class HedgeStats:
+    def __init__(self):
+        self.subjects: Dict[str, SubjectHedgeStats] = {}
+        self.providers: Dict[str, ProviderTtft] = {}
+
+    def subject(self, name: str) -> SubjectHedgeStats:
+        return self.subjects.setdefault(name, SubjectHedgeStats())
+
+    def provider(self, name: str) -> ProviderTtft:
+        return self.providers.setdefault(name, ProviderTtft())
+
+    def snapshot(self) -> dict:
+        return {
+            "subjects": {name: s.snapshot() for name, s in self.subjects.items()},
+            "ttft": {name: p.snapshot() for name, p in self.providers.items()},
+        }
+
+
+_stats = HedgeStats()
+
+
+def get_hedge_stats() -> HedgeStats:
+    """Process-wide hedge counters and per-provider TTFT."""
+    return _stats
+
+
+def hedge_deadline(subject: str) -> Optional[float]:
+    """Seconds before hedging this subject, or None when hedging is off for it."""
+    if not HEDGE_ENABLED:
+        return None
+    return HEDGE_DEADLINES.get(subject)
+
+
+def openai_text_stream(model: str, system: str, messages: List[dict], client=None) -> AsyncIterator[str]:
+    """Stream a chat completion's text (through the provider gateway if enabled). messages exclude the system prompt."""
+    usage = Usage()
+    start = lambda: _openai_stream(model, system, messages, client, usage)
+    stream = get_gateway().stream(PROVIDER_OPENAI, model, start) if GATEWAY_ENABLED else start()
+    return instrument_stream(
+        "llm.stream", stream, operation="llm.stream", model=model, provider=PROVIDER_OPENAI, usage=usage,
+    )
+
+
+def anthropic_text_stream(model: str, system: str, messages: List[dict], client=None) -> AsyncIterator[str]:
+    """Stream a Claude message's text (through the provider gateway if enabled)."""
+    usage = Usage()
+    start = lambda: _anthropic_stream(model, system, messages, client, usage)
+    stream = get_gateway().stream(PROVIDER_ANTHROPIC, model, start) if GATEWAY_ENABLED else start()
+    return instrument_stream(
+        "llm.stream", stream, operation="llm.stream", model=model, provider=PROVIDER_ANTHROPIC, usage=usage,
+    )
+
+
+async def _openai_stream(model: str, system: str, messages: List[dict], client, usage: Usage) -> AsyncIterator[str]:
+    from clients.registry import get_openai_client
+
+    _client = client or without_sdk_retries(get_openai_client())
+    stream = await _client.chat.completions.create(
+        model=model,
+        messages=[{"role": "system", "content": system}] + messages,
+        stream=True,
+        stream_options={"include_usage": True},
+        max_tokens=MAX_TOKENS,
+    )
+    async for chunk in stream:
+        if getattr(chunk, "usage", None):
+            # include_usage: the last chunk carries usage and no choices
+            usage.update(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _anthropic_stream(model: str, system: str, messages: List[dict], client, usage: Usage) -> AsyncIterator[str]:
+    from clients.registry import get_anthropic_client
+
+    _client = client or without_sdk_retries(get_anthropic_client())
+    async with _client.messages.stream(
+        model=model,
+        max_tokens=MAX_TOKENS,
+        system=system,
+        messages=messages,
+    ) as stream:
+        async for text in stream.text_stream:
+            yield text
+        try:
+            final = await stream.get_final_message()
+            usage.update(final.usage.input_tokens, final.usage.output_tokens)
+        except Exception as e:
+            logger.debug(f"Anthropic usage unavailable: {e}")
+
+
+def cross_provider_leg(primary_provider: str, system: str, messages: List[dict]) -> Leg:
+    """The same prompt on the other provider."""
+    if primary_provider == PROVIDER_ANTHROPIC:
+        return Leg(
+            PROVIDER_OPENAI, lambda: openai_text_stream(HEDGE_OPENAI_MODEL, system, messages), HEDGE_OPENAI_MODEL,
+        )
+    return Leg(
+        PROVIDER_ANTHROPIC, lambda: anthropic_text_stream(HEDGE_ANTHROPIC_MODEL, system, messages), HEDGE_ANTHROPIC_MODEL,
+    )
+
+
+async def _first_chunk(stream: AsyncIterator[str]):
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _EMPTY
+
+
+async def hedged_stream(
+    subject: str,
+    primary: Leg,
+    secondary: Optional[Leg],
+    deadline_s: Optional[float],
+    stats: Optional[HedgeStats] = None,
+    served_by: Optional[List[Tuple[Optional[str], str]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream from primary, hedging to secondary if no first token within deadline_s.
+
+    deadline_s=None (or no secondary) still records TTFT but never hedges.
+    served_by, if given, gets the winning leg's (model, provider) appended
+    before its first chunk — pass it on to instrument_stream so the answer
+    is attributed to the leg that produced it.
+    """
+    stats = stats or _stats
+    subject_stats = stats.subject(subject)
+    subject_stats.requests += 1
+    legs: Dict[asyncio.Task, tuple] = {}   # first-chunk task -> (leg, stream, started_at)
+
+    def _launch(leg: Leg) -> asyncio.Task:
+        stream = leg.start()
+        task = asyncio.ensure_future(_first_chunk(stream))
+        legs[task] = (leg, stream, time.monotonic())
+        return task
+
+    def _hedge(reason: str) -> None:
+        subject_stats.hedged += 1
+        logger.warning(f"Hedging {subject}: {reason}, starting {secondary.provider}")
+        _launch(secondary)
+
+    can_hedge = secondary is not None and deadline_s is not None
+    winner = None
+    error: Optional[BaseException] = None
+    try:
+        # Inside the try: a caller cancelled during the deadline wait
+        # (speculation cancel, barge-in) still closes every started leg
+        primary_task = _launch(primary)
+        if can_hedge:
+            done, _ = await asyncio.wait({primary_task}, timeout=deadline_s)
+            if not done:
+                _hedge(f"no first token from {primary.provider} within {deadline_s * 1000:.0f}ms")
+
+        pending = set(legs)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                leg = legs[task][0]
+                if task.exception() is None:
+                    winner = task
+                    break
+                error = task.exception()
+                stats.provider(leg.provider).errors += 1
+                logger.warning(f"{leg.provider} failed before first token for {subject}: {error}")
+                if can_hedge and task is primary_task and len(legs) == 1:
+                    _hedge(f"{primary.provider} failed")
+                    pending = {t for t in legs if not t.done()}
+    finally:
+        # Cancel and close every losing leg
+        for task, (leg, stream, _) in legs.items():
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except BaseException:
+                    pass
+            await _aclose(stream)
+
+    if winner is None:
+        raise error or RuntimeError(f"No {subject} specialist leg produced output")
+
+    leg, stream, started_at = legs[winner]
+    stats.provider(leg.provider).record((time.monotonic() - started_at) * 1000)
+    if leg is secondary:
+        subject_stats.secondary_wins += 1
+    if served_by is not None:
+        served_by.append((leg.model, leg.provider))
+
+    first = winner.result()
+    if first is _EMPTY:
+        return
+    try:
+        yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await _aclose(stream)
+
+
+async def _aclose(stream) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
@@ -0,0 +1,302 @@
+"""
+On-box fast-path intent classifier.
+
+A hashed word/character n-gram softmax regression trained from the
+routing_decisions table (see train_classifier.py). route_intent consults it
+before Haiku: when the top class probability clears the threshold the
+RoutingResult is returned immediately, otherwise Haiku decides.
+
+Hot-swappable:
+- model: LocalRouter re-reads CLASSIFIER_LOCAL_MODEL_PATH when its mtime
+  changes (the trainer writes atomically), checked every RELOAD_SECONDS
+- threshold: CLASSIFIER_LOCAL_THRESHOLD, else the value stored in the model
+  file, overridable at runtime with LocalRouter.set_threshold()
+
+CRITICAL: Local decisions report their probability as confidence, capped at
+LOCAL_MAX_CONFIDENCE (0.99). Haiku only ever reports 1.0 / 0.8 / 0.5, so the
+trainer's `confidence IN (1.0, 0.8)` filter never learns from its own output.
+"""
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .classifier import RoutingResult
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CLASSIFIER_ENABLED = os.environ.get("CLASSIFIER_LOCAL", "false").lower() in ("1", "true", "yes")
+LOCAL_MODEL_PATH = os.environ.get("CLASSIFIER_LOCAL_MODEL_PATH", "/workspace/models/router.json")
+# Unset = use the threshold stored in the model file
+LOCAL_THRESHOLD: Optional[float] = (
+    float(os.environ["CLASSIFIER_LOCAL_THRESHOLD"]) if os.environ.get("CLASSIFIER_LOCAL_THRESHOLD") else None
+)
+LOCAL_RELOAD_SECONDS = float(os.environ.get("CLASSIFIER_LOCAL_RELOAD_SECONDS", "30"))
+
+DEFAULT_THRESHOLD = 0.9
+LOCAL_MAX_CONFIDENCE = 0.99
+N_FEATURES = 1 << 18
+MODEL_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+|[+\-*/=%^×]")
+
+
+def features(text: str, n_features: int = N_FEATURES) -> Dict[int, float]:
+    """L2-normalized hashed word unigrams, word bigrams and character 3-grams."""
+    lowered = text.lower()
+    tokens = _TOKEN.findall(lowered)
+    grams = [f"w:{t}" for t in tokens]
+    grams += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    padded = f" {' '.join(tokens)} "
+    grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    vec: Dict[int, float] = {}
+    for gram in grams:
+        idx = zlib.crc32(gram.encode("utf-8")) % n_features
+        vec[idx] = vec.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {idx: v / norm for idx, v in vec.items()}
+
+
+def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+    top = max(scores.values())
+    exps = {label: math.exp(s - top) for label, s in scores.items()}
+    total = sum(exps.values())
+    return {label: e / total for label, e in exps.items()}
+
+
+class HashedNgramModel:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(
+        self,
+        labels: List[str],
+        n_features: int = N_FEATURES,
+        threshold: float = DEFAULT_THRESHOLD,
+    ):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.threshold = threshold
+        self.weights: Dict[str, Dict[int, float]] = {label: {} for label in self.labels}
+        self.bias: Dict[str, float] = {label: 0.0 for label in self.labels}
+        self.metadata: dict = {}
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        x = features(text, self.n_features)
+        scores = {
+            label: self.bias[label] + sum(w.get(i, 0.0) * v for i, v in x.items())
+            for label, w in self.weights.items()
+        }
+        return _softmax(scores)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return (label, probability) of the most likely class."""
+        proba = self.predict_proba(text)
+        label = max(proba, key=proba.get)
+        return label, proba[label]
+
+    def fit(
+        self,
+        samples: Iterable[Tuple[str, str]],
+        epochs: int = 15,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        seed: int = 0,
+    ) -> "HashedNgramModel":
+        """Train with plain SGD on (text, label) pairs. Unknown labels are skipped."""
+        data = [(features(text, self.n_features), label) for text, label in samples if label in self.bias]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            lr = learning_rate / (1 + epoch)
+            for x, target in data:
+                scores = {
+                    label: self.bias[label] + sum(w.get(i, 0.0) * v for i, v in x.items())
+                    for label, w in self.weights.items()
+                }
+                proba = _softmax(scores)
+                for label, w in self.weights.items():
+                    grad = proba[label] - (1.0 if label == target else 0.0)
+                    self.bias[label] -= lr * grad
+                    for i, v in x.items():
+                        w[i] = w.get(i, 0.0) * (1 - lr * l2) - lr * grad * v
+        self.metadata["samples"] = len(data)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "labels": self.labels,
+            "n_features": self.n_features,
+            "threshold": self.threshold,
+            "bias": self.bias,
+            # Drop near-zero weights to keep the file small
+            "weights": {
+                label: {str(i): round(v, 6) for i, v in w.items() if abs(v) > 1e-6}
+                for label, w in self.weights.items()
+            },
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HashedNgramModel":
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"unsupported model version {data.get('version')!r}")
+        model = cls(data["labels"], data["n_features"], data.get("threshold", DEFAULT_THRESHOLD))
+        model.bias = {label: float(b) for label, b in data["bias"].items()}
+        model.weights = {
+            label: {int(i): float(v) for i, v in w.items()}
+            for label, w in data["weights"].items()
+        }
+        model.metadata = data.get("metadata", {})
+        return model
+
+    def save(self, path: str) -> None:
+        """Write atomically so a hot-reloading LocalRouter never sees a partial file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramModel":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass
+class LocalRouterStats:
+    decided: int = 0       # returned a RoutingResult (Haiku skipped)
+    deferred: int = 0      # below threshold, Haiku called
+    no_model: int = 0
+    reloads: int = 0
+    reload_errors: int = 0
+
+    def snapshot(self) -> dict:
+        consulted = self.decided + self.deferred
+        return {
+            "decided": self.decided,
+            "deferred": self.deferred,
+            "no_model": self.no_model,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "coverage": round(self.decided / consulted, 4) if consulted else 0.0,
+        }
+
+
+class LocalRouter:
+    """Holds the current model + threshold and hot-swaps them."""
+
+    def __init__(
+        self,
+        model_path: Optional[str] = LOCAL_MODEL_PATH,
+        threshold: Optional[float] = LOCAL_THRESHOLD,
+        reload_seconds: float = LOCAL_RELOAD_SECONDS,
+        model: Optional[HashedNgramModel] = None,
+    ):
+        self.model_path = model_path
+        self.reload_seconds = reload_seconds
+        self._threshold_override = threshold
+        self._model = model
+        self._mtime: Optional[float] = None
+        self._checked_at = float("-inf")
+        self.stats = LocalRouterStats()
+
+    @property
+    def threshold(self) -> float:
+        if self._threshold_override is not None:
+            return self._threshold_override
+        return self._model.threshold if self._model is not None else DEFAULT_THRESHOLD
+
+    def set_threshold(self, threshold: Optional[float]) -> None:
+        """Override the threshold at runtime (None = back to the model's own)."""
+        self._threshold_override = threshold
+        logger.info(f"Local classifier threshold set to {self.threshold}")
+
+    def swap(self, model: HashedNgramModel) -> None:
+        """Replace the model in place (e.g. after training in-process)."""
+        self._model = model
+        self.stats.reloads += 1
+
+    def _maybe_reload(self) -> None:
+        if not self.model_path:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.model_path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            self._model = HashedNgramModel.load(self.model_path)
+            self._mtime = mtime
+            self.stats.reloads += 1
+            logger.info(
+                f"Local classifier loaded from {self.model_path} "
+                f"({self._model.metadata.get('samples', '?')} samples, threshold={self.threshold})"
+            )
+        except Exception as e:
+            # Keep serving the previous model
+            self.stats.reload_errors += 1
+            logger.warning(f"Local classifier reload failed: {e}")
+
+    def classify(self, transcript: str) -> Optional[RoutingResult]:
+        """Return a RoutingResult if confident enough, else None (defer to Haiku)."""
+        self._maybe_reload()
+        if self._model is None:
+            self.stats.no_model += 1
+            return None
+        try:
+            label, proba = self._model.predict(transcript)
+        except Exception as e:
+            logger.warning(f"Local classifier failed: {e}")
+            return None
+        if proba < self.threshold:
+            self.stats.deferred += 1
+            return None
+        self.stats.decided += 1
+        return RoutingResult(
+            subject=label,
+            confidence=round(min(proba, LOCAL_MAX_CONFIDENCE), 3),
+            raw_response=f"[local {proba:.2f}] {label}",
+        )
+
+    def guess(self, transcript: str) -> Optional[str]:
+        """Top label regardless of threshold (a cheap hint, e.g. for speculation)."""
+        self._maybe_reload()
+        if self._model is None:
+            return None
+        try:
+            return self._model.predict(transcript)[0]
+        except Exception:
+            return None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "threshold": self.threshold,
+            "model_loaded": self._model is not None,
+            "model_samples": self._model.metadata.get("samples") if self._model else None,
+        }
+
+
+_local_router: Optional[LocalRouter] = None
+
+
+def get_local_router() -> LocalRouter:
+    """Process-wide local router (lazily created; loads the model on first use)."""
+    global _local_router
+    if _local_router is None:
+        _local_router = LocalRouter()
+    return _local_router
@@ -7,7 +7,15 @@ import os
 from typing import AsyncGenerator, Optional
 from anthropic import AsyncAnthropic
 
+from .hedging import PROVIDER_ANTHROPIC, Leg, cross_provider_leg, hedge_deadline, hedged_stream, anthropic_text_stream
+from .telemetry import instrument_stream
+from .tiering import choose_model
+
 MATH_MODEL = os.environ.get("ANTHROPIC_MATH_MODEL", "claude-sonnet-4-6")
+MATH_FAST_MODEL = os.environ.get("ANTHROPIC_MATH_FAST_MODEL", "claude-haiku-4-5-20251001")
+
+# Model per complexity tier (SPECIALIST_TIERING, see tiering.py)
+MODEL_TIERS = {"fast": MATH_FAST_MODEL, "standard": MATH_MODEL}
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,7 @@ async def answer_math_question(
     question: str,
     conversation_history: list | None = None,
     client: Optional[AsyncAnthropic] = None,
+    model: Optional[str] = None,
 ) -> AsyncGenerator[str, None]:
     """
     Stream a math answer using Claude Sonnet 4.6.
@@ -29,23 +38,36 @@ async def answer_math_question(
         question: The student's math question
         conversation_history: Optional list of prior messages for context
         client: Optional AsyncAnthropic client
+        model: Model to use; by default MATH_MODEL, or its fast tier for a
+            simple question when SPECIALIST_TIERING is on
 
     Yields:
         Text chunks of the response
     """
-    _client = client or AsyncAnthropic()
-
-    messages = conversation_history or []
-    messages = messages + [{"role": "user", "content": question}]
-
-    async with _client.messages.stream(
-        model=MATH_MODEL,
-        max_tokens=1024,
-        system=SYSTEM_PROMPT,
-        messages=messages,
-    ) as stream:
-        async for text in stream.text_stream:
-            yield text
+    model = model or choose_model("math", question, MATH_MODEL)
+    messages = list(conversation_history or [])
+    messages.append({"role": "user", "content": question})
+
+    primary = Leg(PROVIDER_ANTHROPIC, lambda: anthropic_text_stream(model, SYSTEM_PROMPT, messages, client), model)
+    served_by: list = []   # (model, provider) of the hedge leg that answered
+    if client is not None:
+        stream = primary.start()
+    else:
+        # Default client: record TTFT and hedge to the other provider if it is late
+        stream = hedged_stream(
+            "math",
+            primary,
+            cross_provider_leg(PROVIDER_ANTHROPIC, SYSTEM_PROMPT, messages),
+            hedge_deadline("math"),
+            served_by=served_by,
+        )
+    answer = instrument_stream(
+        "specialist.answer", stream,
+        operation="specialist.answer", model=model, provider=PROVIDER_ANTHROPIC, subject="math",
+        served_by=served_by,
+    )
+    async for text in answer:
+        yield text
 
 
 # Alias used by orchestrator and integration tests
@@ -0,0 +1,235 @@
+"""
+Routing cache for the intent classifier.
+
+Students keep asking near-identical questions ("what is 7 times 8",
+"what's 7x8?"). Every one used to cost a Haiku round trip. The cache has two
+layers in front of route_intent's API call:
+
+1. exact:  normalized transcript → RoutingResult (LRU)
+2. near:   MinHash over character 3-shingles with LSH banding; a prior result
+           is reused when the estimated Jaccard similarity >= threshold
+
+Served results carry a marker in raw_response ("[cache:exact] math",
+"[cache:near 0.86] math") so routing_decisions audits can tell them apart.
+
+A near hit is a different text: the tokens that differ may be exactly the
+ones that matter ("how do I get my teacher to hurt me with fractions" ~ a
+fractions question). Near hits are skipped when the new text has an
+escalation cue, and carry confidence = the similarity (never more than the
+cached confidence) so confidence thresholds downstream (tiering) still apply.
+
+CRITICAL: Fallback results (raw_response == "", classifier error) are never
+cached — an outage must not pin "english" for a question.
+"""
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from .classifier import RoutingResult
+
+logger = logging.getLogger(__name__)
+
+ROUTING_CACHE_ENABLED = os.environ.get("CLASSIFIER_CACHE", "false").lower() in ("1", "true", "yes")
+ROUTING_CACHE_SIZE = int(os.environ.get("CLASSIFIER_CACHE_SIZE", "5000"))
+ROUTING_CACHE_SIMILARITY = float(os.environ.get("CLASSIFIER_CACHE_SIMILARITY", "0.8"))
+
+NUM_PERM = 64          # MinHash signature length
+BANDS = 16             # LSH bands (NUM_PERM / BANDS rows each)
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed permutations so signatures are stable across processes and restarts
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+_CONTRACTIONS = {
+    "what's": "what is", "whats": "what is", "who's": "who is", "where's": "where is",
+    "how's": "how is", "when's": "when is", "it's": "it is", "that's": "that is",
+    "can't": "cannot", "don't": "do not", "doesn't": "does not", "isn't": "is not",
+}
+_TIMES = re.compile(r"(?<=\d)\s*[x×*]\s*(?=\d)")
+_NON_WORD = re.compile(r"[^a-z0-9'+\-/=%. ]+")
+_WHITESPACE = re.compile(r"\s+")
+# Words that must reach the classifier's escalate path (matched on normalized text)
+_ESCALATION = re.compile(
+    r"\b(teacher|real person|human|upset|scared|afraid|hurt|hurts|hurting|"
+    r"bully|bullied|bullying|abuse|unsafe|kill|die|crying|hate myself|help me please)\b"
+)
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, expand contractions and "7x8", drop punctuation, collapse whitespace."""
+    text = _TIMES.sub(" times ", text.lower())
+    text = " ".join(_CONTRACTIONS.get(word, word) for word in text.split())
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip(" .")
+
+
+def has_escalation_cue(text: str) -> bool:
+    """True if a normalized transcript mentions anything the escalate route must see."""
+    return _ESCALATION.search(text) is not None
+
+
+def _shingles(text: str) -> Set[str]:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature of the character shingles of an already-normalized text."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in _shingles(text)
+    ]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+@dataclass
+class RoutingCacheStats:
+    exact_hits: int = 0
+    near_hits: int = 0
+    near_unsafe: int = 0       # near hit skipped: escalation cue in the new text
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        hits = self.exact_hits + self.near_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "near_unsafe": self.near_unsafe,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RoutingCache:
+    """In-process LRU of RoutingResults with a MinHash/LSH near-duplicate layer."""
+
+    def __init__(
+        self,
+        max_size: int = ROUTING_CACHE_SIZE,
+        threshold: float = ROUTING_CACHE_SIMILARITY,
+    ):
+        self.max_size = max(1, max_size)
+        self.threshold = threshold
+        self._rows = NUM_PERM // BANDS
+        # normalized transcript -> (signature, result)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], RoutingResult]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self.stats = RoutingCacheStats()
+
+    def _bands(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, signature[band * self._rows:(band + 1) * self._rows])
+            for band in range(BANDS)
+        ]
+
+    def get(self, transcript: str) -> Optional[RoutingResult]:
+        """Return a cached RoutingResult (raw_response marked), or None."""
+        key = normalize_transcript(transcript)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.exact_hits += 1
+            return replace(entry[1], raw_response=f"[cache:exact] {entry[1].raw_response}")
+
+        if self.threshold < 1.0 and key:
+            signature = minhash(key)
+            best_key, best_sim = None, 0.0
+            candidates: Set[str] = set()
+            for band in self._bands(signature):
+                candidates |= self._buckets.get(band, set())
+            for candidate in candidates:
+                sim = similarity(signature, self._entries[candidate][0])
+                if sim > best_sim:
+                    best_key, best_sim = candidate, sim
+            if best_key is not None and best_sim >= self.threshold:
+                result = self._entries[best_key][1]
+                if result.subject != "escalate" and has_escalation_cue(key):
+                    self.stats.near_unsafe += 1
+                    logger.info(f"Routing near-duplicate skipped, escalation cue: {key[:40]!r}")
+                else:
+                    self._entries.move_to_end(best_key)
+                    self.stats.near_hits += 1
+                    logger.info(f"Routing near-duplicate ({best_sim:.2f}): {key[:40]!r} ~ {best_key[:40]!r}")
+                    return replace(
+                        result,
+                        confidence=min(result.confidence, round(best_sim, 4)),
+                        raw_response=f"[cache:near {best_sim:.2f}] {result.raw_response}",
+                    )
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, transcript: str, result: RoutingResult) -> None:
+        """Store a classifier result. Fallback results (no raw response) are skipped."""
+        if not result.raw_response:
+            return
+        key = normalize_transcript(transcript)
+        if not key:
+            return
+        if key in self._entries:
+            self._remove(key)
+        signature = minhash(key)
+        self._entries[key] = (signature, result)
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, set()).add(key)
+        self.stats.stores += 1
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        signature, _ = self._entries.pop(key)
+        for band in self._bands(signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+        }
+
+
+_routing_cache: Optional[RoutingCache] = None
+
+
+def get_routing_cache() -> RoutingCache:
+    """Process-wide routing cache (lazily created)."""
+    global _routing_cache
+    if _routing_cache is None:
+        _routing_cache = RoutingCache()
+    return _routing_cache
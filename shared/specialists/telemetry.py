@@ -0,0 +1,317 @@
+"""
+Streaming telemetry for specialists and the classifier.
+
+Nothing measured how fast each specialist streams, so MATH_MODEL /
+HISTORY_MODEL choices could not be compared on real traffic. Every
+answer_*_question stream, every provider stream underneath it (the primary
+or hedged leg) and every route_intent call now records:
+
+- an OTEL span ("specialist.answer", "llm.stream", "classifier.route_intent")
+  with gen_ai.* attributes: system, request model, usage input/output tokens,
+  plus time-to-first-chunk, duration, chunk count and output characters
+- OTEL metrics (tagged by operation, subject, provider and model):
+  specialist.time_to_first_chunk and specialist.duration histograms (ms),
+  specialist.chunks / specialist.output_chars counters and
+  gen_ai.client.token.usage (by gen_ai.token.type)
+- process-wide StreamStats (p50/p95 TTFT, chars/s, tokens) for GET /metrics
+
+Token usage comes from the provider responses (Anthropic final message,
+OpenAI include_usage chunk); when a provider does not report it the output
+is estimated at CHARS_PER_TOKEN characters per token (output_tokens_est).
+
+opentelemetry-api is optional — without it only StreamStats are kept.
+
+CRITICAL: Spans are started without being attached across yields (an async
+generator can be resumed from another context). The span is attached only
+while pulling each chunk, so provider calls made inside it are parented
+correctly.
+"""
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import metrics as otel_metrics
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # pragma: no cover - exercised only without opentelemetry
+    otel_context = otel_metrics = otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+# Recent samples kept per operation:model for percentiles
+SAMPLE_WINDOW = 500
+
+
+@dataclass
+class Usage:
+    """Token usage reported by a provider response (filled in by the stream)."""
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+    def update(self, input_tokens: Any = None, output_tokens: Any = None) -> None:
+        # Mocked/partial responses carry non-int placeholders; ignore them
+        if isinstance(input_tokens, int):
+            self.input_tokens = input_tokens
+        if isinstance(output_tokens, int):
+            self.output_tokens = output_tokens
+
+
+def _percentile(ordered: list, p: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+
+@dataclass
+class ModelStreamStats:
+    requests: int = 0
+    errors: int = 0
+    chunks: int = 0
+    output_chars: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    output_tokens_est: int = 0
+    total_duration_ms: float = 0.0
+    ttft_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+    duration_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    def snapshot(self) -> dict:
+        ttft = sorted(self.ttft_ms)
+        duration = sorted(self.duration_ms)
+        seconds = self.total_duration_ms / 1000
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "ttft_p50_ms": _percentile(ttft, 0.5),
+            "ttft_p95_ms": _percentile(ttft, 0.95),
+            "duration_p50_ms": _percentile(duration, 0.5),
+            "duration_p95_ms": _percentile(duration, 0.95),
+            "chunks": self.chunks,
+            "output_chars": self.output_chars,
+            "chars_per_second": round(self.output_chars / seconds, 1) if seconds else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "output_tokens_est": self.output_tokens_est,
+        }
+
+
+class StreamStats:
+    """Per operation:model aggregates of every instrumented stream/call."""
+
+    def __init__(self):
+        self.models: Dict[str, ModelStreamStats] = {}
+
+    def get(self, operation: str, model: str) -> ModelStreamStats:
+        return self.models.setdefault(f"{operation}:{model}", ModelStreamStats())
+
+    def snapshot(self) -> dict:
+        return {key: stats.snapshot() for key, stats in self.models.items()}
+
+
+_stats = StreamStats()
+
+
+def get_stream_stats() -> StreamStats:
+    """Process-wide specialist/classifier streaming stats."""
+    return _stats
+
+
+class _Instruments:
+    """OTEL instruments, created on first use (after the app set its providers)."""
+
+    def __init__(self):
+        meter = otel_metrics.get_meter("specialists")
+        self.ttft = meter.create_histogram(
+            "specialist.time_to_first_chunk", unit="ms", description="Time until the first streamed chunk"
+        )
+        self.duration = meter.create_histogram(
+            "specialist.duration", unit="ms", description="Total stream or call duration"
+        )
+        self.chunks = meter.create_counter("specialist.chunks", description="Streamed chunks")
+        self.output_chars = meter.create_counter(
+            "specialist.output_chars", unit="{char}", description="Streamed output characters"
+        )
+        self.tokens = meter.create_counter(
+            "gen_ai.client.token.usage", unit="{token}", description="Provider-reported token usage"
+        )
+
+
+_instruments: Optional[_Instruments] = None
+
+
+def _otel() -> Optional[_Instruments]:
+    global _instruments
+    if otel_metrics is None:
+        return None
+    if _instruments is None:
+        _instruments = _Instruments()
+    return _instruments
+
+
+def _start_span(name: str, attributes: dict):
+    if otel_trace is None:
+        return None
+    return otel_trace.get_tracer("specialists").start_span(name, attributes=attributes)
+
+
+class _Measurement:
+    """Timing, counts and usage of one stream/call; recorded once in finish()."""
+
+    def __init__(self, span_name: str, operation: str, model: str, provider: str, subject: Optional[str]):
+        self.operation = operation
+        self.model = model
+        self.labels = {"operation": operation, "gen_ai.system": provider, "gen_ai.request.model": model}
+        if subject:
+            self.labels["subject"] = subject
+        self.span = _start_span(span_name, dict(self.labels))
+        self.started = time.monotonic()
+        self.ttft_ms: Optional[float] = None
+        self.chunks = 0
+        self.chars = 0
+
+    def attribute(self, model: Optional[str], provider: str) -> None:
+        """Re-label the measurement with the model/provider that actually answered."""
+        if model:
+            self.model = model
+            self.labels["gen_ai.request.model"] = model
+        self.labels["gen_ai.system"] = provider
+        if self.span is not None:
+            self.span.set_attributes({"gen_ai.request.model": self.model, "gen_ai.system": provider})
+
+    def chunk(self, text: str) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.monotonic() - self.started) * 1000
+        self.chunks += 1
+        self.chars += len(text)
+
+    def finish(self, usage: Optional[Usage], error: Optional[BaseException]) -> None:
+        try:
+            self._record(usage, error)
+        except Exception as e:
+            # Telemetry must never break an answer
+            logger.debug(f"Stream telemetry failed: {e}")
+
+    def _record(self, usage: Optional[Usage], error: Optional[BaseException]) -> None:
+        duration_ms = (time.monotonic() - self.started) * 1000
+        usage = usage or Usage()
+        stats = _stats.get(self.operation, self.model)
+        stats.requests += 1
+        stats.chunks += self.chunks
+        stats.output_chars += self.chars
+        stats.total_duration_ms += duration_ms
+        stats.duration_ms.append(duration_ms)
+        if self.ttft_ms is not None:
+            stats.ttft_ms.append(self.ttft_ms)
+        if error is not None:
+            stats.errors += 1
+        stats.input_tokens += usage.input_tokens or 0
+        if usage.output_tokens is not None:
+            stats.output_tokens += usage.output_tokens
+        else:
+            stats.output_tokens_est += self.chars // CHARS_PER_TOKEN
+
+        instruments = _otel()
+        if instruments is not None:
+            instruments.duration.record(duration_ms, self.labels)
+            if self.ttft_ms is not None:
+                instruments.ttft.record(self.ttft_ms, self.labels)
+            if self.chunks:
+                instruments.chunks.add(self.chunks, self.labels)
+                instruments.output_chars.add(self.chars, self.labels)
+            if usage.input_tokens is not None:
+                instruments.tokens.add(usage.input_tokens, {**self.labels, "gen_ai.token.type": "input"})
+            if usage.output_tokens is not None:
+                instruments.tokens.add(usage.output_tokens, {**self.labels, "gen_ai.token.type": "output"})
+
+        if self.span is not None:
+            attributes = {
+                "duration_ms": round(duration_ms, 1),
+                "chunks": self.chunks,
+                "output_chars": self.chars,
+            }
+            if self.ttft_ms is not None:
+                attributes["time_to_first_chunk_ms"] = round(self.ttft_ms, 1)
+            if usage.input_tokens is not None:
+                attributes["gen_ai.usage.input_tokens"] = usage.input_tokens
+            if usage.output_tokens is not None:
+                attributes["gen_ai.usage.output_tokens"] = usage.output_tokens
+            self.span.set_attributes(attributes)
+            if error is not None:
+                self.span.record_exception(error)
+                self.span.set_status(Status(StatusCode.ERROR, str(error)))
+            self.span.end()
+
+
+async def instrument_stream(
+    span_name: str,
+    stream: AsyncIterator[str],
+    *,
+    operation: str,
+    model: str,
+    provider: str,
+    subject: Optional[str] = None,
+    usage: Optional[Usage] = None,
+    served_by: Optional[List[Tuple[Optional[str], str]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Pass stream through, recording TTFT, duration, chunks, chars and usage.
+
+    usage is read after the stream ends — pass the Usage the provider
+    stream fills in. served_by is hedged_stream's list of the winning
+    (model, provider); when filled it replaces model/provider, which then
+    only name the primary.
+    """
+    measurement = _Measurement(span_name, operation, model, provider, subject)
+    span_context = (
+        otel_trace.set_span_in_context(measurement.span) if measurement.span is not None else None
+    )
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            token = otel_context.attach(span_context) if span_context is not None else None
+            try:
+                chunk = await stream.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                if token is not None:
+                    otel_context.detach(token)
+            measurement.chunk(chunk)
+            yield chunk
+    except BaseException as e:
+        # Includes cancellation / aclose (hedge loser, barge-in)
+        error = e if isinstance(e, Exception) else None
+        raise
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+        if served_by:
+            measurement.attribute(*served_by[-1])
+        measurement.finish(usage, error)
+
+
+class CallMeasurement:
+    """Span + metrics for a non-streaming call (route_intent)."""
+
+    def __init__(self, span_name: str, *, operation: str, model: str, provider: str):
+        self._measurement = _Measurement(span_name, operation, model, provider, None)
+        self.usage = Usage()
+        self._finished = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self._measurement.span is not None:
+            self._measurement.span.set_attribute(key, value)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if not self._finished:
+            self._finished = True
+            self._measurement.finish(self.usage, error)
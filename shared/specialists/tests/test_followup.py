@@ -0,0 +1,115 @@
+"""Unit tests for the session-affinity follow-up fast path."""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.followup import AFFINITY_CONFIDENCE, FollowupDetector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _detector(**kwargs):
+    clock = FakeClock()
+    return FollowupDetector(clock=clock, **kwargs), clock
+
+
+def test_short_followup_keeps_subject():
+    """'why?' right after a math answer stays on math."""
+    detector, clock = _detector()
+
+    result = detector.route("Why?", "math", clock.now - 10)
+
+    assert result.subject == "math"
+    assert result.confidence == AFFINITY_CONFIDENCE
+    assert result.raw_response == "[affinity] math"
+
+
+def test_anaphoric_followup_keeps_subject():
+    """A longer turn that refers back ('the next step') is still a follow-up."""
+    detector, clock = _detector()
+
+    result = detector.route("And what about the next step after that?", "math", clock.now - 5)
+
+    assert result is not None
+    assert result.subject == "math"
+
+
+def test_pronoun_led_followup_keeps_subject():
+    detector, clock = _detector()
+    assert detector.route("That makes no sense", "english", clock.now - 5).subject == "english"
+
+
+def test_short_turn_without_cue_reclassifies():
+    """Being short is not a cue: self-contained questions and safety statements are classified."""
+    detector, clock = _detector()
+
+    assert detector.route("I want to kill myself", "math", clock.now - 5) is None
+    assert detector.route("Who was Napoleon?", "math", clock.now - 5) is None
+    assert detector.route("What is photosynthesis?", "math", clock.now - 5) is None
+    assert detector.route("Why did Napoleon invade Russia?", "math", clock.now - 5) is None
+    assert detector.stats.escalated == 1
+    assert detector.stats.not_followup == 3
+
+
+def test_escalation_cue_sends_followup_to_classifier():
+    """A follow-up that sounds like a cry for help is never routed on affinity."""
+    detector, clock = _detector()
+
+    assert detector.route("it makes me want to hurt myself", "math", clock.now - 5) is None
+    assert detector.route("that is why I get bullied", "history", clock.now - 5) is None
+    assert detector.route("why is that?", "math", clock.now - 5).subject == "math"
+    assert detector.stats.escalated == 2
+    assert detector.stats.bypassed == 1
+
+
+def test_outside_window_reclassifies():
+    """Turns after the window has passed go back to the classifier."""
+    detector, clock = _detector(window_seconds=60)
+
+    assert detector.route("why?", "history", clock.now - 61) is None
+    assert detector.stats.outside_window == 1
+
+
+def test_other_subject_keywords_trigger_reclassification():
+    """A short turn naming another subject's vocabulary is a topic shift."""
+    detector, clock = _detector()
+
+    assert detector.route("what about fractions?", "history", clock.now - 5) is None
+    assert detector.route("let's talk about poems", "math", clock.now - 5) is None
+    assert detector.stats.topic_shift == 2
+    assert detector.route("can I talk to my teacher", "math", clock.now - 5) is None
+    assert detector.stats.escalated == 1
+
+
+def test_own_subject_keywords_do_not_block():
+    """Vocabulary of the current subject does not count as a shift."""
+    detector, clock = _detector()
+    assert detector.route("so how do I solve it?", "math", clock.now - 5).subject == "math"
+
+
+def test_long_new_question_reclassifies():
+    """A long, self-contained question is not treated as a follow-up."""
+    detector, clock = _detector(max_words=8)
+
+    result = detector.route(
+        "So could you explain how photosynthesis works in plants during the winter months",
+        "history", clock.now - 5,
+    )
+
+    assert result is None
+    assert detector.stats.not_followup == 1
+
+
+def test_no_subject_or_escalated_session_classifies():
+    """Without a specialist subject (or after escalation) there is nothing to reuse."""
+    detector, clock = _detector()
+    assert detector.route("why?", None, clock.now - 5) is None
+    assert detector.route("why?", "escalate", clock.now - 5) is None
+    assert detector.route("why?", "math", None) is None
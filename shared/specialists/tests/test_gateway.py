@@ -0,0 +1,251 @@
+"""Unit tests for the provider gateway (AIMD limits, queueing, retries)."""
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.gateway import (
+    AimdLimiter,
+    GatewaySaturatedError,
+    ProviderGateway,
+    header_delay,
+    is_retryable,
+)
+
+
+class FakeResponse:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers)
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+def _gateway(**kwargs):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, limits={}, sleep=fake_sleep, rand=lambda: 0.5)
+    options.update(kwargs)
+    return ProviderGateway(**options), sleeps
+
+
+# ---- limiter -------------------------------------------------------------
+
+def test_additive_increase_and_multiplicative_decrease():
+    """+1 per limit's worth of successes; a rate limit halves the limit."""
+    limiter = AimdLimiter(initial=4, min_limit=1, max_limit=16, decrease_cooldown_s=0)
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.capacity == 4      # ~4.92 after four successes
+    limiter.on_success()
+    assert limiter.capacity == 5
+
+    limiter.on_rate_limited()
+    assert limiter.capacity == 2
+    assert limiter.stats.decreases == 1
+
+
+def test_decrease_once_per_cooldown():
+    """A burst of 429s from one overload counts as a single decrease."""
+    now = [100.0]
+    limiter = AimdLimiter(initial=16, min_limit=2, max_limit=16, decrease_cooldown_s=1.0, clock=lambda: now[0])
+
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()
+    assert limiter.capacity == 8
+    now[0] += 2
+    limiter.on_rate_limited()
+    assert limiter.capacity == 4
+    assert limiter.stats.rate_limited == 3
+
+
+def test_limit_never_below_min():
+    limiter = AimdLimiter(initial=2, min_limit=2, max_limit=8, decrease_cooldown_s=0)
+    limiter.on_rate_limited()
+    assert limiter.capacity == 2
+
+
+@pytest.mark.asyncio
+async def test_saturated_limiter_queues_in_order():
+    """Callers past the limit wait FIFO and get slots as others release."""
+    limiter = AimdLimiter(initial=1, min_limit=1, max_limit=1)
+    await limiter.acquire()
+    order = []
+
+    async def waiter(name):
+        await limiter.acquire()
+        order.append(name)
+
+    tasks = [asyncio.create_task(waiter(n)) for n in ("a", "b")]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    limiter.release()
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b"]
+    assert limiter.stats.peak_queue_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_raises_saturated():
+    limiter = AimdLimiter(initial=1, min_limit=1, max_limit=1)
+    await limiter.acquire()
+
+    with pytest.raises(GatewaySaturatedError):
+        await limiter.acquire(timeout=0.01)
+    assert limiter.queue_depth == 0
+    assert limiter.stats.queue_timeouts == 1
+
+
+# ---- headers -------------------------------------------------------------
+
+def test_header_delay_prefers_retry_after():
+    assert header_delay({"retry-after-ms": "1500", "retry-after": "9"}) == 1.5
+    assert header_delay({"retry-after": "2"}) == 2.0
+
+
+def test_header_delay_openai_reset_when_exhausted():
+    headers = {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m0.5s"}
+    assert header_delay(headers) == pytest.approx(60.5)
+    assert header_delay({"x-ratelimit-remaining-requests": "3", "x-ratelimit-reset-requests": "6s"}) is None
+
+
+def test_header_delay_anthropic_reset_when_exhausted():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    reset = (now + timedelta(seconds=3)).isoformat().replace("+00:00", "Z")
+    headers = {"anthropic-ratelimit-tokens-remaining": "0", "anthropic-ratelimit-tokens-reset": reset}
+    assert header_delay(headers, now=now) == pytest.approx(3.0)
+
+
+def test_retryable_classification():
+    assert is_retryable(FakeAPIError(429))
+    assert is_retryable(FakeAPIError(529))
+    assert is_retryable(APIConnectionError("reset"))
+    assert not is_retryable(FakeAPIError(400))
+    assert not is_retryable(ValueError("bad"))
+
+
+# ---- gateway -------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_call_retries_rate_limit_honoring_retry_after():
+    """A 429 with retry-after is retried after (at least) the requested delay and shrinks the limit."""
+    gateway, sleeps = _gateway()
+    attempts = []
+
+    async def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeAPIError(429, {"retry-after": "1"})
+        return "ok"
+
+    assert await gateway.call("anthropic", "haiku", fn) == "ok"
+    assert len(sleeps) == 1 and 1.0 <= sleeps[0] <= 1.1
+    snapshot = gateway.snapshot()["limiters"]["anthropic:haiku"]
+    assert snapshot["rate_limited"] == 1
+    assert snapshot["retries"] == 1
+    assert snapshot["limit"] == 2
+    assert snapshot["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_client_errors():
+    gateway, sleeps = _gateway()
+
+    async def fn():
+        raise FakeAPIError(400)
+
+    with pytest.raises(FakeAPIError):
+        await gateway.call("openai", "gpt-4o", fn)
+    assert sleeps == []
+    assert gateway.snapshot()["limiters"]["openai:gpt-4o"]["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_after_max_retries():
+    gateway, sleeps = _gateway(max_retries=2)
+
+    async def fn():
+        raise FakeAPIError(503)
+
+    with pytest.raises(FakeAPIError):
+        await gateway.call("openai", "gpt-4o", fn)
+    assert len(sleeps) == 2
+
+
+@pytest.mark.asyncio
+async def test_too_long_retry_after_is_not_retried():
+    """A provider asking for more than max_backoff fails fast (hedging can take over)."""
+    gateway, sleeps = _gateway(max_backoff_s=2.0)
+
+    async def fn():
+        raise FakeAPIError(429, {"retry-after": "30"})
+
+    with pytest.raises(FakeAPIError):
+        await gateway.call("openai", "gpt-4o", fn)
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_chunk_only():
+    """A stream failing before its first chunk is restarted; the slot is held until it ends."""
+    gateway, sleeps = _gateway()
+    starts = []
+
+    async def start():
+        starts.append(1)
+        if len(starts) == 1:
+            raise FakeAPIError(529)
+        yield "a"
+        yield "b"
+
+    stream = gateway.stream("anthropic", "sonnet", start)
+    first = await stream.__anext__()
+    limiter = gateway.limiter("anthropic", "sonnet")
+    assert first == "a"
+    assert limiter.in_flight == 1
+    assert [chunk async for chunk in stream] == ["b"]
+    assert limiter.in_flight == 0
+    assert len(starts) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_mid_answer_failure_is_not_retried():
+    gateway, _ = _gateway()
+    starts = []
+
+    async def start():
+        starts.append(1)
+        yield "partial"
+        raise FakeAPIError(503)
+
+    with pytest.raises(FakeAPIError):
+        async for _ in gateway.stream("openai", "gpt-4o", start):
+            pass
+    assert len(starts) == 1
+    assert gateway.limiter("openai", "gpt-4o").in_flight == 0
+
+
+def test_per_model_limit_overrides():
+    gateway, _ = _gateway(initial_limit=16, limits={"anthropic": 4, "openai:gpt-4o-mini": 32}, max_limit=8)
+
+    assert gateway.limiter("anthropic", "sonnet").max_limit == 4
+    assert gateway.limiter("openai", "gpt-4o-mini").max_limit == 32
+    assert gateway.limiter("openai", "gpt-4o").max_limit == 8
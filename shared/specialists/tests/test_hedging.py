@@ -0,0 +1,161 @@
+"""Unit tests for hedged specialist requests."""
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.hedging import HedgeStats, Leg, _parse_deadlines, hedged_stream
+
+
+class FakeProvider:
+    """Text stream that waits `delay` before its first chunk (or raises)."""
+
+    def __init__(self, chunks, delay=0.0, error=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.error = error
+        self.started = 0
+        self.closed = False
+
+    async def stream(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for chunk in self.chunks:
+                yield chunk
+        finally:
+            self.closed = True
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    """A primary that answers before the deadline never starts the secondary."""
+    stats = HedgeStats()
+    primary = FakeProvider(["a", "b"])
+    secondary = FakeProvider(["x"])
+
+    result = await collect(hedged_stream(
+        "math", Leg("anthropic", primary.stream), Leg("openai", secondary.stream), 0.5, stats,
+    ))
+
+    assert result == ["a", "b"]
+    assert secondary.started == 0
+    snapshot = stats.snapshot()
+    assert snapshot["subjects"]["math"]["hedge_rate"] == 0.0
+    assert snapshot["ttft"]["anthropic"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_hedges_and_secondary_wins():
+    """Past the deadline the secondary starts; the faster leg streams, the loser is cancelled."""
+    stats = HedgeStats()
+    primary = FakeProvider(["slow"], delay=1.0)
+    secondary = FakeProvider(["fast", "er"])
+
+    served_by = []
+    result = await collect(hedged_stream(
+        "history", Leg("openai", primary.stream, "gpt-4o"), Leg("anthropic", secondary.stream, "claude-hedge"), 0.02,
+        stats, served_by=served_by,
+    ))
+
+    assert result == ["fast", "er"]
+    assert primary.closed
+    assert served_by == [("claude-hedge", "anthropic")]
+    subject = stats.snapshot()["subjects"]["history"]
+    assert subject["hedged"] == 1
+    assert subject["secondary_wins"] == 1
+    assert subject["hedge_rate"] == 1.0
+    assert "anthropic" in stats.snapshot()["ttft"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_primary_can_still_win():
+    """If the primary's first token lands before the secondary's, the primary streams."""
+    stats = HedgeStats()
+    primary = FakeProvider(["primary"], delay=0.05)
+    secondary = FakeProvider(["secondary"], delay=1.0)
+
+    result = await collect(hedged_stream(
+        "english", Leg("openai", primary.stream), Leg("anthropic", secondary.stream), 0.01, stats,
+    ))
+
+    assert result == ["primary"]
+    assert secondary.started == 1
+    assert secondary.closed
+    assert stats.snapshot()["subjects"]["english"]["secondary_wins"] == 0
+
+
+@pytest.mark.asyncio
+async def test_primary_error_falls_back_immediately():
+    """A primary that fails before its first token hands over without waiting for the deadline."""
+    stats = HedgeStats()
+    primary = FakeProvider([], error=RuntimeError("503"))
+    secondary = FakeProvider(["fallback"])
+
+    result = await collect(hedged_stream(
+        "math", Leg("anthropic", primary.stream), Leg("openai", secondary.stream), 10.0, stats,
+    ))
+
+    assert result == ["fallback"]
+    snapshot = stats.snapshot()
+    assert snapshot["subjects"]["math"]["hedged"] == 1
+    assert snapshot["ttft"]["anthropic"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_both_legs_failing_raises():
+    """When every leg fails the original error propagates."""
+    primary = FakeProvider([], error=RuntimeError("primary down"))
+    secondary = FakeProvider([], error=RuntimeError("secondary down"))
+
+    with pytest.raises(RuntimeError):
+        await collect(hedged_stream(
+            "math", Leg("anthropic", primary.stream), Leg("openai", secondary.stream), 1.0, HedgeStats(),
+        ))
+
+
+@pytest.mark.asyncio
+async def test_no_deadline_records_ttft_without_hedging():
+    """With hedging off (deadline None) a primary error is not retried elsewhere."""
+    stats = HedgeStats()
+    primary = FakeProvider([], error=RuntimeError("down"))
+    secondary = FakeProvider(["x"])
+
+    with pytest.raises(RuntimeError):
+        await collect(hedged_stream(
+            "history", Leg("openai", primary.stream), Leg("anthropic", secondary.stream), None, stats,
+        ))
+    assert secondary.started == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_deadline_wait_closes_primary():
+    """A caller cancelled before the hedge deadline leaves no orphaned leg behind."""
+    primary = FakeProvider(["slow"], delay=5.0)
+    secondary = FakeProvider(["x"])
+    consumer = asyncio.create_task(collect(hedged_stream(
+        "math", Leg("anthropic", primary.stream), Leg("openai", secondary.stream), 2.0, HedgeStats(),
+    )))
+    await asyncio.sleep(0.05)
+
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert primary.started == 1 and primary.closed
+    assert secondary.started == 0
+    orphans = [t for t in asyncio.all_tasks() if "_first_chunk" in repr(t.get_coro())]
+    assert orphans == []
+
+
+def test_parse_deadlines_converts_ms():
+    assert _parse_deadlines("math=2500, history=1500") == {"math": 2.5, "history": 1.5}
@@ -0,0 +1,146 @@
+"""Unit tests for the local fast-path intent classifier and its trainer."""
+import pytest
+from unittest.mock import AsyncMock
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.local_classifier import LOCAL_MAX_CONFIDENCE, HashedNgramModel, LocalRouter
+from specialists.train_classifier import LABELS, evaluate, train
+
+SAMPLES = [
+    ("what is 7 times 8", "math"),
+    ("how do I solve this equation for x", "math"),
+    ("what is the square root of 144", "math"),
+    ("can you help me with fractions", "math"),
+    ("why did world war one start", "history"),
+    ("who was the first roman emperor", "history"),
+    ("tell me about the french revolution", "history"),
+    ("when did the berlin wall fall", "history"),
+    ("fix the grammar in this sentence", "english"),
+    ("what does this poem mean", "english"),
+    ("help me write an essay introduction", "english"),
+    ("is this word a noun or a verb", "english"),
+    ("I want to talk to a real teacher", "escalate"),
+    ("this is not helping, get me a person", "escalate"),
+] * 3
+
+
+def _trained(threshold: float = 0.5) -> HashedNgramModel:
+    return HashedNgramModel(LABELS, threshold=threshold).fit(SAMPLES, epochs=20)
+
+
+def test_fit_predicts_training_labels():
+    """A model fit on a small synthetic set recovers the training labels."""
+    model = _trained()
+    assert model.predict("what is 7 times 8")[0] == "math"
+    assert model.predict("tell me about the french revolution")[0] == "history"
+    assert model.predict("fix the grammar in this sentence")[0] == "english"
+
+
+def test_save_load_round_trip(tmp_path):
+    """A saved model loads back with identical predictions and threshold."""
+    model = _trained(threshold=0.75)
+    path = str(tmp_path / "router.json")
+    model.save(path)
+
+    loaded = HashedNgramModel.load(path)
+
+    assert loaded.threshold == 0.75
+    assert loaded.predict("who was the first roman emperor") == pytest.approx(
+        model.predict("who was the first roman emperor"), abs=1e-4
+    )
+
+
+def test_router_decides_above_threshold_and_defers_below():
+    """Confident predictions return a marked RoutingResult; others defer to Haiku."""
+    router = LocalRouter(model_path=None, threshold=0.0, model=_trained())
+    result = router.classify("what is 7 times 8")
+    assert result.subject == "math"
+    assert result.raw_response.startswith("[local ")
+
+    router.set_threshold(1.0)
+    assert router.classify("what is 7 times 8") is None
+    assert router.stats.decided == 1
+    assert router.stats.deferred == 1
+
+
+def test_local_confidence_never_matches_haiku_markers():
+    """Local confidence is capped so the trainer never learns from its own output."""
+    model = HashedNgramModel(["math", "history"]).fit([("seven times eight", "math")] * 50, epochs=30)
+    router = LocalRouter(model_path=None, threshold=0.0, model=model)
+
+    result = router.classify("seven times eight")
+
+    assert result.confidence <= LOCAL_MAX_CONFIDENCE
+    assert result.confidence not in (1.0, 0.8)
+
+
+def test_no_model_defers():
+    """Without a model file the router always defers."""
+    router = LocalRouter(model_path="/nonexistent/router.json", reload_seconds=0)
+    assert router.classify("what is 7 times 8") is None
+    assert router.stats.no_model == 1
+
+
+def test_hot_reload_on_mtime_change(tmp_path):
+    """Rewriting the model file swaps the model and its threshold in place."""
+    path = str(tmp_path / "router.json")
+    _trained(threshold=1.0).save(path)
+    router = LocalRouter(model_path=path, threshold=None, reload_seconds=0)
+    assert router.classify("what is 7 times 8") is None
+
+    _trained(threshold=0.0).save(path)
+    os.utime(path, (os.stat(path).st_atime, os.stat(path).st_mtime + 5))
+
+    assert router.classify("what is 7 times 8").subject == "math"
+    assert router.stats.reloads == 2
+
+
+def test_corrupt_reload_keeps_previous_model(tmp_path):
+    """A bad model file is logged and the previous model keeps serving."""
+    path = str(tmp_path / "router.json")
+    _trained(threshold=0.0).save(path)
+    router = LocalRouter(model_path=path, threshold=None, reload_seconds=0)
+    assert router.classify("what is 7 times 8") is not None
+
+    with open(path, "w") as f:
+        f.write("{not json")
+    os.utime(path, (os.stat(path).st_atime, os.stat(path).st_mtime + 5))
+
+    assert router.classify("what is 7 times 8") is not None
+    assert router.stats.reload_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_route_intent_skips_api_when_local_confident():
+    """A confident local prediction returns without calling Haiku."""
+    from specialists.classifier import route_intent
+
+    client = AsyncMock()
+    router = LocalRouter(model_path=None, threshold=0.0, model=_trained())
+
+    result = await route_intent("what is 7 times 8", client=client, local=router)
+
+    assert result.subject == "math"
+    client.messages.create.assert_not_called()
+
+
+def test_train_reports_holdout_metrics():
+    """train() reports held-out accuracy/coverage and stores them in metadata."""
+    model, report = train(SAMPLES, threshold=0.5, holdout=0.25, epochs=20)
+
+    assert report["samples"] > 0
+    assert 0.0 <= report["coverage"] <= 1.0
+    assert model.metadata["holdout"] == report
+    assert model.metadata["samples"] == len(SAMPLES)
+    assert evaluate(model, [], 0.5) == {"samples": 0}
+
+
+def test_guess_ignores_threshold():
+    """guess() returns the top label even when classify() would defer."""
+    router = LocalRouter(model_path=None, threshold=1.0, model=_trained())
+    assert router.classify("what is 7 times 8") is None
+    assert router.guess("what is 7 times 8") == "math"
+    assert LocalRouter(model_path=None).guess("anything") is None
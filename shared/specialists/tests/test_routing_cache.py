@@ -0,0 +1,119 @@
+"""Unit tests for the classifier routing cache - all API calls mocked."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.classifier import RoutingResult
+from specialists.routing_cache import RoutingCache, minhash, normalize_transcript, similarity
+
+
+def _make_anthropic_response(text: str) -> MagicMock:
+    content = MagicMock()
+    content.text = text
+    response = MagicMock()
+    response.content = [content]
+    return response
+
+
+def test_normalize_transcript_folds_contractions_and_times():
+    """'what's 7x8?' and 'What is 7 times 8' normalize to the same key."""
+    assert normalize_transcript("what's 7x8?") == normalize_transcript("What is 7 times 8")
+
+
+def test_minhash_similarity_tracks_jaccard():
+    """Close paraphrases score high, unrelated questions score low."""
+    a = minhash(normalize_transcript("Why did World War One start?"))
+    b = minhash(normalize_transcript("why did world war one begin"))
+    c = minhash(normalize_transcript("Help me fix the grammar in this sentence."))
+    assert similarity(a, b) > similarity(a, c)
+    assert similarity(a, a) == 1.0
+
+
+def test_exact_hit_marks_raw_response():
+    """Exact hits return the stored route with a [cache:exact] marker."""
+    cache = RoutingCache()
+    cache.put("What is 7 times 8?", RoutingResult("math", 1.0, "math"))
+
+    result = cache.get("what's 7x8")
+
+    assert result.subject == "math"
+    assert result.confidence == 1.0
+    assert result.raw_response == "[cache:exact] math"
+    assert cache.stats.exact_hits == 1
+
+
+def test_near_duplicate_hit_above_threshold():
+    """A close paraphrase reuses the prior result and is marked as a near hit."""
+    cache = RoutingCache(threshold=0.6)
+    cache.put("Can you explain the causes of the French Revolution?", RoutingResult("history", 1.0, "history"))
+
+    result = cache.get("can you explain the causes of the french revolution please")
+
+    assert result is not None
+    assert result.subject == "history"
+    assert result.raw_response.startswith("[cache:near ")
+    assert 0.6 <= result.confidence < 1.0   # the similarity, not the cached 1.0
+    assert cache.stats.near_hits == 1
+
+
+def test_near_duplicate_with_escalation_cue_goes_to_classifier():
+    """The differing tokens are checked: a near hit that now mentions harm is not reused."""
+    cache = RoutingCache(threshold=0.8)
+    cache.put("how do I get my teacher to help me with fractions", RoutingResult("math", 1.0, "math"))
+
+    assert cache.get("how do I get my teacher to hurt me with fractions") is None
+    assert cache.stats.near_unsafe == 1
+    assert cache.stats.misses == 1
+
+
+def test_unrelated_question_misses():
+    """Questions below the similarity threshold go to the classifier."""
+    cache = RoutingCache(threshold=0.8)
+    cache.put("Can you explain the causes of the French Revolution?", RoutingResult("history", 1.0, "history"))
+
+    assert cache.get("What is the derivative of x squared?") is None
+    assert cache.stats.misses == 1
+
+
+def test_fallback_results_not_cached():
+    """Classifier errors (empty raw_response) never enter the cache."""
+    cache = RoutingCache()
+    cache.put("What is 2+2?", RoutingResult("english", 0.5, ""))
+    assert cache.get("What is 2+2?") is None
+
+
+def test_lru_eviction_drops_oldest_and_its_lsh_buckets():
+    """Eviction removes the least recently used entry from the LRU and the LSH index."""
+    cache = RoutingCache(max_size=2)
+    cache.put("first question about fractions", RoutingResult("math", 1.0, "math"))
+    cache.put("second question about empires", RoutingResult("history", 1.0, "history"))
+    cache.get("first question about fractions")          # refresh first
+    cache.put("third question about commas", RoutingResult("english", 1.0, "english"))
+
+    assert cache.stats.evictions == 1
+    assert cache.get("second question about empires") is None
+    assert cache.get("first question about fractions") is not None
+    assert all(
+        "second question about empires" not in keys for keys in cache._buckets.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_route_intent_uses_cache_and_skips_api():
+    """A second near-identical question is answered from the cache."""
+    from specialists.classifier import route_intent
+
+    cache = RoutingCache()
+    mock_client = AsyncMock()
+    mock_client.messages.create = AsyncMock(return_value=_make_anthropic_response("math"))
+
+    first = await route_intent("What is 7 times 8?", client=mock_client, cache=cache)
+    second = await route_intent("what's 7x8", client=mock_client, cache=cache)
+
+    assert first.raw_response == "math"
+    assert second.subject == "math"
+    assert second.raw_response == "[cache:exact] math"
+    mock_client.messages.create.assert_called_once()
@@ -0,0 +1,167 @@
+"""Unit tests for specialist streaming telemetry (TTFT, throughput, token usage)."""
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists import telemetry
+from specialists.telemetry import StreamStats, Usage, instrument_stream
+
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    """Fresh stats and an in-memory span exporter for each test."""
+    exporter = InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer("test")
+    monkeypatch.setattr(telemetry, "_stats", StreamStats())
+    monkeypatch.setattr(telemetry, "_start_span", lambda name, attributes: tracer.start_span(name, attributes=attributes))
+    return exporter
+
+
+async def _chunks(*texts):
+    for text in texts:
+        yield text
+
+
+@pytest.mark.asyncio
+async def test_instrument_stream_records_ttft_chunks_and_usage(spans):
+    usage = Usage()
+    stream = instrument_stream(
+        "llm.stream", _chunks("Hello ", "world."), operation="llm.stream", model="gpt-4o", provider="openai", usage=usage,
+    )
+
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        usage.update(12, 3)
+
+    assert chunks == ["Hello ", "world."]
+    stats = telemetry.get_stream_stats().snapshot()["llm.stream:gpt-4o"]
+    assert stats["requests"] == 1
+    assert stats["chunks"] == 2
+    assert stats["output_chars"] == 12
+    assert stats["input_tokens"] == 12
+    assert stats["output_tokens"] == 3
+    assert stats["ttft_p50_ms"] is not None
+
+    (span,) = spans.get_finished_spans()
+    assert span.name == "llm.stream"
+    assert span.attributes["gen_ai.request.model"] == "gpt-4o"
+    assert span.attributes["gen_ai.usage.output_tokens"] == 3
+    assert span.attributes["chunks"] == 2
+    assert "time_to_first_chunk_ms" in span.attributes
+
+
+@pytest.mark.asyncio
+async def test_missing_usage_is_estimated(spans):
+    stream = instrument_stream(
+        "llm.stream", _chunks("x" * 40), operation="llm.stream", model="m", provider="openai",
+    )
+    async for _ in stream:
+        pass
+
+    stats = telemetry.get_stream_stats().snapshot()["llm.stream:m"]
+    assert stats["output_tokens"] == 0
+    assert stats["output_tokens_est"] == 10
+
+
+@pytest.mark.asyncio
+async def test_stream_error_is_recorded_and_raised(spans):
+    async def failing():
+        yield "partial"
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        async for _ in instrument_stream("llm.stream", failing(), operation="llm.stream", model="m", provider="anthropic"):
+            pass
+
+    assert telemetry.get_stream_stats().snapshot()["llm.stream:m"]["errors"] == 1
+    (span,) = spans.get_finished_spans()
+    assert not span.status.is_ok
+
+
+@pytest.mark.asyncio
+async def test_history_answer_reports_provider_usage(spans):
+    """The include_usage chunk's tokens land on the llm.stream span, nested under specialist.answer."""
+    from specialists.history import HISTORY_MODEL, answer_history_question
+
+    content = MagicMock(usage=None)
+    content.choices = [MagicMock()]
+    content.choices[0].delta.content = "It began in 1914."
+    final = MagicMock(choices=[])
+    final.usage.prompt_tokens = 40
+    final.usage.completion_tokens = 6
+
+    async def chunks():
+        yield content
+        yield final
+
+    client = AsyncMock()
+    client.chat.completions.create = AsyncMock(return_value=chunks())
+
+    result = [c async for c in answer_history_question("When did World War I start?", client=client)]
+
+    assert result == ["It began in 1914."]
+    assert client.chat.completions.create.call_args.kwargs["stream_options"] == {"include_usage": True}
+    stats = telemetry.get_stream_stats().snapshot()
+    assert stats[f"llm.stream:{HISTORY_MODEL}"]["input_tokens"] == 40
+    assert stats[f"llm.stream:{HISTORY_MODEL}"]["output_tokens"] == 6
+    assert stats[f"specialist.answer:{HISTORY_MODEL}"]["requests"] == 1
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    assert by_name["specialist.answer"].attributes["subject"] == "history"
+    assert by_name["llm.stream"].attributes["gen_ai.usage.input_tokens"] == 40
+    assert by_name["llm.stream"].parent.span_id == by_name["specialist.answer"].context.span_id
+
+
+@pytest.mark.asyncio
+async def test_answer_is_attributed_to_the_hedge_leg_that_won(spans):
+    """When the secondary wins, specialist.answer carries its model and provider, not the primary's."""
+    served_by = []
+
+    async def hedged():
+        served_by.append(("claude-hedge", "anthropic"))
+        yield "It began in 1914."
+
+    stream = instrument_stream(
+        "specialist.answer", hedged(), operation="specialist.answer", model="gpt-4o", provider="openai",
+        subject="history", served_by=served_by,
+    )
+    async for _ in stream:
+        pass
+
+    stats = telemetry.get_stream_stats().snapshot()
+    assert "specialist.answer:claude-hedge" in stats
+    assert "specialist.answer:gpt-4o" not in stats
+    (span,) = spans.get_finished_spans()
+    assert span.attributes["gen_ai.request.model"] == "claude-hedge"
+    assert span.attributes["gen_ai.system"] == "anthropic"
+
+
+@pytest.mark.asyncio
+async def test_route_intent_records_usage(spans):
+    from specialists.classifier import CLASSIFIER_MODEL, route_intent
+
+    response = MagicMock()
+    response.content = [MagicMock(text="math")]
+    response.usage.input_tokens = 120
+    response.usage.output_tokens = 1
+    client = AsyncMock()
+    client.messages.create = AsyncMock(return_value=response)
+
+    result = await route_intent("What is 7 times 8?", client=client)
+
+    assert result.subject == "math"
+    stats = telemetry.get_stream_stats().snapshot()[f"classifier.route_intent:{CLASSIFIER_MODEL}"]
+    assert stats["input_tokens"] == 120
+    (span,) = spans.get_finished_spans()
+    assert span.attributes["routing.subject"] == "math"
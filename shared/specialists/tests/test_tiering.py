@@ -0,0 +1,78 @@
+"""Unit tests for complexity-based model tiering."""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../"))
+
+from specialists.tiering import TIER_FAST, TIER_STANDARD, TierRouter, estimate_complexity
+
+
+def _router(**thresholds):
+    return TierRouter(thresholds=thresholds or {"math": 0.3, "history": 0.3, "english": 0.3})
+
+
+def test_short_factual_questions_are_simple():
+    """Single-step lookups score below the default cut-off."""
+    for question in ("What's 12 squared?", "When did WW2 end?", "What is a noun?", "Who was Napoleon?"):
+        score, _ = estimate_complexity(question)
+        assert score < 0.3, question
+
+
+def test_multi_step_questions_are_complex():
+    """Proofs, explanations, multi-operator arithmetic and word problems stay on the standard tier."""
+    for question in (
+        "Prove that the square root of 2 is irrational",
+        "Explain why the Roman Empire fell and what effects it had on Europe",
+        "What is 3/4 + 5/6 - 1/2 times 2?",
+        "Solve 2x + 3 = 11",
+        "A train leaves at 3pm going 60 mph, another at 4pm going 80 mph, when does the second catch up?",
+    ):
+        score, _ = estimate_complexity(question)
+        assert score >= 0.3, question
+
+
+def test_hyphenated_words_are_not_operators():
+    _, features = estimate_complexity("Can you do it step-by-step, one-by-one?")
+    assert "operators" not in features
+
+
+def test_uncertain_route_is_never_downgraded():
+    """A low classifier confidence keeps even a simple question on the standard model."""
+    score, features = estimate_complexity("What is a noun?", confidence=0.8)
+    assert "uncertain_route" in features
+    assert score >= 0.3
+
+    # Affinity bypasses carry -1.0, which is not a confidence
+    _, features = estimate_complexity("What is a noun?", confidence=-1.0)
+    assert "uncertain_route" not in features
+
+
+def test_decide_uses_the_specialist_model_tiers():
+    from specialists.math import MATH_FAST_MODEL, MATH_MODEL
+
+    router = _router()
+    fast = router.decide("math", "What is 7 times 8?", confidence=1.0)
+    standard = router.decide("math", "Prove that there are infinitely many primes", confidence=1.0)
+
+    assert (fast.tier, fast.model) == (TIER_FAST, MATH_FAST_MODEL)
+    assert (standard.tier, standard.model) == (TIER_STANDARD, MATH_MODEL)
+    assert fast.elapsed_ms >= 0
+
+
+def test_untiered_subject_returns_none():
+    router = _router(math=0.3)
+    assert router.decide("history", "When did WW2 end?") is None
+
+
+def test_decisions_are_recorded_for_tuning():
+    """Per-subject tier counts, score histogram and decision latency; record=False is not counted."""
+    router = _router()
+    router.decide("history", "When did WW2 end?")
+    router.decide("history", "Compare the causes of World War I and World War II")
+    router.decide("history", "When did WW2 end?", record=False)
+
+    history = router.snapshot()["subjects"]["history"]
+    assert history["decisions"] == {TIER_FAST: 1, TIER_STANDARD: 1}
+    assert history["fast_rate"] == 0.5
+    assert sum(history["score_histogram"][TIER_FAST]) == 1
+    assert "avg_decision_ms" in history
@@ -0,0 +1,249 @@
+"""
+Complexity-based model tiering for specialists.
+
+"what's 12 squared" and "when did WW2 end" went to the same Sonnet / GPT-4o
+as a multi-step proof. TierRouter estimates a question's complexity locally
+(no API call, microseconds) and picks a model tier per subject:
+
+    score < SPECIALIST_TIER_THRESHOLDS[subject]  → "fast"
+    otherwise                                    → "standard"
+
+Each specialist module declares its own tiers as MODEL_TIERS
+({"fast": ..., "standard": ...}; e.g. ANTHROPIC_MATH_FAST_MODEL). Subjects
+missing from the thresholds always use their standard model.
+
+Complexity features (each recorded on the decision so cut-offs can be tuned):
+- length: more words, more to reason about
+- operators: several arithmetic operators, variables or quantities mean a
+  multi-step problem
+- reasoning keywords: prove, explain why, compare, analyze, essay, ...
+- simple openers: what is, when did, who was, define, how many, ...
+- several questions in one turn
+- classifier confidence: an uncertain route (< UNCERTAIN_CONFIDENCE) is not
+  trusted to a smaller model
+
+Decisions, their score distribution and decision latency are in /metrics.
+
+CRITICAL: Tiering only ever downgrades clearly simple questions. Anything
+ambiguous — including a failure inside the router — uses the standard model.
+"""
+import importlib
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .routing_cache import normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+TIERING_ENABLED = os.environ.get("SPECIALIST_TIERING", "false").lower() in ("1", "true", "yes")
+
+
+def _parse_thresholds(raw: str) -> Dict[str, float]:
+    thresholds = {}
+    for part in raw.split(","):
+        if "=" in part:
+            subject, value = part.split("=", 1)
+            thresholds[subject.strip()] = float(value)
+    return thresholds
+
+
+# Complexity below the subject's threshold → fast tier
+TIER_THRESHOLDS = _parse_thresholds(
+    os.environ.get("SPECIALIST_TIER_THRESHOLDS", "math=0.3,history=0.3,english=0.3")
+)
+
+TIER_FAST = "fast"
+TIER_STANDARD = "standard"
+
+# Classifier confidence below this (0.8 "extra text", 0.5 fallback, unsure local predictions)
+UNCERTAIN_CONFIDENCE = 0.9
+# Score histogram buckets per subject/tier
+SCORE_BUCKETS = 10
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Hyphens only count as minus between numbers/spaces ("step-by-step" is not arithmetic)
+_OPERATOR_SYMBOL = re.compile(r"[+*/^=%√×÷]|(?<=[\d\s])-(?=[\s\d(])")
+_OPERATOR_WORDS = {
+    "plus", "minus", "times", "multiplied", "divided", "over", "squared", "cubed",
+    "power", "root", "percent",
+}
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?")
+_VARIABLES = re.compile(r"\b[a-z]\s*[=+\-*/^]|[=+\-*/^]\s*[a-z]\b|\b\d+[a-z]\b")
+_REASONING = re.compile(
+    r"\b(prove|proof|derive|show that|justify|explain why|explain how|why did|why does|why do|why is|why was|"
+    r"how does|how did|compare|contrast|analy[sz]e|evaluate|discuss|interpret|essay|"
+    r"step by step|steps|significance|impact|effects? of|causes? of|difference between|"
+    r"word problem|if .+ then|rewrite|improve|feedback)\b"
+)
+_SIMPLE_OPENER = re.compile(
+    r"^(what is|what's|whats|what was|what year|when did|when was|when is|who was|who is|who were|"
+    r"where is|where was|define|how many|how much|how do you spell|spell|is it|is)\b"
+)
+
+
+@dataclass
+class TierDecision:
+    subject: str
+    tier: str
+    model: str
+    score: float
+    elapsed_ms: float
+    features: Dict[str, float] = field(default_factory=dict)
+
+
+def estimate_complexity(
+    question: str,
+    confidence: Optional[float] = None,
+) -> tuple:
+    """Return (score in [0, 1], feature contributions) for a question."""
+    raw = question.lower()
+    text = normalize_transcript(question)
+    words = _WORD.findall(text)
+    features: Dict[str, float] = {}
+
+    features["length"] = round(min(1.0, len(words) / 40) * 0.35, 4)
+
+    operators = len(_OPERATOR_SYMBOL.findall(raw))
+    operators += sum(1 for w in words if w in _OPERATOR_WORDS)
+    if operators >= 4:
+        features["operators"] = 0.4
+    elif operators == 3:
+        features["operators"] = 0.3
+    elif operators == 2:
+        features["operators"] = 0.15
+    if _VARIABLES.search(raw):
+        features["variables"] = 0.2
+    # Word problems: several quantities to relate
+    if len(_NUMBER.findall(raw)) >= 3:
+        features["numbers"] = 0.2
+
+    if _REASONING.search(text):
+        features["reasoning"] = 0.35
+    if _SIMPLE_OPENER.match(text):
+        features["simple_opener"] = -0.1
+    if question.count("?") > 1:
+        features["multiple_questions"] = 0.1
+
+    # Never downgrade an uncertain route. Affinity bypasses carry a negative
+    # marker, not a probability
+    if confidence is not None and 0 <= confidence < UNCERTAIN_CONFIDENCE:
+        features["uncertain_route"] = 1.0
+
+    score = max(0.0, min(1.0, sum(features.values())))
+    return round(score, 4), features
+
+
+def model_tiers(subject: str) -> Dict[str, str]:
+    """MODEL_TIERS declared by the subject's specialist module."""
+    module = importlib.import_module(f"specialists.{subject}")
+    return dict(module.MODEL_TIERS)
+
+
+@dataclass
+class SubjectTierStats:
+    decisions: Dict[str, int] = field(default_factory=dict)
+    # tier -> SCORE_BUCKETS counts of scores in [i/SCORE_BUCKETS, (i+1)/SCORE_BUCKETS)
+    scores: Dict[str, List[int]] = field(default_factory=dict)
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, decision: TierDecision) -> None:
+        self.decisions[decision.tier] = self.decisions.get(decision.tier, 0) + 1
+        buckets = self.scores.setdefault(decision.tier, [0] * SCORE_BUCKETS)
+        buckets[min(SCORE_BUCKETS - 1, int(decision.score * SCORE_BUCKETS))] += 1
+        self.total_ms += decision.elapsed_ms
+        self.max_ms = max(self.max_ms, decision.elapsed_ms)
+
+    def snapshot(self) -> dict:
+        total = sum(self.decisions.values())
+        return {
+            "decisions": dict(self.decisions),
+            "fast_rate": round(self.decisions.get(TIER_FAST, 0) / total, 4) if total else 0.0,
+            "score_histogram": {tier: list(buckets) for tier, buckets in self.scores.items()},
+            "avg_decision_ms": round(self.total_ms / total, 4) if total else 0.0,
+            "max_decision_ms": round(self.max_ms, 4),
+        }
+
+
+class TierRouter:
+    """Picks a specialist model tier from a local complexity estimate."""
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None):
+        self.thresholds = dict(TIER_THRESHOLDS if thresholds is None else thresholds)
+        self.stats: Dict[str, SubjectTierStats] = {}
+        self._tiers: Dict[str, Dict[str, str]] = {}
+
+    def _model_tiers(self, subject: str) -> Dict[str, str]:
+        tiers = self._tiers.get(subject)
+        if tiers is None:
+            tiers = self._tiers[subject] = model_tiers(subject)
+        return tiers
+
+    def decide(
+        self,
+        subject: str,
+        question: str,
+        confidence: Optional[float] = None,
+        record: bool = True,
+    ) -> Optional[TierDecision]:
+        """
+        Tier decision for a question, or None when the subject is not tiered.
+
+        record=False skips stats/logging (speculative starts, which are decided
+        again once the classifier's confidence is known).
+        """
+        threshold = self.thresholds.get(subject)
+        if threshold is None:
+            return None
+        started = time.perf_counter()
+        try:
+            tiers = self._model_tiers(subject)
+            score, features = estimate_complexity(question, confidence)
+        except Exception as e:
+            logger.warning(f"Tiering failed for {subject}, using standard model: {e}")
+            return None
+        tier = TIER_FAST if score < threshold and TIER_FAST in tiers else TIER_STANDARD
+        decision = TierDecision(
+            subject=subject,
+            tier=tier,
+            model=tiers[tier],
+            score=score,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            features=features,
+        )
+        if record:
+            self.stats.setdefault(subject, SubjectTierStats()).record(decision)
+            logger.info(
+                f"Tier {subject}/{tier} ({decision.model}) score={score:.2f} "
+                f"features={features} in {decision.elapsed_ms:.3f}ms"
+            )
+        return decision
+
+    def snapshot(self) -> dict:
+        return {
+            "subjects": {subject: stats.snapshot() for subject, stats in self.stats.items()},
+            "thresholds": self.thresholds,
+        }
+
+
+_router: Optional[TierRouter] = None
+
+
+def get_tier_router() -> TierRouter:
+    """Process-wide tier router (lazily created)."""
+    global _router
+    if _router is None:
+        _router = TierRouter()
+    return _router
+
+
+def choose_model(subject: str, question: str, default: str, confidence: Optional[float] = None) -> str:
+    """The tiered model for a question when SPECIALIST_TIERING is on, else default."""
+    if not TIERING_ENABLED:
+        return default
+    decision = get_tier_router().decide(subject, question, confidence)
+    return decision.model if decision is not None else default
@@ -0,0 +1,122 @@
+"""
+Train the local fast-path intent classifier from routing_decisions.
+
+Usage:
+    python -m specialists.train_classifier --out /workspace/models/router.json
+    python -m specialists.train_classifier --dsn postgresql://... --threshold 0.92
+
+Only Haiku-labelled rows are used (from_agent='orchestrator', confidence 1.0
+or 0.8, non-empty transcript_excerpt). A held-out split reports accuracy and
+coverage at the chosen threshold; the model file is written atomically so
+running services pick it up on their next reload check.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+from typing import List, Tuple
+
+from .local_classifier import DEFAULT_THRESHOLD, LOCAL_MODEL_PATH, HashedNgramModel
+
+logger = logging.getLogger(__name__)
+
+LABELS = ["math", "history", "english", "escalate"]
+
+TRAINING_QUERY = (
+    "SELECT transcript_excerpt, to_agent FROM routing_decisions "
+    "WHERE from_agent = 'orchestrator' "
+    "AND confidence IN (1.0, 0.8) "
+    "AND transcript_excerpt IS NOT NULL AND transcript_excerpt <> '' "
+    "AND to_agent = ANY($1::text[]) "
+    "ORDER BY created_at DESC LIMIT $2"
+)
+
+
+async def fetch_samples(dsn: str, limit: int) -> List[Tuple[str, str]]:
+    """Load (transcript_excerpt, to_agent) pairs from routing_decisions."""
+    import asyncpg  # training-only dependency: specialists[train]
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch(TRAINING_QUERY, LABELS, limit)
+    finally:
+        await conn.close()
+    return [(row["transcript_excerpt"], row["to_agent"]) for row in rows]
+
+
+def evaluate(model: HashedNgramModel, samples: List[Tuple[str, str]], threshold: float) -> dict:
+    """Accuracy overall and on the confident (above-threshold) subset."""
+    if not samples:
+        return {"samples": 0}
+    correct = confident = confident_correct = 0
+    for text, label in samples:
+        predicted, proba = model.predict(text)
+        correct += predicted == label
+        if proba >= threshold:
+            confident += 1
+            confident_correct += predicted == label
+    return {
+        "samples": len(samples),
+        "accuracy": round(correct / len(samples), 4),
+        "coverage": round(confident / len(samples), 4),
+        "confident_accuracy": round(confident_correct / confident, 4) if confident else None,
+    }
+
+
+def train(
+    samples: List[Tuple[str, str]],
+    threshold: float = DEFAULT_THRESHOLD,
+    holdout: float = 0.2,
+    epochs: int = 15,
+    seed: int = 0,
+) -> Tuple[HashedNgramModel, dict]:
+    """Fit on a shuffled split, report held-out metrics, then refit on everything."""
+    rng = random.Random(seed)
+    shuffled = list(samples)
+    rng.shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    train_set, test_set = shuffled[:cut], shuffled[cut:]
+
+    report = {}
+    if test_set:
+        trial = HashedNgramModel(LABELS, threshold=threshold).fit(train_set, epochs=epochs, seed=seed)
+        report = evaluate(trial, test_set, threshold)
+
+    model = HashedNgramModel(LABELS, threshold=threshold).fit(shuffled, epochs=epochs, seed=seed)
+    model.metadata["holdout"] = report
+    return model, report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL", ""), help="PostgreSQL DSN (default $DATABASE_URL)")
+    parser.add_argument("--out", default=LOCAL_MODEL_PATH, help="Model file to write")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Probability needed to skip Haiku")
+    parser.add_argument("--limit", type=int, default=50000, help="Most recent rows to train on")
+    parser.add_argument("--min-samples", type=int, default=200, help="Refuse to write a model trained on fewer rows")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if not args.dsn:
+        logger.error("No DSN: pass --dsn or set DATABASE_URL")
+        return 2
+
+    samples = asyncio.run(fetch_samples(args.dsn, args.limit))
+    logger.info(f"Loaded {len(samples)} labelled routing decisions")
+    if len(samples) < args.min_samples:
+        logger.error(f"Only {len(samples)} samples (< --min-samples {args.min_samples}); model not written")
+        return 1
+
+    model, report = train(samples, args.threshold, args.holdout, args.epochs)
+    logger.info(f"Held-out: {report}")
+    model.save(args.out)
+    logger.info(f"Model written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,10 @@ The sentence-level guardrail runs in tts_node before synthesis.
 """
 import json
 import logging
-import re
 from typing import AsyncIterable, Optional
 
 logger = logging.getLogger(__name__)
 
-# Sentence-ending punctuation
-_SENTENCE_END = re.compile(r'[.!?]+\s*')
-
 
 async def _emit_step(agent, step: str | None) -> None:
     """Emit a pipeline step from an agent instance. Best-effort, never raises."""
@@ -53,40 +49,21 @@ class GuardedAgent:
         CRITICAL: Must return AsyncIterable[rtc.AudioFrame], NOT str.
         """
         async def _guarded_audio():
+            # Shared incremental segmenter: decimal/abbreviation aware, linear scan,
+            # releases held short sentences on time. The flushed residual comes
+            # last — CRITICAL: don't drop the last fragment
+            from guardrail.segmenter import segment_stream
+
             await _emit_step(self, "guardrail")
             tts_emitted = False
-            buffer = ""
-
-            async for chunk in text:
-                buffer += chunk
-
-                # Process complete sentences
-                while True:
-                    match = _SENTENCE_END.search(buffer)
-                    if not match:
-                        break
-
-                    end_pos = match.end()
-                    sentence = buffer[:end_pos].strip()
-                    buffer = buffer[end_pos:]
-
-                    if sentence:
-                        safe_sentence = await self._guardrail_text(sentence)
-                        if safe_sentence:
-                            if not tts_emitted:
-                                await _emit_step(self, "tts")
-                                tts_emitted = True
-                            async for frame in self._synthesize(safe_sentence):
-                                yield frame
-
-            # Flush residual buffer — CRITICAL: don't drop the last fragment
-            if buffer.strip():
-                safe_text = await self._guardrail_text(buffer.strip())
-                if safe_text:
+
+            async for sentence, _complete in segment_stream(text):
+                safe_sentence = await self._guardrail_text(sentence)
+                if safe_sentence:
                     if not tts_emitted:
                         await _emit_step(self, "tts")
                         tts_emitted = True
-                    async for frame in self._synthesize(safe_text):
+                    async for frame in self._synthesize(safe_sentence):
                         yield frame
 
             await _emit_step(self, None)   # clear step when TTS finishes
@@ -31,11 +31,45 @@ def _start_health_server(port: int = 8080) -> None:
 
 def setup_observability():
     """Initialize OTEL + Langfuse tracing."""
-    from observability.langfuse import setup_langfuse_tracing
+    from observability.langfuse import setup_langfuse_tracing, setup_otel_metrics
     setup_langfuse_tracing(
         service_name="version-a-agent",
         langfuse_host=os.environ.get("LANGFUSE_HOST", "http://localhost:3001"),
     )
+    setup_otel_metrics(service_name="version-a-agent")
+
+
+_warmup_tasks: set = set()
+
+
+def prewarm(proc) -> None:
+    """
+    Worker process boot (LiveKit prewarm_fnc): build the pooled provider clients.
+
+    prewarm runs before the process's event loop exists, so connections are
+    opened by the first job in the process (_warm_provider_pools), once.
+    """
+    proc.userdata["warm_provider_pools"] = True
+    try:
+        from clients.registry import get_anthropic_client, get_openai_client
+        get_openai_client()
+        get_anthropic_client()
+    except Exception as e:
+        logger.warning(f"Provider clients not prebuilt: {e}")
+
+
+def _warm_provider_pools(proc) -> None:
+    """Pre-open pooled OpenAI/Anthropic connections in the background, once per process."""
+    if not proc.userdata.pop("warm_provider_pools", False):
+        return
+    try:
+        import asyncio
+        from clients.registry import warm_up
+        task = asyncio.create_task(warm_up())
+        _warmup_tasks.add(task)
+        task.add_done_callback(_warmup_tasks.discard)
+    except Exception as e:
+        logger.warning(f"Provider pool warm-up not started: {e}")
 
 
 async def entrypoint_orchestrator(ctx):
@@ -48,6 +82,8 @@ async def entrypoint_orchestrator(ctx):
     from agents.orchestrator import OrchestratorAgent
     from models.session_state import SessionUserdata
 
+    _warm_provider_pools(ctx.proc)
+
     userdata = SessionUserdata(
         room_name=ctx.room.name,
         session_id=ctx.room.name,
@@ -93,6 +129,8 @@ async def entrypoint_english(ctx):
     from agents.english_agent import EnglishAgent
     from models.session_state import SessionUserdata
 
+    _warm_provider_pools(ctx.proc)
+
     userdata = SessionUserdata(
         room_name=ctx.room.name,
         session_id=ctx.room.name,
@@ -139,6 +177,7 @@ if __name__ == "__main__":
         cli.run_app(
             WorkerOptions(
                 entrypoint_fnc=entrypoint_english,
+                prewarm_fnc=prewarm,
                 worker_type=WorkerType.ROOM,
                 agent_name="learning-english",
             )
@@ -147,6 +186,7 @@ if __name__ == "__main__":
         cli.run_app(
             WorkerOptions(
                 entrypoint_fnc=entrypoint_orchestrator,
+                prewarm_fnc=prewarm,
                 worker_type=WorkerType.ROOM,
                 agent_name="learning-orchestrator",
             )
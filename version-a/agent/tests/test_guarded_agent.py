@@ -114,3 +114,33 @@ async def test_guardrail_with_mocked_service():
     with patch("guardrail.service.check_and_rewrite", AsyncMock(return_value=mock_result)):
         result = await mock_guardrail_text("Safe content")
         assert result == "Safe content"
+
+
+@pytest.mark.asyncio
+async def test_tts_node_keeps_decimals_and_abbreviations_whole():
+    """tts_node guardrails whole sentences — '3.14' and 'e.g.' are not split."""
+    from agents.base import GuardedAgent
+
+    agent = object.__new__(GuardedAgent)
+    agent._openai_client = None
+    checked: list[str] = []
+
+    async def fake_guardrail(text, session=None):
+        checked.append(text)
+        return text
+
+    async def fake_synthesize(text):
+        yield f"frame:{text}"
+
+    agent._guardrail_text = fake_guardrail
+    agent._synthesize = fake_synthesize
+
+    async def text_stream():
+        yield "Pi is about 3."
+        yield "14, e.g. in circles. "
+        yield "That is all"
+
+    frames = [frame async for frame in await agent.tts_node(text_stream())]
+
+    assert checked == ["Pi is about 3.14, e.g. in circles.", "That is all"]
+    assert len(frames) == 2
@@ -1,4 +1,5 @@
 """Version B FastAPI application entry point."""
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
@@ -9,7 +10,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from backend.routers import session, orchestrator, tts, teacher, csrf, events
+from backend.routers import session, orchestrator, tts, teacher, csrf, events, metrics, channel
 from backend.services.job_store import start_cleanup_task, stop_cleanup_task
 
 limiter = Limiter(key_func=get_remote_address, storage_uri="memory://")
@@ -26,12 +27,22 @@ async def lifespan(app: FastAPI):
     """Startup/shutdown lifecycle."""
     # Setup OTEL tracing
     try:
-        from observability.langfuse import setup_langfuse_tracing
+        from observability.langfuse import setup_langfuse_tracing, setup_otel_metrics
         setup_langfuse_tracing(service_name="version-b-backend")
+        setup_otel_metrics(service_name="version-b-backend")
         logger.info("OTEL tracing configured")
     except Exception as e:
         logger.warning(f"OTEL tracing not configured: {e}")
 
+    # Pre-open pooled provider connections (best-effort, in the background)
+    warmup = None
+    try:
+        from clients.registry import warm_up
+        warmup = asyncio.create_task(warm_up())
+        logger.info("Provider connection pool warm-up started")
+    except Exception as e:
+        logger.warning(f"Provider pool warm-up not started: {e}")
+
     # Start background job cleanup
     cleanup = start_cleanup_task()
     logger.info("Background job cleanup task started")
@@ -40,6 +51,18 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     stop_cleanup_task()
+    try:
+        from backend.services.semantic_index import flush_semantic_index
+        await flush_semantic_index()
+    except Exception as e:
+        logger.warning(f"Semantic index flush failed: {e}")
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    try:
+        from clients.registry import get_registry
+        await get_registry().aclose()
+    except Exception as e:
+        logger.warning(f"Provider pool shutdown failed: {e}")
     logger.info("Version B backend shutting down")
 
 
@@ -78,6 +101,8 @@ app.include_router(session.router)
 app.include_router(orchestrator.router)
 app.include_router(tts.router)
 app.include_router(teacher.router)
+app.include_router(channel.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health")
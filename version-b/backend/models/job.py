@@ -1,11 +1,30 @@
 """OrchestratorJob dataclass for async job tracking."""
 import asyncio
+import logging
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timezone
 import uuid
 
+logger = logging.getLogger(__name__)
+
+
+class JobEventType(str, Enum):
+    """Entries of a job's append-only event log (streamed by GET /orchestrate/{job_id}/events)."""
+    CLASSIFIED = "classified"
+    SENTENCE = "sentence"
+    COMPLETE = "complete"
+    ERROR = "error"
+
+
+@dataclass
+class JobEvent:
+    """One event log entry. ids start at 1 and are the SSE event ids."""
+    id: int
+    type: JobEventType
+    data: Dict[str, Any]
+
 
 class JobStatus(str, Enum):
     """Job status enum with DB constraint mapping."""
@@ -25,6 +44,13 @@ class OrchestratorJob:
     classifier starts -> PROCESSING
     specialist streams + guardrail runs -> COMPLETE (tts_ready=True)
     client polls GET /orchestrate/{job_id} -> streams POST /tts/stream
+
+    Meanwhile every step is appended to an event log (classified, each
+    guardrailed sentence, complete/error) that GET /orchestrate/{job_id}/events
+    streams as SSE, so a client can start speaking on the first sentence.
+
+    COMPLETE and ERROR are final: once a job has finished (including when the
+    job store reaps or evicts it), later mark_* calls are ignored.
     """
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     session_id: Optional[str] = None
@@ -40,6 +66,8 @@ class OrchestratorJob:
     raw_text: Optional[str] = None      # LLM output before guardrail
     safe_text: Optional[str] = None     # Guardrailed text (use for TTS)
     tts_ready: bool = False             # Client starts streaming when True
+    sentences: List[str] = field(default_factory=list)  # guardrailed sentences, append-only
+    answer_cache_key: Optional[str] = None  # set when the answer is (or may be) cached
 
     # Error
     error_message: Optional[str] = None
@@ -49,32 +77,89 @@ class OrchestratorJob:
     classified_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
+    # Append-only event log (see JobEventType)
+    events: List[JobEvent] = field(default_factory=list, repr=False)
+    # Called with each new event (session push channel, job store sync); must not block
+    listeners: List[Callable[[JobEvent], None]] = field(default_factory=list, repr=False)
+
     # Internal: signals completion to polling clients
     _completion_event: asyncio.Event = field(
         default_factory=asyncio.Event, repr=False
     )
+    # Internal: set (and replaced) on every appended event, wakes SSE streams
+    _event_signal: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETE, JobStatus.ERROR)
+
+    def _emit(self, event_type: JobEventType, data: Dict[str, Any]) -> None:
+        event = JobEvent(id=len(self.events) + 1, type=event_type, data=data)
+        self.events.append(event)
+        signal, self._event_signal = self._event_signal, asyncio.Event()
+        signal.set()
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Job {self.id[:8]} event listener failed: {e}")
+
+    def events_after(self, last_event_id: int = 0) -> List[JobEvent]:
+        """Events with id > last_event_id (ids are 1-based list positions)."""
+        return self.events[max(0, last_event_id):]
+
+    async def wait_for_event(self, last_event_id: int, timeout: float) -> bool:
+        """Wait until an event after last_event_id exists. Returns False on timeout."""
+        if len(self.events) > last_event_id:
+            return True
+        try:
+            await asyncio.wait_for(self._event_signal.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return len(self.events) > last_event_id
+
+    def append_sentence(self, text: str) -> None:
+        """Record one guardrailed sentence as soon as it is safe to speak."""
+        if not text.strip() or self.finished:
+            return
+        self.sentences.append(text)
+        self._emit(JobEventType.SENTENCE, {"index": len(self.sentences) - 1, "text": text})
 
     def mark_processing(self, subject: str) -> None:
         """Mark job as processing after classification."""
+        if self.finished:
+            return
         self.status = JobStatus.PROCESSING
         self.subject = subject
         self.classified_at = datetime.now(timezone.utc)
+        self._emit(JobEventType.CLASSIFIED, {"subject": subject})
 
     def mark_complete(self, safe_text: str, raw_text: str = "") -> None:
-        """Mark job as complete with guardrailed text."""
+        """Mark job as complete with guardrailed text (ignored once finished)."""
+        if self.finished:
+            logger.info(f"Job {self.id[:8]} already {self.status.value}, completion ignored")
+            return
         self.status = JobStatus.COMPLETE
         self.safe_text = safe_text
         self.raw_text = raw_text
         self.tts_ready = True
         self.completed_at = datetime.now(timezone.utc)
         self._completion_event.set()
+        self._emit(JobEventType.COMPLETE, {
+            "safe_text": safe_text,
+            "sentences": len(self.sentences),
+            "tts_ready": True,
+        })
 
     def mark_error(self, error: str) -> None:
-        """Mark job as failed."""
+        """Mark job as failed (ignored once finished)."""
+        if self.finished:
+            return
         self.status = JobStatus.ERROR
         self.error_message = error
         self.completed_at = datetime.now(timezone.utc)
         self._completion_event.set()
+        self._emit(JobEventType.ERROR, {"error_message": error})
 
     async def wait_for_completion(self, timeout: float = 30.0) -> bool:
         """Wait for job to complete. Returns True if completed, False if timeout."""
@@ -18,6 +18,7 @@ class SessionUserdata:
     filler_state: int = 0  # 0=none, 1=500ms, 2=1500ms, 3=3000ms
     escalated: bool = False
     turn_count: int = 0
+    last_routed_at: Optional[float] = None  # time.monotonic() of the last routed turn
 
     def should_skip_turn(self) -> bool:
         return self.skip_next_user_turns > 0
@@ -0,0 +1,130 @@
+"""
+Session push channel router for Version B.
+
+WebSocket /ws/session/{session_id}?token=<channel_token>&last_seq=<n>
+  - One persistent connection per student session (SESSION_CHANNEL=true)
+  - Receives every job.* event, filler cue, teacher hint and escalation for
+    the session (see services/session_channel.py for the message types)
+  - Can dispatch turns without a POST /orchestrate per job
+
+The channel_token returned by POST /session/token is checked once when
+connecting instead of a CSRF token on every request. It is bound to the
+session_id, so it cannot open (read or dispatch into) any other session.
+Dispatches are rate limited per session, across all of its connections.
+On reconnect the client passes the last seq it saw; buffered messages after
+it are replayed before live ones, or {"type": "resync"} is sent when they
+are gone (re-read job state via GET /orchestrate/{job_id}).
+
+Message format sent by the client:
+  {"type": "dispatch", "student_text": "...", "ref": "<client id>"}
+      → {"type": "dispatched", "ref": "...", "job_id": "..."}
+  {"type": "ping"} → {"type": "pong", "seq": <latest seq>}
+
+Replies, "connected" and "resync" carry no seq — only channel messages do.
+"""
+import asyncio
+import logging
+import time
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from backend.routers.csrf import verify_session_token
+from backend.services import session_channel
+from backend.services.session_channel import DROPPED, SessionChannel
+
+router = APIRouter(tags=["channel"])
+logger = logging.getLogger(__name__)
+
+# Same budget as POST /orchestrate (20/minute), per session
+DISPATCH_PER_MINUTE = 20
+
+# Close codes: policy violation (bad token / disabled), try again later (fell behind)
+CLOSE_POLICY = 1008
+CLOSE_RECONNECT = 1013
+
+
+@router.websocket("/ws/session/{session_id}")
+async def session_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    token: str | None = None,
+    last_seq: int | None = None,
+) -> None:
+    """Multiplexed, replayable event stream (and turn dispatch) for one session."""
+    if (
+        not session_channel.SESSION_CHANNEL_ENABLED
+        or not token
+        or not verify_session_token(token, session_id)
+    ):
+        await websocket.close(code=CLOSE_POLICY)
+        return
+
+    await websocket.accept()
+    channel = session_channel.get_channel_registry().get(session_id)
+    queue, replay, complete = channel.subscribe(last_seq)
+    logger.info(f"Session channel connected for {session_id} (last_seq={last_seq})")
+
+    reader = asyncio.create_task(_read_client(websocket, channel), name=f"channel-read-{session_id[:8]}")
+    try:
+        await websocket.send_json({"type": "connected", "session_id": session_id, "seq": channel.seq})
+        if not complete:
+            await websocket.send_json({"type": "resync", "seq": channel.seq})
+        for message in replay:
+            await websocket.send_json(message)
+
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break  # client went away
+            message = getter.result()
+            if message is DROPPED:
+                await websocket.close(code=CLOSE_RECONNECT)
+                break
+            await websocket.send_json(message)
+            channel.stats.delivered += 1
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Session channel error for {session_id}: {e}")
+    finally:
+        reader.cancel()
+        channel.unsubscribe(queue)
+        logger.info(f"Session channel disconnected for {session_id}")
+
+
+async def _read_client(websocket: WebSocket, channel: SessionChannel) -> None:
+    """Handle client messages until the socket closes."""
+    dispatched = channel.dispatched  # shared by every connection of the session
+    try:
+        while True:
+            data = await websocket.receive_json()
+            msg_type = data.get("type")
+
+            if msg_type == "dispatch":
+                now = time.monotonic()
+                while dispatched and now - dispatched[0] > 60:
+                    dispatched.popleft()
+                text = str(data.get("student_text", "")).strip()
+                if len(dispatched) >= DISPATCH_PER_MINUTE:
+                    await websocket.send_json({"type": "error", "ref": data.get("ref"), "detail": "Rate limit exceeded"})
+                    continue
+                if not text:
+                    await websocket.send_json({"type": "error", "ref": data.get("ref"), "detail": "student_text is required"})
+                    continue
+                dispatched.append(now)
+
+                from backend.routers.orchestrator import dispatch_job
+                job = dispatch_job(channel.session_id, text)
+                channel.stats.dispatches += 1
+                await websocket.send_json({"type": "dispatched", "ref": data.get("ref"), "job_id": job.id})
+
+            elif msg_type == "ping":
+                await websocket.send_json({"type": "pong", "seq": channel.seq})
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.debug(f"Session channel reader for {channel.session_id} stopped: {e}")
@@ -1,4 +1,4 @@
-"""CSRF protection: stateless HMAC double-submit token."""
+"""CSRF protection: stateless HMAC double-submit token, plus session-bound channel tokens."""
 import hashlib
 import hmac
 import os
@@ -9,6 +9,8 @@ from fastapi import APIRouter, Header, HTTPException
 
 CSRF_SECRET = os.getenv("CSRF_SECRET", secrets.token_hex(32))
 CSRF_TTL = 300  # 5 minutes
+# Session channel tokens outlive a CSRF token: the client reconnects with them all session
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_CHANNEL_TOKEN_TTL_S", "3600"))
 
 router = APIRouter(tags=["csrf"])
 
@@ -30,6 +32,28 @@ def verify_csrf_token(token: str) -> bool:
         return False
 
 
+def _session_signature(session_id: str, expire_str: str) -> str:
+    message = f"session:{session_id}:{expire_str}".encode()
+    return hmac.new(CSRF_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def make_session_token(session_id: str, ttl: int = SESSION_TOKEN_TTL) -> str:
+    """Token for one session's push channel (issued with POST /session/token)."""
+    expire = str(int(time.time()) + ttl)
+    return f"{expire}:{_session_signature(session_id, expire)}"
+
+
+def verify_session_token(token: str, session_id: str) -> bool:
+    """True only for an unexpired token issued for this session_id."""
+    try:
+        expire_str, sig = token.split(":", 1)
+        if int(time.time()) > int(expire_str):
+            return False
+        return hmac.compare_digest(_session_signature(session_id, expire_str), sig)
+    except Exception:
+        return False
+
+
 async def require_csrf(x_csrf_token: str | None = Header(None, alias="X-CSRF-Token")) -> None:
     if not x_csrf_token or not verify_csrf_token(x_csrf_token):
         raise HTTPException(status_code=403, detail="CSRF check failed")
@@ -0,0 +1,128 @@
+"""
+Metrics router for Version B.
+
+GET /metrics → JSON snapshot of in-process pipeline counters, one section per
+component (guardrail batcher, moderation cache, lexical pre-filter, ...).
+Per-worker values — each uvicorn worker reports its own.
+"""
+import logging
+from fastapi import APIRouter
+
+router = APIRouter(tags=["metrics"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict:
+    """Return a snapshot of pipeline metrics. Sections that fail to load are omitted."""
+    metrics: dict = {}
+
+    try:
+        from guardrail.batcher import get_batcher
+        metrics["guardrail_batcher"] = get_batcher().stats.snapshot()
+    except Exception as e:
+        logger.debug(f"guardrail batcher metrics unavailable: {e}")
+
+    try:
+        from guardrail.cache import get_cache
+        metrics["guardrail_cache"] = get_cache().snapshot()
+    except Exception as e:
+        logger.debug(f"guardrail cache metrics unavailable: {e}")
+
+    try:
+        from guardrail.prefilter import get_prefilter
+        metrics["guardrail_prefilter"] = get_prefilter().stats.snapshot()
+    except Exception as e:
+        logger.debug(f"guardrail prefilter metrics unavailable: {e}")
+
+    try:
+        from guardrail.deadline import get_policy
+        metrics["guardrail_deadline"] = get_policy().snapshot()
+    except Exception as e:
+        logger.debug(f"guardrail deadline metrics unavailable: {e}")
+
+    try:
+        from specialists.routing_cache import get_routing_cache
+        metrics["classifier_cache"] = get_routing_cache().snapshot()
+    except Exception as e:
+        logger.debug(f"classifier cache metrics unavailable: {e}")
+
+    try:
+        from specialists.local_classifier import get_local_router
+        metrics["classifier_local"] = get_local_router().snapshot()
+    except Exception as e:
+        logger.debug(f"local classifier metrics unavailable: {e}")
+
+    try:
+        from specialists.followup import get_followup_detector
+        metrics["classifier_followup"] = get_followup_detector().snapshot()
+    except Exception as e:
+        logger.debug(f"follow-up detector metrics unavailable: {e}")
+
+    try:
+        from backend.services.answer_cache import get_answer_cache
+        metrics["answer_cache"] = get_answer_cache().snapshot()
+    except Exception as e:
+        logger.debug(f"answer cache metrics unavailable: {e}")
+
+    try:
+        from backend.services.semantic_index import get_semantic_index
+        metrics["semantic_index"] = get_semantic_index().snapshot()
+    except Exception as e:
+        logger.debug(f"semantic index metrics unavailable: {e}")
+
+    try:
+        from backend.services.conversation_memory import get_memory_store
+        metrics["conversation_memory"] = get_memory_store().snapshot()
+    except Exception as e:
+        logger.debug(f"conversation memory metrics unavailable: {e}")
+
+    try:
+        from backend.services.speculation import get_speculation_stats
+        metrics["speculation"] = get_speculation_stats().snapshot()
+    except Exception as e:
+        logger.debug(f"speculation metrics unavailable: {e}")
+
+    try:
+        from backend.services.job_store import get_job_store
+        metrics["job_store"] = get_job_store().snapshot()
+    except Exception as e:
+        logger.debug(f"job store metrics unavailable: {e}")
+
+    try:
+        from backend.services.session_channel import get_channel_registry
+        metrics["session_channels"] = get_channel_registry().snapshot()
+    except Exception as e:
+        logger.debug(f"session channel metrics unavailable: {e}")
+
+    try:
+        from specialists.hedging import get_hedge_stats
+        metrics["specialist_hedging"] = get_hedge_stats().snapshot()
+    except Exception as e:
+        logger.debug(f"specialist hedging metrics unavailable: {e}")
+
+    try:
+        from specialists.tiering import get_tier_router
+        metrics["specialist_tiering"] = get_tier_router().snapshot()
+    except Exception as e:
+        logger.debug(f"specialist tiering metrics unavailable: {e}")
+
+    try:
+        from specialists.telemetry import get_stream_stats
+        metrics["specialist_streams"] = get_stream_stats().snapshot()
+    except Exception as e:
+        logger.debug(f"specialist stream metrics unavailable: {e}")
+
+    try:
+        from specialists.gateway import get_gateway
+        metrics["provider_gateway"] = get_gateway().snapshot()
+    except Exception as e:
+        logger.debug(f"provider gateway metrics unavailable: {e}")
+
+    try:
+        from clients.registry import get_registry
+        metrics["provider_pools"] = get_registry().snapshot()
+    except Exception as e:
+        logger.debug(f"provider pool metrics unavailable: {e}")
+
+    return metrics
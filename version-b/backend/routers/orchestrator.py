@@ -3,11 +3,15 @@ Orchestrator router for Version B.
 
 POST /orchestrate  → dispatches async job, returns {job_id} in <100ms
 GET  /orchestrate/{job_id} → polls job status; streams TTS when complete
+GET  /orchestrate/{job_id}/events → SSE: classified, each safe sentence, complete
 """
 import asyncio
+import json
 import logging
+import time
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -16,9 +20,17 @@ from backend.routers.csrf import require_csrf
 
 limiter = Limiter(key_func=get_remote_address)
 
-from backend.models.job import OrchestratorJob, JobStatus
+from backend.models.job import JobEvent, JobEventType, OrchestratorJob, JobStatus
 from backend.models.session_state import SessionUserdata
-from backend.services.job_store import get_job, store_job
+from backend.services import answer_cache, conversation_memory, semantic_index, session_channel
+from backend.services.job_store import load_job, store_job, wait_for_job_completion, wait_for_job_event
+from backend.services.speculation import (
+    CANCEL_CACHE_HIT,
+    CANCEL_ERROR,
+    CANCEL_TIER_MISMATCH,
+    SpeculativeStream,
+    start_speculation,
+)
 
 router = APIRouter(prefix="/orchestrate", tags=["orchestrate"])
 logger = logging.getLogger(__name__)
@@ -26,6 +38,11 @@ logger = logging.getLogger(__name__)
 # Per-session state: session_id -> SessionUserdata
 _sessions: dict[str, SessionUserdata] = {}
 
+# SSE: comment line sent when no event arrives for this long (keeps proxies from closing)
+SSE_KEEPALIVE_S = 15.0
+# SSE: client reconnect delay advertised in the first frame
+SSE_RETRY_MS = 1000
+
 
 class OrchestrationRequest(BaseModel):
     session_id: str
@@ -61,13 +78,30 @@ async def dispatch_orchestration(
     Version B tradeoff vs Version A:
     - Version A: LiveKit pipeline handles turn sequencing, barge-in, audio routing
     - Version B: We manage job lifecycle manually with asyncio + polling
+      (or the per-session push channel, SESSION_CHANNEL)
+    """
+    job = dispatch_job(req.session_id, req.student_text)
+    return OrchestrationResponse(job_id=job.id)
+
+
+def dispatch_job(session_id: str, student_text: str) -> OrchestratorJob:
     """
-    session = _sessions.setdefault(req.session_id, SessionUserdata(session_id=req.session_id))
+    Create, store and start a job (POST /orchestrate and the session WebSocket).
+
+    With SESSION_CHANNEL the job's events are republished on the session's
+    push channel and filler cues are sent while no sentence is ready yet.
+    """
+    session = _sessions.setdefault(session_id, SessionUserdata(session_id=session_id))
 
     job = OrchestratorJob(
-        session_id=req.session_id,
-        student_text=req.student_text,
+        session_id=session_id,
+        student_text=student_text,
     )
+    if session_channel.SESSION_CHANNEL_ENABLED:
+        channel = session_channel.get_channel_registry().get(session_id)
+        job.listeners.append(channel.job_listener(job.id))
+        channel.publish("job.dispatched", {"job_id": job.id, "student_text": student_text})
+        asyncio.create_task(_send_filler_cues(job, session, channel), name=f"filler-{job.id[:8]}")
     store_job(job)
 
     # Increment turn counter
@@ -80,8 +114,30 @@ async def dispatch_orchestration(
         name=f"orchestrate-{job.id[:8]}",
     )
 
-    logger.info(f"Dispatched job {job.id} for session {req.session_id}")
-    return OrchestrationResponse(job_id=job.id)
+    logger.info(f"Dispatched job {job.id} for session {session_id}")
+    return job
+
+
+async def _send_filler_cues(job: OrchestratorJob, session: SessionUserdata, channel) -> None:
+    """Publish a "filler" cue at each of the session's filler thresholds until the first sentence."""
+    started = time.monotonic()
+    try:
+        while not job.sentences and not job.finished:
+            threshold = session.next_filler_threshold()
+            if threshold is None:
+                return
+            remaining = threshold - (time.monotonic() - started)
+            if remaining > 0:
+                await job.wait_for_event(len(job.events), timeout=remaining)
+                continue
+            session.advance_filler()
+            channel.publish("filler", {
+                "job_id": job.id,
+                "level": session.filler_state,
+                "elapsed_ms": round((time.monotonic() - started) * 1000),
+            })
+    except Exception as e:
+        logger.warning(f"Filler cues failed for job {job.id[:8]}: {e}")
 
 
 @router.get("/{job_id}", response_model=JobStatusResponse)
@@ -89,7 +145,7 @@ async def get_job_status(job_id: str) -> JobStatusResponse:
     """
     Poll job status. Client polls this until tts_ready=True, then calls /tts/stream.
     """
-    job = get_job(job_id)
+    job = await load_job(job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -109,12 +165,12 @@ async def wait_for_job(job_id: str, timeout: float = 30.0) -> JobStatusResponse:
     Long-poll endpoint: waits for job completion (up to timeout seconds).
     Client calls this once instead of polling repeatedly.
     """
-    job = get_job(job_id)
+    job = await load_job(job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    completed = await job.wait_for_completion(timeout=timeout)
-    if not completed:
+    job = await wait_for_job_completion(job, timeout=timeout)
+    if job is None:
         raise HTTPException(status_code=408, detail="Job timed out")
 
     return JobStatusResponse(
@@ -127,15 +183,82 @@ async def wait_for_job(job_id: str, timeout: float = 30.0) -> JobStatusResponse:
     )
 
 
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: int | None = None,
+) -> StreamingResponse:
+    """
+    Server-Sent Events for one job: "classified", one "sentence" per
+    guardrailed sentence as soon as it is safe, then "complete" (or "error"),
+    after which the stream ends.
+
+    Resume: EventSource resends the last seen id as the Last-Event-ID header
+    on reconnect (?last_event_id= works for clients that cannot set headers);
+    only later events are sent. The job's event log is append-only, so a
+    late subscriber replays everything it missed.
+    """
+    job = await load_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    header = request.headers.get("last-event-id")
+    if last_event_id is None and header is not None:
+        try:
+            last_event_id = int(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    return StreamingResponse(
+        _job_event_stream(job, request, max(0, last_event_id or 0)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: don't buffer the stream
+        },
+    )
+
+
+def _format_sse(event: JobEvent) -> str:
+    data = json.dumps(event.data)
+    return f"id: {event.id}\nevent: {event.type.value}\ndata: {data}\n\n"
+
+
+async def _job_event_stream(job: OrchestratorJob, request: Request, last_event_id: int):
+    """Yield SSE frames for events after last_event_id until the job finishes or the client leaves."""
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    while True:
+        for event in job.events_after(last_event_id):
+            yield _format_sse(event)
+            last_event_id = event.id
+            if event.type in (JobEventType.COMPLETE, JobEventType.ERROR):
+                return
+        if await request.is_disconnected():
+            return
+        updated = await wait_for_job_event(job, last_event_id, timeout=SSE_KEEPALIVE_S)
+        if updated is None:
+            yield ": keepalive\n\n"
+        else:
+            job = updated
+
+
 async def _run_orchestration(job: OrchestratorJob, session: SessionUserdata) -> None:
     """
     Background task: classify → route to specialist → guardrail → mark complete.
 
     Pipeline:
-    1. Classifier (Claude Haiku, temp=0.1) → subject label
+    1. Classifier (Claude Haiku, temp=0.1) → subject label; follow-up turns
+       keep the session's subject without classifying (CLASSIFIER_FOLLOWUP);
+       with ORCHESTRATOR_SPECULATIVE the guessed specialist starts concurrently
     2. Mark job PROCESSING
-    3. Specialist streams text (math=Sonnet 4.6, history=GPT-4o, english=GPT-4o)
-    4. Sentence-buffered guardrail rewrites harmful content
+    3. Specialist streams text (math=Sonnet 4.6, history=GPT-4o, english=GPT-4o;
+       a faster model for simple questions with SPECIALIST_TIERING),
+       with the session's bounded conversation memory (CONVERSATION_MEMORY)
+       — or a cached guardrailed answer for a repeated or paraphrased
+       question (ANSWER_CACHE, SEMANTIC_CACHE)
+    4. Sentence-buffered guardrail rewrites harmful content; each safe
+       sentence is appended to the job's event log (GET .../events)
     5. Accumulated safe text → mark_complete()
     6. Save transcript turn + audit trail
     """
@@ -144,10 +267,35 @@ async def _run_orchestration(job: OrchestratorJob, session: SessionUserdata) ->
         from specialists.classifier import route_intent
         from guardrail.service import check_stream_with_sentence_buffer
 
-        # Step 1: Classify
-        routing = await route_intent(job.student_text)
+        # Prior turns for the specialist, bounded by the memory's token budget
+        memory = conversation_memory.get_memory_store() if conversation_memory.MEMORY_ENABLED else None
+        history = memory.history(job.session_id) if memory is not None else None
+
+        # Model the speculative specialist was started on (its tier is decided
+        # without the classifier's confidence)
+        speculated_model = None
+
+        def _start_speculative(subject: str, student_text: str):
+            nonlocal speculated_model
+            speculated_model = _choose_model(subject, student_text, record=False)
+            return _get_specialist_stream(subject, student_text, history, model=speculated_model)
+
+        # Step 1: Classify — unless this is a follow-up on the session's subject.
+        # The guessed specialist, if any, streams into a buffer meanwhile.
+        speculative = None
+        routing = _route_followup(session, job.student_text)
+        followup = routing is not None
+        if routing is None:
+            speculative = start_speculation(session.current_subject, job.student_text, _start_speculative)
+            try:
+                routing = await route_intent(job.student_text)
+            except BaseException:
+                if speculative is not None:
+                    await speculative.cancel(CANCEL_ERROR)
+                raise
         job.mark_processing(routing.subject)
         session.current_subject = routing.subject
+        session.last_routed_at = time.monotonic()
         logger.info(f"Job {job.id[:8]} classified as {routing.subject!r} (conf={routing.confidence})")
 
         # Step 2: Log routing decision with confidence + excerpt
@@ -157,46 +305,46 @@ async def _run_orchestration(job: OrchestratorJob, session: SessionUserdata) ->
             transcript_excerpt=job.student_text[:200],
         )
 
-        # Step 3: Get specialist stream; tee it to capture raw text
-        raw_stream = _get_specialist_stream(routing.subject, job.student_text)
-        raw_chunks: list[str] = []
-
-        async def _tee_stream(stream):
-            async for chunk in stream:
-                raw_chunks.append(chunk)
-                yield chunk
-
-        # Step 4: Sentence-buffered guardrail
-        safe_chunks: list[str] = []
-        async for safe_chunk in check_stream_with_sentence_buffer(_tee_stream(raw_stream)):
-            safe_chunks.append(safe_chunk)
-
-        safe_text = "".join(safe_chunks).strip()
-        raw_text = "".join(raw_chunks).strip()
+        # Model tier for this question (SPECIALIST_TIERING); None = the subject's standard model
+        model = _choose_model(routing.subject, job.student_text, confidence=routing.confidence)
 
-        # Step 5: Log guardrail event with confidence + categories from moderation check
-        guardrail_confidence = 0.0
-        guardrail_categories: list[str] = []
-        if safe_text != raw_text:
-            try:
-                from guardrail.service import check
-                mod_result = await check(raw_text)
-                guardrail_confidence = mod_result.confidence
-                guardrail_categories = mod_result.categories_flagged
-            except Exception:
-                pass  # Best-effort — never block TTS pipeline
-        await _log_guardrail_event(
-            job.session_id, raw_text, safe_text, safe_text != raw_text,
-            confidence=guardrail_confidence,
-            categories_flagged=guardrail_categories,
+        # Step 3: Answer cache — a clean cached answer (exact, or a paraphrase via
+        # the semantic index) completes the job without a specialist call or moderation
+        job.answer_cache_key = _answer_cache_key(
+            routing.subject, job.student_text, followup=followup, model=model,
         )
+        cached_text = _cached_answer(job, routing.subject, model) if job.answer_cache_key else None
+        if cached_text is not None:
+            if speculative is not None:
+                await speculative.cancel(CANCEL_CACHE_HIT)
+            safe_text = raw_text = cached_text
+            for sentence in _split_sentences(cached_text):
+                job.append_sentence(sentence)
+            logger.info(f"Job {job.id[:8]} answered from cache ({routing.subject})")
+        else:
+            if speculative is not None and speculated_model != model:
+                # Right subject, wrong tier: the answer must come from the chosen model
+                await speculative.cancel(CANCEL_TIER_MISMATCH)
+                speculative = None
+            raw_stream = await _resolve_specialist_stream(
+                routing.subject, job.student_text, speculative,
+                lambda subject, student_text: _get_specialist_stream(subject, student_text, history, model=model),
+            )
+            safe_text, raw_text, guardrail_events = await _guarded_answer(
+                job, raw_stream, check_stream_with_sentence_buffer,
+            )
+            # An answer written with prior turns in the prompt may refer to them
+            if job.answer_cache_key and not history and _is_cacheable(guardrail_events):
+                _store_answer(job, routing.subject, safe_text, model)
 
-        # Step 6: Mark complete
+        # Step 4: Mark complete
         job.mark_complete(safe_text=safe_text, raw_text=raw_text)
+        if memory is not None:
+            memory.record(job.session_id, job.student_text, safe_text, routing.subject)
         session.reset_filler()
         session.consume_skip()
 
-        # Step 7: Persist transcript
+        # Step 5: Persist transcript
         await _save_transcript(job, routing.subject, safe_text)
 
         logger.info(f"Job {job.id[:8]} complete, {len(safe_text)} chars")
@@ -207,17 +355,25 @@ async def _run_orchestration(job: OrchestratorJob, session: SessionUserdata) ->
         session.consume_skip()
 
 
-def _get_specialist_stream(subject: str, student_text: str):
-    """Return async text stream from the appropriate specialist."""
+def _get_specialist_stream(
+    subject: str,
+    student_text: str,
+    history: list | None = None,
+    model: str | None = None,
+):
+    """Return async text stream from the appropriate specialist (with prior turns and tier model, if any)."""
+    kwargs = {"conversation_history": history} if history else {}
+    if model:
+        kwargs["model"] = model
     if subject == "math":
         from specialists.math import stream_math_response
-        return stream_math_response(student_text)
+        return stream_math_response(student_text, **kwargs)
     elif subject == "history":
         from specialists.history import stream_history_response
-        return stream_history_response(student_text)
+        return stream_history_response(student_text, **kwargs)
     elif subject == "english":
         from specialists.english import stream_english_response
-        return stream_english_response(student_text)
+        return stream_english_response(student_text, **kwargs)
     elif subject == "escalate":
         # Return a simple async generator signaling escalation
         async def _escalation_text():
@@ -226,7 +382,203 @@ def _get_specialist_stream(subject: str, student_text: str):
     else:
         # Fallback to english
         from specialists.english import stream_english_response
-        return stream_english_response(student_text)
+        return stream_english_response(student_text, **kwargs)
+
+
+async def _guarded_answer(job: OrchestratorJob, raw_stream, check_stream_with_sentence_buffer):
+    """
+    Run the specialist stream through the sentence-buffered guardrail.
+
+    Returns (safe_text, raw_text, guardrail_events) and logs the aggregated
+    guardrail event — from the stream's own per-sentence results, no second
+    moderation call.
+
+    Rewritten sentences stream clause by clause; the clauses are joined back
+    into one sentence before job.append_sentence (SSE, incremental TTS). The
+    last piece of every complete sentence ends with a space.
+    """
+    raw_chunks: list[str] = []
+
+    async def _tee_stream(stream):
+        async for chunk in stream:
+            raw_chunks.append(chunk)
+            yield chunk
+
+    safe_chunks: list[str] = []
+    guardrail_events: list = []
+    sentence = ""
+    async for safe_chunk in check_stream_with_sentence_buffer(
+        _tee_stream(raw_stream), events=guardrail_events
+    ):
+        safe_chunks.append(safe_chunk)
+        sentence += safe_chunk
+        if sentence[-1:].isspace():
+            job.append_sentence(sentence)
+            sentence = ""
+    if sentence:
+        job.append_sentence(sentence)  # residual fragment (no sentence end)
+
+    safe_text = "".join(safe_chunks).strip()
+    raw_text = "".join(raw_chunks).strip()
+
+    flagged, guardrail_confidence, guardrail_categories = _aggregate_guardrail_events(
+        guardrail_events
+    )
+    await _log_guardrail_event(
+        job.session_id, raw_text, safe_text, flagged,
+        confidence=guardrail_confidence,
+        categories_flagged=guardrail_categories,
+    )
+    return safe_text, raw_text, guardrail_events
+
+
+def _split_sentences(text: str) -> list[str]:
+    """Sentences of an already-safe answer (cache hits), as the guardrail would have emitted them."""
+    try:
+        from guardrail.segmenter import SentenceSegmenter
+        segmenter = SentenceSegmenter()
+        sentences = list(segmenter.feed(text)) + [segmenter.flush()]
+        sentences = [s for s in sentences if isinstance(s, str) and s]
+    except Exception as e:
+        logger.warning(f"Sentence split failed, sending answer as one sentence: {e}")
+        sentences = []
+    return sentences or [text]
+
+
+def _answer_cache_key(
+    subject: str,
+    student_text: str,
+    followup: bool = False,
+    model: str | None = None,
+) -> str | None:
+    """
+    Answer cache key (ANSWER_CACHE), or None when disabled or the turn is a
+    follow-up (its meaning depends on the previous answer).
+
+    A standalone question is served from the cache even when the session has
+    history; only storing is skipped for answers generated with history.
+    """
+    if not answer_cache.ANSWER_CACHE_ENABLED or followup:
+        return None
+    try:
+        return answer_cache.answer_key(student_text, subject, model or _specialist_model(subject))
+    except Exception as e:
+        logger.warning(f"Answer cache key failed: {e}")
+        return None
+
+
+def _cached_answer(job: OrchestratorJob, subject: str, model: str | None = None) -> str | None:
+    """Exact answer cache hit, else a semantic match (SEMANTIC_CACHE), else None."""
+    cached = answer_cache.get_answer_cache().get(job.answer_cache_key, subject)
+    if cached is not None:
+        return cached.safe_text
+    if not semantic_index.SEMANTIC_CACHE_ENABLED:
+        return None
+    try:
+        index = semantic_index.get_semantic_index()
+        if not index.serves(subject):
+            return None
+        match = index.search(job.student_text, subject, model or _specialist_model(subject))
+        return match.safe_text if match is not None else None
+    except Exception as e:
+        logger.warning(f"Semantic answer lookup failed: {e}")
+        return None
+
+
+def _store_answer(job: OrchestratorJob, subject: str, safe_text: str, model: str | None = None) -> None:
+    """Store a clean answer in the answer cache and, if enabled, the semantic index."""
+    answer_cache.get_answer_cache().put(job.answer_cache_key, subject, safe_text)
+    if not semantic_index.SEMANTIC_CACHE_ENABLED:
+        return
+    try:
+        semantic_index.get_semantic_index().add(
+            job.student_text, subject, model or _specialist_model(subject), safe_text,
+            key=job.answer_cache_key,
+        )
+    except Exception as e:
+        logger.warning(f"Semantic index insert failed: {e}")
+
+
+def _specialist_model(subject: str) -> str:
+    """Model behind a subject's specialist — part of the answer cache key."""
+    if subject == "math":
+        from specialists.math import MATH_MODEL
+        return MATH_MODEL
+    if subject == "history":
+        from specialists.history import HISTORY_MODEL
+        return HISTORY_MODEL
+    from specialists.english import ENGLISH_MODEL
+    return ENGLISH_MODEL
+
+
+def _choose_model(
+    subject: str,
+    student_text: str,
+    confidence: float | None = None,
+    record: bool = True,
+) -> str | None:
+    """Tiered specialist model (SPECIALIST_TIERING), or None for the subject's standard model."""
+    try:
+        from specialists.tiering import TIERING_ENABLED, get_tier_router
+        if not TIERING_ENABLED:
+            return None
+        decision = get_tier_router().decide(subject, student_text, confidence, record=record)
+        return decision.model if decision is not None else None
+    except Exception as e:
+        logger.warning(f"Model tiering failed, using the standard model: {e}")
+        return None
+
+
+def _is_cacheable(events: list) -> bool:
+    """Only answers whose every sentence passed moderation cleanly are cached."""
+    return all(not e.flagged and not getattr(e, "error", None) for e in events)
+
+
+def _route_followup(session: SessionUserdata, student_text: str):
+    """Affinity RoutingResult for a follow-up turn (CLASSIFIER_FOLLOWUP), else None."""
+    try:
+        from specialists.followup import FOLLOWUP_ENABLED, get_followup_detector
+        if not FOLLOWUP_ENABLED:
+            return None
+        return get_followup_detector().route(
+            student_text, session.current_subject, session.last_routed_at,
+        )
+    except Exception as e:
+        logger.warning(f"Follow-up detection failed, classifying: {e}")
+        return None
+
+
+async def _resolve_specialist_stream(
+    subject: str,
+    student_text: str,
+    speculative: SpeculativeStream | None,
+    start,
+):
+    """Adopt the speculative stream if it guessed right, else cancel it and start(subject, text)."""
+    if speculative is not None:
+        if speculative.subject == subject:
+            return speculative.adopt()
+        await speculative.cancel()
+    return start(subject, student_text)
+
+
+def _aggregate_guardrail_events(events: list) -> tuple[bool, float, list[str]]:
+    """
+    Collapse per-sentence GuardrailEvents into one audit row.
+
+    Returns (flagged, confidence, categories): flagged if any sentence was,
+    the highest confidence among flagged sentences, and the union of their
+    categories in first-seen order.
+    """
+    flagged_events = [e for e in events if e.flagged]
+    if not flagged_events:
+        return False, 0.0, []
+    categories: dict[str, None] = {}
+    for event in flagged_events:
+        for category in event.categories_flagged:
+            categories[category] = None
+    confidence = max(event.confidence for event in flagged_events)
+    return True, confidence, list(categories)
 
 
 async def _log_routing_decision(
@@ -7,6 +7,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from openai import AsyncOpenAI
 
+from backend.routers.csrf import make_session_token
+from backend.services.conversation_memory import get_memory_store
+
 REALTIME_MODEL = os.environ.get("OPENAI_REALTIME_MODEL", "gpt-4o-realtime-preview-2024-12-17")
 
 router = APIRouter(prefix="/session", tags=["session"])
@@ -25,6 +28,7 @@ def get_openai_client() -> AsyncOpenAI:
 class TokenResponse(BaseModel):
     client_secret: dict
     session_id: str
+    channel_token: str  # authorises WebSocket /ws/session/{session_id} for this session only
 
 
 @router.post("/token", response_model=TokenResponse)
@@ -80,6 +84,7 @@ async def create_session_token(session_id: str) -> TokenResponse:
         return TokenResponse(
             client_secret={"value": session.client_secret.value},
             session_id=session_id,
+            channel_token=make_session_token(session_id),
         )
     except Exception as e:
         logger.error(f"Failed to create OpenAI session: {e}")
@@ -125,6 +130,7 @@ async def close_session(session_id: str, body: CloseSessionRequest | None = None
     """
     report = (body.session_report if body else None) or await _build_session_report(session_id)
     await close_session_record(session_id, report)
+    get_memory_store().drop(session_id)
     return CloseSessionResponse(session_id=session_id, closed=True)
 
 
@@ -5,6 +5,7 @@ WebSocket /ws/teacher/{session_id}
   - Teacher connects to observe a student session in real time
   - Receives all transcript turns + escalation events
   - Can inject text that appears as 'teacher hint' in student session
+    (delivered on the session push channel, SESSION_CHANNEL)
 
 Version B tradeoff vs Version A (LiveKit):
 - Version A: Teacher joins a LiveKit room → full audio/video, media routing,
@@ -21,6 +22,7 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from backend.routers.csrf import require_csrf
+from backend.services import session_channel
 
 from backend.services.human_escalation import (
     add_teacher_connection,
@@ -76,6 +78,10 @@ async def teacher_websocket(websocket: WebSocket, session_id: str) -> None:
                     "text": data.get("text", ""),
                     "from": "teacher",
                 })
+                session_channel.publish(session_id, "teacher_hint", {
+                    "text": data.get("text", ""),
+                    "from": "teacher",
+                })
                 logger.info(f"Teacher hint relayed for session {session_id}")
 
             elif msg_type == "ping":
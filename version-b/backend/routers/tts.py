@@ -3,6 +3,12 @@ TTS streaming router for Version B.
 
 POST /tts/stream → streams chunked PCM audio from OpenAI TTS.
 
+Incremental mode ({"incremental": true}) can be requested as soon as the job
+is dispatched: each guardrailed sentence is synthesized the moment it lands
+on the job's event log and its PCM is appended to the same response, which
+stays open until the job completes. Time-to-first-audio is then set by the
+first sentence, not the whole answer.
+
 CRITICAL: Stream chunks as they arrive — NEVER buffer the full response.
 Client plays chunks via Web Audio API while backend is still generating.
 
@@ -23,8 +29,9 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from backend.routers.csrf import require_csrf
-from backend.services.job_store import get_job
-from backend.models.job import JobStatus
+from backend.services.answer_cache import get_answer_cache
+from backend.services.job_store import load_job, wait_for_job_event
+from backend.models.job import JobEventType, JobStatus, OrchestratorJob
 
 router = APIRouter(prefix="/tts", tags=["tts"])
 logger = logging.getLogger(__name__)
@@ -32,6 +39,8 @@ limiter = Limiter(key_func=get_remote_address)
 
 _openai: AsyncOpenAI | None = None
 TTS_CHUNK_SIZE = 4096  # bytes per chunk (~128ms at 16kHz PCM16)
+# Incremental mode: give up if the next sentence (or completion) takes longer
+TTS_SENTENCE_TIMEOUT_S = 30.0
 
 
 def get_openai_client() -> AsyncOpenAI:
@@ -44,6 +53,7 @@ def get_openai_client() -> AsyncOpenAI:
 class TtsStreamRequest(BaseModel):
     job_id: str
     voice: str = "alloy"
+    incremental: bool = False  # synthesize sentences as they are guardrailed
 
 
 @router.post("/stream", dependencies=[Depends(require_csrf)])
@@ -52,7 +62,9 @@ async def stream_tts(request: Request, req: TtsStreamRequest) -> StreamingRespon
     """
     Stream TTS audio for a completed orchestration job.
 
-    Client calls this after polling GET /orchestrate/{job_id} returns tts_ready=True.
+    Client calls this after polling GET /orchestrate/{job_id} returns tts_ready=True
+    — or, with incremental=true, right after dispatch (the response stays open
+    and carries each sentence's audio as it is guardrailed).
     Returns chunked PCM16 at 24kHz mono — client feeds into Web Audio API buffer.
 
     Audio flow (Version B):
@@ -62,18 +74,25 @@ async def stream_tts(request: Request, req: TtsStreamRequest) -> StreamingRespon
     4. This endpoint streams PCM chunks → client decodes + plays
     5. On stream end, client unmutes Realtime audio (50ms crossfade)
     """
-    job = get_job(req.job_id)
+    job = await load_job(req.job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if job.status == JobStatus.ERROR:
         raise HTTPException(status_code=422, detail=job.error_message or "Job failed")
 
-    if not job.tts_ready or not job.safe_text:
+    if req.incremental and not job.tts_ready:
+        stream = _stream_sentence_audio(job, req.voice)
+    elif not job.tts_ready or not job.safe_text:
         raise HTTPException(status_code=409, detail="Job not ready for TTS")
-
+    else:
+        audio = _cached_audio(job.answer_cache_key, req.voice)
+        stream = (
+            _replay_audio_chunks(audio) if audio is not None
+            else _stream_audio_chunks(job.safe_text, req.voice, cache_key=job.answer_cache_key)
+        )
     return StreamingResponse(
-        _stream_audio_chunks(job.safe_text, req.voice),
+        stream,
         media_type="audio/pcm",
         headers={
             "X-Audio-Sample-Rate": "24000",
@@ -83,27 +102,101 @@ async def stream_tts(request: Request, req: TtsStreamRequest) -> StreamingRespon
     )
 
 
-async def _stream_audio_chunks(text: str, voice: str):
+def _cached_audio(cache_key: str | None, voice: str) -> bytes | None:
+    """Synthesized audio for a cached answer (ANSWER_CACHE_AUDIO), if any."""
+    if not cache_key:
+        return None
+    return get_answer_cache().get_audio(cache_key, voice)
+
+
+async def _replay_audio_chunks(audio: bytes):
+    """Replay cached PCM in TTS_CHUNK_SIZE chunks."""
+    for start in range(0, len(audio), TTS_CHUNK_SIZE):
+        yield audio[start:start + TTS_CHUNK_SIZE]
+        await asyncio.sleep(0)
+
+
+async def _synthesize(text: str, voice: str):
     """
-    Stream PCM16 audio from OpenAI TTS.
+    Stream PCM16 audio for text from OpenAI TTS (errors propagate).
 
     CRITICAL: Use response.iter_bytes() and yield as chunks arrive.
     Never accumulate into a list or bytes object before yielding.
     """
     client = get_openai_client()
+    async with client.audio.speech.with_streaming_response.create(
+        model="tts-1",
+        voice=voice,
+        input=text,
+        response_format="pcm",  # Raw PCM16 @ 24kHz mono
+    ) as response:
+        async for chunk in response.iter_bytes(chunk_size=TTS_CHUNK_SIZE):
+            if chunk:
+                yield chunk
+                # Yield control to event loop between chunks
+                await asyncio.sleep(0)
+
+
+async def _stream_audio_chunks(text: str, voice: str, cache_key: str | None = None):
+    """
+    Stream PCM16 audio for a complete answer.
+
+    With cache_key (answer cache + ANSWER_CACHE_AUDIO) a copy of each chunk
+    is kept after it has been yielded and stored once the stream completes.
+    """
+    cache = get_answer_cache() if cache_key else None
+    keep_audio = cache is not None and cache.cache_audio
+    audio_chunks: list[bytes] = []
     try:
-        async with client.audio.speech.with_streaming_response.create(
-            model="tts-1",
-            voice=voice,
-            input=text,
-            response_format="pcm",  # Raw PCM16 @ 24kHz mono
-        ) as response:
-            async for chunk in response.iter_bytes(chunk_size=TTS_CHUNK_SIZE):
-                if chunk:
-                    yield chunk
-                    # Yield control to event loop between chunks
-                    await asyncio.sleep(0)
+        async for chunk in _synthesize(text, voice):
+            yield chunk
+            if keep_audio:
+                audio_chunks.append(chunk)
+        if keep_audio:
+            cache.put_audio(cache_key, voice, b"".join(audio_chunks), text)
     except Exception as e:
         logger.error(f"TTS streaming error: {e}")
         # Can't raise HTTPException inside a streaming response generator
         # Client will see a truncated stream and should handle gracefully
+
+
+async def _stream_sentence_audio(job: OrchestratorJob, voice: str):
+    """
+    Incremental mode: synthesize each guardrailed sentence as it lands on the
+    job and concatenate the PCM into one stream, ending when the job does.
+
+    Sentences are synthesized one at a time, in order (TTS streams faster
+    than real time, so the client's buffer covers the next request's
+    latency). Audio is cached like a full answer when every sentence
+    synthesized and the job completed with an answer cache key.
+    """
+    # The answer cache key is only set once the job is classified
+    cache = get_answer_cache()
+    keep_audio = cache.cache_audio
+    audio_chunks: list[bytes] = []
+    last_event_id = 0
+    try:
+        while True:
+            for event in job.events_after(last_event_id):
+                last_event_id = event.id
+                if event.type == JobEventType.SENTENCE:
+                    async for chunk in _synthesize(event.data["text"], voice):
+                        yield chunk
+                        if keep_audio:
+                            audio_chunks.append(chunk)
+                elif event.type == JobEventType.COMPLETE:
+                    if keep_audio and job.answer_cache_key:
+                        cache.put_audio(
+                            job.answer_cache_key, voice, b"".join(audio_chunks), event.data.get("safe_text", ""),
+                        )
+                    return
+                elif event.type == JobEventType.ERROR:
+                    logger.warning(f"Job {job.id[:8]} failed mid-answer, ending incremental TTS")
+                    return
+            updated = await wait_for_job_event(job, last_event_id, timeout=TTS_SENTENCE_TIMEOUT_S)
+            if updated is None:
+                logger.warning(f"Job {job.id[:8]} produced no sentence in {TTS_SENTENCE_TIMEOUT_S}s, ending TTS")
+                return
+            job = updated
+    except Exception as e:
+        logger.error(f"Incremental TTS streaming error: {e}")
@@ -0,0 +1,199 @@
+"""
+Guardrailed answer cache for Version B.
+
+Popular questions ("what caused World War I", "what is a noun") were answered
+from scratch by GPT-4o / Sonnet and re-moderated every time. AnswerCache
+stores the final guardrailed safe_text keyed by
+
+    subject | specialist model | normalized question
+
+so a model upgrade never serves the old model's answers. A hit completes the
+OrchestratorJob immediately — no specialist call, no moderation. With
+ANSWER_CACHE_AUDIO the TTS stream for a cached answer is kept too (per voice)
+and replayed on later hits.
+
+Bounded three ways: ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SIZE entries and
+ANSWER_CACHE_MAX_BYTES of text + audio (LRU eviction).
+
+CRITICAL: Only clean answers are stored — any flagged sentence, moderation
+error or fail-closed fallback makes the turn uncacheable. Follow-up turns
+and very short questions ("why?") depend on context and are never cached or
+served. A standalone question is served even when the session has history,
+but an answer generated with history is not stored (it may refer back).
+Audio is only attached to the entry whose safe_text it was synthesized from.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from specialists.routing_cache import normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE", "false").lower() in ("1", "true", "yes")
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "2000"))
+ANSWER_CACHE_TTL_SECONDS = float(os.environ.get("ANSWER_CACHE_TTL_SECONDS", "86400"))
+ANSWER_CACHE_MAX_BYTES = int(os.environ.get("ANSWER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+ANSWER_CACHE_AUDIO = os.environ.get("ANSWER_CACHE_AUDIO", "false").lower() in ("1", "true", "yes")
+ANSWER_CACHE_MIN_WORDS = int(os.environ.get("ANSWER_CACHE_MIN_WORDS", "4"))
+
+CACHEABLE_SUBJECTS = ("math", "history", "english")
+
+
+def answer_key(question: str, subject: str, model: str) -> Optional[str]:
+    """Cache key for a self-contained question, or None if it should not be cached."""
+    if subject not in CACHEABLE_SUBJECTS:
+        return None
+    normalized = normalize_transcript(question)
+    if len(normalized.split()) < ANSWER_CACHE_MIN_WORDS:
+        return None
+    return f"{subject}|{model}|{normalized}"
+
+
+@dataclass
+class CachedAnswer:
+    subject: str
+    safe_text: str
+    created_at: float
+    audio: Dict[str, bytes] = field(default_factory=dict)  # voice -> PCM
+
+    @property
+    def size(self) -> int:
+        return len(self.safe_text.encode("utf-8")) + sum(len(a) for a in self.audio.values())
+
+
+@dataclass
+class SubjectStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class AnswerCache:
+    """TTL + LRU cache of guardrailed answers (and optionally their audio)."""
+
+    def __init__(
+        self,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_bytes: int = ANSWER_CACHE_MAX_BYTES,
+        cache_audio: bool = ANSWER_CACHE_AUDIO,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max(1, max_size)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.cache_audio = cache_audio
+        self._clock = clock
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._bytes = 0
+        # Called with the key of every entry that expires, is evicted or replaced
+        self.on_remove: Optional[Callable[[str], None]] = None
+        self.stats: Dict[str, SubjectStats] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    def _subject_stats(self, subject: str) -> SubjectStats:
+        return self.stats.setdefault(subject, SubjectStats())
+
+    def _lookup(self, key: str) -> Optional[CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._clock() - entry.created_at > self.ttl_seconds:
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: str, subject: str) -> Optional[CachedAnswer]:
+        entry = self._lookup(key)
+        if entry is None:
+            self._subject_stats(subject).misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._subject_stats(subject).hits += 1
+        return entry
+
+    def put(self, key: str, subject: str, safe_text: str) -> None:
+        if not safe_text:
+            return
+        if key in self._entries:
+            self._remove(key)
+        entry = CachedAnswer(subject=subject, safe_text=safe_text, created_at=self._clock())
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._subject_stats(subject).stores += 1
+        self._evict()
+
+    def get_audio(self, key: str, voice: str) -> Optional[bytes]:
+        if not self.cache_audio:
+            return None
+        entry = self._lookup(key)
+        return entry.audio.get(voice) if entry is not None else None
+
+    def put_audio(self, key: str, voice: str, audio: bytes, safe_text: str) -> None:
+        """
+        Attach audio synthesized from safe_text to the entry under key.
+
+        No-op if the entry expired, was evicted, or now holds a different
+        answer (replaced while the audio was being synthesized).
+        """
+        if not self.cache_audio or not audio:
+            return
+        entry = self._lookup(key)
+        if entry is None or entry.safe_text != safe_text:
+            return
+        self._bytes -= entry.size
+        entry.audio[voice] = audio
+        self._bytes += entry.size
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_size or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if self.on_remove is not None:
+            try:
+                self.on_remove(key)
+            except Exception as e:
+                logger.warning(f"Answer cache removal hook failed: {e}")
+
+    def snapshot(self) -> dict:
+        return {
+            "subjects": {subject: stats.snapshot() for subject, stats in self.stats.items()},
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache (lazily created)."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache()
+    return _answer_cache
@@ -0,0 +1,236 @@
+"""
+Per-session conversation memory for Version B specialists.
+
+Specialists used to be called without conversation_history, so every turn
+was stateless. Passing the whole transcript instead would grow prompts (and
+latency and cost) without bound. SessionMemory keeps prompt size bounded
+however long the session runs:
+
+- ring buffer: at most CONVERSATION_MEMORY_MAX_TURNS recent turns
+- token budget: oldest turns are trimmed until the estimated prompt
+  tokens fit CONVERSATION_MEMORY_TOKEN_BUDGET
+- rolling summary (CONVERSATION_MEMORY_SUMMARIZE): trimmed turns are folded
+  into a short summary by a small model, in the background after the turn
+  completes, and sent ahead of the retained turns
+
+The store itself is an LRU of CONVERSATION_MEMORY_MAX_SESSIONS sessions and
+drops a session when it is closed.
+
+CRITICAL: Only safe_text (what the student actually heard) is stored as the
+assistant turn — never the raw specialist output.
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ENABLED = os.environ.get("CONVERSATION_MEMORY", "false").lower() in ("1", "true", "yes")
+MEMORY_MAX_TURNS = int(os.environ.get("CONVERSATION_MEMORY_MAX_TURNS", "12"))
+MEMORY_TOKEN_BUDGET = int(os.environ.get("CONVERSATION_MEMORY_TOKEN_BUDGET", "1500"))
+MEMORY_MAX_SESSIONS = int(os.environ.get("CONVERSATION_MEMORY_MAX_SESSIONS", "1000"))
+MEMORY_SUMMARIZE = os.environ.get("CONVERSATION_MEMORY_SUMMARIZE", "false").lower() in ("1", "true", "yes")
+SUMMARY_MODEL = os.environ.get("CONVERSATION_MEMORY_SUMMARY_MODEL", "gpt-4o-mini")
+
+SUMMARY_MAX_TOKENS = 200
+# Rough chars-per-token; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+# Per-message overhead (role, separators) in the estimate
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of our earlier conversation: "
+SUMMARY_ACK = "Thanks, I'll keep that in mind."
+
+SUMMARY_PROMPT = """Summarize this tutoring conversation for the tutor's own reference.
+Keep the subjects, the student's questions, key answers and anything the student struggled with.
+Be brief: at most five short sentences. Fold in the previous summary if one is given."""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class Turn:
+    student: str
+    assistant: str
+    subject: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.student) + estimate_tokens(self.assistant)
+
+
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+
+async def summarize_turns(previous_summary: str, turns: List[Turn], client=None) -> str:
+    """Fold turns into the previous summary with a small, fast model."""
+    from clients.registry import get_openai_client
+
+    _client = client or get_openai_client()
+    transcript = "\n".join(
+        f"Student ({turn.subject}): {turn.student}\nTutor: {turn.assistant}" for turn in turns
+    )
+    content = f"Previous summary: {previous_summary}\n\n{transcript}" if previous_summary else transcript
+    response = await _client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": content},
+        ],
+        max_tokens=SUMMARY_MAX_TOKENS,
+        temperature=0.2,
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+class SessionMemory:
+    """Ring buffer of one session's turns, trimmed to a token budget."""
+
+    def __init__(
+        self,
+        max_turns: int = MEMORY_MAX_TURNS,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.max_turns = max(1, max_turns)
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.turns: Deque[Turn] = deque()
+        self.summary = ""
+        self._evicted: List[Turn] = []   # trimmed turns not yet folded into the summary
+        self._compacting = False
+        self.trimmed = 0
+        self.summaries = 0
+
+    def _summary_tokens(self) -> int:
+        if not self.summary:
+            return 0
+        return estimate_tokens(SUMMARY_PREFIX + self.summary) + estimate_tokens(SUMMARY_ACK)
+
+    def tokens(self) -> int:
+        """Estimated prompt tokens of history() as it stands."""
+        return self._summary_tokens() + sum(turn.tokens for turn in self.turns)
+
+    def add(self, student: str, assistant: str, subject: str) -> None:
+        """Record a completed turn and trim to the turn limit and token budget."""
+        self.turns.append(Turn(student, assistant, subject))
+        while len(self.turns) > self.max_turns:
+            self._evict()
+        # Always keep the latest turn, even if it alone exceeds the budget
+        while len(self.turns) > 1 and self.tokens() > self.token_budget:
+            self._evict()
+
+    def _evict(self) -> None:
+        self._evicted.append(self.turns.popleft())
+        self.trimmed += 1
+        if self.summarizer is None:
+            self._evicted.clear()
+
+    def history(self) -> list:
+        """conversation_history for answer_*_question: alternating user/assistant messages."""
+        messages = []
+        if self.summary:
+            messages.append({"role": "user", "content": SUMMARY_PREFIX + self.summary})
+            messages.append({"role": "assistant", "content": SUMMARY_ACK})
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn.student})
+            messages.append({"role": "assistant", "content": turn.assistant})
+        return messages
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.summarizer is not None and bool(self._evicted)
+
+    async def compact(self) -> None:
+        """Fold evicted turns into the rolling summary. Never raises."""
+        if self.summarizer is None or not self._evicted or self._compacting:
+            return
+        self._compacting = True
+        batch, self._evicted = self._evicted, []
+        try:
+            summary = await self.summarizer(self.summary, batch)
+            # Bound the summary too, in case the model ignores max_tokens
+            self.summary = summary[: SUMMARY_MAX_TOKENS * CHARS_PER_TOKEN]
+            self.summaries += 1
+        except Exception as e:
+            # Dropped turns stay dropped; the retained window is still valid
+            logger.warning(f"Conversation summary failed: {e}")
+        finally:
+            self._compacting = False
+        # Retained turns may no longer fit next to a longer summary
+        # (trimmed ones are folded in on the next compaction)
+        while len(self.turns) > 1 and self.tokens() > self.token_budget:
+            self._evict()
+
+
+class ConversationMemoryStore:
+    """LRU of SessionMemory keyed by session_id."""
+
+    def __init__(
+        self,
+        max_sessions: int = MEMORY_MAX_SESSIONS,
+        max_turns: int = MEMORY_MAX_TURNS,
+        token_budget: int = MEMORY_TOKEN_BUDGET,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, session_id: str) -> SessionMemory:
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            memory = SessionMemory(self.max_turns, self.token_budget, self.summarizer)
+            self._sessions[session_id] = memory
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        return memory
+
+    def history(self, session_id: str) -> list:
+        memory = self._sessions.get(session_id)
+        return memory.history() if memory is not None else []
+
+    def record(self, session_id: str, student: str, assistant: str, subject: str) -> None:
+        """Add a completed turn and fold trimmed turns into the summary in the background."""
+        memory = self.get(session_id)
+        memory.add(student, assistant, subject)
+        if memory.needs_compaction:
+            asyncio.create_task(memory.compact(), name=f"memory-compact-{session_id[:8]}")
+
+    def drop(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def snapshot(self) -> dict:
+        memories = list(self._sessions.values())
+        return {
+            "sessions": len(memories),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "turns": sum(len(m.turns) for m in memories),
+            "trimmed_turns": sum(m.trimmed for m in memories),
+            "summaries": sum(m.summaries for m in memories),
+            "max_session_tokens": max((m.tokens() for m in memories), default=0),
+            "token_budget": self.token_budget,
+        }
+
+
+_store: Optional[ConversationMemoryStore] = None
+
+
+def get_memory_store() -> ConversationMemoryStore:
+    """Process-wide conversation memory (lazily created)."""
+    global _store
+    if _store is None:
+        _store = ConversationMemoryStore(summarizer=summarize_turns if MEMORY_SUMMARIZE else None)
+    return _store
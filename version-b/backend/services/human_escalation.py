@@ -52,6 +52,10 @@ async def notify_escalation(
         "teacher_ws_url": teacher_ws_url,
     })
 
+    # Tell the student's session (push channel, if enabled)
+    from backend.services.session_channel import publish
+    publish(session_id, "escalation", {"reason": reason, "teacher_ws_url": teacher_ws_url})
+
     # Save to DB
     try:
         from backend.services.transcript_store import get_pool
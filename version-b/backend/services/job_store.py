@@ -1,56 +1,598 @@
 """
-In-memory job store with background TTL cleanup.
-Handles async job lifecycle for orchestration pipeline.
+Job store for the async orchestration pipeline.
+
+Backends are pluggable:
+- InMemoryJobStore: per-process, bounded (see below) (default).
+  Only the worker that dispatched a job can answer polls for it.
+- RedisJobStore: job state as a Redis hash per job, shared by every
+  backend-b worker (JOB_STORE_REDIS_URL). Expiry uses key TTL, and
+  completion/event wake-ups use pub/sub, so GET /orchestrate/{job_id},
+  /wait, /events and /tts/stream work on any worker.
+
+The worker running a job keeps the live OrchestratorJob in _jobs (fast local
+reads, asyncio wake-ups). Every job event marks it dirty, and a single writer
+task per job then writes the latest state and publishes on
+"<prefix><job_id>:events". Other workers load a snapshot from the hash and
+wait on that channel.
+
+Local jobs (_jobs, both backends) are bounded:
+- expiry index: two time-ordered queues — finished jobs expire
+  JOB_STORE_TTL_SECONDS after completion, jobs still PENDING/PROCESSING
+  after JOB_STORE_STUCK_SECONDS are reaped (marked ERROR so waiters wake).
+  Deadlines are appended in time order, so a sweep only pops expired heads
+  (amortized O(1) per job) instead of scanning every job
+- caps: at most JOB_STORE_MAX_JOBS jobs and JOB_STORE_MAX_BYTES of estimated
+  job text (a running total, updated per event). Beyond either the least
+  recently used *finished* job is evicted; only when no finished job is left
+  does an unfinished one go, and it is marked ERROR so its waiters wake
+
+CRITICAL: Job writes never block the orchestration task. Writes are
+coalesced per job, so the last state written is always the newest, and a
+failed write is retried with the next event.
 """
 import asyncio
+import json
 import logging
-from typing import Dict, Optional
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from backend.models.job import JobEvent, JobEventType, JobStatus, OrchestratorJob
 
 logger = logging.getLogger(__name__)
 
-# In-memory store: job_id -> OrchestratorJob
-_jobs: Dict[str, "OrchestratorJob"] = {}
+JOB_STORE_REDIS_URL = os.environ.get("JOB_STORE_REDIS_URL", "")
+# Finished jobs expire this long after completion (Redis key TTL / cleanup loop)
+JOB_TTL_SECONDS = int(os.environ.get("JOB_STORE_TTL_SECONDS", "3600"))
+# Unfinished jobs expire if their worker stops updating them (crashed worker)
+JOB_PENDING_TTL_SECONDS = int(os.environ.get("JOB_STORE_PENDING_TTL_SECONDS", "600"))
+# Local jobs still unfinished after this are reaped as stuck
+JOB_STUCK_SECONDS = float(os.environ.get("JOB_STORE_STUCK_SECONDS", "300"))
+# Local caps (LRU eviction beyond either, finished jobs first)
+JOB_MAX_JOBS = int(os.environ.get("JOB_STORE_MAX_JOBS", "10000"))
+JOB_MAX_BYTES = int(os.environ.get("JOB_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+# How often the cleanup task sweeps the expiry index
+JOB_SWEEP_SECONDS = float(os.environ.get("JOB_STORE_SWEEP_SECONDS", "30"))
+
+# Fixed per-job estimate (object, ids, timestamps, asyncio events) on top of its text
+JOB_OVERHEAD_BYTES = 1024
+
+
+def _fixed_bytes(job: OrchestratorJob) -> int:
+    return JOB_OVERHEAD_BYTES + len(job.student_text) + len(job.safe_text or "") + len(job.raw_text or "")
+
+
+def _event_bytes(event: JobEvent) -> int:
+    return 64 + sum(len(str(value)) for value in event.data.values())
+
+
+def estimate_job_bytes(job: OrchestratorJob) -> int:
+    """Rough memory footprint of a job: overhead + its text and event payloads."""
+    size = _fixed_bytes(job)
+    size += sum(len(sentence) for sentence in job.sentences)
+    size += sum(_event_bytes(event) for event in job.events)
+    return size
+
+
+@dataclass
+class LocalJobStats:
+    stored: int = 0
+    expired: int = 0           # finished jobs past their TTL
+    reaped_stuck: int = 0      # unfinished jobs past JOB_STUCK_SECONDS
+    evicted: int = 0           # LRU evictions for the job or byte cap
+    evicted_unfinished: int = 0  # no finished job left to evict; marked ERROR
+
+    def snapshot(self) -> dict:
+        return {
+            "stored": self.stored,
+            "expired": self.expired,
+            "reaped_stuck": self.reaped_stuck,
+            "evicted": self.evicted,
+            "evicted_unfinished": self.evicted_unfinished,
+        }
+
+
+class LocalJobs:
+    """
+    This process's jobs: LRU-ordered, size-accounted, with a time-ordered
+    expiry index.
+
+    The index is two deques of (deadline, job_id): one for unfinished jobs
+    (stuck deadline, appended on put) and one for finished jobs (TTL,
+    appended on completion). Each deque's offset is constant, so it is
+    sorted by construction. Entries for jobs that were removed, or that
+    finished before their stuck deadline, are skipped lazily when popped.
+
+    Finished jobs are also kept in their own LRU order, so the caps evict
+    them first without scanning past running ones. Each job's byte estimate
+    is updated from its new sentences and events only, never re-summed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = JOB_TTL_SECONDS,
+        stuck_seconds: float = JOB_STUCK_SECONDS,
+        max_jobs: int = JOB_MAX_JOBS,
+        max_bytes: int = JOB_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stuck_seconds = stuck_seconds
+        self.max_jobs = max(1, max_jobs)
+        self.max_bytes = max_bytes
+        self.stats = LocalJobStats()
+        self._clock = clock
+        self._jobs: "OrderedDict[str, OrchestratorJob]" = OrderedDict()
+        self._done: "OrderedDict[str, None]" = OrderedDict()  # finished jobs, LRU order
+        self._bytes: Dict[str, int] = {}
+        self._counted: Dict[str, Tuple[int, int, int]] = {}  # (sentences, events, fixed bytes)
+        self._total_bytes = 0
+        self._unfinished: Deque[Tuple[float, str]] = deque()
+        self._finished: Deque[Tuple[float, str]] = deque()
+
+    # -- dict-like access ---------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def items(self) -> Iterator[Tuple[str, OrchestratorJob]]:
+        return iter(list(self._jobs.items()))
+
+    def get(self, job_id: str) -> Optional[OrchestratorJob]:
+        """Look up a job, marking it most recently used."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            self._jobs.move_to_end(job_id)
+            if job_id in self._done:
+                self._done.move_to_end(job_id)
+        return job
+
+    def pop(self, job_id: str, default: Optional[OrchestratorJob] = None) -> Optional[OrchestratorJob]:
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return default
+        self._done.pop(job_id, None)
+        self._counted.pop(job_id, None)
+        self._total_bytes -= self._bytes.pop(job_id, 0)
+        return job
+
+    def clear(self) -> None:
+        self._jobs.clear()
+        self._done.clear()
+        self._bytes.clear()
+        self._counted.clear()
+        self._total_bytes = 0
+        self._unfinished.clear()
+        self._finished.clear()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def put(self, job: OrchestratorJob) -> None:
+        if self._jobs.get(job.id) is job:
+            self.get(job.id)
+            return
+        now = self._clock()
+        self.pop(job.id)
+        self._jobs[job.id] = job
+        self._bytes[job.id] = 0
+        self._counted[job.id] = (0, 0, 0)
+        self._account(job)
+        if job.finished:
+            self._done[job.id] = None
+            self._finished.append((now + self.ttl_seconds, job.id))
+        else:
+            self._unfinished.append((now + self.stuck_seconds, job.id))
+        job.listeners.append(lambda event: self._on_event(job, event))
+        self.stats.stored += 1
+        self.sweep(now)
+        self._enforce_caps(keep=job.id)
+
+    def _account(self, job: OrchestratorJob) -> None:
+        """Add the bytes of sentences/events appended since the last call."""
+        sentences, events, fixed = self._counted[job.id]
+        new_fixed = _fixed_bytes(job)
+        delta = new_fixed - fixed
+        delta += sum(len(sentence) for sentence in job.sentences[sentences:])
+        delta += sum(_event_bytes(event) for event in job.events[events:])
+        self._counted[job.id] = (len(job.sentences), len(job.events), new_fixed)
+        self._bytes[job.id] += delta
+        self._total_bytes += delta
+
+    def _on_event(self, job: OrchestratorJob, event: JobEvent) -> None:
+        if self._jobs.get(job.id) is not job:
+            return  # evicted or replaced
+        self._account(job)
+        if event.type in (JobEventType.COMPLETE, JobEventType.ERROR):
+            self._done[job.id] = None
+            self._finished.append((self._clock() + self.ttl_seconds, job.id))
+        self._enforce_caps(keep=job.id)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Expire finished jobs past their TTL and reap stuck ones. Returns jobs removed."""
+        now = self._clock() if now is None else now
+        removed = 0
+        while self._finished and self._finished[0][0] <= now:
+            _, job_id = self._finished.popleft()
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished:
+                self.pop(job_id)
+                self.stats.expired += 1
+                removed += 1
+        while self._unfinished and self._unfinished[0][0] <= now:
+            _, job_id = self._unfinished.popleft()
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished:
+                self.pop(job_id)
+                # Wake /wait, /events and incremental TTS instead of leaving them hanging
+                job.mark_error(f"Job did not finish within {self.stuck_seconds:.0f}s")
+                self.stats.reaped_stuck += 1
+                removed += 1
+                logger.warning(f"Reaped stuck job {job_id[:8]} ({job.status.value})")
+        return removed
+
+    def _enforce_caps(self, keep: Optional[str] = None) -> None:
+        while len(self._jobs) > self.max_jobs or (
+            self._total_bytes > self.max_bytes and len(self._jobs) > 1
+        ):
+            # The job being written is never evicted for its own growth
+            job_id = _first_other(self._done, keep) or _first_other(self._jobs, keep)
+            if job_id is None:
+                return
+            job = self.pop(job_id)
+            self.stats.evicted += 1
+            if job is not None and not job.finished:
+                self.stats.evicted_unfinished += 1
+                job.mark_error("Job evicted: job store is full")
+                logger.warning(f"Evicted unfinished job {job_id[:8]}: no finished jobs left to evict")
+
+    def snapshot(self) -> dict:
+        return {
+            "local_jobs": len(self._jobs),
+            "local_bytes": self._total_bytes,
+            "max_jobs": self.max_jobs,
+            "max_bytes": self.max_bytes,
+            "expiry_index": len(self._finished) + len(self._unfinished),
+            **self.stats.snapshot(),
+        }
+
+
+def _first_other(ordered: "OrderedDict[str, Any]", keep: Optional[str]) -> Optional[str]:
+    """Least recently used key other than keep (at most two keys are looked at)."""
+    for key in ordered:
+        if key != keep:
+            return key
+    return None
+
+
+# Live jobs of this process
+_jobs = LocalJobs()
 _cleanup_task: Optional[asyncio.Task] = None
 
+_DATETIME_FIELDS = ("dispatched_at", "classified_at", "completed_at")
+_OPTIONAL_TEXT_FIELDS = ("session_id", "subject", "raw_text", "safe_text", "answer_cache_key", "error_message")
+
+
+def job_to_hash(job: OrchestratorJob) -> Dict[str, str]:
+    """Flat string mapping of a job for a Redis hash (None → "")."""
+    mapping = {
+        "id": job.id,
+        "status": job.status.value,
+        "student_text": job.student_text,
+        "tts_ready": "1" if job.tts_ready else "0",
+        "sentences": json.dumps(job.sentences),
+        "events": json.dumps([
+            {"id": event.id, "type": event.type.value, "data": event.data} for event in job.events
+        ]),
+    }
+    for name in _OPTIONAL_TEXT_FIELDS:
+        mapping[name] = getattr(job, name) or ""
+    for name in _DATETIME_FIELDS:
+        value = getattr(job, name)
+        mapping[name] = value.isoformat() if value else ""
+    return mapping
+
+
+def job_from_hash(mapping: Dict[Any, Any]) -> OrchestratorJob:
+    """Rebuild a (read-only snapshot) job from job_to_hash output."""
+    data = {
+        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+        for k, v in mapping.items()
+    }
+    job = OrchestratorJob(
+        id=data["id"],
+        status=JobStatus(data["status"]),
+        student_text=data.get("student_text", ""),
+        tts_ready=data.get("tts_ready") == "1",
+        sentences=json.loads(data.get("sentences") or "[]"),
+        events=[
+            JobEvent(id=event["id"], type=JobEventType(event["type"]), data=event["data"])
+            for event in json.loads(data.get("events") or "[]")
+        ],
+    )
+    for name in _OPTIONAL_TEXT_FIELDS:
+        setattr(job, name, data.get(name) or None)
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            setattr(job, name, datetime.fromisoformat(data[name]))
+    if job.finished:
+        job._completion_event.set()
+    return job
+
+
+@dataclass
+class JobStoreStats:
+    remote_loads: int = 0      # jobs read from the shared store (dispatched elsewhere)
+    writes: int = 0
+    write_errors: int = 0
+    wakeups: int = 0           # pub/sub notifications that delivered a new event
+
+    def snapshot(self) -> dict:
+        return {
+            "remote_loads": self.remote_loads,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "wakeups": self.wakeups,
+        }
+
+
+class JobStore:
+    """Job storage interface. put/get/remove are sync; shared reads and waits are async."""
+
+    def __init__(self):
+        self.stats = JobStoreStats()
+
+    def put(self, job: OrchestratorJob) -> None:
+        _jobs.put(job)
+
+    def get(self, job_id: str) -> Optional[OrchestratorJob]:
+        """A job running (or kept) in this process."""
+        return _jobs.get(job_id)
+
+    def remove(self, job_id: str) -> None:
+        _jobs.pop(job_id, None)
+
+    async def load(self, job_id: str) -> Optional[OrchestratorJob]:
+        """A job from any worker (the live object when it is local)."""
+        return _jobs.get(job_id)
+
+    async def wait_for_event(
+        self, job: OrchestratorJob, last_event_id: int, timeout: float,
+    ) -> Optional[OrchestratorJob]:
+        """The job once it has an event after last_event_id, or None on timeout."""
+        if await job.wait_for_event(last_event_id, timeout=timeout):
+            return job
+        return None
+
+    async def wait_for_completion(self, job: OrchestratorJob, timeout: float) -> Optional[OrchestratorJob]:
+        """The finished job, or None if it did not finish within timeout."""
+        deadline = time.monotonic() + timeout
+        while not job.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            updated = await self.wait_for_event(job, len(job.events), remaining)
+            if updated is None:
+                return None
+            job = updated
+        return job
+
+    def sweep(self) -> int:
+        """Expire/reap local jobs (the shared Redis copies expire by key TTL)."""
+        return _jobs.sweep()
+
+    def snapshot(self) -> dict:
+        return {**_jobs.snapshot(), **self.stats.snapshot()}
+
+
+class InMemoryJobStore(JobStore):
+    """Per-process store, bounded by LocalJobs (expiry index, job/byte caps)."""
+
+    def snapshot(self) -> dict:
+        return {"backend": "memory", **super().snapshot()}
+
+
+class _JobWriter:
+    """Coalesces a job's updates into sequential writes of its latest state."""
+
+    def __init__(self, store: "RedisJobStore", job: OrchestratorJob):
+        self.store = store
+        self.job = job
+        self.dirty = False
+        self.task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self, _event: Optional[JobEvent] = None) -> None:
+        self.dirty = True
+        if self.task is None or self.task.done():
+            try:
+                self.task = asyncio.get_running_loop().create_task(
+                    self._flush(), name=f"job-write-{self.job.id[:8]}"
+                )
+            except RuntimeError:
+                logger.warning(f"Job {self.job.id[:8]} not written: no running event loop")
+
+    async def _flush(self) -> None:
+        while self.dirty:
+            self.dirty = False
+            try:
+                await self.store.write(self.job)
+            except Exception as e:
+                self.store.stats.write_errors += 1
+                logger.warning(f"Job {self.job.id[:8]} write failed: {e}")
+                return
+
+
+class RedisJobStore(JobStore):
+    """
+    Job state shared by every worker: one hash per job (<prefix><job_id>),
+    TTL JOB_PENDING_TTL_SECONDS until finished then JOB_TTL_SECONDS, and a
+    pub/sub message on <prefix><job_id>:events after each write.
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        client: Any = None,
+        ttl_seconds: int = JOB_TTL_SECONDS,
+        pending_ttl_seconds: int = JOB_PENDING_TTL_SECONDS,
+        prefix: str = "orchestrator:job:",
+    ):
+        super().__init__()
+        if client is None:
+            import redis.asyncio as aioredis
+
+            client = aioredis.from_url(url, decode_responses=True)
+        self._redis = client
+        self.ttl_seconds = ttl_seconds
+        self.pending_ttl_seconds = pending_ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return self.prefix + job_id
+
+    def _channel(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}:events"
+
+    def put(self, job: OrchestratorJob) -> None:
+        if _jobs.get(job.id) is job:
+            return  # already stored and syncing
+        super().put(job)
+        writer = _JobWriter(self, job)
+        job.listeners.append(writer.mark_dirty)
+        writer.mark_dirty()
+
+    def remove(self, job_id: str) -> None:
+        super().remove(job_id)
+        try:
+            asyncio.get_running_loop().create_task(self._redis.delete(self._key(job_id)))
+        except RuntimeError:
+            pass
+
+    async def write(self, job: OrchestratorJob) -> None:
+        """Write the job's current state, refresh its TTL and wake waiters."""
+        ttl = self.ttl_seconds if job.finished else self.pending_ttl_seconds
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(job.id), mapping=job_to_hash(job))
+            pipe.expire(self._key(job.id), ttl)
+            pipe.publish(self._channel(job.id), str(len(job.events)))
+            await pipe.execute()
+        self.stats.writes += 1
+
+    async def load(self, job_id: str) -> Optional[OrchestratorJob]:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return job
+        mapping = await self._redis.hgetall(self._key(job_id))
+        if not mapping:
+            return None
+        self.stats.remote_loads += 1
+        return job_from_hash(mapping)
+
+    async def wait_for_event(
+        self, job: OrchestratorJob, last_event_id: int, timeout: float,
+    ) -> Optional[OrchestratorJob]:
+        if _jobs.get(job.id) is job:
+            return await super().wait_for_event(job, last_event_id, timeout)
+
+        deadline = time.monotonic() + timeout
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._channel(job.id))
+        try:
+            notified = False
+            while True:
+                # Re-read after subscribing, so a write in between is not missed
+                fresh = await self.load(job.id)
+                if fresh is None:
+                    return None
+                if len(fresh.events) > last_event_id:
+                    if notified:
+                        self.stats.wakeups += 1
+                    return fresh
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                notified = message is not None
+        finally:
+            await pubsub.unsubscribe(self._channel(job.id))
+            await pubsub.reset()
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            "pending_ttl_seconds": self.pending_ttl_seconds,
+            **super().snapshot(),
+        }
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Process-wide job store: Redis with JOB_STORE_REDIS_URL, else in-memory."""
+    global _store
+    if _store is None:
+        if JOB_STORE_REDIS_URL:
+            try:
+                _store = RedisJobStore(JOB_STORE_REDIS_URL)
+            except Exception as e:
+                logger.warning(f"Redis job store unavailable, using in-memory store: {e}")
+        if _store is None:
+            _store = InMemoryJobStore()
+    return _store
+
 
 def get_job(job_id: str) -> Optional["OrchestratorJob"]:
-    """Retrieve a job by ID."""
-    return _jobs.get(job_id)
+    """Retrieve a job running (or kept) in this process by ID."""
+    return get_job_store().get(job_id)
 
 
 def store_job(job: "OrchestratorJob") -> None:
-    """Store a job in memory."""
-    _jobs[job.id] = job
+    """Store a job (and, with Redis, keep it in sync as it progresses)."""
+    get_job_store().put(job)
     logger.debug(f"Stored job {job.id}")
 
 
 def remove_job(job_id: str) -> None:
-    """Remove a job from memory."""
-    _jobs.pop(job_id, None)
+    """Remove a job from the store."""
+    get_job_store().remove(job_id)
 
 
-async def cleanup_expired_jobs(ttl_seconds: int = 3600) -> None:
-    """Periodically remove old completed jobs to prevent memory growth."""
-    from datetime import datetime, timedelta, timezone
-    from backend.models.job import JobStatus
+async def load_job(job_id: str) -> Optional["OrchestratorJob"]:
+    """Retrieve a job by ID from whichever worker dispatched it."""
+    return await get_job_store().load(job_id)
+
+
+async def wait_for_job_event(
+    job: "OrchestratorJob", last_event_id: int, timeout: float,
+) -> Optional["OrchestratorJob"]:
+    """The (possibly refreshed) job once it has an event after last_event_id, else None."""
+    return await get_job_store().wait_for_event(job, last_event_id, timeout)
 
-    while True:
-        try:
-            await asyncio.sleep(300)  # Check every 5 minutes
-            cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
 
-            expired = [
-                job_id for job_id, job in _jobs.items()
-                if job.status in (JobStatus.COMPLETE, JobStatus.ERROR)
-                and job.completed_at
-                and job.completed_at < cutoff
-            ]
+async def wait_for_job_completion(job: "OrchestratorJob", timeout: float) -> Optional["OrchestratorJob"]:
+    """The finished (possibly refreshed) job, or None on timeout."""
+    return await get_job_store().wait_for_completion(job, timeout)
 
-            for job_id in expired:
-                remove_job(job_id)
 
-            if expired:
-                logger.info(f"Cleaned up {len(expired)} expired jobs")
+async def cleanup_expired_jobs(interval_seconds: float = JOB_SWEEP_SECONDS) -> None:
+    """Periodically sweep the expiry index (expired and stuck jobs)."""
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            removed = get_job_store().sweep()
+            if removed:
+                logger.info(f"Cleaned up {removed} expired jobs")
         except asyncio.CancelledError:
             break
         except Exception as e:
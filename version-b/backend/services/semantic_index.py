@@ -0,0 +1,443 @@
+"""
+Semantic answer reuse for Version B.
+
+The answer cache only matches questions that normalize identically; many
+repeats are paraphrases ("what started World War I" / "why did the First
+World War begin"). SemanticIndex sits behind it:
+
+- embedding: local and network-free — signed hashed bag of word unigrams,
+  bigrams and character 3-grams, L2-normalized (EMBED_DIM floats)
+- index: a fixed-capacity NumPy matrix (ring buffer, oldest overwritten),
+  searched with one matrix product per batch of questions
+- per-subject cosine thresholds (SEMANTIC_CACHE_THRESHOLDS); only history
+  and english are served — math paraphrases ("7 times 8" / "7 times 9")
+  embed almost identically but need different answers
+- critical-token guard: n-gram vectors cannot tell "World War I" from
+  "World War II" or "first" from "last", so a candidate must also agree on
+  numbers, roman numerals, ordinals, negations and the question word
+- content-token guard: "Ottoman" / "Roman", "ended" / "caused", "swim" /
+  "run" and "pronoun" / "noun" all score above 0.75, so a candidate must
+  also have exactly the same content words (stopwords, politeness and plural
+  -s aside). Reuse covers rewordings like "can you explain the causes of the
+  French Revolution" / "the French Revolution causes, please"
+- lifetime: every row carries its answer cache key and lives no longer than
+  that entry — rows older than ANSWER_CACHE_TTL_SECONDS never match, and the
+  answer cache's on_remove hook discards rows it evicts or replaces
+- persistence (SEMANTIC_INDEX_PATH): vectors live in a memory-mapped
+  float32 file, metadata in a JSON sidecar written atomically every
+  SEMANTIC_INDEX_FLUSH_EVERY inserts (in a worker thread, off the event
+  loop) and at shutdown
+
+CRITICAL: Only answers that were stored in the answer cache (clean,
+guardrailed safe_text) are indexed, and entries from another specialist
+model never match.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.services import answer_cache
+from specialists.routing_cache import normalize_transcript
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+SEMANTIC_INDEX_CAPACITY = int(os.environ.get("SEMANTIC_INDEX_CAPACITY", "10000"))
+SEMANTIC_INDEX_PATH = os.environ.get("SEMANTIC_INDEX_PATH", "")
+SEMANTIC_INDEX_FLUSH_EVERY = int(os.environ.get("SEMANTIC_INDEX_FLUSH_EVERY", "20"))
+
+
+def _parse_thresholds(raw: str) -> Dict[str, float]:
+    thresholds = {}
+    for part in raw.split(","):
+        if "=" in part:
+            subject, value = part.split("=", 1)
+            thresholds[subject.strip()] = float(value)
+    return thresholds
+
+
+# Subjects absent from the map are never served semantically
+SEMANTIC_THRESHOLDS = _parse_thresholds(
+    os.environ.get("SEMANTIC_CACHE_THRESHOLDS", "history=0.75,english=0.8")
+)
+
+EMBED_DIM = 1024
+INDEX_VERSION = 2
+# Candidates checked against the critical-token guard per question
+TOP_K = 5
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_CRITICAL = re.compile(
+    r"^(\d+|[ivxlc]+|first|second|third|fourth|fifth|last|final|next|previous|before|after|"
+    r"not|no|never|without|who|what|when|where|why|how|which)$"
+)
+
+
+# Words that never change what is being asked
+_STOPWORDS = frozenset({
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "from", "by", "with", "about", "as", "into",
+    "and", "or", "but", "so", "if", "then", "than",
+    "is", "are", "was", "were", "be", "been", "being", "am", "do", "does", "did", "done",
+    "have", "has", "had", "will", "would", "can", "could", "should", "may", "might", "must",
+    "i", "me", "my", "we", "us", "our", "you", "your", "it", "its", "this", "that", "these", "those",
+    "there", "their", "they", "them", "he", "she", "his", "her",
+    "please", "explain", "tell", "describe", "know", "want", "like", "just", "really", "some", "any",
+})
+
+
+def critical_tokens(text: str) -> frozenset:
+    """Tokens that change the answer even when the wording barely changes."""
+    return frozenset(t for t in _TOKEN.findall(normalize_transcript(text)) if _CRITICAL.match(t))
+
+
+def content_tokens(text: str) -> frozenset:
+    """Non-stopword, non-critical tokens with a plural -s stripped ("causes" == "cause")."""
+    tokens = set()
+    for t in _TOKEN.findall(normalize_transcript(text)):
+        if t in _STOPWORDS or _CRITICAL.match(t):
+            continue
+        if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+            t = t[:-1]
+        tokens.add(t)
+    return frozenset(tokens)
+
+
+def embed(texts: Sequence[str], dim: int = EMBED_DIM) -> np.ndarray:
+    """Embed texts as L2-normalized signed hashed n-gram vectors, shape (len(texts), dim)."""
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = _TOKEN.findall(normalize_transcript(text))
+        grams = [f"w:{t}" for t in tokens]
+        grams += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        padded = f" {' '.join(tokens)} "
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        for gram in grams:
+            h = zlib.crc32(gram.encode("utf-8"))
+            # Top bit picks the sign so collisions cancel rather than accumulate
+            matrix[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@dataclass
+class SemanticMatch:
+    question: str
+    subject: str
+    safe_text: str
+    score: float
+    key: Optional[str] = None
+
+
+@dataclass
+class SemanticStats:
+    hits: int = 0
+    misses: int = 0
+    inserts: int = 0
+    overwrites: int = 0
+    discards: int = 0        # rows removed with their answer cache entry
+    flushes: int = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "overwrites": self.overwrites,
+            "discards": self.discards,
+            "flushes": self.flushes,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SemanticIndex:
+    """Bounded cosine-similarity index over previously guardrailed answers."""
+
+    def __init__(
+        self,
+        capacity: int = SEMANTIC_INDEX_CAPACITY,
+        path: str = SEMANTIC_INDEX_PATH,
+        thresholds: Optional[Dict[str, float]] = None,
+        dim: int = EMBED_DIM,
+        flush_every: int = SEMANTIC_INDEX_FLUSH_EVERY,
+        ttl_seconds: float = answer_cache.ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.capacity = max(1, capacity)
+        self.path = path
+        self.thresholds = dict(SEMANTIC_THRESHOLDS if thresholds is None else thresholds)
+        self.dim = dim
+        self.flush_every = flush_every
+        self.ttl_seconds = ttl_seconds
+        self.stats = SemanticStats()
+        self._count = 0          # filled rows
+        self._next = 0           # next row to write (ring buffer)
+        self._dirty = 0
+        self._flushing: Optional[asyncio.Task] = None
+        # Per-row metadata, parallel to the vector rows
+        self._questions: List[str] = [""] * self.capacity
+        self._critical: List[frozenset] = [frozenset()] * self.capacity
+        self._content: List[frozenset] = [frozenset()] * self.capacity
+        self._subjects = np.empty(self.capacity, dtype=object)
+        self._models = np.empty(self.capacity, dtype=object)
+        self._answers: List[str] = [""] * self.capacity
+        self._created = np.zeros(self.capacity, dtype=np.float64)   # wall clock, survives restarts
+        self._keys: List[Optional[str]] = [None] * self.capacity
+        self._rows_by_key: Dict[str, int] = {}
+        self._vectors = self._open_vectors()
+
+    # ---- persistence -------------------------------------------------------
+
+    @property
+    def _meta_path(self) -> str:
+        return f"{self.path}.meta.json"
+
+    def _open_vectors(self) -> np.ndarray:
+        if not self.path:
+            return np.zeros((self.capacity, self.dim), dtype=np.float32)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)) or ".", exist_ok=True)
+        expected = self.capacity * self.dim * np.dtype(np.float32).itemsize
+        if os.path.exists(self.path) and os.path.getsize(self.path) == expected and self._load_meta():
+            logger.info(f"Semantic index loaded from {self.path} ({self._count} entries)")
+            return np.memmap(self.path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+        if os.path.exists(self.path):
+            logger.warning(f"Semantic index at {self.path} does not match capacity/dim, starting empty")
+        return np.memmap(self.path, dtype=np.float32, mode="w+", shape=(self.capacity, self.dim))
+
+    def _load_meta(self) -> bool:
+        try:
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION or meta.get("capacity") != self.capacity or meta.get("dim") != self.dim:
+                return False
+            self._count, self._next = meta["count"], meta["next"]
+            for i, row in enumerate(meta["rows"]):
+                if row is None:
+                    continue
+                self._questions[i] = row["question"]
+                self._critical[i] = critical_tokens(row["question"])
+                self._content[i] = content_tokens(row["question"])
+                self._subjects[i] = row["subject"]
+                self._models[i] = row["model"]
+                self._answers[i] = row["safe_text"]
+                self._created[i] = row["created_at"]
+                self._keys[i] = row["key"]
+                if row["key"] is not None:
+                    self._rows_by_key[row["key"]] = i
+            return True
+        except Exception as e:
+            logger.warning(f"Semantic index metadata unreadable: {e}")
+            self._count = self._next = 0
+            self._subjects[:] = None
+            self._models[:] = None
+            return False
+
+    def _take_snapshot(self) -> tuple:
+        """Copy the row metadata (cheap, on the caller's thread) and mark it clean."""
+        snapshot = (
+            self._count, self._next, list(self._questions), self._subjects.copy(), self._models.copy(),
+            list(self._answers), self._created.copy(), list(self._keys),
+        )
+        self._dirty = 0
+        return snapshot
+
+    def _write(self, snapshot: tuple) -> None:
+        """Persist vectors (memmap) and a metadata snapshot (atomic JSON)."""
+        count, next_row, questions, subjects, models, answers, created, keys = snapshot
+        self._vectors.flush()
+        rows = [
+            {
+                "question": questions[i],
+                "subject": subjects[i],
+                "model": models[i],
+                "safe_text": answers[i],
+                "created_at": float(created[i]),
+                "key": keys[i],
+            } if subjects[i] is not None else None
+            for i in range(self.capacity)
+        ]
+        meta = {
+            "version": INDEX_VERSION,
+            "capacity": self.capacity,
+            "dim": self.dim,
+            "count": count,
+            "next": next_row,
+            "rows": rows,
+        }
+        tmp = f"{self._meta_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path)
+        self.stats.flushes += 1
+
+    def flush(self) -> None:
+        """Persist synchronously. No-op without a path or changes."""
+        if not self.path or not self._dirty:
+            return
+        self._write(self._take_snapshot())
+
+    async def aflush(self) -> None:
+        """Wait for a background flush, then persist what is left in a worker thread."""
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        if not self.path or not self._dirty:
+            return
+        await asyncio.to_thread(self._write, self._take_snapshot())
+
+    def _schedule_flush(self) -> None:
+        """Flush in a worker thread when an event loop is running, else inline."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flushing is not None and not self._flushing.done():
+            return  # still dirty: the next insert retries
+        self._flushing = loop.create_task(self._flush_in_thread(self._take_snapshot()))
+
+    async def _flush_in_thread(self, snapshot: tuple) -> None:
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except Exception as e:
+            logger.warning(f"Semantic index flush failed: {e}")
+
+    # ---- index -------------------------------------------------------------
+
+    def serves(self, subject: str) -> bool:
+        return subject in self.thresholds
+
+    def add(
+        self,
+        question: str,
+        subject: str,
+        model: str,
+        safe_text: str,
+        key: Optional[str] = None,
+    ) -> None:
+        """Insert one answer (key: its answer cache key), overwriting the oldest row when full."""
+        if not self.serves(subject) or not safe_text:
+            return
+        if key is not None:
+            self.discard(key)
+        row = self._next
+        if self._subjects[row] is not None:
+            self.stats.overwrites += 1
+            self._rows_by_key.pop(self._keys[row], None)
+        self._vectors[row] = embed([question], self.dim)[0]
+        self._questions[row] = question
+        self._critical[row] = critical_tokens(question)
+        self._content[row] = content_tokens(question)
+        self._subjects[row] = subject
+        self._models[row] = model
+        self._answers[row] = safe_text
+        self._created[row] = time.time()
+        self._keys[row] = key
+        if key is not None:
+            self._rows_by_key[key] = row
+        self._next = (row + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.stats.inserts += 1
+        self._dirty += 1
+        if self.flush_every > 0 and self._dirty >= self.flush_every:
+            self._schedule_flush()
+
+    def discard(self, key: str) -> None:
+        """Remove the row stored under an answer cache key (AnswerCache.on_remove)."""
+        row = self._rows_by_key.pop(key, None)
+        if row is None:
+            return
+        self._vectors[row] = 0.0
+        self._subjects[row] = None
+        self._models[row] = None
+        self._questions[row] = self._answers[row] = ""
+        self._keys[row] = None
+        self.stats.discards += 1
+        self._dirty += 1
+
+    def search_batch(
+        self,
+        questions: Sequence[str],
+        subject: str,
+        model: str,
+    ) -> List[Optional[SemanticMatch]]:
+        """
+        Best match per question at or above the subject's threshold that also
+        passes the critical- and content-token guards. One matrix product for
+        the whole batch.
+        """
+        threshold = self.thresholds.get(subject)
+        if threshold is None or self._count == 0 or not questions:
+            return [None] * len(questions)
+        n = self._count
+        mask = (self._subjects[:n] == subject) & (self._models[:n] == model)
+        if self.ttl_seconds > 0:
+            mask &= self._created[:n] >= time.time() - self.ttl_seconds
+        if not mask.any():
+            return [None] * len(questions)
+        scores = embed(questions, self.dim) @ np.asarray(self._vectors[:n]).T   # (batch, n)
+        scores[:, ~mask] = -1.0
+        k = min(TOP_K, n)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results: List[Optional[SemanticMatch]] = []
+        for q, question in enumerate(questions):
+            critical = critical_tokens(question)
+            content = content_tokens(question)
+            match = None
+            for row in sorted(top[q], key=lambda r: -scores[q, r]):
+                score = float(scores[q, row])
+                if score < threshold:
+                    break
+                if self._critical[row] == critical and self._content[row] == content:
+                    match = SemanticMatch(
+                        self._questions[row], subject, self._answers[row], round(score, 4), self._keys[row],
+                    )
+                    break
+            results.append(match)
+        return results
+
+    def search(self, question: str, subject: str, model: str) -> Optional[SemanticMatch]:
+        match = self.search_batch([question], subject, model)[0]
+        if match is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+            logger.info(f"Semantic answer reuse ({match.score:.2f}): {question[:40]!r} ~ {match.question[:40]!r}")
+        return match
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "size": int(sum(s is not None for s in self._subjects[:self._count])),
+            "capacity": self.capacity,
+            "thresholds": self.thresholds,
+            "persistent": bool(self.path),
+        }
+
+
+_index: Optional[SemanticIndex] = None
+
+
+def get_semantic_index() -> SemanticIndex:
+    """
+    Process-wide semantic index (lazily created; loads SEMANTIC_INDEX_PATH if
+    present). Its rows are discarded with the answer cache entries they mirror.
+    """
+    global _index
+    if _index is None:
+        _index = SemanticIndex()
+        answer_cache.get_answer_cache().on_remove = _index.discard
+    return _index
+
+
+async def flush_semantic_index() -> None:
+    """Persist the process-wide index if it was created (called at shutdown)."""
+    if _index is not None:
+        await _index.aflush()
@@ -0,0 +1,207 @@
+"""
+Per-session push channel for Version B.
+
+The Version B turn was dispatch → poll or long-poll per job → TTS POST, each
+a new HTTP request with its own CSRF check. With SESSION_CHANNEL=true every
+session gets one sequence-numbered message stream, served over
+WebSocket /ws/session/{session_id}, that multiplexes everything for all of
+the session's jobs:
+
+    job.dispatched / job.classified / job.sentence / job.complete / job.error
+    filler         — no sentence yet after 0.5s / 1.5s / 3s (speak a filler)
+    teacher_hint   — text injected by a teacher observer
+    escalation     — the session was escalated to a teacher
+
+Each message carries a per-session seq. The last SESSION_CHANNEL_REPLAY
+messages are kept, so a reconnecting client sends the last seq it saw and
+gets everything after it; if that is no longer buffered it gets a "resync"
+and re-reads job state over HTTP.
+
+CRITICAL: publish() never blocks or awaits. It runs inside the orchestration
+task (job events) — a slow WebSocket client must not slow an answer down. A
+subscriber whose queue exceeds SESSION_CHANNEL_QUEUE is dropped instead; it
+reconnects and catches up from the replay buffer.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_CHANNEL_ENABLED = os.environ.get("SESSION_CHANNEL", "false").lower() in ("1", "true", "yes")
+# Messages kept per session for reconnect replay
+SESSION_CHANNEL_REPLAY = int(os.environ.get("SESSION_CHANNEL_REPLAY", "256"))
+# Undelivered messages a subscriber may fall behind before it is dropped
+SESSION_CHANNEL_QUEUE = int(os.environ.get("SESSION_CHANNEL_QUEUE", "512"))
+# Channels without subscribers or messages for this long are forgotten
+SESSION_CHANNEL_TTL_S = float(os.environ.get("SESSION_CHANNEL_TTL_S", "3600"))
+
+# Queue sentinel: the subscriber fell too far behind and must reconnect
+DROPPED = None
+
+
+@dataclass
+class ChannelStats:
+    channels_opened: int = 0
+    channels_expired: int = 0
+    connections: int = 0
+    published: int = 0
+    delivered: int = 0
+    replayed: int = 0
+    resyncs: int = 0            # reconnect asked for seqs no longer buffered
+    dropped_subscribers: int = 0
+    dispatches: int = 0         # jobs dispatched over the socket (no HTTP request)
+
+    def snapshot(self) -> dict:
+        return {
+            "channels_opened": self.channels_opened,
+            "channels_expired": self.channels_expired,
+            "connections": self.connections,
+            "published": self.published,
+            "delivered": self.delivered,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+            "dropped_subscribers": self.dropped_subscribers,
+            "dispatches": self.dispatches,
+        }
+
+
+class SessionChannel:
+    """Sequence-numbered message stream of one session, with a replay buffer."""
+
+    def __init__(
+        self,
+        session_id: str,
+        replay: int = SESSION_CHANNEL_REPLAY,
+        max_queue: int = SESSION_CHANNEL_QUEUE,
+        stats: Optional[ChannelStats] = None,
+    ):
+        self.session_id = session_id
+        self.max_queue = max_queue
+        self.stats = stats or ChannelStats()
+        self.seq = 0
+        self.last_active = time.monotonic()
+        self._buffer: Deque[dict] = deque(maxlen=replay)
+        self._subscribers: Set[asyncio.Queue] = set()
+        # Dispatch times of the last minute, for the per-session rate limit
+        self.dispatched: Deque[float] = deque()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, message_type: str, data: Dict[str, Any]) -> dict:
+        """Append a message to the stream and hand it to every subscriber."""
+        self.seq += 1
+        message = {"seq": self.seq, "type": message_type, "session_id": self.session_id, **data}
+        self._buffer.append(message)
+        self.last_active = time.monotonic()
+        self.stats.published += 1
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.max_queue:
+                self._subscribers.discard(queue)
+                queue.put_nowait(DROPPED)
+                self.stats.dropped_subscribers += 1
+                logger.warning(f"Session {self.session_id[:8]} subscriber fell behind, dropped")
+                continue
+            queue.put_nowait(message)
+        return message
+
+    def subscribe(self, last_seq: Optional[int] = None) -> Tuple[asyncio.Queue, List[dict], bool]:
+        """
+        Register a subscriber. Returns (queue, replay, complete).
+
+        replay is every buffered message after last_seq; complete is False
+        when some of them are no longer buffered (the client must resync).
+        Subscribing and snapshotting happen without an await in between, so
+        no message is both replayed and queued, or missed.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        self.last_active = time.monotonic()
+        self.stats.connections += 1
+        if last_seq is None:
+            return queue, [], True
+        replay = [m for m in self._buffer if m["seq"] > last_seq]
+        oldest = self._buffer[0]["seq"] if self._buffer else self.seq + 1
+        complete = last_seq >= oldest - 1 and last_seq <= self.seq
+        self.stats.replayed += len(replay)
+        if not complete:
+            self.stats.resyncs += 1
+        return queue, replay, complete
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        self.last_active = time.monotonic()
+
+    def job_listener(self, job_id: str):
+        """OrchestratorJob.listener that republishes the job's events as job.* messages."""
+        def _on_event(event) -> None:
+            self.publish(f"job.{event.type.value}", {"job_id": job_id, "event_id": event.id, **event.data})
+        return _on_event
+
+
+class SessionChannelRegistry:
+    """session_id -> SessionChannel, forgetting idle channels."""
+
+    def __init__(self, ttl_s: float = SESSION_CHANNEL_TTL_S, stats: Optional[ChannelStats] = None):
+        self.ttl_s = ttl_s
+        self.stats = stats or ChannelStats()
+        self._channels: Dict[str, SessionChannel] = {}
+
+    def get(self, session_id: str) -> SessionChannel:
+        channel = self._channels.get(session_id)
+        if channel is None:
+            self.prune()
+            channel = self._channels[session_id] = SessionChannel(session_id, stats=self.stats)
+            self.stats.channels_opened += 1
+        return channel
+
+    def find(self, session_id: str) -> Optional[SessionChannel]:
+        return self._channels.get(session_id)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop channels with no subscribers that have been idle for ttl_s."""
+        now = time.monotonic() if now is None else now
+        idle = [
+            session_id for session_id, channel in self._channels.items()
+            if not channel.subscriber_count and now - channel.last_active > self.ttl_s
+        ]
+        for session_id in idle:
+            del self._channels[session_id]
+        self.stats.channels_expired += len(idle)
+        return len(idle)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": SESSION_CHANNEL_ENABLED,
+            "channels": len(self._channels),
+            "subscribers": sum(c.subscriber_count for c in self._channels.values()),
+            **self.stats.snapshot(),
+        }
+
+
+_registry: Optional[SessionChannelRegistry] = None
+
+
+def get_channel_registry() -> SessionChannelRegistry:
+    """Process-wide session channels (lazily created)."""
+    global _registry
+    if _registry is None:
+        _registry = SessionChannelRegistry()
+    return _registry
+
+
+def publish(session_id: str, message_type: str, data: Dict[str, Any]) -> Optional[dict]:
+    """Publish to a session's channel when SESSION_CHANNEL is on (never raises)."""
+    if not SESSION_CHANNEL_ENABLED:
+        return None
+    try:
+        return get_channel_registry().get(session_id).publish(message_type, data)
+    except Exception as e:
+        logger.warning(f"Session channel publish failed for {session_id}: {e}")
+        return None
@@ -0,0 +1,163 @@
+"""
+Speculative specialist dispatch for Version B.
+
+Every specialist call normally waits for route_intent (a Haiku round trip)
+before its first token. With ORCHESTRATOR_SPECULATIVE=true the orchestrator
+guesses the subject up front — the session's current_subject, else the local
+classifier's top label — starts that specialist immediately and buffers its
+output while the classifier runs:
+
+- classifier agrees:    the buffered chunks are replayed, then the stream continues
+- classifier disagrees: the speculative stream is cancelled and the correct
+                        specialist started; what it produced is counted as waste
+
+Only a wrong subject is a miss. Streams cancelled for other reasons (the
+answer came from the cache, the routed model tier differs, classification
+failed) are counted per reason, with their output as discarded_chars.
+
+CRITICAL: Speculative output is only buffered. Nothing reaches the guardrail
+or the student until the classifier has confirmed the subject.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_DISPATCH = os.environ.get("ORCHESTRATOR_SPECULATIVE", "false").lower() in ("1", "true", "yes")
+
+# Only real specialists are worth speculating on (escalation is a canned line)
+SPECULATIVE_SUBJECTS = ("math", "history", "english")
+
+# Rough chars-per-token for reporting wasted output without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_DONE = object()
+
+# SpeculativeStream.cancel() reasons
+CANCEL_MISPREDICTED = "mispredicted"     # classifier chose another subject
+CANCEL_CACHE_HIT = "cache_hit"           # answer served from the answer cache
+CANCEL_TIER_MISMATCH = "tier_mismatch"   # right subject, another model tier
+CANCEL_ERROR = "error"                   # classification failed or was cancelled
+
+
+@dataclass
+class SpeculationStats:
+    started: int = 0
+    hits: int = 0          # classifier agreed, buffered output used
+    misses: int = 0        # classifier disagreed, speculative stream cancelled
+    skipped: int = 0       # no guess available
+    wasted_chars: int = 0  # produced by mispredicted streams
+    cancelled: Dict[str, int] = field(default_factory=dict)   # reason -> count, misses included
+    discarded_chars: int = 0   # produced by streams cancelled for other reasons
+
+    def snapshot(self) -> dict:
+        resolved = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hits / resolved, 4) if resolved else 0.0,
+            "wasted_chars": self.wasted_chars,
+            "wasted_tokens_est": self.wasted_chars // CHARS_PER_TOKEN,
+            "cancelled": dict(self.cancelled),
+            "discarded_chars": self.discarded_chars,
+        }
+
+
+_stats = SpeculationStats()
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Process-wide speculation counters (reported by GET /metrics)."""
+    return _stats
+
+
+class SpeculativeStream:
+    """A specialist stream started before classification, pumped into a buffer."""
+
+    def __init__(self, subject: str, stream: AsyncIterator[str], stats: Optional[SpeculationStats] = None):
+        self.subject = subject
+        self.stats = stats or _stats
+        self.chars = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._pump(stream), name=f"speculate-{subject}")
+        self.stats.started += 1
+
+    async def _pump(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async for chunk in stream:
+                self.chars += len(chunk)
+                self._queue.put_nowait(chunk)
+        except Exception as e:
+            self._queue.put_nowait(e)
+        finally:
+            self._queue.put_nowait(_DONE)
+
+    async def adopt(self) -> AsyncIterator[str]:
+        """
+        Yield the buffered chunks, then the rest of the stream as it arrives.
+
+        If the consumer stops early (closed or cancelled), the pump and the
+        specialist stream behind it are cancelled too.
+        """
+        self.stats.hits += 1
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not self._task.done():
+                self._task.cancel()
+
+    async def cancel(self, reason: str = CANCEL_MISPREDICTED) -> None:
+        """Stop the speculative stream; only a misprediction counts as a miss and waste."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self.stats.cancelled[reason] = self.stats.cancelled.get(reason, 0) + 1
+        if reason == CANCEL_MISPREDICTED:
+            self.stats.misses += 1
+            self.stats.wasted_chars += self.chars
+        else:
+            self.stats.discarded_chars += self.chars
+        logger.info(f"Speculative {self.subject} stream cancelled ({reason}), {self.chars} chars unused")
+
+
+def guess_subject(current_subject: Optional[str], student_text: str) -> Optional[str]:
+    """The session's current subject, else the local classifier's top label."""
+    if current_subject in SPECULATIVE_SUBJECTS:
+        return current_subject
+    try:
+        from specialists import local_classifier
+        if local_classifier.LOCAL_CLASSIFIER_ENABLED:
+            guess = local_classifier.get_local_router().guess(student_text)
+            if guess in SPECULATIVE_SUBJECTS:
+                return guess
+    except Exception as e:
+        logger.debug(f"Local classifier guess unavailable: {e}")
+    return None
+
+
+def start_speculation(
+    current_subject: Optional[str],
+    student_text: str,
+    start: Callable[[str, str], AsyncIterator[str]],
+) -> Optional[SpeculativeStream]:
+    """Start the guessed specialist via start(subject, text), or None if disabled / no guess."""
+    if not SPECULATIVE_DISPATCH:
+        return None
+    subject = guess_subject(current_subject, student_text)
+    if subject is None:
+        _stats.skipped += 1
+        return None
+    return SpeculativeStream(subject, start(subject, student_text))
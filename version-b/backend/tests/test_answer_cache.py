@@ -0,0 +1,267 @@
+"""
+Unit tests for the guardrailed answer cache.
+
+Tests:
+- key covers subject + model + normalized question; short/escalate turns skipped
+- TTL, entry-count and byte-size eviction
+- per-subject hit/miss accounting
+- a cache hit completes the job without specialist or moderation
+- flagged answers are never stored
+- cached TTS audio is replayed instead of calling OpenAI TTS
+"""
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from httpx import AsyncClient, ASGITransport
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.services.answer_cache import AnswerCache, answer_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_answer_key_includes_subject_model_and_normalized_question():
+    """Paraphrases that normalize equally share a key; model or subject changes do not."""
+    key = answer_key("What's the cause of World War I?", "history", "gpt-4o")
+    assert key == answer_key("what is the cause of world war i", "history", "gpt-4o")
+    assert key != answer_key("What's the cause of World War I?", "history", "gpt-4.1")
+    assert key != answer_key("What's the cause of World War I?", "english", "gpt-4o")
+
+
+def test_answer_key_skips_short_and_escalation_turns():
+    """Context-dependent short turns and escalations are never cached."""
+    assert answer_key("why?", "math", "m") is None
+    assert answer_key("I want to talk to a teacher now", "escalate", "m") is None
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL miss and are removed."""
+    clock = FakeClock()
+    cache = AnswerCache(ttl_seconds=60, clock=clock)
+    cache.put("k", "history", "Because of alliances.")
+
+    assert cache.get("k", "history").safe_text == "Because of alliances."
+    clock.now += 61
+    assert cache.get("k", "history") is None
+    assert cache.expirations == 1
+
+
+def test_size_and_byte_bounds_evict_lru():
+    """The least recently used entry goes first when count or bytes overflow."""
+    cache = AnswerCache(max_size=2)
+    cache.put("a", "math", "A.")
+    cache.put("b", "math", "B.")
+    cache.get("a", "math")
+    cache.put("c", "math", "C.")
+    assert cache.get("b", "math") is None
+    assert cache.get("a", "math") is not None
+
+    small = AnswerCache(max_bytes=10, cache_audio=True)
+    small.put("x", "math", "12345")
+    small.put_audio("x", "alloy", b"0123456789", "12345")  # pushes the entry over the byte cap
+    assert small.snapshot()["size"] == 0
+    assert small.snapshot()["bytes"] == 0
+
+
+def test_audio_only_attaches_to_the_answer_it_was_synthesized_from():
+    """Audio for an answer that was replaced meanwhile is dropped."""
+    cache = AnswerCache(cache_audio=True)
+    cache.put("k", "history", "Old answer.")
+    cache.put("k", "history", "New answer.")
+
+    cache.put_audio("k", "alloy", b"OLD", "Old answer.")
+    assert cache.get_audio("k", "alloy") is None
+
+    cache.put_audio("k", "alloy", b"NEW", "New answer.")
+    assert cache.get_audio("k", "alloy") == b"NEW"
+
+
+def test_hit_rate_per_subject():
+    """Hits and misses are counted per subject."""
+    cache = AnswerCache()
+    cache.put("k", "history", "text")
+    cache.get("k", "history")
+    cache.get("other", "history")
+    cache.get("m", "math")
+
+    subjects = cache.snapshot()["subjects"]
+    assert subjects["history"]["hit_rate"] == 0.5
+    assert subjects["math"]["misses"] == 1
+
+
+async def _orchestrate(cache: AnswerCache, student_text: str, guardrail_events: list, history=None):
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+
+    job = OrchestratorJob(session_id="sess-ac", student_text=student_text)
+    session = SessionUserdata(session_id="sess-ac")
+    specialist = MagicMock(side_effect=lambda text: _stream("Because of alliances."))
+
+    async def mock_classifier(text, client=None):
+        return SimpleNamespace(subject="history", confidence=1.0)
+
+    async def mock_guardrail(stream, client=None, events=None):
+        async for chunk in stream:
+            events.extend(guardrail_events)
+            yield chunk
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = mock_classifier
+    mock_history_mod = MagicMock()
+    mock_history_mod.stream_history_response = specialist
+    mock_history_mod.HISTORY_MODEL = "gpt-4o"
+    mock_guardrail_service = MagicMock()
+    mock_guardrail_service.check_stream_with_sentence_buffer = mock_guardrail
+    memory = MagicMock()
+    memory.history.return_value = history or []
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists.classifier": mock_classifier_mod,
+            "specialists.history": mock_history_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": mock_guardrail_service,
+        }),
+        patch("backend.services.answer_cache.ANSWER_CACHE_ENABLED", True),
+        patch("backend.services.answer_cache.get_answer_cache", return_value=cache),
+        patch("backend.services.conversation_memory.MEMORY_ENABLED", history is not None),
+        patch("backend.services.conversation_memory.get_memory_store", return_value=memory),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()),
+        patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()) as mock_log_guard,
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+    ):
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    return job, specialist, mock_log_guard
+
+
+async def _stream(text):
+    yield text
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_completes_job_without_specialist():
+    """The second identical question is answered from cache: no specialist, no moderation."""
+    cache = AnswerCache()
+    clean = [SimpleNamespace(flagged=False, confidence=0.0, categories_flagged=[], error=None)]
+
+    first, specialist, _ = await _orchestrate(cache, "What caused World War I?", clean)
+    second, specialist2, log_guard = await _orchestrate(cache, "what caused world war i", clean)
+
+    assert first.safe_text == second.safe_text == "Because of alliances."
+    specialist.assert_called_once()
+    specialist2.assert_not_called()
+    log_guard.assert_not_called()
+    assert second.tts_ready
+    assert second.answer_cache_key == first.answer_cache_key
+    assert cache.snapshot()["subjects"]["history"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_standalone_question_with_history_is_served_from_cache():
+    """Session history does not stop a standalone question from being answered from cache."""
+    cache = AnswerCache()
+    clean = [SimpleNamespace(flagged=False, confidence=0.0, categories_flagged=[], error=None)]
+    history = [
+        {"role": "user", "content": "Tell me about the Austro-Hungarian empire"},
+        {"role": "assistant", "content": "It was a dual monarchy."},
+    ]
+
+    await _orchestrate(cache, "What caused World War I?", clean)
+    job, specialist, _ = await _orchestrate(cache, "What caused World War I?", clean, history=history)
+
+    specialist.assert_not_called()
+    assert job.safe_text == "Because of alliances."
+    assert cache.snapshot()["subjects"]["history"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_answer_generated_with_history_is_not_stored():
+    """An answer written with prior turns in the prompt may refer to them, so it is not cached."""
+    cache = AnswerCache()
+    clean = [SimpleNamespace(flagged=False, confidence=0.0, categories_flagged=[], error=None)]
+    history = [{"role": "user", "content": "Tell me about the Austro-Hungarian empire"}]
+
+    job, specialist, _ = await _orchestrate(cache, "What caused World War I?", clean, history=history)
+
+    specialist.assert_called_once()
+    assert job.answer_cache_key is not None
+    assert cache.snapshot()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flagged_answer_not_cached():
+    """An answer with any flagged sentence is not stored."""
+    cache = AnswerCache()
+    flagged = [SimpleNamespace(flagged=True, confidence=0.9, categories_flagged=["violence"], error=None)]
+
+    await _orchestrate(cache, "What caused World War I?", flagged)
+
+    assert cache.snapshot()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_tts_replays_cached_audio():
+    """A job whose answer has cached audio is served without calling OpenAI TTS."""
+    from backend.main import app
+    from backend.models.job import OrchestratorJob
+    from backend.services.job_store import store_job
+
+    cache = AnswerCache(cache_audio=True)
+    cache.put("k", "history", "Because of alliances.")
+    cache.put_audio("k", "alloy", b"PCM" * 10, "Because of alliances.")
+    job = OrchestratorJob(session_id="sess-ac", student_text="q")
+    job.answer_cache_key = "k"
+    job.mark_complete(safe_text="Because of alliances.")
+    store_job(job)
+    tts_client = MagicMock()
+
+    with (
+        patch("backend.routers.tts.get_answer_cache", return_value=cache),
+        patch("backend.routers.tts.get_openai_client", return_value=tts_client),
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/tts/stream", json={"job_id": job.id, "voice": "alloy"})
+
+    assert response.status_code == 200
+    assert response.content == b"PCM" * 10
+    tts_client.audio.speech.with_streaming_response.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_tts_stores_audio_for_cached_answer():
+    """Audio streamed for a cacheable answer is kept for the next hit."""
+    from backend.routers.tts import _stream_audio_chunks
+
+    cache = AnswerCache(cache_audio=True)
+    cache.put("k", "history", "Because of alliances.")
+
+    async def fake_audio_chunks(*args, **kwargs):
+        yield b"A1"
+        yield b"A2"
+
+    mock_response = AsyncMock()
+    mock_response.iter_bytes = fake_audio_chunks
+    mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_response.__aexit__ = AsyncMock(return_value=None)
+    mock_openai = AsyncMock()
+    mock_openai.audio.speech.with_streaming_response.create = MagicMock(return_value=mock_response)
+
+    with (
+        patch("backend.routers.tts.get_answer_cache", return_value=cache),
+        patch("backend.routers.tts.get_openai_client", return_value=mock_openai),
+    ):
+        chunks = [c async for c in _stream_audio_chunks("Because of alliances.", "alloy", cache_key="k")]
+
+    assert chunks == [b"A1", b"A2"]
+    assert cache.get_audio("k", "alloy") == b"A1A2"
@@ -0,0 +1,172 @@
+"""
+Unit tests for per-session conversation memory.
+
+Tests:
+- history is alternating user/assistant messages in turn order
+- ring buffer and token budget bound the history
+- evicted turns are folded into a rolling summary
+- store LRU eviction and drop on close
+- orchestration passes history to the specialist and records safe_text
+"""
+import sys
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.services.conversation_memory import (
+    SUMMARY_PREFIX,
+    ConversationMemoryStore,
+    SessionMemory,
+)
+
+
+def test_history_alternates_roles():
+    """Each turn becomes a user message followed by an assistant message."""
+    memory = SessionMemory()
+    memory.add("What is 2+2?", "4.", "math")
+    memory.add("Why?", "Because 2 and 2 make 4.", "math")
+
+    assert memory.history() == [
+        {"role": "user", "content": "What is 2+2?"},
+        {"role": "assistant", "content": "4."},
+        {"role": "user", "content": "Why?"},
+        {"role": "assistant", "content": "Because 2 and 2 make 4."},
+    ]
+
+
+def test_ring_buffer_keeps_latest_turns():
+    """Only the last max_turns turns are kept."""
+    memory = SessionMemory(max_turns=2)
+    for i in range(5):
+        memory.add(f"q{i}", f"a{i}", "math")
+
+    assert [m["content"] for m in memory.history()] == ["q3", "a3", "q4", "a4"]
+    assert memory.trimmed == 3
+
+
+def test_token_budget_bounds_history():
+    """However long the session, estimated history tokens stay within budget."""
+    memory = SessionMemory(max_turns=100, token_budget=200)
+    for i in range(50):
+        memory.add(f"question {i} " * 10, f"answer {i} " * 20, "history")
+        assert memory.tokens() <= 200
+
+    assert memory.history()[-1]["content"].startswith("answer 49")
+
+
+def test_latest_turn_kept_even_over_budget():
+    """A single oversized turn is kept rather than sending no context at all."""
+    memory = SessionMemory(token_budget=10)
+    memory.add("x" * 400, "y" * 400, "english")
+    assert len(memory.turns) == 1
+
+
+@pytest.mark.asyncio
+async def test_compact_folds_evicted_turns_into_summary():
+    """Evicted turns go to the summarizer; the summary leads the history."""
+    summarizer = AsyncMock(return_value="Student asked about fractions.")
+    memory = SessionMemory(max_turns=1, summarizer=summarizer)
+    memory.add("What is 1/2 + 1/4?", "3/4.", "math")
+    memory.add("And 1/3 + 1/3?", "2/3.", "math")
+
+    assert memory.needs_compaction
+    await memory.compact()
+
+    previous, turns = summarizer.call_args[0]
+    assert previous == ""
+    assert [t.student for t in turns] == ["What is 1/2 + 1/4?"]
+    history = memory.history()
+    assert history[0] == {"role": "user", "content": SUMMARY_PREFIX + "Student asked about fractions."}
+    assert history[1]["role"] == "assistant"
+    assert history[2]["content"] == "And 1/3 + 1/3?"
+    assert not memory.needs_compaction
+
+
+@pytest.mark.asyncio
+async def test_summary_failure_keeps_window():
+    """A failing summarizer is logged and the retained turns are unaffected."""
+    memory = SessionMemory(max_turns=1, summarizer=AsyncMock(side_effect=RuntimeError("down")))
+    memory.add("q1", "a1", "math")
+    memory.add("q2", "a2", "math")
+
+    await memory.compact()
+
+    assert memory.summary == ""
+    assert [m["content"] for m in memory.history()] == ["q2", "a2"]
+
+
+def test_store_lru_and_drop():
+    """The store evicts the least recently used session and drops closed ones."""
+    store = ConversationMemoryStore(max_sessions=2)
+    store.record("s1", "q", "a", "math")
+    store.record("s2", "q", "a", "math")
+    store.get("s1")
+    store.record("s3", "q", "a", "math")
+
+    assert store.history("s2") == []
+    assert store.history("s1") != []
+    assert store.evictions == 1
+
+    store.drop("s1")
+    assert store.history("s1") == []
+
+
+@pytest.mark.asyncio
+async def test_orchestration_passes_history_and_records_safe_text():
+    """The specialist gets prior turns; the completed turn stores safe_text, not raw."""
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+
+    store = ConversationMemoryStore()
+    store.record("sess-mem", "What is 2+2?", "4.", "math")
+    job = OrchestratorJob(session_id="sess-mem", student_text="And 3+3?")
+    session = SessionUserdata(session_id="sess-mem")
+    seen_history = []
+
+    async def mock_classifier(text, client=None):
+        result = MagicMock()
+        result.subject = "math"
+        result.confidence = 1.0
+        return result
+
+    def mock_math(text, conversation_history=None):
+        seen_history.append(conversation_history)
+
+        async def _stream():
+            yield "raw six"
+        return _stream()
+
+    async def mock_guardrail(stream, client=None, events=None):
+        async for _ in stream:
+            yield "safe six"
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = mock_classifier
+    mock_math_mod = MagicMock()
+    mock_math_mod.stream_math_response = mock_math
+    mock_guardrail_service = MagicMock()
+    mock_guardrail_service.check_stream_with_sentence_buffer = mock_guardrail
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists.classifier": mock_classifier_mod,
+            "specialists.math": mock_math_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": mock_guardrail_service,
+        }),
+        patch("backend.services.conversation_memory.MEMORY_ENABLED", True),
+        patch("backend.services.conversation_memory.get_memory_store", return_value=store),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()),
+        patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()),
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+    ):
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    assert seen_history == [[
+        {"role": "user", "content": "What is 2+2?"},
+        {"role": "assistant", "content": "4."},
+    ]]
+    assert store.history("sess-mem")[-1] == {"role": "assistant", "content": "safe six"}
@@ -3,7 +3,7 @@ import asyncio
 import pytest
 from datetime import datetime
 
-from backend.models.job import OrchestratorJob, JobStatus
+from backend.models.job import JobEventType, OrchestratorJob, JobStatus
 
 
 def test_job_initial_state():
@@ -90,3 +90,61 @@ async def test_completion_event_set_on_error():
     result = await job.wait_for_completion(timeout=2.0)
     assert result is True
     assert job.status == JobStatus.ERROR
+
+
+def test_event_log_records_lifecycle_and_sentences():
+    """classified → one event per sentence → complete, with 1-based ids."""
+    job = OrchestratorJob()
+    job.mark_processing("math")
+    job.append_sentence("The answer is 4.")
+    job.append_sentence("   ")  # whitespace is not a sentence
+    job.append_sentence("Two plus two is four.")
+    job.mark_complete(safe_text="The answer is 4. Two plus two is four.")
+
+    assert job.sentences == ["The answer is 4.", "Two plus two is four."]
+    assert [(e.id, e.type) for e in job.events] == [
+        (1, JobEventType.CLASSIFIED),
+        (2, JobEventType.SENTENCE),
+        (3, JobEventType.SENTENCE),
+        (4, JobEventType.COMPLETE),
+    ]
+    assert job.events[2].data == {"index": 1, "text": "Two plus two is four."}
+    assert [e.id for e in job.events_after(2)] == [3, 4]
+
+    job.append_sentence("Too late.")  # nothing is appended after completion
+    assert len(job.events) == 4
+
+
+def test_terminal_states_are_final():
+    """A job reaped as ERROR cannot be flipped to COMPLETE (or back to PROCESSING)."""
+    job = OrchestratorJob()
+    job.mark_processing("history")
+    job.mark_error("Job did not finish within 300s")
+
+    job.mark_complete(safe_text="Late answer.")
+    job.mark_processing("math")
+    job.mark_error("second error")
+
+    assert job.status == JobStatus.ERROR
+    assert job.error_message == "Job did not finish within 300s"
+    assert job.safe_text is None and job.tts_ready is False
+    assert [e.type for e in job.events] == [JobEventType.CLASSIFIED, JobEventType.ERROR]
+
+    done = OrchestratorJob()
+    done.mark_complete(safe_text="4")
+    done.mark_error("too late")
+    assert done.status == JobStatus.COMPLETE
+    assert done.error_message is None
+
+
+@pytest.mark.asyncio
+async def test_wait_for_event_wakes_on_append():
+    job = OrchestratorJob()
+
+    async def append_later():
+        await asyncio.sleep(0.02)
+        job.append_sentence("First sentence.")
+
+    asyncio.create_task(append_later())
+    assert await job.wait_for_event(0, timeout=2.0) is True
+    assert await job.wait_for_event(1, timeout=0.02) is False
@@ -113,3 +113,381 @@ async def _run_single_cleanup(ttl_seconds: int) -> None:
     ]
     for job_id in expired:
         remove_job(job_id)
+
+
+# ---- Redis job store -----------------------------------------------------
+
+import os
+from backend.services.job_store import RedisJobStore, job_from_hash, job_to_hash
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.channels: set = set()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+        self._redis.subscribers.add(self)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def reset(self):
+        self._redis.subscribers.discard(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeRedis:
+    """In-process stand-in for the redis.asyncio commands RedisJobStore uses."""
+
+    def __init__(self):
+        self.hashes: dict = {}
+        self.ttls: dict = {}
+        self.subscribers: set = set()
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def delete(self, key):
+        self.hashes.pop(key, None)
+
+    async def publish(self, channel, message):
+        for pubsub in list(self.subscribers):
+            if channel in pubsub.channels:
+                pubsub._queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+def _forget_locally(job):
+    """Make a job look as if another worker dispatched it."""
+    _jobs.pop(job.id, None)
+
+
+def test_job_hash_round_trip():
+    job = OrchestratorJob(session_id="sess-1", student_text="What is 2+2?")
+    job.mark_processing("math")
+    job.append_sentence("The answer is 4.")
+    job.mark_complete(safe_text="The answer is 4.", raw_text="The answer is 4.")
+
+    restored = job_from_hash(job_to_hash(job))
+
+    assert restored.id == job.id
+    assert restored.status == JobStatus.COMPLETE
+    assert restored.subject == "math"
+    assert restored.tts_ready is True
+    assert restored.raw_text == "The answer is 4."
+    assert restored.error_message is None
+    assert restored.sentences == ["The answer is 4."]
+    assert [(e.id, e.type) for e in restored.events] == [(e.id, e.type) for e in job.events]
+    assert restored.completed_at == job.completed_at
+
+
+@pytest.mark.asyncio
+async def test_redis_store_shares_jobs_across_workers_with_ttl():
+    redis = FakeRedis()
+    store = RedisJobStore(client=redis, ttl_seconds=3600, pending_ttl_seconds=600)
+    job = OrchestratorJob(session_id="sess-1", student_text="q")
+    store.put(job)
+    await asyncio.sleep(0)
+    key = store._key(job.id)
+    assert redis.ttls[key] == 600  # unfinished: short TTL in case the worker dies
+
+    job.mark_processing("history")
+    job.mark_complete(safe_text="It began in 1914.")
+    await asyncio.sleep(0.01)
+    _forget_locally(job)
+
+    loaded = await RedisJobStore(client=redis).load(job.id)
+    assert loaded is not job
+    assert loaded.status == JobStatus.COMPLETE
+    assert loaded.safe_text == "It began in 1914."
+    assert redis.ttls[key] == 3600
+    assert await store.load("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_wakes_remote_waiter_via_pubsub():
+    """A worker waiting on a job dispatched elsewhere wakes when it completes."""
+    redis = FakeRedis()
+    running = RedisJobStore(client=redis)
+    job = OrchestratorJob(session_id="sess-1", student_text="q")
+    running.put(job)
+    await asyncio.sleep(0)
+    _forget_locally(job)
+
+    polling = RedisJobStore(client=redis)
+    snapshot = await polling.load(job.id)
+
+    async def finish_later():
+        await asyncio.sleep(0.05)
+        job.mark_processing("math")
+        job.append_sentence("Four.")
+        job.mark_complete(safe_text="Four.")
+
+    task = asyncio.create_task(finish_later())
+    done = await polling.wait_for_completion(snapshot, timeout=2.0)
+    await task
+
+    assert done.status == JobStatus.COMPLETE
+    assert done.safe_text == "Four."
+    assert polling.stats.wakeups >= 1
+    assert redis.subscribers == set()
+
+
+@pytest.mark.asyncio
+async def test_redis_store_wait_times_out():
+    redis = FakeRedis()
+    store = RedisJobStore(client=redis)
+    job = OrchestratorJob(session_id="sess-1", student_text="q")
+    store.put(job)
+    await asyncio.sleep(0)
+    _forget_locally(job)
+
+    snapshot = await store.load(job.id)
+    assert await store.wait_for_completion(snapshot, timeout=0.05) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_store_against_local_redis():
+    """Same flow against a real server: JOB_STORE_TEST_REDIS_URL=redis://localhost:6379/15."""
+    url = os.environ.get("JOB_STORE_TEST_REDIS_URL")
+    if not url:
+        pytest.skip("JOB_STORE_TEST_REDIS_URL not set")
+    pytest.importorskip("redis")
+
+    store = RedisJobStore(url, prefix="test:orchestrator:job:")
+    job = OrchestratorJob(session_id="sess-live", student_text="q")
+    store.put(job)
+    job.mark_processing("math")
+    job.mark_complete(safe_text="Done.")
+    await asyncio.sleep(0.2)
+    _forget_locally(job)
+
+    loaded = await store.load(job.id)
+    assert loaded.safe_text == "Done."
+    assert 0 < await store._redis.ttl(store._key(job.id)) <= store.ttl_seconds
+    await store._redis.delete(store._key(job.id))
+
+
+@pytest.mark.asyncio
+async def test_poll_on_another_worker_finds_redis_job():
+    """GET /orchestrate/{job_id} no longer 404s when the job ran on another worker."""
+    from unittest.mock import patch
+    from httpx import AsyncClient, ASGITransport
+    from backend.main import app
+
+    store = RedisJobStore(client=FakeRedis())
+    job = OrchestratorJob(session_id="sess-1", student_text="q")
+    with patch("backend.services.job_store._store", store):
+        store.put(job)
+        job.mark_processing("math")
+        job.mark_complete(safe_text="Four.")
+        await asyncio.sleep(0.01)
+        _forget_locally(job)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(f"/orchestrate/{job.id}")
+
+    assert response.status_code == 200
+    assert response.json()["safe_text"] == "Four."
+    assert response.json()["tts_ready"] is True
+
+
+# ---- bounded local jobs --------------------------------------------------
+
+from backend.services.job_store import LocalJobs, estimate_job_bytes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _finished_job(text: str = "answer") -> OrchestratorJob:
+    job = OrchestratorJob(session_id="sess", student_text="q")
+    job.mark_processing("math")
+    job.mark_complete(safe_text=text)
+    return job
+
+
+def test_local_jobs_expire_finished_jobs_after_ttl():
+    clock = FakeClock()
+    jobs = LocalJobs(ttl_seconds=60, stuck_seconds=600, clock=clock)
+    done = _finished_job()
+    running = OrchestratorJob(session_id="sess", student_text="q")
+    jobs.put(done)
+    jobs.put(running)
+
+    clock.now += 30
+    running.mark_processing("math")
+    running.mark_complete(safe_text="later")  # its TTL starts now
+
+    clock.now += 40
+    assert jobs.sweep() == 1
+    assert done.id not in jobs and running.id in jobs
+
+    clock.now += 30
+    assert jobs.sweep() == 1
+    assert len(jobs) == 0
+    assert jobs.stats.expired == 2
+    assert jobs.total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_local_jobs_reap_stuck_jobs_and_wake_waiters():
+    """A job still PENDING/PROCESSING past the hard deadline is removed and marked ERROR."""
+    clock = FakeClock()
+    jobs = LocalJobs(ttl_seconds=60, stuck_seconds=300, clock=clock)
+    stuck = OrchestratorJob(session_id="sess", student_text="q")
+    stuck.mark_processing("history")
+    jobs.put(stuck)
+    waiter = asyncio.create_task(stuck.wait_for_completion(timeout=2.0))
+    await asyncio.sleep(0)
+
+    clock.now += 299
+    assert jobs.sweep() == 0
+    clock.now += 2
+    assert jobs.sweep() == 1
+
+    assert await waiter is True
+    assert stuck.status == JobStatus.ERROR
+    assert stuck.id not in jobs
+    assert jobs.stats.reaped_stuck == 1
+
+
+def test_local_jobs_evict_least_recently_used_over_job_cap():
+    jobs = LocalJobs(max_jobs=2, clock=FakeClock())
+    first, second, third = _finished_job(), _finished_job(), _finished_job()
+    jobs.put(first)
+    jobs.put(second)
+    jobs.get(first.id)  # first is now more recent than second
+
+    jobs.put(third)
+
+    assert second.id not in jobs
+    assert first.id in jobs and third.id in jobs
+    assert jobs.stats.evicted == 1
+
+
+def test_local_jobs_enforce_byte_budget_as_jobs_grow():
+    """Bytes are re-estimated as sentences land; the LRU job goes when the budget is exceeded."""
+    old = _finished_job()
+    budget = estimate_job_bytes(old) * 2 + 100
+    jobs = LocalJobs(max_bytes=budget, clock=FakeClock())
+    growing = OrchestratorJob(session_id="sess", student_text="q")
+    jobs.put(old)
+    jobs.put(growing)
+    assert len(jobs) == 2
+
+    growing.mark_processing("english")
+    growing.append_sentence("x" * 500)
+
+    assert old.id not in jobs
+    assert growing.id in jobs
+    assert jobs.total_bytes == estimate_job_bytes(growing)
+    assert jobs.snapshot()["evicted"] == 1
+
+
+def test_local_jobs_evict_finished_jobs_before_running_ones():
+    """Caps skip past older running jobs to the least recently used finished one."""
+    jobs = LocalJobs(max_jobs=3, clock=FakeClock())
+    running = OrchestratorJob(session_id="sess", student_text="q")
+    running.mark_processing("math")
+    old_done, new_done = _finished_job(), _finished_job()
+    jobs.put(running)
+    jobs.put(old_done)
+    jobs.put(new_done)
+
+    jobs.put(_finished_job())
+
+    assert running.id in jobs and new_done.id in jobs
+    assert old_done.id not in jobs
+    assert running.status == JobStatus.PROCESSING
+    assert jobs.stats.evicted_unfinished == 0
+
+
+@pytest.mark.asyncio
+async def test_local_jobs_evicting_unfinished_job_marks_it_error():
+    """With no finished job left, an evicted running job fails loudly and wakes its waiters."""
+    jobs = LocalJobs(max_jobs=1, clock=FakeClock())
+    first = OrchestratorJob(session_id="sess", student_text="q")
+    jobs.put(first)
+    waiter = asyncio.create_task(first.wait_for_completion(timeout=2.0))
+    await asyncio.sleep(0)
+
+    jobs.put(OrchestratorJob(session_id="sess", student_text="q2"))
+
+    assert await waiter is True
+    assert first.status == JobStatus.ERROR
+    assert "evicted" in first.error_message
+    assert jobs.stats.evicted_unfinished == 1
+
+
+def test_local_jobs_running_byte_total_matches_estimate():
+    """Per-event accounting adds only the new sentence/event, and still matches a full re-estimate."""
+    jobs = LocalJobs(clock=FakeClock())
+    job = OrchestratorJob(session_id="sess", student_text="Why did Rome fall?")
+    jobs.put(job)
+    job.mark_processing("history")
+    for i in range(50):
+        job.append_sentence(f"Sentence number {i}. ")
+        assert jobs.total_bytes == estimate_job_bytes(job)
+    job.mark_complete(safe_text="".join(job.sentences), raw_text="raw")
+
+    assert jobs.total_bytes == estimate_job_bytes(job)
+    jobs.pop(job.id)
+    assert jobs.total_bytes == 0
+
+
+def test_sweep_only_touches_expired_index_heads():
+    """Removed or already-finished entries are skipped lazily; live deadlines stay queued."""
+    clock = FakeClock()
+    jobs = LocalJobs(ttl_seconds=60, stuck_seconds=120, clock=clock)
+    for _ in range(100):
+        jobs.put(_finished_job())
+    removed = _finished_job()
+    jobs.put(removed)
+    jobs.pop(removed.id)
+
+    clock.now += 61
+    assert jobs.sweep() == 100
+    assert jobs.snapshot()["expiry_index"] == 0
@@ -0,0 +1,181 @@
+"""Unit tests for GET /metrics."""
+import sys
+import os
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.main import app
+
+
+@pytest.fixture
+async def client():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_guardrail_batcher(client):
+    """GET /metrics includes batch-size and latency counters for the moderation batcher."""
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    batcher = resp.json()["guardrail_batcher"]
+    assert "avg_batch_size" in batcher
+    assert "avg_request_ms" in batcher
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_guardrail_cache(client):
+    """GET /metrics includes moderation cache hit/miss counters."""
+    resp = await client.get("/metrics")
+    cache = resp.json()["guardrail_cache"]
+    assert "hits" in cache
+    assert "misses" in cache
+    assert "hit_rate" in cache
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_guardrail_prefilter(client):
+    """GET /metrics includes pre-filter decision counts and derived rates."""
+    resp = await client.get("/metrics")
+    prefilter = resp.json()["guardrail_prefilter"]
+    assert "api_call_reduction" in prefilter
+    assert "false_negative_rate" in prefilter
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_guardrail_deadline(client):
+    """GET /metrics includes budget-exceeded counts and circuit breaker state."""
+    resp = await client.get("/metrics")
+    deadline = resp.json()["guardrail_deadline"]
+    assert "budget_exceeded" in deadline
+    assert deadline["breaker"]["state"] in ("closed", "open", "half_open")
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_classifier_cache(client):
+    """GET /metrics includes exact/near-duplicate routing cache hits and hit rate."""
+    resp = await client.get("/metrics")
+    cache = resp.json()["classifier_cache"]
+    assert "near_hits" in cache
+    assert "hit_rate" in cache
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_provider_pools(client):
+    """GET /metrics includes per-provider connection pool utilization."""
+    resp = await client.get("/metrics")
+    pools = resp.json()["provider_pools"]
+    assert "in_flight" in pools["openai"]
+    assert "utilization" in pools["anthropic"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_classifier_local(client):
+    """GET /metrics includes local classifier coverage and the active threshold."""
+    resp = await client.get("/metrics")
+    local = resp.json()["classifier_local"]
+    assert "coverage" in local
+    assert "threshold" in local
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_speculation(client):
+    """GET /metrics includes speculative dispatch hit rate and wasted tokens."""
+    resp = await client.get("/metrics")
+    speculation = resp.json()["speculation"]
+    assert "hit_rate" in speculation
+    assert "wasted_tokens_est" in speculation
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_classifier_followup(client):
+    """GET /metrics includes how many follow-up turns skipped the classifier."""
+    resp = await client.get("/metrics")
+    followup = resp.json()["classifier_followup"]
+    assert "bypassed" in followup
+    assert "bypass_rate" in followup
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_conversation_memory(client):
+    """GET /metrics includes conversation memory size against its token budget."""
+    resp = await client.get("/metrics")
+    memory = resp.json()["conversation_memory"]
+    assert "max_session_tokens" in memory
+    assert "token_budget" in memory
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_answer_cache(client):
+    """GET /metrics includes answer cache size and per-subject hit rates."""
+    resp = await client.get("/metrics")
+    cache = resp.json()["answer_cache"]
+    assert "subjects" in cache
+    assert "bytes" in cache
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_semantic_index(client):
+    """GET /metrics includes semantic index size and hit rate."""
+    resp = await client.get("/metrics")
+    index = resp.json()["semantic_index"]
+    assert "hit_rate" in index
+    assert "capacity" in index
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_specialist_hedging(client):
+    """GET /metrics includes per-subject hedge rate and per-provider TTFT."""
+    resp = await client.get("/metrics")
+    hedging = resp.json()["specialist_hedging"]
+    assert "subjects" in hedging
+    assert "ttft" in hedging
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_provider_gateway(client):
+    """GET /metrics includes provider gateway limits and queue depth."""
+    resp = await client.get("/metrics")
+    gateway = resp.json()["provider_gateway"]
+    assert "limiters" in gateway
+    assert "queue_depth" in gateway
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_specialist_streams(client):
+    """GET /metrics includes per-model streaming stats (TTFT, throughput, tokens)."""
+    resp = await client.get("/metrics")
+    assert isinstance(resp.json()["specialist_streams"], dict)
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_specialist_tiering(client):
+    """GET /metrics includes model tier decisions and thresholds."""
+    resp = await client.get("/metrics")
+    tiering = resp.json()["specialist_tiering"]
+    assert "subjects" in tiering
+    assert "thresholds" in tiering
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_session_channels(client):
+    """GET /metrics includes push channel counts (replays, resyncs, dropped subscribers)."""
+    resp = await client.get("/metrics")
+    channels = resp.json()["session_channels"]
+    assert "subscribers" in channels
+    assert "resyncs" in channels
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_job_store(client):
+    """GET /metrics reports the job store backend and its write/load counters."""
+    resp = await client.get("/metrics")
+    job_store = resp.json()["job_store"]
+    assert job_store["backend"] in ("memory", "redis")
+    assert "local_jobs" in job_store
+    assert "local_bytes" in job_store
+    assert "evicted" in job_store
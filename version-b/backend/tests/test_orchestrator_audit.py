@@ -5,12 +5,14 @@ Tests:
 - routing_decisions INSERT on classification
 - guardrail_events INSERT when flagged/clean
 - raw_text vs safe_text separation via tee stream
+- guardrail flags aggregated from per-sentence stream events
 - learning_sessions INSERT on session token creation
 - DB errors in audit functions do not break orchestration
 """
 import sys
 import os
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch, call
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
@@ -127,8 +129,11 @@ async def test_raw_text_differs_from_safe_text_when_guardrail_rewrites():
     async def mock_specialist_stream(text):
         yield raw_response
 
-    async def mock_guardrail(stream, client=None):
+    async def mock_guardrail(stream, client=None, events=None):
         async for _ in stream:
+            events.append(SimpleNamespace(
+                flagged=True, confidence=0.92, categories_flagged=["violence"],
+            ))
             yield safe_response  # guardrail rewrites
 
     mock_classifier_mod = MagicMock()
@@ -161,6 +166,25 @@ async def test_raw_text_differs_from_safe_text_when_guardrail_rewrites():
     assert original == raw_response
     assert rewritten == safe_response
     assert original != rewritten
+    # Flags come from the stream's events — no second moderation round trip
+    assert call_kwargs[0][3] is True
+    assert call_kwargs[1]["confidence"] == 0.92
+    assert call_kwargs[1]["categories_flagged"] == ["violence"]
+    mock_guardrail_service.check.assert_not_called()
+
+
+def test_aggregate_guardrail_events():
+    """Per-sentence events collapse to any-flagged, max confidence, category union."""
+    from backend.routers.orchestrator import _aggregate_guardrail_events
+
+    events = [
+        SimpleNamespace(flagged=False, confidence=0.01, categories_flagged=[]),
+        SimpleNamespace(flagged=True, confidence=0.7, categories_flagged=["violence"]),
+        SimpleNamespace(flagged=True, confidence=0.9, categories_flagged=["hate", "violence"]),
+    ]
+
+    assert _aggregate_guardrail_events(events) == (True, 0.9, ["violence", "hate"])
+    assert _aggregate_guardrail_events(events[:1]) == (False, 0.0, [])
 
 
 @pytest.mark.asyncio
@@ -203,7 +227,7 @@ async def test_audit_failures_do_not_break_orchestration():
     async def mock_specialist_stream(text):
         yield "The answer is 4."
 
-    async def mock_guardrail(stream, client=None):
+    async def mock_guardrail(stream, client=None, events=None):
         async for chunk in stream:
             yield chunk
 
@@ -237,3 +261,102 @@ async def test_audit_failures_do_not_break_orchestration():
     assert job.status.value == "complete"
     assert job.tts_ready is True
     assert job.safe_text is not None
+
+
+@pytest.mark.asyncio
+async def test_followup_turn_keeps_subject_and_logs_affinity_marker():
+    """A follow-up keeps the session's subject without a classifier call and logs the affinity marker."""
+    import time
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+    from specialists.classifier import RoutingResult
+    from specialists.followup import AFFINITY_CONFIDENCE
+
+    job = OrchestratorJob(session_id="sess-7", student_text="why?")
+    session = SessionUserdata(
+        session_id="sess-7", current_subject="history", last_routed_at=time.monotonic(),
+    )
+
+    async def mock_specialist_stream(text):
+        yield "Because of the treaty."
+
+    async def mock_guardrail(stream, client=None, events=None):
+        async for chunk in stream:
+            yield chunk
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = AsyncMock(
+        return_value=RoutingResult(subject="english", confidence=0.5, raw_response="why"),
+    )
+    mock_history_mod = MagicMock()
+    mock_history_mod.stream_history_response = lambda text: mock_specialist_stream(text)
+    mock_guardrail_service = MagicMock()
+    mock_guardrail_service.check_stream_with_sentence_buffer = mock_guardrail
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists.classifier": mock_classifier_mod,
+            "specialists.history": mock_history_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": mock_guardrail_service,
+        }),
+        patch("specialists.followup.FOLLOWUP_ENABLED", True),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()) as mock_log_route,
+        patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()),
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+    ):
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    mock_classifier_mod.route_intent.assert_not_awaited()
+    assert job.subject == "history"
+    assert job.safe_text == "Because of the treaty."
+    assert mock_log_route.call_args[0][1] == "history"
+    assert mock_log_route.call_args[1]["confidence"] == AFFINITY_CONFIDENCE
+
+
+@pytest.mark.asyncio
+async def test_followup_turn_with_escalation_cue_is_classified():
+    """A follow-up with an escalation cue goes to the classifier, which can escalate it."""
+    import time
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+    from specialists.classifier import RoutingResult
+
+    job = OrchestratorJob(session_id="sess-8", student_text="it makes me want to hurt myself")
+    session = SessionUserdata(
+        session_id="sess-8", current_subject="math", last_routed_at=time.monotonic(),
+    )
+
+    async def mock_guardrail(stream, client=None, events=None):
+        async for chunk in stream:
+            yield chunk
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = AsyncMock(
+        return_value=RoutingResult(subject="escalate", confidence=1.0, raw_response="escalate"),
+    )
+    mock_math_mod = MagicMock()
+    mock_guardrail_service = MagicMock()
+    mock_guardrail_service.check_stream_with_sentence_buffer = mock_guardrail
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists.classifier": mock_classifier_mod,
+            "specialists.math": mock_math_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": mock_guardrail_service,
+        }),
+        patch("specialists.followup.FOLLOWUP_ENABLED", True),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()) as mock_log_route,
+        patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()),
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+    ):
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    mock_classifier_mod.route_intent.assert_awaited_once()
+    assert job.subject == "escalate"
+    assert mock_log_route.call_args[0][1] == "escalate"
+    assert mock_log_route.call_args[1]["confidence"] == 1.0
+    mock_math_mod.stream_math_response.assert_not_called()
@@ -98,7 +98,7 @@ async def test_full_orchestration_pipeline(client):
     async def mock_specialist_stream(text):
         yield "The answer is 20."
 
-    async def mock_guardrail(stream, client=None):
+    async def mock_guardrail(stream, client=None, events=None):
         async for chunk in stream:
             yield chunk
 
@@ -155,6 +155,110 @@ async def test_full_orchestration_pipeline(client):
         assert len(job.safe_text) > 0
 
 
+def _sse_events(body: str) -> list[dict]:
+    """Parse an SSE body into [{"id", "event", "data"}] (comments and retry skipped)."""
+    import json
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append({"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+@pytest.mark.asyncio
+async def test_job_events_stream_until_complete(client):
+    """SSE replays classification and each sentence, then ends after complete."""
+    from backend.models.job import OrchestratorJob
+    from backend.services.job_store import store_job
+
+    job = OrchestratorJob(session_id="sess-sse", student_text="What is 2+2?")
+    store_job(job)
+    job.mark_processing("math")
+    job.append_sentence("The answer is 4.")
+
+    async def finish_later():
+        await asyncio.sleep(0.05)
+        job.append_sentence("Two plus two is four.")
+        job.mark_complete(safe_text="The answer is 4. Two plus two is four.")
+
+    task = asyncio.create_task(finish_later())
+    response = await client.get(f"/orchestrate/{job.id}/events")
+    await task
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    assert [e["event"] for e in events] == ["classified", "sentence", "sentence", "complete"]
+    assert events[0]["data"] == {"subject": "math"}
+    assert events[2]["data"] == {"index": 1, "text": "Two plus two is four."}
+    assert [e["id"] for e in events] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_job_events_resume_from_last_event_id(client):
+    """Last-Event-ID skips events the client already has."""
+    from backend.models.job import OrchestratorJob
+    from backend.services.job_store import store_job
+
+    job = OrchestratorJob(session_id="sess-sse")
+    store_job(job)
+    job.mark_processing("history")
+    job.append_sentence("It began in 1914.")
+    job.mark_complete(safe_text="It began in 1914.")
+
+    response = await client.get(f"/orchestrate/{job.id}/events", headers={"Last-Event-ID": "2"})
+    assert [e["event"] for e in _sse_events(response.text)] == ["complete"]
+
+    response = await client.get(f"/orchestrate/{job.id}/events", params={"last_event_id": 1})
+    assert [e["event"] for e in _sse_events(response.text)] == ["sentence", "complete"]
+
+
+@pytest.mark.asyncio
+async def test_job_events_not_found(client):
+    response = await client.get("/orchestrate/nonexistent-id/events")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_cached_answer_is_sent_as_sentences():
+    from backend.routers.orchestrator import _split_sentences
+
+    text = "The Treaty of Versailles was signed in 1919. It ended the First World War."
+    assert _split_sentences(text) == [
+        "The Treaty of Versailles was signed in 1919.",
+        "It ended the First World War.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rewrite_clauses_are_published_as_one_sentence():
+    """Clause-by-clause rewrite output reaches append_sentence as whole sentences."""
+    from backend.models.job import OrchestratorJob
+    from backend.routers.orchestrator import _guarded_answer
+
+    async def raw_stream():
+        yield "unused"
+
+    async def clause_guardrail(stream, events=None):
+        async for _ in stream:
+            pass
+        # A rewritten sentence (three clauses), a clean one, then the residual
+        for piece in ["Let's keep it kind,", " and look at", " the treaty instead. ", "It was signed in 1919. ", "Done"]:
+            yield piece
+
+    job = OrchestratorJob(session_id="sess-rw", student_text="q")
+    with patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()):
+        safe_text, _, _ = await _guarded_answer(job, raw_stream(), clause_guardrail)
+
+    assert [s.strip() for s in job.sentences] == [
+        "Let's keep it kind, and look at the treaty instead.",
+        "It was signed in 1919.",
+        "Done",
+    ]
+    assert safe_text == "Let's keep it kind, and look at the treaty instead. It was signed in 1919. Done"
+
+
 @pytest.mark.asyncio
 async def test_health_endpoint(client):
     """Health check returns ok."""
@@ -0,0 +1,216 @@
+"""
+Unit tests for semantic answer reuse.
+
+Tests:
+- paraphrases match above the subject threshold; unrelated questions do not
+- critical-token guard (World War I vs II, first vs last)
+- content-token guard: near-miss questions that score above the threshold
+- rows expire with the answer cache TTL and are discarded with their entry
+- math is never served; other specialist models never match
+- batched search, ring-buffer bound, memory-mapped persistence
+- orchestration serves a paraphrase from the index
+"""
+import asyncio
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.services.semantic_index import SemanticIndex, content_tokens, critical_tokens, embed
+
+THRESHOLDS = {"history": 0.75, "english": 0.8}
+
+
+def _index(**kwargs) -> SemanticIndex:
+    kwargs.setdefault("path", "")
+    kwargs.setdefault("thresholds", THRESHOLDS)
+    return SemanticIndex(**kwargs)
+
+
+def test_embeddings_are_normalized_and_deterministic():
+    """Vectors are unit length and identical across calls."""
+    vectors = embed(["Why did the Berlin Wall fall?", "why did the berlin wall fall"])
+    assert vectors.shape[0] == 2
+    assert float(vectors[0] @ vectors[0]) == pytest.approx(1.0, abs=1e-5)
+    assert float(vectors[0] @ vectors[1]) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_paraphrase_served_above_threshold():
+    """A paraphrase of an indexed history question returns its answer."""
+    index = _index()
+    index.add("Why did the Berlin Wall fall?", "history", "gpt-4o", "Protests and reforms in 1989.")
+
+    match = index.search("so why did the berlin wall fall, please", "history", "gpt-4o")
+
+    assert match is not None
+    assert match.safe_text == "Protests and reforms in 1989."
+    assert match.score >= THRESHOLDS["history"]
+    assert index.search("Who painted the Mona Lisa?", "history", "gpt-4o") is None
+    assert index.stats.hits == 1 and index.stats.misses == 1
+
+
+def test_critical_token_guard():
+    """Near-identical wording that changes numbers, ordinals or the question word never matches."""
+    index = _index()
+    index.add("What caused World War I?", "history", "gpt-4o", "WWI answer.")
+    index.add("Who was the first Roman emperor?", "history", "gpt-4o", "Augustus.")
+
+    assert index.search("What caused World War II?", "history", "gpt-4o") is None
+    assert index.search("Who was the last Roman emperor?", "history", "gpt-4o") is None
+    assert critical_tokens("What caused World War I?") != critical_tokens("What caused World War II?")
+
+
+@pytest.mark.parametrize("indexed, asked, subject", [
+    ("Why did the Ottoman Empire fall?", "Why did the Roman Empire fall?", "history"),
+    ("What ended World War I?", "What caused World War I?", "history"),
+    ("What is the past tense of swim?", "What is the past tense of run?", "english"),
+    ("What is a pronoun?", "What is a noun?", "english"),
+])
+def test_near_miss_questions_do_not_match(indexed, asked, subject):
+    """Questions that embed above the threshold but ask about something else are misses."""
+    index = _index(thresholds={"history": 0.75, "english": 0.75})
+    index.add(indexed, subject, "gpt-4o", "Answer to a different question.")
+
+    score = float(embed([indexed])[0] @ embed([asked])[0])
+    assert score >= 0.75  # the n-gram vectors alone would serve it
+    assert content_tokens(indexed) != content_tokens(asked)
+    assert index.search(asked, subject, "gpt-4o") is None
+
+
+def test_rows_expire_and_are_discarded_with_answer_cache_entry():
+    """Rows older than the TTL never match; evicting the cache entry discards its row."""
+    from backend.services.answer_cache import AnswerCache
+
+    cache = AnswerCache(max_size=1)
+    index = _index()
+    cache.on_remove = index.discard
+    key = "history|m|why did the berlin wall fall"
+    cache.put(key, "history", "Berlin.")
+    index.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.", key=key)
+    assert index.search("Why did the Berlin Wall fall?", "history", "m").key == key
+
+    cache.put("history|m|who built the pyramids of giza", "history", "Egyptians.")   # evicts key
+
+    assert index.search("Why did the Berlin Wall fall?", "history", "m") is None
+    assert index.snapshot()["size"] == 0
+    assert index.stats.discards == 1
+
+    stale = _index(ttl_seconds=60)
+    stale.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.")
+    stale._created[0] -= 61
+    assert stale.search("Why did the Berlin Wall fall?", "history", "m") is None
+
+
+@pytest.mark.asyncio
+async def test_flush_runs_off_the_event_loop(tmp_path):
+    """Inserts on a running loop hand the metadata write to a worker thread."""
+    path = str(tmp_path / "answers.f32")
+    index = _index(capacity=8, path=path, flush_every=1)
+
+    with patch("backend.services.semantic_index.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        index.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.")
+        await index.aflush()
+
+    to_thread.assert_called()
+    assert index.stats.flushes == 1
+    assert _index(capacity=8, path=path).snapshot()["size"] == 1
+
+
+def test_math_not_served_and_model_must_match():
+    """Math is never indexed; answers from another model never match."""
+    index = _index()
+    index.add("What is 7 times 8?", "math", "claude-sonnet-4-6", "56.")
+    assert index.snapshot()["size"] == 0
+
+    index.add("What is a noun?", "english", "gpt-4o", "A naming word.")
+    assert index.search("What is a noun?", "english", "gpt-4.1") is None
+    assert index.search("What is a noun?", "english", "gpt-4o").safe_text == "A naming word."
+
+
+def test_batch_search_matches_individual_results():
+    """search_batch scores many questions at once."""
+    index = _index()
+    index.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.")
+    index.add("Can you explain the causes of the French Revolution?", "history", "m", "France.")
+
+    results = index.search_batch(
+        ["explain the causes of the french revolution please", "why did the berlin wall fall", "what is gravity"],
+        "history", "m",
+    )
+
+    assert [r.safe_text if r else None for r in results] == ["France.", "Berlin.", None]
+
+
+def test_ring_buffer_bounds_size():
+    """Past capacity, the oldest rows are overwritten."""
+    index = _index(capacity=2)
+    index.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.")
+    index.add("Who built the pyramids of Giza?", "history", "m", "Egyptians.")
+    index.add("What was the Magna Carta about?", "history", "m", "Rights.")
+
+    assert index.snapshot()["size"] == 2
+    assert index.stats.overwrites == 1
+    assert index.search("Why did the Berlin Wall fall?", "history", "m") is None
+
+
+def test_memmap_persistence_round_trip(tmp_path):
+    """A flushed index reloads its vectors and answers from disk."""
+    path = str(tmp_path / "answers.f32")
+    index = _index(capacity=8, path=path, flush_every=0)
+    index.add("Why did the Berlin Wall fall?", "history", "m", "Berlin.")
+    index.flush()
+
+    reloaded = _index(capacity=8, path=path)
+
+    assert reloaded.snapshot()["size"] == 1
+    assert reloaded.search("so why did the berlin wall fall, please", "history", "m").safe_text == "Berlin."
+
+    # A different capacity cannot reuse the file and starts empty
+    assert _index(capacity=4, path=path).snapshot()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_orchestration_serves_paraphrase_from_index():
+    """An answer-cache miss that matches the semantic index skips the specialist."""
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+    from backend.services.answer_cache import AnswerCache
+
+    index = _index()
+    index.add("Why did the Berlin Wall fall?", "history", "gpt-4o", "Protests and reforms in 1989.")
+    job = OrchestratorJob(session_id="sess-sem", student_text="so why did the berlin wall fall, please")
+    session = SessionUserdata(session_id="sess-sem")
+    specialist = MagicMock()
+
+    async def mock_classifier(text, client=None):
+        return SimpleNamespace(subject="history", confidence=1.0)
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = mock_classifier
+    mock_history_mod = MagicMock()
+    mock_history_mod.stream_history_response = specialist
+    mock_history_mod.HISTORY_MODEL = "gpt-4o"
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists.classifier": mock_classifier_mod,
+            "specialists.history": mock_history_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": MagicMock(),
+        }),
+        patch("backend.services.answer_cache.ANSWER_CACHE_ENABLED", True),
+        patch("backend.services.answer_cache.get_answer_cache", return_value=AnswerCache()),
+        patch("backend.services.semantic_index.SEMANTIC_CACHE_ENABLED", True),
+        patch("backend.services.semantic_index.get_semantic_index", return_value=index),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()),
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+    ):
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    specialist.assert_not_called()
+    assert job.safe_text == "Protests and reforms in 1989."
+    assert job.tts_ready
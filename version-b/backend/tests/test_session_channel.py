@@ -0,0 +1,205 @@
+"""
+Unit tests for the per-session push channel.
+
+Tests:
+- sequence numbers, replay after last_seq and resync when it is gone
+- slow subscribers are dropped instead of blocking publish
+- job events, filler cues and teacher hints are multiplexed onto the channel
+- WebSocket /ws/session/{session_id}: CSRF, replay on reconnect, dispatch
+"""
+import asyncio
+import sys
+import os
+import pytest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.models.job import OrchestratorJob
+from backend.models.session_state import SessionUserdata
+from backend.services.session_channel import DROPPED, SessionChannel, SessionChannelRegistry
+
+
+def test_publish_numbers_messages_and_replays_after_last_seq():
+    channel = SessionChannel("sess-1", replay=10)
+    for i in range(3):
+        channel.publish("filler", {"level": i})
+
+    _, replay, complete = channel.subscribe(last_seq=1)
+
+    assert complete is True
+    assert [m["seq"] for m in replay] == [2, 3]
+    assert replay[0] == {"seq": 2, "type": "filler", "session_id": "sess-1", "level": 1}
+
+
+def test_replay_gap_requires_resync():
+    """A reconnect older than the replay buffer (or from before a restart) must resync."""
+    channel = SessionChannel("sess-1", replay=2)
+    for i in range(5):
+        channel.publish("filler", {"level": i})
+
+    _, replay, complete = channel.subscribe(last_seq=1)
+    assert complete is False
+    assert [m["seq"] for m in replay] == [4, 5]
+    assert channel.subscribe(last_seq=3)[2] is True
+    assert channel.subscribe(last_seq=99)[2] is False
+    assert channel.stats.resyncs == 2
+
+
+def test_slow_subscriber_is_dropped():
+    channel = SessionChannel("sess-1", max_queue=2)
+    queue, _, _ = channel.subscribe()
+    for i in range(3):
+        channel.publish("filler", {"level": i})
+
+    assert channel.subscriber_count == 0
+    assert [queue.get_nowait() for _ in range(3)][-1] is DROPPED
+    assert channel.stats.dropped_subscribers == 1
+
+
+def test_registry_prunes_idle_channels_without_subscribers():
+    registry = SessionChannelRegistry(ttl_s=10)
+    idle = registry.get("idle")
+    busy = registry.get("busy")
+    busy.subscribe()
+    idle.last_active = busy.last_active = 0.0
+
+    assert registry.prune(now=100.0) == 1
+    assert registry.find("idle") is None
+    assert registry.find("busy") is busy
+
+
+def test_job_events_are_republished():
+    channel = SessionChannel("sess-1")
+    job = OrchestratorJob(session_id="sess-1", student_text="What is 2+2?")
+    job.listeners.append(channel.job_listener(job.id))
+
+    job.mark_processing("math")
+    job.append_sentence("The answer is 4.")
+    job.mark_complete(safe_text="The answer is 4.")
+
+    _, replay, _ = channel.subscribe(last_seq=0)
+    assert [m["type"] for m in replay] == ["job.classified", "job.sentence", "job.complete"]
+    assert replay[1]["job_id"] == job.id
+    assert replay[1]["text"] == "The answer is 4."
+
+
+@pytest.mark.asyncio
+async def test_filler_cues_stop_at_first_sentence():
+    from backend.routers.orchestrator import _send_filler_cues
+
+    channel = SessionChannel("sess-1")
+    job = OrchestratorJob(session_id="sess-1")
+    session = SessionUserdata(session_id="sess-1")
+
+    async def first_sentence_later():
+        await asyncio.sleep(0.7)  # past the 0.5s threshold, before 1.5s
+        job.append_sentence("Here we go.")
+
+    task = asyncio.create_task(first_sentence_later())
+    await _send_filler_cues(job, session, channel)
+    await task
+
+    _, replay, _ = channel.subscribe(last_seq=0)
+    assert [(m["type"], m["level"]) for m in replay] == [("filler", 1)]
+
+
+# ---- WebSocket -----------------------------------------------------------
+
+@pytest.fixture
+def channels():
+    registry = SessionChannelRegistry()
+    with (
+        patch("backend.services.session_channel.SESSION_CHANNEL_ENABLED", True),
+        patch("backend.services.session_channel._registry", registry),
+    ):
+        yield registry
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "?token={csrf}",                   # a CSRF token is not a channel token
+    "?token={other}",                  # a token for another session
+])
+def test_websocket_rejects_tokens_not_bound_to_the_session(channels, query):
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    from backend.main import app
+    from backend.routers.csrf import make_csrf_token, make_session_token
+
+    query = query.format(csrf=make_csrf_token(), other=make_session_token("sess-other"))
+    with TestClient(app) as client:
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(f"/ws/session/sess-ws{query}") as ws:
+                ws.receive_json()
+
+
+def test_websocket_replays_after_last_seq_then_streams_live(channels):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.routers.csrf import make_session_token
+    from backend.services.session_channel import publish
+
+    publish("sess-ws", "teacher_hint", {"text": "first"})
+    publish("sess-ws", "teacher_hint", {"text": "second"})
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/ws/session/sess-ws?token={make_session_token('sess-ws')}&last_seq=1") as ws:
+            assert ws.receive_json() == {"type": "connected", "session_id": "sess-ws", "seq": 2}
+            assert ws.receive_json()["text"] == "second"
+
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "pong", "seq": 2}
+
+
+def test_websocket_dispatch_starts_a_job(channels):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.routers.csrf import make_session_token
+
+    async def no_orchestration(job, session):
+        return None
+
+    with (
+        patch("backend.routers.orchestrator._run_orchestration", new=no_orchestration),
+        TestClient(app) as client,
+    ):
+        with client.websocket_connect(f"/ws/session/sess-ws?token={make_session_token('sess-ws')}") as ws:
+            ws.receive_json()  # connected
+            ws.send_json({"type": "dispatch", "student_text": "What is 2+2?", "ref": "t1"})
+            first, second = ws.receive_json(), ws.receive_json()
+
+    by_type = {m["type"]: m for m in (first, second)}
+    assert by_type["dispatched"]["ref"] == "t1"
+    assert by_type["job.dispatched"]["job_id"] == by_type["dispatched"]["job_id"]
+    assert by_type["job.dispatched"]["seq"] == 1
+    assert channels.stats.dispatches == 1
+
+
+def test_dispatch_rate_limit_is_shared_by_all_connections_of_a_session(channels):
+    """Opening more sockets does not multiply the per-session dispatch budget."""
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.routers.csrf import make_session_token
+
+    async def no_orchestration(job, session):
+        return None
+
+    url = f"/ws/session/sess-ws?token={make_session_token('sess-ws')}"
+    with (
+        patch("backend.routers.orchestrator._run_orchestration", new=no_orchestration),
+        patch("backend.routers.channel.DISPATCH_PER_MINUTE", 1),
+        TestClient(app) as client,
+    ):
+        with client.websocket_connect(url) as ws:
+            ws.receive_json()  # connected
+            ws.send_json({"type": "dispatch", "student_text": "What is 2+2?", "ref": "t1"})
+            replies = {ws.receive_json()["type"] for _ in range(2)}
+            assert "dispatched" in replies
+        with client.websocket_connect(url) as ws:
+            ws.receive_json()  # connected
+            ws.send_json({"type": "dispatch", "student_text": "What is 3+3?", "ref": "t2"})
+            reply = ws.receive_json()
+
+    assert reply == {"type": "error", "ref": "t2", "detail": "Rate limit exceeded"}
+    assert channels.stats.dispatches == 1
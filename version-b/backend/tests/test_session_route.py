@@ -50,6 +50,11 @@ async def test_session_token_endpoint(client):
     assert data["session_id"] == "sess-abc123"
 
 
+    from backend.routers.csrf import verify_session_token
+    assert verify_session_token(data["channel_token"], "sess-abc123")
+    assert not verify_session_token(data["channel_token"], "sess-other")
+
+
 @pytest.mark.asyncio
 async def test_session_token_returns_provided_session_id(client):
     """POST /session/token echoes back the caller-provided session_id."""
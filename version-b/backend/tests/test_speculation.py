@@ -0,0 +1,218 @@
+"""
+Unit tests for speculative specialist dispatch.
+
+Tests:
+- buffered output is replayed when the guess is adopted
+- cancelling a speculative stream records wasted output (mispredictions only)
+- a consumer that stops early cancels the pump
+- subject guess: session subject first, then the local classifier
+- orchestration adopts a correct guess and replaces a wrong one (or one on another model tier)
+"""
+import asyncio
+from contextlib import ExitStack
+import sys
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../../shared"))
+
+from backend.services.speculation import SpeculationStats, SpeculativeStream, guess_subject
+
+
+async def _chunks(*chunks, delay: float = 0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_adopt_replays_buffered_chunks():
+    """Chunks produced before adoption are replayed in order, then the rest follow."""
+    stats = SpeculationStats()
+    spec = SpeculativeStream("math", _chunks("The ", "answer ", "is 4."), stats=stats)
+    await asyncio.sleep(0.01)  # let the pump buffer everything
+
+    assert "".join([c async for c in spec.adopt()]) == "The answer is 4."
+    assert stats.started == 1
+    assert stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_adopt_reraises_stream_error():
+    """A failing speculative stream surfaces its error to the consumer."""
+    async def failing():
+        yield "partial "
+        raise RuntimeError("provider down")
+
+    spec = SpeculativeStream("math", failing(), stats=SpeculationStats())
+
+    with pytest.raises(RuntimeError, match="provider down"):
+        async for _ in spec.adopt():
+            pass
+
+
+@pytest.mark.asyncio
+async def test_cancel_records_waste():
+    """Cancelling stops the stream and counts what it produced as wasted."""
+    stats = SpeculationStats()
+    spec = SpeculativeStream("history", _chunks("abcd", "efgh", "never", delay=0.02), stats=stats)
+    await asyncio.sleep(0.05)
+
+    await spec.cancel()
+
+    assert stats.misses == 1
+    assert 0 < stats.wasted_chars < len("abcdefghnever")
+    assert stats.snapshot()["wasted_tokens_est"] == stats.wasted_chars // 4
+
+
+@pytest.mark.asyncio
+async def test_cancel_for_other_reasons_is_not_a_miss():
+    """Cache hits, tier changes and errors are counted by reason, not as mispredictions."""
+    from backend.services.speculation import CANCEL_CACHE_HIT
+
+    stats = SpeculationStats()
+    spec = SpeculativeStream("history", _chunks("abcd", "efgh"), stats=stats)
+    await asyncio.sleep(0.01)
+
+    await spec.cancel(CANCEL_CACHE_HIT)
+
+    assert stats.misses == 0
+    assert stats.wasted_chars == 0
+    assert stats.discarded_chars == len("abcdefgh")
+    assert stats.snapshot()["cancelled"] == {"cache_hit": 1}
+
+
+@pytest.mark.asyncio
+async def test_adopting_consumer_stopping_early_cancels_pump():
+    """Closing the adopted stream stops the specialist stream behind it."""
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield "more "
+                await asyncio.sleep(0.005)
+        finally:
+            closed.set()
+
+    spec = SpeculativeStream("math", endless(), stats=SpeculationStats())
+    adopted = spec.adopt()
+    assert await adopted.__anext__() == "more "
+    await adopted.aclose()
+
+    await asyncio.wait_for(closed.wait(), timeout=1)
+    assert spec._task.done()
+
+
+def test_guess_prefers_session_subject():
+    """The session's current subject is used before the local classifier."""
+    assert guess_subject("history", "what is 7 times 8") == "history"
+
+
+def test_guess_falls_back_to_local_classifier():
+    """With no session subject, the local classifier's top label is used."""
+    router = MagicMock()
+    router.guess.return_value = "math"
+    with (
+        patch("specialists.local_classifier.LOCAL_CLASSIFIER_ENABLED", True),
+        patch("specialists.local_classifier.get_local_router", return_value=router),
+    ):
+        assert guess_subject(None, "what is 7 times 8") == "math"
+
+    router.guess.return_value = "escalate"
+    with (
+        patch("specialists.local_classifier.LOCAL_CLASSIFIER_ENABLED", True),
+        patch("specialists.local_classifier.get_local_router", return_value=router),
+    ):
+        assert guess_subject(None, "get me a teacher") is None
+
+
+async def _orchestrate(session_subject: str, routed_subject: str, choose_model=None):
+    """Run _run_orchestration with speculation on; return (job, started subjects, stats)."""
+    from backend.models.job import OrchestratorJob
+    from backend.models.session_state import SessionUserdata
+
+    job = OrchestratorJob(session_id="sess-spec", student_text="question")
+    session = SessionUserdata(session_id="sess-spec", current_subject=session_subject)
+    started: list[str] = []
+    stats = SpeculationStats()
+
+    async def slow_classifier(text, client=None):
+        await asyncio.sleep(0.02)
+        result = MagicMock()
+        result.subject = routed_subject
+        result.confidence = 1.0
+        return result
+
+    def fake_specialist(subject, text, history=None, model=None):
+        started.append(subject)
+        return _chunks(f"{subject} answer.")
+
+    async def passthrough_guardrail(stream, client=None, events=None):
+        async for chunk in stream:
+            yield chunk
+
+    mock_classifier_mod = MagicMock()
+    mock_classifier_mod.route_intent = slow_classifier
+    mock_guardrail_service = MagicMock()
+    mock_guardrail_service.check_stream_with_sentence_buffer = passthrough_guardrail
+
+    with (
+        patch.dict(sys.modules, {
+            "specialists": MagicMock(),
+            "specialists.classifier": mock_classifier_mod,
+            "guardrail": MagicMock(),
+            "guardrail.service": mock_guardrail_service,
+        }),
+        patch("backend.services.speculation.SPECULATIVE_DISPATCH", True),
+        patch("backend.services.speculation._stats", stats),
+        patch("backend.routers.orchestrator._get_specialist_stream", new=fake_specialist),
+        patch("backend.routers.orchestrator._log_routing_decision", new=AsyncMock()),
+        patch("backend.routers.orchestrator._log_guardrail_event", new=AsyncMock()),
+        patch("backend.routers.orchestrator._save_transcript", new=AsyncMock()),
+        ExitStack() as stack,
+    ):
+        if choose_model is not None:
+            stack.enter_context(patch("backend.routers.orchestrator._choose_model", new=choose_model))
+        from backend.routers.orchestrator import _run_orchestration
+        await _run_orchestration(job, session)
+
+    return job, started, stats
+
+
+@pytest.mark.asyncio
+async def test_orchestration_adopts_correct_guess():
+    """When the classifier agrees, the speculative stream is the only specialist call."""
+    job, started, stats = await _orchestrate("math", "math")
+
+    assert job.safe_text == "math answer."
+    assert started == ["math"]
+    assert stats.hits == 1 and stats.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_orchestration_replaces_wrong_guess():
+    """When the classifier disagrees, the speculative output is discarded."""
+    job, started, stats = await _orchestrate("math", "history")
+
+    assert job.safe_text == "history answer."
+    assert started == ["math", "history"]
+    assert stats.misses == 1
+    assert stats.wasted_chars == len("math answer.")
+
+
+@pytest.mark.asyncio
+async def test_orchestration_replaces_guess_on_another_tier():
+    """Right subject but a different model tier: the speculative stream is discarded."""
+    def choose_model(subject, text, confidence=None, record=True):
+        # Speculation (no confidence yet) picks the fast tier, the routed decision the standard one
+        return "fast-model" if not record else "standard-model"
+
+    job, started, stats = await _orchestrate("math", "math", choose_model=choose_model)
+
+    assert started == ["math", "math"]
+    assert stats.misses == 0 and stats.hits == 0
+    assert stats.cancelled == {"tier_mismatch": 1}
+    assert stats.wasted_chars == 0
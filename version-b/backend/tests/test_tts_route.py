@@ -112,3 +112,61 @@ async def test_tts_stream_missing_job_id(client):
     """POST /tts/stream returns 422 when job_id field is missing."""
     response = await client.post("/tts/stream", json={"voice": "alloy"})
     assert response.status_code == 422
+
+
+def _fake_synthesize(calls: list):
+    async def synthesize(text, voice):
+        calls.append(text)
+        yield f"PCM[{text}]".encode()
+    return synthesize
+
+
+@pytest.mark.asyncio
+async def test_tts_stream_incremental_starts_before_completion(client):
+    """incremental=true streams each sentence's audio as it lands, ending on completion."""
+    import asyncio
+
+    job = OrchestratorJob(session_id="sess-inc", student_text="What is 25% of 80?")
+    store_job(job)
+    job.mark_processing("math")
+    job.append_sentence("The answer is 20.")
+    calls: list[str] = []
+
+    async def finish_later():
+        await asyncio.sleep(0.05)
+        assert calls == ["The answer is 20."]  # first sentence synthesized before the rest exists
+        job.append_sentence("A quarter of 80 is 20.")
+        job.mark_complete(safe_text="The answer is 20. A quarter of 80 is 20.")
+
+    task = asyncio.create_task(finish_later())
+    with patch("backend.routers.tts._synthesize", new=_fake_synthesize(calls)):
+        response = await client.post("/tts/stream", json={"job_id": job.id, "incremental": True})
+    await task
+
+    assert response.status_code == 200
+    assert response.content == b"PCM[The answer is 20.]PCM[A quarter of 80 is 20.]"
+    assert calls == ["The answer is 20.", "A quarter of 80 is 20."]
+
+
+@pytest.mark.asyncio
+async def test_tts_stream_incremental_ends_on_job_error(client):
+    """A job failing mid-answer ends the stream after the sentences already spoken."""
+    import asyncio
+
+    job = OrchestratorJob(session_id="sess-inc-err", student_text="hello")
+    store_job(job)
+    job.mark_processing("history")
+    job.append_sentence("It began in 1914.")
+    calls: list[str] = []
+
+    async def fail_later():
+        await asyncio.sleep(0.05)
+        job.mark_error("provider down")
+
+    task = asyncio.create_task(fail_later())
+    with patch("backend.routers.tts._synthesize", new=_fake_synthesize(calls)):
+        response = await client.post("/tts/stream", json={"job_id": job.id, "incremental": True})
+    await task
+
+    assert response.status_code == 200
+    assert response.content == b"PCM[It began in 1914.]"